@@ -0,0 +1,35 @@
+"""add_overdue_sweep_support
+
+Revision ID: o0p1q2r3s4t5
+Revises: b7c8d9e0f1g2
+Create Date: 2025-12-15 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'o0p1q2r3s4t5'
+down_revision: Union[str, None] = 'b7c8d9e0f1g2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE pistatus ADD VALUE IF NOT EXISTS 'EXPIRED'")
+
+    # Supports the overdue sweep and overdue/aging lookups
+    op.create_index('ix_invoices_status_due_date', 'invoices', ['status', 'due_date'])
+    op.create_index('ix_proforma_invoices_status_valid_until', 'proforma_invoices', ['status', 'valid_until'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_proforma_invoices_status_valid_until', table_name='proforma_invoices')
+    op.drop_index('ix_invoices_status_due_date', table_name='invoices')
+
+    # PostgreSQL cannot drop an enum value; move expired PIs back to SENT
+    op.execute("UPDATE proforma_invoices SET status = 'SENT' WHERE status = 'EXPIRED'")
@@ -0,0 +1,49 @@
+"""add_payment_allocations
+
+Revision ID: p1q2r3s4t5u6
+Revises: o0p1q2r3s4t5
+Create Date: 2025-12-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'p1q2r3s4t5u6'
+down_revision: Union[str, None] = 'o0p1q2r3s4t5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'payment_allocations',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('payment_id', sa.Integer(), sa.ForeignKey('payments.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('invoice_id', sa.Integer(), sa.ForeignKey('invoices.id'), nullable=False),
+        sa.Column('amount', sa.Numeric(15, 2), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint('payment_id', 'invoice_id', name='uq_payment_allocation_payment_invoice'),
+    )
+    op.create_index('ix_payment_allocations_id', 'payment_allocations', ['id'])
+    op.create_index('ix_payment_allocations_payment_id', 'payment_allocations', ['payment_id'])
+    op.create_index('ix_payment_allocations_invoice_id', 'payment_allocations', ['invoice_id'])
+
+    # Existing single-invoice payments become one allocation each
+    op.execute("""
+        INSERT INTO payment_allocations (payment_id, invoice_id, amount, created_at, updated_at)
+        SELECT id, invoice_id, net_amount, created_at, updated_at
+        FROM payments
+        WHERE invoice_id IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payment_allocations_invoice_id', table_name='payment_allocations')
+    op.drop_index('ix_payment_allocations_payment_id', table_name='payment_allocations')
+    op.drop_index('ix_payment_allocations_id', table_name='payment_allocations')
+    op.drop_table('payment_allocations')
@@ -0,0 +1,71 @@
+"""add_bank_statement_tables
+
+Revision ID: q2r3s4t5u6v7
+Revises: p1q2r3s4t5u6
+Create Date: 2025-12-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'q2r3s4t5u6v7'
+down_revision: Union[str, None] = 'p1q2r3s4t5u6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create bank_statements table
+    op.create_table(
+        'bank_statements',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('bank_account_id', sa.Integer(), sa.ForeignKey('bank_accounts.id'), nullable=False),
+        sa.Column('file_name', sa.String(255), nullable=False),
+        sa.Column('statement_from', sa.Date(), nullable=True),
+        sa.Column('statement_to', sa.Date(), nullable=True),
+        sa.Column('total_lines', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('matched_lines', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_debit', sa.Numeric(15, 2), nullable=False, server_default='0'),
+        sa.Column('total_credit', sa.Numeric(15, 2), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_bank_statements_id', 'bank_statements', ['id'])
+    op.create_index('ix_bank_statements_bank_account_id', 'bank_statements', ['bank_account_id'])
+
+    # Create bank_statement_lines table
+    op.create_table(
+        'bank_statement_lines',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('statement_id', sa.Integer(), sa.ForeignKey('bank_statements.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('line_number', sa.Integer(), nullable=False),
+        sa.Column('transaction_date', sa.Date(), nullable=False),
+        sa.Column('narration', sa.Text(), nullable=True),
+        sa.Column('reference', sa.String(100), nullable=True),
+        sa.Column('transaction_type', sa.String(10), nullable=False),
+        sa.Column('amount', sa.Numeric(15, 2), nullable=False),
+        sa.Column('balance', sa.Numeric(15, 2), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False, server_default='UNMATCHED'),
+        sa.Column('match_type', sa.String(20), nullable=True),
+        sa.Column('match_score', sa.Numeric(5, 2), nullable=True),
+        sa.Column('payment_id', sa.Integer(), sa.ForeignKey('payments.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('cash_expense_id', sa.Integer(), sa.ForeignKey('cash_expenses.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_bank_statement_lines_id', 'bank_statement_lines', ['id'])
+    op.create_index('ix_bank_statement_lines_statement_id', 'bank_statement_lines', ['statement_id'])
+    op.create_index('ix_bank_statement_lines_transaction_date', 'bank_statement_lines', ['transaction_date'])
+    op.create_index('ix_bank_statement_lines_reference', 'bank_statement_lines', ['reference'])
+    op.create_index('ix_bank_statement_lines_status', 'bank_statement_lines', ['status'])
+    op.create_index('ix_bank_statement_lines_payment_id', 'bank_statement_lines', ['payment_id'])
+    op.create_index('ix_bank_statement_lines_cash_expense_id', 'bank_statement_lines', ['cash_expense_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('bank_statement_lines')
+    op.drop_table('bank_statements')
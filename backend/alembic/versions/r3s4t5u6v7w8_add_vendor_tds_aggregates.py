@@ -0,0 +1,74 @@
+"""add_vendor_tds_aggregates
+
+Revision ID: r3s4t5u6v7w8
+Revises: q2r3s4t5u6v7
+Create Date: 2025-12-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'r3s4t5u6v7w8'
+down_revision: Union[str, None] = 'q2r3s4t5u6v7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'vendor_tds_aggregates',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('vendor_id', sa.Integer(), sa.ForeignKey('vendors.id'), nullable=False),
+        sa.Column('tds_section', sa.String(10), nullable=False),
+        sa.Column('financial_year', sa.String(9), nullable=False),
+        sa.Column('total_amount', sa.Numeric(15, 2), nullable=False, server_default='0'),
+        sa.Column('tds_base_amount', sa.Numeric(15, 2), nullable=False, server_default='0'),
+        sa.Column('invoice_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint('vendor_id', 'tds_section', 'financial_year', name='uq_vendor_tds_aggregate'),
+    )
+    op.create_index('ix_vendor_tds_aggregates_id', 'vendor_tds_aggregates', ['id'])
+    op.create_index('ix_vendor_tds_aggregates_vendor_id', 'vendor_tds_aggregates', ['vendor_id'])
+
+    # Build running totals from existing purchase invoices
+    op.execute("""
+        INSERT INTO vendor_tds_aggregates (
+            vendor_id, tds_section, financial_year, total_amount,
+            tds_base_amount, invoice_count, created_at, updated_at
+        )
+        SELECT
+            i.vendor_id,
+            upper(replace(replace(trim(coalesce(i.tds_section, v.tds_section)), '-', ''), ' ', '')) AS section,
+            fy.financial_year,
+            sum(i.taxable_amount),
+            coalesce(sum(i.taxable_amount) FILTER (WHERE i.tds_applicable), 0),
+            count(*),
+            now(),
+            now()
+        FROM invoices i
+        JOIN vendors v ON v.id = i.vendor_id
+        CROSS JOIN LATERAL (
+            SELECT CASE WHEN extract(month FROM i.invoice_date) >= 4
+                THEN extract(year FROM i.invoice_date)::int
+                ELSE extract(year FROM i.invoice_date)::int - 1
+            END AS start_year
+        ) y
+        CROSS JOIN LATERAL (
+            SELECT y.start_year::text || '-' || (y.start_year + 1)::text AS financial_year
+        ) fy
+        WHERE i.invoice_type = 'PURCHASE'
+          AND i.status <> 'CANCELLED'
+          AND coalesce(i.tds_section, v.tds_section) IS NOT NULL
+        GROUP BY i.vendor_id, section, fy.financial_year
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vendor_tds_aggregates_vendor_id', table_name='vendor_tds_aggregates')
+    op.drop_index('ix_vendor_tds_aggregates_id', table_name='vendor_tds_aggregates')
+    op.drop_table('vendor_tds_aggregates')
@@ -5,9 +5,12 @@ from sqlalchemy import select
 
 from app.db.session import get_db
 from app.models.user import User
-from app.schemas.user import UserCreate, UserResponse, UserLogin, Token
+from app.schemas.user import UserCreate, UserResponse, UserLogin, Token, PasswordChange
 from app.core.config import settings
-from app.core.security import create_access_token, verify_password, get_password_hash, get_current_user
+from app.core.security import (
+    create_user_token, verify_password_async, get_password_hash_async, get_current_user,
+    bump_token_version, user_cache, login_throttle, password_needs_rehash,
+)
 
 router = APIRouter()
 
@@ -28,7 +31,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     user = User(
         email=user_data.email,
         name=user_data.name,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash_async(user_data.password),
         role=user_data.role,
         is_active=user_data.is_active,
     )
@@ -41,10 +44,19 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login and get access token."""
+    retry_after = login_throttle.retry_after(credentials.email)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
     result = await db.execute(select(User).where(User.email == credentials.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not user or not await verify_password_async(credentials.password, user.hashed_password):
+        login_throttle.failure(credentials.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -57,10 +69,14 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
             detail="Inactive user"
         )
 
+    login_throttle.success(credentials.email)
+    if password_needs_rehash(user.hashed_password):
+        # Cost factor changed; upgrade while the plain password is at hand
+        user.hashed_password = await get_password_hash_async(credentials.password)
+        await db.commit()
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
-    )
+    access_token = create_user_token(user, expires_delta=access_token_expires)
 
     return Token(
         access_token=access_token,
@@ -69,11 +85,46 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
     """Get current user information."""
+    if current_user.created_at is None:
+        # Principal built from token claims; load the full record
+        result = await db.execute(select(User).where(User.id == current_user.id))
+        return result.scalar_one()
     return current_user
 
 
+@router.post("/change-password", response_model=Token)
+async def change_password(
+    data: PasswordChange,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Change the password; tokens issued before the change stop working."""
+    result = await db.execute(select(User).where(User.id == current_user.id))
+    user = result.scalar_one()
+
+    if not await verify_password_async(data.current_password, user.hashed_password):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Current password is incorrect"
+        )
+
+    user.hashed_password = await get_password_hash_async(data.new_password)
+    bump_token_version(user)
+    await db.commit()
+    user_cache.invalidate(user.id)
+
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return Token(
+        access_token=create_user_token(user, expires_delta=access_token_expires),
+        user=UserResponse.model_validate(user)
+    )
+
+
 @router.post("/logout")
 async def logout():
     """Logout user (client should discard the token)."""
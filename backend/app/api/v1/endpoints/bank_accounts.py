@@ -11,9 +11,12 @@ from app.models.user import User
 from app.schemas.bank_account import BankAccountCreate, BankAccountUpdate, BankAccountResponse, BankAccountWithBranch
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
+from app.core.responses import paginated_response, response_adapter
 
 router = APIRouter()
 
+BANK_ACCOUNT_PAGE = response_adapter(PaginatedResponse[BankAccountResponse])
+
 
 @router.get("", response_model=PaginatedResponse[BankAccountResponse])
 async def get_bank_accounts(
@@ -44,13 +47,7 @@ async def get_bank_accounts(
     result = await db.execute(query)
     accounts = result.scalars().all()
 
-    return PaginatedResponse(
-        items=[BankAccountResponse.model_validate(a) for a in accounts],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return paginated_response(BANK_ACCOUNT_PAGE, accounts, total, page, page_size)
 
 
 @router.get("/{account_id}", response_model=BankAccountWithBranch)
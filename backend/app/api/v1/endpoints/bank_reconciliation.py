@@ -0,0 +1,386 @@
+import logging
+from typing import Optional
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, insert, update, values, column, Integer
+
+from app.db.session import get_db
+from app.models.user import User
+from app.models.bank_account import BankAccount
+from app.models.bank_statement import BankStatement, BankStatementLine, ReconciliationStatus, MatchType
+from app.models.cash_expense import CashExpense
+from app.models.payment import Payment
+from app.models.expense_category import ExpenseCategory
+from app.models.project import Project
+from app.models.branch import Branch
+from app.schemas.bank_statement import (
+    BankStatementResponse,
+    BankStatementImportResponse,
+    BankStatementLineResponse,
+    BankStatementLineUpdate,
+    CreateExpensesFromLinesRequest,
+    CreateExpensesFromLinesResponse,
+)
+from app.schemas.common import PaginatedResponse, Message
+from app.core.security import get_current_user
+from app.core.responses import paginated_response, response_adapter
+from app.services.bank_reconciliation import (
+    NARRATION_WINDOW_DAYS,
+    parse_statement,
+    load_candidates,
+    match_lines,
+    insert_statement_lines,
+    apply_matches,
+    load_unmatched_lines,
+    refresh_statement_summary,
+    summarize_matches,
+)
+from app.services.number_generator import reserve_expense_numbers, get_financial_year
+
+router = APIRouter()
+
+BANK_STATEMENT_PAGE = response_adapter(PaginatedResponse[BankStatementResponse])
+BANK_STATEMENT_LINE_PAGE = response_adapter(PaginatedResponse[BankStatementLineResponse])
+logger = logging.getLogger(__name__)
+
+
+async def _get_statement(db: AsyncSession, statement_id: int) -> BankStatement:
+    result = await db.execute(select(BankStatement).where(BankStatement.id == statement_id))
+    statement = result.scalar_one_or_none()
+    if not statement:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bank statement not found")
+    return statement
+
+
+@router.post("/statements", response_model=BankStatementImportResponse, status_code=status.HTTP_201_CREATED)
+async def import_bank_statement(
+    bank_account_id: int = Form(...),
+    date_window_days: int = Form(3, ge=0, le=30),
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Import a bank statement (CSV or XLSX) and auto-reconcile its lines against
+    unreconciled payments and cash expenses of the bank account.
+    """
+    bank_account_result = await db.execute(select(BankAccount).where(BankAccount.id == bank_account_id))
+    if not bank_account_result.scalar_one_or_none():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Bank account not found")
+
+    # Parsing and matching are CPU bound; keep them off the event loop
+    try:
+        lines = await run_in_threadpool(parse_statement, file.file, file.filename or "")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not lines:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No transactions found in the statement")
+
+    date_from = min(line["transaction_date"] for line in lines)
+    date_to = max(line["transaction_date"] for line in lines)
+    window = timedelta(days=max(date_window_days, NARRATION_WINDOW_DAYS))
+    candidates = await load_candidates(db, bank_account_id, date_from - window, date_to + window)
+    matches = await run_in_threadpool(match_lines, lines, candidates, date_window_days)
+
+    statement = BankStatement(
+        bank_account_id=bank_account_id,
+        file_name=file.filename or "statement",
+        statement_from=date_from,
+        statement_to=date_to,
+        total_lines=len(lines),
+        matched_lines=len(matches),
+        total_debit=sum(line["amount"] for line in lines if line["transaction_type"] == "DEBIT"),
+        total_credit=sum(line["amount"] for line in lines if line["transaction_type"] == "CREDIT"),
+    )
+    db.add(statement)
+    await db.flush()
+
+    await insert_statement_lines(db, statement.id, lines, matches)
+    await db.commit()
+
+    logger.info(
+        f"Imported bank statement {statement.id}: {len(lines)} lines, {len(matches)} matched"
+    )
+
+    return BankStatementImportResponse(
+        statement=BankStatementResponse.model_validate(statement),
+        matches_by_type=summarize_matches(matches),
+        unmatched_lines=len(lines) - len(matches),
+    )
+
+
+@router.get("/statements", response_model=PaginatedResponse[BankStatementResponse])
+async def get_bank_statements(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    bank_account_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get imported bank statements."""
+    query = select(BankStatement)
+    if bank_account_id:
+        query = query.where(BankStatement.bank_account_id == bank_account_id)
+    query = query.order_by(BankStatement.created_at.desc())
+
+    count_query = select(func.count()).select_from(query.subquery())
+    total_result = await db.execute(count_query)
+    total = total_result.scalar()
+
+    query = query.offset((page - 1) * page_size).limit(page_size)
+    result = await db.execute(query)
+    statements = result.scalars().all()
+
+    return paginated_response(BANK_STATEMENT_PAGE, statements, total, page, page_size)
+
+
+@router.get("/statements/{statement_id}", response_model=BankStatementResponse)
+async def get_bank_statement(
+    statement_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get a bank statement summary."""
+    return await _get_statement(db, statement_id)
+
+
+@router.get("/statements/{statement_id}/lines", response_model=PaginatedResponse[BankStatementLineResponse])
+async def get_bank_statement_lines(
+    statement_id: int,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    line_status: Optional[ReconciliationStatus] = Query(None, alias="status"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get statement lines with their reconciliation status."""
+    await _get_statement(db, statement_id)
+
+    query = select(BankStatementLine).where(BankStatementLine.statement_id == statement_id)
+    if line_status:
+        query = query.where(BankStatementLine.status == line_status.value)
+    query = query.order_by(BankStatementLine.line_number)
+
+    count_query = select(func.count()).select_from(query.subquery())
+    total_result = await db.execute(count_query)
+    total = total_result.scalar()
+
+    query = query.offset((page - 1) * page_size).limit(page_size)
+    result = await db.execute(query)
+    lines = result.scalars().all()
+
+    return paginated_response(BANK_STATEMENT_LINE_PAGE, lines, total, page, page_size)
+
+
+@router.post("/statements/{statement_id}/reconcile", response_model=BankStatementImportResponse)
+async def reconcile_bank_statement(
+    statement_id: int,
+    date_window_days: int = Query(3, ge=0, le=30),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Re-run auto-reconciliation for the unmatched lines of a statement."""
+    statement = await _get_statement(db, statement_id)
+
+    lines = await load_unmatched_lines(db, statement_id)
+    matches = {}
+    if lines:
+        date_from = min(line["transaction_date"] for line in lines)
+        date_to = max(line["transaction_date"] for line in lines)
+        window = timedelta(days=max(date_window_days, NARRATION_WINDOW_DAYS))
+        candidates = await load_candidates(db, statement.bank_account_id, date_from - window, date_to + window)
+        matches = await run_in_threadpool(match_lines, lines, candidates, date_window_days)
+        await apply_matches(db, statement_id, matches)
+
+    await refresh_statement_summary(db, statement)
+    await db.commit()
+
+    return BankStatementImportResponse(
+        statement=BankStatementResponse.model_validate(statement),
+        matches_by_type=summarize_matches(matches),
+        unmatched_lines=len(lines) - len(matches),
+    )
+
+
+@router.patch("/lines/{line_id}", response_model=BankStatementLineResponse)
+async def update_bank_statement_line(
+    line_id: int,
+    line_data: BankStatementLineUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Manually match, unmatch or ignore a statement line."""
+    result = await db.execute(select(BankStatementLine).where(BankStatementLine.id == line_id))
+    line = result.scalar_one_or_none()
+    if not line:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Statement line not found")
+
+    if line_data.status == ReconciliationStatus.EXPENSE_CREATED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use create-expenses to create cash expenses from statement lines"
+        )
+
+    if line_data.status == ReconciliationStatus.MATCHED:
+        if bool(line_data.payment_id) == bool(line_data.cash_expense_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Provide either payment_id or cash_expense_id to match a line"
+            )
+
+        if line_data.payment_id:
+            model, target_id, link = Payment, line_data.payment_id, BankStatementLine.payment_id
+        else:
+            model, target_id, link = CashExpense, line_data.cash_expense_id, BankStatementLine.cash_expense_id
+
+        target_result = await db.execute(select(model.id).where(model.id == target_id))
+        if not target_result.scalar_one_or_none():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Record to match not found")
+
+        taken_result = await db.execute(
+            select(BankStatementLine.id).where(link == target_id).where(BankStatementLine.id != line_id)
+        )
+        if taken_result.first():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Record is already reconciled with another statement line"
+            )
+
+        line.payment_id = line_data.payment_id
+        line.cash_expense_id = line_data.cash_expense_id
+        line.match_type = MatchType.MANUAL.value
+        line.match_score = None
+    else:
+        line.payment_id = None
+        line.cash_expense_id = None
+        line.match_type = None
+        line.match_score = None
+
+    line.status = line_data.status.value
+
+    statement = await _get_statement(db, line.statement_id)
+    await db.flush()
+    await refresh_statement_summary(db, statement)
+    await db.commit()
+    await db.refresh(line)
+
+    return line
+
+
+@router.post("/statements/{statement_id}/create-expenses", response_model=CreateExpensesFromLinesResponse)
+async def create_expenses_from_lines(
+    statement_id: int,
+    request: CreateExpensesFromLinesRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Create cash expenses in bulk from unmatched statement lines and mark the
+    lines as reconciled against them.
+    """
+    statement = await _get_statement(db, statement_id)
+
+    # Validate expense category if provided
+    if request.expense_category_id:
+        cat_result = await db.execute(select(ExpenseCategory).where(ExpenseCategory.id == request.expense_category_id))
+        if not cat_result.scalar_one_or_none():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expense category not found")
+
+    # Validate project if provided
+    if request.project_id:
+        project_result = await db.execute(select(Project).where(Project.id == request.project_id))
+        if not project_result.scalar_one_or_none():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project not found")
+
+    # Validate branch if provided
+    if request.branch_id:
+        branch_result = await db.execute(select(Branch).where(Branch.id == request.branch_id))
+        if not branch_result.scalar_one_or_none():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Branch not found")
+
+    query = (
+        select(
+            BankStatementLine.id,
+            BankStatementLine.transaction_date,
+            BankStatementLine.transaction_type,
+            BankStatementLine.amount,
+            BankStatementLine.reference,
+            BankStatementLine.narration,
+        )
+        .where(BankStatementLine.statement_id == statement_id)
+        .where(BankStatementLine.status == ReconciliationStatus.UNMATCHED.value)
+        .order_by(BankStatementLine.line_number)
+        .with_for_update()
+    )
+    if request.line_ids is not None:
+        query = query.where(BankStatementLine.id.in_(request.line_ids))
+    result = await db.execute(query)
+    lines = result.all()
+
+    if not lines:
+        return CreateExpensesFromLinesResponse(created_count=0, expense_ids=[])
+
+    expense_numbers = await reserve_expense_numbers(db, len(lines))
+    financial_year = get_financial_year()
+    now = datetime.utcnow()
+
+    result = await db.execute(
+        insert(CashExpense).returning(CashExpense.id, sort_by_parameter_order=True),
+        [
+            {
+                "expense_number": expense_number,
+                "transaction_date": line.transaction_date,
+                "expense_category_id": request.expense_category_id,
+                "bank_account_id": statement.bank_account_id,
+                "project_id": request.project_id,
+                "branch_id": request.branch_id,
+                "amount": line.amount,
+                "transaction_type": line.transaction_type,
+                "transaction_ref": line.reference,
+                "description": line.narration,
+                "financial_year": financial_year,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for expense_number, line in zip(expense_numbers, lines)
+        ],
+    )
+    expense_ids = list(result.scalars().all())
+
+    created = values(
+        column("line_id", Integer),
+        column("expense_id", Integer),
+        name="created",
+    ).data([(line.id, expense_id) for line, expense_id in zip(lines, expense_ids)])
+    await db.execute(
+        update(BankStatementLine)
+        .where(BankStatementLine.id == created.c.line_id)
+        .values(
+            status=ReconciliationStatus.EXPENSE_CREATED.value,
+            cash_expense_id=created.c.expense_id,
+            match_type=None,
+            match_score=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    await refresh_statement_summary(db, statement)
+    await db.commit()
+
+    return CreateExpensesFromLinesResponse(created_count=len(expense_ids), expense_ids=expense_ids)
+
+
+@router.delete("/statements/{statement_id}", response_model=Message)
+async def delete_bank_statement(
+    statement_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Delete an imported statement and its reconciliation results."""
+    statement = await _get_statement(db, statement_id)
+    await db.delete(statement)
+    await db.commit()
+    return Message(message="Bank statement deleted successfully")
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
@@ -12,9 +12,15 @@ from app.schemas.branch import BranchCreate, BranchUpdate, BranchResponse, Branc
 from app.schemas.bank_account import BankAccountResponse
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
+from app.core.http_cache import cached_response
+from app.core.responses import orm_response, paginated_response, response_adapter
 
 router = APIRouter()
 
+BRANCH_PAGE = response_adapter(PaginatedResponse[BranchResponse])
+BRANCH_LIST = response_adapter(List[BranchResponse])
+BANK_ACCOUNT_LIST = response_adapter(List[BankAccountResponse])
+
 
 @router.get("", response_model=PaginatedResponse[BranchResponse])
 async def get_branches(
@@ -48,25 +54,23 @@ async def get_branches(
     result = await db.execute(query)
     branches = result.scalars().all()
 
-    return PaginatedResponse(
-        items=[BranchResponse.model_validate(b) for b in branches],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return paginated_response(BRANCH_PAGE, branches, total, page, page_size)
 
 
 @router.get("/active", response_model=List[BranchResponse])
 async def get_active_branches(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get all active branches (for dropdowns)."""
-    query = select(Branch).where(Branch.is_active == True).order_by(Branch.branch_name)
-    result = await db.execute(query)
-    branches = result.scalars().all()
-    return [BranchResponse.model_validate(b) for b in branches]
+    async def load():
+        query = select(Branch).where(Branch.is_active == True).order_by(Branch.branch_name)
+        result = await db.execute(query)
+        branches = result.scalars().all()
+        return orm_response(BRANCH_LIST, branches)
+
+    return await cached_response(request, db, Branch, load)
 
 
 @router.get("/{branch_id}", response_model=BranchWithBankAccounts)
@@ -101,7 +105,7 @@ async def get_branch_bank_accounts(
     query = select(BankAccount).where(BankAccount.branch_id == branch_id).order_by(BankAccount.is_default.desc(), BankAccount.account_name)
     result = await db.execute(query)
     accounts = result.scalars().all()
-    return [BankAccountResponse.model_validate(a) for a in accounts]
+    return orm_response(BANK_ACCOUNT_LIST, accounts)
 
 
 @router.post("", response_model=BranchResponse, status_code=status.HTTP_201_CREATED)
@@ -15,10 +15,13 @@ from app.models.user import User
 from app.schemas.cash_expense import CashExpenseCreate, CashExpenseUpdate, CashExpenseResponse
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
+from app.core.responses import paginated_response, response_adapter
 from app.services.number_generator import generate_expense_number, get_financial_year
 
 router = APIRouter()
 
+CASH_EXPENSE_PAGE = response_adapter(PaginatedResponse[CashExpenseResponse])
+
 
 @router.get("", response_model=PaginatedResponse[CashExpenseResponse])
 async def get_cash_expenses(
@@ -77,13 +80,7 @@ async def get_cash_expenses(
     result = await db.execute(query)
     expenses = result.scalars().all()
 
-    return PaginatedResponse(
-        items=[CashExpenseResponse.model_validate(e) for e in expenses],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return paginated_response(CASH_EXPENSE_PAGE, expenses, total, page, page_size)
 
 
 @router.get("/{expense_id}", response_model=CashExpenseResponse)
@@ -1,6 +1,5 @@
 from typing import Optional, List
 from datetime import date
-from dateutil.relativedelta import relativedelta
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -20,6 +19,7 @@ from app.schemas.client_po import (
     ClientPOWithItemsResponse,
     ClientPOListResponse,
     ClientPOStatusUpdate,
+    POFulfillmentReconcileResponse,
 )
 from app.schemas.billing_schedule import (
     BillingScheduleCreate,
@@ -28,12 +28,18 @@ from app.schemas.billing_schedule import (
     BillingScheduleStatusUpdate,
     GenerateSchedulesRequest,
     CreateInvoiceFromScheduleRequest,
+    BillingRunRequest,
+    BillingRunResponse,
+    BulkGenerateSchedulesRequest,
+    BulkGenerateSchedulesResult,
+    BulkGenerateSchedulesResponse,
 )
 from app.schemas.invoice import InvoiceResponse
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
 from app.services.number_generator import generate_client_po_number
-from app.services.fulfillment import create_invoice_from_schedule as create_invoice_service, create_pi_from_schedule as create_pi_service
+from app.services.billing_schedules import regenerate_schedules
+from app.services.fulfillment import create_invoice_from_schedule as create_invoice_service, create_pi_from_schedule as create_pi_service, run_billing, refresh_po_fulfillment
 from app.models.invoice import Invoice
 from app.models.proforma_invoice import ProformaInvoice
 from app.models.bank_account import BankAccount
@@ -464,74 +470,13 @@ async def generate_billing_schedules(
     if client_po.billing_frequency == BillingFrequency.MILESTONE:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use manual schedule creation for MILESTONE billing")
 
-    # Delete existing pending schedules
-    await db.execute(
-        BillingSchedule.__table__.delete().where(
-            (BillingSchedule.client_po_id == po_id) &
-            (BillingSchedule.status == ScheduleStatus.PENDING)
-        )
-    )
-
-    # Determine number of installments
-    start_date = request.start_date
-    end_date = request.end_date or client_po.valid_until
-
-    if not end_date:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="End date is required")
-
-    schedules = []
-    current_date = start_date
-    installment = 1
-
-    if client_po.billing_frequency == BillingFrequency.MONTHLY:
-        delta = relativedelta(months=1)
-    elif client_po.billing_frequency == BillingFrequency.QUARTERLY:
-        delta = relativedelta(months=3)
-    elif client_po.billing_frequency == BillingFrequency.HALF_YEARLY:
-        delta = relativedelta(months=6)
-    elif client_po.billing_frequency == BillingFrequency.YEARLY:
-        delta = relativedelta(years=1)
-
-    # Count total installments (exclusive of end date for proper period calculation)
-    # For example: Dec 2025 to Dec 2026 = 12 months, not 13
-    temp_date = start_date
-    total_installments = 0
-    while temp_date < end_date:
-        total_installments += 1
-        temp_date += delta
-
-    # Ensure at least 1 installment
-    if total_installments == 0:
-        total_installments = 1
-
-    # Calculate amount per installment
-    amount_per_installment = client_po.taxable_amount / total_installments if total_installments > 0 else Decimal('0')
-    gst_per_installment = (client_po.cgst_amount + client_po.sgst_amount + client_po.igst_amount) / total_installments if total_installments > 0 else Decimal('0')
-
-    while current_date < end_date:
-        month_name = current_date.strftime("%B %Y")
-        schedule = BillingSchedule(
-            client_po_id=po_id,
-            installment_number=installment,
-            description=f"{client_po.billing_frequency.value} - {month_name}",
-            due_date=current_date,
-            amount=amount_per_installment,
-            gst_amount=gst_per_installment,
-            total_amount=amount_per_installment + gst_per_installment,
-            status=ScheduleStatus.PENDING,
-        )
-        db.add(schedule)
-        schedules.append(schedule)
-        installment += 1
-        current_date += delta
+    try:
+        generated = await regenerate_schedules(db, [client_po], request.start_date, request.end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     await db.commit()
-
-    # Refresh all schedules
-    for schedule in schedules:
-        await db.refresh(schedule)
-
-    return schedules
+    return generated[po_id]
 
 
 @router.post("/{po_id}/schedules", response_model=BillingScheduleResponse, status_code=status.HTTP_201_CREATED)
@@ -617,6 +562,108 @@ async def delete_billing_schedule(
     return Message(message="Schedule deleted successfully")
 
 
+@router.post("/schedules/generate-bulk", response_model=BulkGenerateSchedulesResponse)
+async def generate_billing_schedules_bulk(
+    request: BulkGenerateSchedulesRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Regenerate the PENDING billing schedules of many Client POs at once.
+
+    Each PO runs from start_date (default: its valid_from) to end_date
+    (default: its valid_until). POs that cannot be scheduled are reported
+    and skipped.
+    """
+    result = await db.execute(select(ClientPO).where(ClientPO.id.in_(request.client_po_ids)))
+    client_pos = {client_po.id: client_po for client_po in result.scalars().all()}
+
+    failures = {}
+    schedulable = []
+    for po_id in request.client_po_ids:
+        client_po = client_pos.get(po_id)
+        if not client_po:
+            failures[po_id] = "Client PO not found"
+        elif client_po.billing_frequency == BillingFrequency.ONE_TIME:
+            failures[po_id] = "Cannot generate schedules for ONE_TIME billing"
+        elif client_po.billing_frequency == BillingFrequency.MILESTONE:
+            failures[po_id] = "Use manual schedule creation for MILESTONE billing"
+        elif not (request.end_date or client_po.valid_until):
+            failures[po_id] = "End date is required"
+        elif client_po not in schedulable:
+            schedulable.append(client_po)
+
+    generated = await regenerate_schedules(db, schedulable, request.start_date, request.end_date)
+    await db.commit()
+
+    results = []
+    for po_id in request.client_po_ids:
+        if po_id in failures:
+            results.append(BulkGenerateSchedulesResult(client_po_id=po_id, success=False, message=failures[po_id]))
+        else:
+            results.append(BulkGenerateSchedulesResult(
+                client_po_id=po_id, success=True, schedule_count=len(generated[po_id])
+            ))
+
+    return BulkGenerateSchedulesResponse(
+        generated_count=sum(len(schedules) for schedules in generated.values()),
+        failed_count=len(failures),
+        results=results,
+    )
+
+
+@router.post("/reconcile-fulfillment", response_model=POFulfillmentReconcileResponse)
+async def reconcile_po_fulfillment(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Recompute invoiced/remaining amounts and status of every Client PO from
+    its invoices, and report the POs that had drifted.
+    """
+    corrections = await refresh_po_fulfillment(db)
+    await db.commit()
+    return POFulfillmentReconcileResponse(
+        corrected_count=len(corrections),
+        corrections=corrections,
+    )
+
+
+@router.post("/billing-run", response_model=BillingRunResponse)
+async def run_billing_for_due_schedules(
+    request: BillingRunRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Create invoices for every PENDING schedule due on or before run_date.
+
+    All invoices are created in one transaction. With dry_run the due
+    schedules and totals are returned without creating anything.
+    """
+    try:
+        result = await run_billing(
+            db=db,
+            run_date=request.run_date,
+            invoice_date=request.invoice_date,
+            due_date=request.due_date,
+            bank_account_id=request.bank_account_id,
+            client_id=request.client_id,
+            branch_id=request.branch_id,
+            client_po_ids=request.client_po_ids,
+            dry_run=request.dry_run,
+        )
+        if not request.dry_run:
+            await db.commit()
+        return result
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
 @router.post("/{po_id}/schedules/{schedule_id}/create-invoice", response_model=InvoiceResponse)
 async def create_invoice_from_schedule(
     po_id: int,
@@ -9,9 +9,12 @@ from app.models.user import User
 from app.schemas.client import ClientCreate, ClientUpdate, ClientResponse
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
+from app.core.responses import paginated_response, response_adapter
 
 router = APIRouter()
 
+CLIENT_PAGE = response_adapter(PaginatedResponse[ClientResponse])
+
 
 @router.get("", response_model=PaginatedResponse[ClientResponse])
 async def get_clients(
@@ -45,13 +48,7 @@ async def get_clients(
     result = await db.execute(query)
     clients = result.scalars().all()
 
-    return PaginatedResponse(
-        items=[ClientResponse.model_validate(c) for c in clients],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return paginated_response(CLIENT_PAGE, clients, total, page, page_size)
 
 
 @router.get("/{client_id}", response_model=ClientResponse)
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
@@ -9,12 +9,18 @@ from app.models.user import User
 from app.schemas.expense_category import ExpenseCategoryCreate, ExpenseCategoryUpdate, ExpenseCategoryResponse
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
+from app.core.http_cache import cached_response
+from app.core.responses import orm_response, paginated_response, response_adapter
 
 router = APIRouter()
 
+EXPENSE_CATEGORY_PAGE = response_adapter(PaginatedResponse[ExpenseCategoryResponse])
+EXPENSE_CATEGORY_LIST = response_adapter(List[ExpenseCategoryResponse])
+
 
 @router.get("", response_model=PaginatedResponse[ExpenseCategoryResponse])
 async def get_expense_categories(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
@@ -23,46 +29,47 @@ async def get_expense_categories(
     current_user: User = Depends(get_current_user),
 ):
     """Get all expense categories with pagination."""
-    query = select(ExpenseCategory)
+    async def load():
+        query = select(ExpenseCategory)
+
+        if search:
+            query = query.where(
+                (ExpenseCategory.name.ilike(f"%{search}%")) |
+                (ExpenseCategory.code.ilike(f"%{search}%"))
+            )
 
-    if search:
-        query = query.where(
-            (ExpenseCategory.name.ilike(f"%{search}%")) |
-            (ExpenseCategory.code.ilike(f"%{search}%"))
-        )
+        if is_active is not None:
+            query = query.where(ExpenseCategory.is_active == is_active)
 
-    if is_active is not None:
-        query = query.where(ExpenseCategory.is_active == is_active)
+        # Count total
+        count_query = select(func.count()).select_from(query.subquery())
+        total_result = await db.execute(count_query)
+        total = total_result.scalar()
 
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+        # Get paginated results
+        query = query.order_by(ExpenseCategory.name).offset((page - 1) * page_size).limit(page_size)
+        result = await db.execute(query)
+        categories = result.scalars().all()
 
-    # Get paginated results
-    query = query.order_by(ExpenseCategory.name).offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    categories = result.scalars().all()
+        return paginated_response(EXPENSE_CATEGORY_PAGE, categories, total, page, page_size)
 
-    return PaginatedResponse(
-        items=[ExpenseCategoryResponse.model_validate(c) for c in categories],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return await cached_response(request, db, ExpenseCategory, load)
 
 
 @router.get("/active", response_model=List[ExpenseCategoryResponse])
 async def get_active_expense_categories(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get all active expense categories (for dropdowns)."""
-    query = select(ExpenseCategory).where(ExpenseCategory.is_active == True).order_by(ExpenseCategory.name)
-    result = await db.execute(query)
-    categories = result.scalars().all()
-    return [ExpenseCategoryResponse.model_validate(c) for c in categories]
+    async def load():
+        query = select(ExpenseCategory).where(ExpenseCategory.is_active == True).order_by(ExpenseCategory.name)
+        result = await db.execute(query)
+        categories = result.scalars().all()
+        return orm_response(EXPENSE_CATEGORY_LIST, categories)
+
+    return await cached_response(request, db, ExpenseCategory, load)
 
 
 @router.get("/{category_id}", response_model=ExpenseCategoryResponse)
@@ -1,8 +1,8 @@
 import logging
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from sqlalchemy.orm import selectinload
 from datetime import date, timedelta
 from decimal import Decimal
@@ -15,17 +15,39 @@ from app.models.client import Client
 from app.models.vendor import Vendor
 from app.models.bank_account import BankAccount
 from app.models.user import User
-from app.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse, InvoiceItemCreate
+from app.schemas.invoice import (
+    InvoiceCreate, InvoiceUpdate, InvoiceResponse, InvoiceItemCreate,
+    InvoiceBulkStatusRequest, InvoiceBulkStatusResult, InvoiceBulkStatusResponse
+)
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
+from app.core.config import settings
+from app.core.responses import (
+    FastJSONResponse, JSONRows, NDJSONResponse, StreamingJSONResponse,
+    paginated_response, response_adapter, wants_ndjson,
+)
 from app.services.number_generator import generate_invoice_number
 from app.services.ledger_posting import (
     post_invoice, reverse_invoice_posting, get_company_settings,
-    should_post_on_create, should_post_on_send
+    should_post_on_create, should_post_on_send,
+    post_invoices_bulk, reverse_invoice_postings_bulk
 )
+from app.services.tds_threshold import get_threshold_status, record_invoice_amounts
+from app.services.fulfillment import refresh_po_fulfillment
 
 router = APIRouter()
 
+INVOICE_PAGE = response_adapter(PaginatedResponse[InvoiceResponse])
+INVOICE_ROW = response_adapter(InvoiceResponse)
+
+# Source statuses allowed for each bulk target status.
+# PARTIAL and PAID are driven by payments and cannot be set in bulk.
+BULK_STATUS_TRANSITIONS = {
+    InvoiceStatus.SENT: [InvoiceStatus.DRAFT],
+    InvoiceStatus.OVERDUE: [InvoiceStatus.SENT, InvoiceStatus.PARTIAL],
+    InvoiceStatus.CANCELLED: [InvoiceStatus.DRAFT, InvoiceStatus.SENT, InvoiceStatus.OVERDUE],
+}
+
 
 def calculate_invoice_item_amounts(item_data: dict, is_igst: bool) -> dict:
     """Calculate amounts for an invoice item."""
@@ -76,6 +98,7 @@ def calculate_invoice_item_amounts(item_data: dict, is_igst: bool) -> dict:
 
 @router.get("", response_model=PaginatedResponse[InvoiceResponse])
 async def get_invoices(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=1000),
     branch_id: Optional[int] = None,
@@ -88,7 +111,13 @@ async def get_invoices(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get all invoices with pagination and filtering by branch, dates, etc."""
+    """
+    Get all invoices with pagination and filtering by branch, dates, etc.
+
+    Pages of RESPONSE_STREAM_MIN_ROWS or more are streamed while the rows
+    are read. With Accept: application/x-ndjson the page is sent as one
+    invoice per line and the total in the X-Total-Count header.
+    """
     query = select(Invoice).options(
         selectinload(Invoice.items),
         selectinload(Invoice.client),
@@ -119,16 +148,27 @@ async def get_invoices(
     total = total_result.scalar()
 
     query = query.offset((page - 1) * page_size).limit(page_size)
+
+    ndjson = wants_ndjson(request)
+    if ndjson or page_size >= settings.RESPONSE_STREAM_MIN_ROWS:
+        rows = JSONRows(
+            await db.stream_scalars(query.execution_options(yield_per=settings.RESPONSE_STREAM_BATCH_SIZE)),
+            INVOICE_ROW,
+        )
+        if ndjson:
+            return NDJSONResponse(rows, headers={"X-Total-Count": str(total)})
+        return StreamingJSONResponse({
+            "items": rows,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total + page_size - 1) // page_size,
+        })
+
     result = await db.execute(query)
     invoices = result.scalars().all()
 
-    return PaginatedResponse(
-        items=[InvoiceResponse.model_validate(inv) for inv in invoices],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return paginated_response(INVOICE_PAGE, invoices, total, page, page_size)
 
 
 @router.get("/{invoice_id}", response_model=InvoiceResponse)
@@ -239,7 +279,19 @@ async def create_invoice(
     total_amount = round(total_before_round)
 
     # TDS/TCS
-    tds_amount = taxable_amount * invoice_data.tds_rate / 100 if invoice_data.tds_applicable else Decimal('0')
+    if invoice_data.auto_tds and invoice_data.invoice_type == InvoiceType.PURCHASE:
+        try:
+            threshold = await get_threshold_status(
+                db, invoice_data.vendor_id, taxable_amount, invoice_data.invoice_date, invoice_data.tds_section
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        invoice.tds_applicable = threshold["tds_applicable"]
+        invoice.tds_section = threshold["section"]
+        invoice.tds_rate = threshold["rate"] if threshold["tds_applicable"] else Decimal('0')
+        tds_amount = threshold["tds_amount"]
+    else:
+        tds_amount = taxable_amount * invoice_data.tds_rate / 100 if invoice_data.tds_applicable else Decimal('0')
     tcs_amount = total_amount * invoice_data.tcs_rate / 100 if invoice_data.tcs_applicable else Decimal('0')
     amount_after_tds = total_amount - tds_amount + tcs_amount
 
@@ -259,6 +311,7 @@ async def create_invoice(
     invoice.amount_paid = Decimal('0')
 
     db.add(invoice)
+    await record_invoice_amounts(db, [invoice])
     await db.commit()
     await db.refresh(invoice)
 
@@ -310,6 +363,9 @@ async def update_invoice(
             detail="Can only edit invoices in DRAFT status"
         )
 
+    # Take the invoice out of the vendor's TDS running total; re-added below
+    await record_invoice_amounts(db, [invoice], sign=-1)
+
     # Update basic fields
     update_data = invoice_data.model_dump(exclude={'items'}, exclude_unset=True)
     for field, value in update_data.items():
@@ -371,6 +427,13 @@ async def update_invoice(
         invoice.amount_after_tds = amount_after_tds
         invoice.amount_due = amount_after_tds - invoice.amount_paid
 
+    if invoice.status != InvoiceStatus.CANCELLED:
+        await record_invoice_amounts(db, [invoice])
+
+    if invoice.client_po_id:
+        await db.flush()
+        await refresh_po_fulfillment(db, [invoice.client_po_id])
+
     await db.commit()
     await db.refresh(invoice)
 
@@ -415,6 +478,17 @@ async def update_invoice_status(
     old_status = invoice.status
     invoice.status = status_update
 
+    # Cancelled invoices do not count towards the vendor's TDS running total
+    if status_update == InvoiceStatus.CANCELLED and old_status != InvoiceStatus.CANCELLED:
+        await record_invoice_amounts(db, [invoice], sign=-1)
+    elif old_status == InvoiceStatus.CANCELLED and status_update != InvoiceStatus.CANCELLED:
+        await record_invoice_amounts(db, [invoice])
+
+    # Cancelled invoices do not count towards the client PO's fulfillment either
+    if invoice.client_po_id and (old_status == InvoiceStatus.CANCELLED) != (status_update == InvoiceStatus.CANCELLED):
+        await db.flush()
+        await refresh_po_fulfillment(db, [invoice.client_po_id])
+
     # Handle ledger posting based on status change
     settings = await get_company_settings(db)
 
@@ -455,6 +529,136 @@ async def update_invoice_status(
     return result.scalar_one()
 
 
+@router.post("/bulk-status", response_model=InvoiceBulkStatusResponse)
+async def bulk_update_invoice_status(
+    request: InvoiceBulkStatusRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Move many invoices to a new status in one request.
+
+    The transition is validated in the UPDATE itself, so only invoices in an
+    allowed source status change. Invoices moving DRAFT -> SENT are posted to
+    the ledger in one batch (if configured for ON_SENT); posted invoices being
+    cancelled have their entries reversed in one batch. Cancellation is only
+    allowed for invoices without payments.
+    """
+    target = request.status
+    allowed_from = BULK_STATUS_TRANSITIONS.get(target)
+    if allowed_from is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bulk transition to {target.value} is not supported"
+        )
+
+    invoice_ids = list(dict.fromkeys(request.invoice_ids))
+
+    stmt = (
+        update(Invoice)
+        .where(Invoice.id.in_(invoice_ids))
+        .where(Invoice.status.in_(allowed_from))
+        .values(status=target)
+        .returning(Invoice.id, Invoice.is_posted, Invoice.client_po_id)
+        .execution_options(synchronize_session=False)
+    )
+    if target == InvoiceStatus.CANCELLED:
+        stmt = stmt.where(Invoice.amount_paid == 0)
+    result = await db.execute(stmt)
+    rows = result.all()
+    updated = {row.id: row.is_posted for row in rows}
+    client_po_ids = sorted({row.client_po_id for row in rows if row.client_po_id})
+
+    # Classify the invoices that were not updated with a single query
+    failures = {}
+    skipped_ids = [i for i in invoice_ids if i not in updated]
+    if skipped_ids:
+        result = await db.execute(
+            select(Invoice.id, Invoice.status, Invoice.amount_paid)
+            .where(Invoice.id.in_(skipped_ids))
+        )
+        found = {row.id: row for row in result.all()}
+        for invoice_id in skipped_ids:
+            row = found.get(invoice_id)
+            if row is None:
+                failures[invoice_id] = (None, "Invoice not found")
+            elif row.status not in allowed_from:
+                failures[invoice_id] = (
+                    row.status,
+                    f"Cannot change status from {row.status.value} to {target.value}"
+                )
+            else:
+                failures[invoice_id] = (row.status, "Cannot cancel an invoice with payments")
+
+    vouchers = {}
+    posted_count = 0
+    reversed_count = 0
+    settings = await get_company_settings(db)
+
+    if target == InvoiceStatus.SENT and settings and await should_post_on_send(db):
+        to_post = [i for i, is_posted in updated.items() if not is_posted]
+        if to_post:
+            result = await db.execute(select(Invoice).where(Invoice.id.in_(to_post)))
+            try:
+                async with db.begin_nested():
+                    vouchers = await post_invoices_bulk(db, list(result.scalars().all()), settings)
+                posted_count = len(vouchers)
+            except Exception as e:
+                logger.error(f"Failed to bulk post ledger for {len(to_post)} invoices on send: {str(e)}")
+
+    if target == InvoiceStatus.CANCELLED and updated:
+        result = await db.execute(
+            select(
+                Invoice.invoice_type, Invoice.vendor_id, Invoice.tds_section,
+                Invoice.invoice_date, Invoice.taxable_amount, Invoice.tds_applicable
+            )
+            .where(Invoice.id.in_(list(updated)))
+            .where(Invoice.invoice_type == InvoiceType.PURCHASE)
+        )
+        await record_invoice_amounts(db, result.all(), sign=-1)
+        await refresh_po_fulfillment(db, client_po_ids)
+
+    if target == InvoiceStatus.CANCELLED and settings:
+        to_reverse = [i for i, is_posted in updated.items() if is_posted]
+        if to_reverse:
+            result = await db.execute(select(Invoice).where(Invoice.id.in_(to_reverse)))
+            try:
+                async with db.begin_nested():
+                    vouchers = await reverse_invoice_postings_bulk(db, list(result.scalars().all()), settings)
+                reversed_count = len(vouchers)
+            except Exception as e:
+                logger.error(f"Failed to bulk reverse ledger for {len(to_reverse)} invoices: {str(e)}")
+
+    await db.commit()
+
+    results = []
+    for invoice_id in invoice_ids:
+        if invoice_id in updated:
+            results.append(InvoiceBulkStatusResult(
+                invoice_id=invoice_id,
+                success=True,
+                status=target,
+                voucher_number=vouchers.get(invoice_id)
+            ))
+        else:
+            current_status, message = failures[invoice_id]
+            results.append(InvoiceBulkStatusResult(
+                invoice_id=invoice_id,
+                success=False,
+                status=current_status,
+                message=message
+            ))
+
+    return InvoiceBulkStatusResponse(
+        status=target,
+        updated_count=len(updated),
+        posted_count=posted_count,
+        reversed_count=reversed_count,
+        failed_count=len(failures),
+        results=results
+    )
+
+
 @router.delete("/{invoice_id}", response_model=Message)
 async def delete_invoice(
     invoice_id: int,
@@ -473,7 +677,11 @@ async def delete_invoice(
             detail="Can only delete invoices in DRAFT status"
         )
 
+    await record_invoice_amounts(db, [invoice], sign=-1)
     await db.delete(invoice)
+    if invoice.client_po_id:
+        await db.flush()
+        await refresh_po_fulfillment(db, [invoice.client_po_id])
     await db.commit()
     return Message(message="Invoice deleted successfully")
 
@@ -520,21 +728,21 @@ async def get_invoices_by_month(
     invoices = result.scalars().all()
 
     # Return simplified invoice data for the table
-    return [
+    return FastJSONResponse([
         {
             "id": inv.id,
             "invoice_number": inv.invoice_number,
             "invoice_date": str(inv.invoice_date),
             "client_name": inv.client.name if inv.client else "N/A",
-            "taxable_amount": float(inv.taxable_amount),
-            "cgst_amount": float(inv.cgst_amount),
-            "sgst_amount": float(inv.sgst_amount),
-            "igst_amount": float(inv.igst_amount),
-            "total_amount": float(inv.total_amount),
-            "amount_paid": float(inv.amount_paid),
-            "amount_due": float(inv.amount_due),
+            "taxable_amount": inv.taxable_amount,
+            "cgst_amount": inv.cgst_amount,
+            "sgst_amount": inv.sgst_amount,
+            "igst_amount": inv.igst_amount,
+            "total_amount": inv.total_amount,
+            "amount_paid": inv.amount_paid,
+            "amount_due": inv.amount_due,
             "status": inv.status.value,
             "branch_name": inv.branch.branch_name if inv.branch else None,
         }
         for inv in invoices
-    ]
+    ])
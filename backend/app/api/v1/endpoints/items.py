@@ -1,5 +1,5 @@
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
@@ -9,12 +9,18 @@ from app.models.user import User
 from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
+from app.core.http_cache import cached_response
+from app.core.responses import orm_response, paginated_response, response_adapter
 
 router = APIRouter()
 
+ITEM_PAGE = response_adapter(PaginatedResponse[ItemResponse])
+ITEM_LIST = response_adapter(List[ItemResponse])
+
 
 @router.get("", response_model=PaginatedResponse[ItemResponse])
 async def get_items(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
@@ -24,57 +30,58 @@ async def get_items(
     current_user: User = Depends(get_current_user),
 ):
     """Get all items with pagination and filtering."""
-    query = select(Item)
+    async def load():
+        query = select(Item)
+
+        if search:
+            query = query.where(
+                (Item.name.ilike(f"%{search}%")) |
+                (Item.code.ilike(f"%{search}%")) |
+                (Item.description.ilike(f"%{search}%")) |
+                (Item.hsn_sac.ilike(f"%{search}%"))
+            )
 
-    if search:
-        query = query.where(
-            (Item.name.ilike(f"%{search}%")) |
-            (Item.code.ilike(f"%{search}%")) |
-            (Item.description.ilike(f"%{search}%")) |
-            (Item.hsn_sac.ilike(f"%{search}%"))
-        )
+        if item_type:
+            query = query.where(Item.item_type == item_type)
 
-    if item_type:
-        query = query.where(Item.item_type == item_type)
+        if is_active is not None:
+            query = query.where(Item.is_active == is_active)
 
-    if is_active is not None:
-        query = query.where(Item.is_active == is_active)
+        # Count total
+        count_query = select(func.count()).select_from(query.subquery())
+        total_result = await db.execute(count_query)
+        total = total_result.scalar()
 
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+        # Get paginated results
+        query = query.order_by(Item.name).offset((page - 1) * page_size).limit(page_size)
+        result = await db.execute(query)
+        items = result.scalars().all()
 
-    # Get paginated results
-    query = query.order_by(Item.name).offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    items = result.scalars().all()
+        return paginated_response(ITEM_PAGE, items, total, page, page_size)
 
-    return PaginatedResponse(
-        items=[ItemResponse.model_validate(item) for item in items],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return await cached_response(request, db, Item, load)
 
 
 @router.get("/active", response_model=List[ItemResponse])
 async def get_active_items(
+    request: Request,
     item_type: Optional[ItemType] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get all active items (for dropdowns)."""
-    query = select(Item).where(Item.is_active == True)
+    async def load():
+        query = select(Item).where(Item.is_active == True)
+
+        if item_type:
+            query = query.where(Item.item_type == item_type)
 
-    if item_type:
-        query = query.where(Item.item_type == item_type)
+        query = query.order_by(Item.name)
+        result = await db.execute(query)
+        items = result.scalars().all()
+        return orm_response(ITEM_LIST, items)
 
-    query = query.order_by(Item.name)
-    result = await db.execute(query)
-    items = result.scalars().all()
-    return [ItemResponse.model_validate(item) for item in items]
+    return await cached_response(request, db, Item, load)
 
 
 @router.get("/{item_id}", response_model=ItemResponse)
@@ -1,12 +1,12 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 from datetime import date, datetime
 from decimal import Decimal
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.ledger import (
     ChartOfAccount,
     LedgerEntry,
@@ -28,16 +28,21 @@ from app.schemas.ledger import (
 )
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
+from app.core.http_cache import cached_response
+from app.core.responses import paginated_response, response_adapter
 from app.services.number_generator import generate_voucher_number
 from app.services.chart_of_accounts_seeder import seed_default_accounts, check_accounts_seeded
 from app.services.ledger_posting import (
-    post_invoice, post_payment, get_company_settings
+    post_invoice, post_payment, get_company_settings, post_invoices_bulk
 )
 from app.models.invoice import Invoice, InvoiceStatus
 from app.models.payment import Payment
 
 router = APIRouter()
 
+CHART_OF_ACCOUNT_PAGE = response_adapter(PaginatedResponse[ChartOfAccountResponse])
+LEDGER_ENTRY_PAGE = response_adapter(PaginatedResponse[LedgerEntryResponse])
+
 
 # Chart of Accounts Endpoints
 @router.post("/accounts/seed", response_model=Message)
@@ -56,6 +61,7 @@ async def seed_accounts(
 
 @router.get("/accounts", response_model=PaginatedResponse[ChartOfAccountResponse])
 async def get_accounts(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=1000),
     account_type: Optional[AccountType] = None,
@@ -65,32 +71,29 @@ async def get_accounts(
     current_user: User = Depends(get_current_user),
 ):
     """Get all chart of accounts."""
-    query = select(ChartOfAccount)
+    async def load():
+        query = select(ChartOfAccount)
 
-    if account_type:
-        query = query.where(ChartOfAccount.account_type == account_type)
-    if account_group:
-        query = query.where(ChartOfAccount.account_group == account_group)
-    if is_active is not None:
-        query = query.where(ChartOfAccount.is_active == is_active)
+        if account_type:
+            query = query.where(ChartOfAccount.account_type == account_type)
+        if account_group:
+            query = query.where(ChartOfAccount.account_group == account_group)
+        if is_active is not None:
+            query = query.where(ChartOfAccount.is_active == is_active)
 
-    query = query.order_by(ChartOfAccount.code)
+        query = query.order_by(ChartOfAccount.code)
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+        count_query = select(func.count()).select_from(query.subquery())
+        total_result = await db.execute(count_query)
+        total = total_result.scalar()
 
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    accounts = result.scalars().all()
-
-    return PaginatedResponse(
-        items=[ChartOfAccountResponse.model_validate(acc) for acc in accounts],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+        query = query.offset((page - 1) * page_size).limit(page_size)
+        result = await db.execute(query)
+        accounts = result.scalars().all()
+
+        return paginated_response(CHART_OF_ACCOUNT_PAGE, accounts, total, page, page_size)
+
+    return await cached_response(request, db, ChartOfAccount, load)
 
 
 @router.get("/accounts/{account_id}", response_model=ChartOfAccountResponse)
@@ -243,13 +246,7 @@ async def get_ledger_entries(
     result = await db.execute(query)
     entries = result.scalars().all()
 
-    return PaginatedResponse(
-        items=[LedgerEntryResponse.model_validate(entry) for entry in entries],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return paginated_response(LEDGER_ENTRY_PAGE, entries, total, page, page_size)
 
 
 @router.post("/journal-entry", status_code=status.HTTP_201_CREATED)
@@ -321,7 +318,7 @@ async def get_ledger_statement(
     account_id: int,
     from_date: date = Query(...),
     to_date: date = Query(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get ledger statement for an account."""
@@ -390,7 +387,7 @@ async def get_ledger_statement(
 @router.get("/trial-balance", response_model=TrialBalance)
 async def get_trial_balance(
     as_on_date: date = Query(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get trial balance as on a date."""
@@ -501,12 +498,22 @@ async def post_all_unposted(
     )
     unposted_invoices = invoices_result.scalars().all()
 
-    for invoice in unposted_invoices:
+    if unposted_invoices:
         try:
-            await post_invoice(db, invoice, settings)
-            invoices_posted += 1
-        except Exception as e:
-            errors.append(f"Invoice {invoice.invoice_number}: {str(e)}")
+            async with db.begin_nested():
+                vouchers = await post_invoices_bulk(db, list(unposted_invoices), settings)
+            invoices_posted = len(vouchers)
+        except Exception:
+            # One bad invoice fails the whole batch; post them one at a time
+            # so the others still go through and each failure is reported
+            for invoice in unposted_invoices:
+                invoice_number = invoice.invoice_number
+                try:
+                    async with db.begin_nested():
+                        await post_invoice(db, invoice, settings)
+                    invoices_posted += 1
+                except Exception as e:
+                    errors.append(f"Invoice {invoice_number}: {str(e)}")
 
     # Find unposted payments
     payments_result = await db.execute(
@@ -11,18 +11,23 @@ logger = logging.getLogger(__name__)
 
 from app.db.session import get_db
 from app.models.payment import Payment, PaymentType, PaymentStatus
-from app.models.invoice import Invoice, InvoiceStatus
 from app.models.user import User
 from app.schemas.payment import PaymentCreate, PaymentUpdate, PaymentResponse
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
+from app.core.responses import paginated_response, response_adapter
 from app.services.number_generator import generate_payment_number
 from app.services.ledger_posting import (
     post_payment, reverse_payment_posting, get_company_settings
 )
+from app.services.payment_allocation import (
+    apply_allocations, reverse_allocations, plan_auto_allocation, plan_invoice_allocation
+)
 
 router = APIRouter()
 
+PAYMENT_PAGE = response_adapter(PaginatedResponse[PaymentResponse])
+
 
 @router.get("", response_model=PaginatedResponse[PaymentResponse])
 async def get_payments(
@@ -43,7 +48,8 @@ async def get_payments(
         selectinload(Payment.client),
         selectinload(Payment.vendor),
         selectinload(Payment.branch),
-        selectinload(Payment.bank_account_ref)
+        selectinload(Payment.bank_account_ref),
+        selectinload(Payment.allocations)
     )
 
     if branch_id:
@@ -71,13 +77,7 @@ async def get_payments(
     result = await db.execute(query)
     payments = result.scalars().all()
 
-    return PaginatedResponse(
-        items=[PaymentResponse.model_validate(p) for p in payments],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return paginated_response(PAYMENT_PAGE, payments, total, page, page_size)
 
 
 @router.get("/{payment_id}", response_model=PaymentResponse)
@@ -93,7 +93,8 @@ async def get_payment(
             selectinload(Payment.client),
             selectinload(Payment.vendor),
             selectinload(Payment.branch),
-            selectinload(Payment.bank_account_ref)
+            selectinload(Payment.bank_account_ref),
+            selectinload(Payment.allocations)
         )
         .where(Payment.id == payment_id)
     )
@@ -139,19 +140,28 @@ async def create_payment(
     )
 
     db.add(payment)
-
-    # Update invoice if linked
-    if payment_data.invoice_id:
-        invoice_result = await db.execute(select(Invoice).where(Invoice.id == payment_data.invoice_id))
-        invoice = invoice_result.scalar_one_or_none()
-        if invoice:
-            invoice.amount_paid += net_amount
-            invoice.amount_due = invoice.amount_after_tds - invoice.amount_paid
-
-            if invoice.amount_due <= 0:
-                invoice.status = InvoiceStatus.PAID
-            elif invoice.amount_paid > 0:
-                invoice.status = InvoiceStatus.PARTIAL
+    await db.flush()
+
+    # Settle invoices: explicit allocations, oldest-first auto allocation,
+    # or the single linked invoice
+    try:
+        if payment_data.allocations:
+            plan = [(a.invoice_id, a.amount) for a in payment_data.allocations]
+        elif payment_data.auto_allocate:
+            plan = await plan_auto_allocation(db, payment)
+        elif payment_data.invoice_id:
+            plan = await plan_invoice_allocation(db, payment, payment_data.invoice_id)
+        else:
+            plan = []
+        await apply_allocations(db, payment, plan)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Allocation lists and auto allocation link the invoice only when they
+    # settle exactly one; an explicitly linked invoice stays linked even if
+    # nothing could be allocated to it (already paid or cancelled)
+    if payment_data.allocations or payment_data.auto_allocate:
+        payment.invoice_id = plan[0][0] if len(plan) == 1 else None
 
     await db.commit()
     await db.refresh(payment)
@@ -172,7 +182,8 @@ async def create_payment(
             selectinload(Payment.client),
             selectinload(Payment.vendor),
             selectinload(Payment.branch),
-            selectinload(Payment.bank_account_ref)
+            selectinload(Payment.bank_account_ref),
+            selectinload(Payment.allocations)
         )
         .where(Payment.id == payment.id)
     )
@@ -193,7 +204,8 @@ async def update_payment(
             selectinload(Payment.client),
             selectinload(Payment.vendor),
             selectinload(Payment.branch),
-            selectinload(Payment.bank_account_ref)
+            selectinload(Payment.bank_account_ref),
+            selectinload(Payment.allocations)
         )
         .where(Payment.id == payment_id)
     )
@@ -201,12 +213,15 @@ async def update_payment(
     if not payment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found")
 
-    # Store old values for invoice update rollback if needed
-    old_invoice_id = payment.invoice_id
     old_net_amount = payment.net_amount
+    previous = [(a.invoice_id, a.amount) for a in payment.allocations]
+
+    update_data = payment_data.model_dump(exclude_unset=True)
+    allocations_data = update_data.pop("allocations", None)
+    auto_allocate = update_data.pop("auto_allocate", None)
 
     # Update fields
-    for field, value in payment_data.model_dump(exclude_unset=True).items():
+    for field, value in update_data.items():
         if field not in ['gross_amount', 'tds_amount', 'tcs_amount']:
             setattr(payment, field, value)
         elif value is not None:
@@ -216,45 +231,38 @@ async def update_payment(
     if payment_data.gross_amount is not None or payment_data.tds_amount is not None or payment_data.tcs_amount is not None:
         payment.net_amount = payment.gross_amount - payment.tds_amount + payment.tcs_amount
 
-    # Handle invoice update if invoice_id changed
-    if payment_data.invoice_id is not None and payment_data.invoice_id != old_invoice_id:
-        # Reverse old invoice update
-        if old_invoice_id:
-            old_invoice_result = await db.execute(select(Invoice).where(Invoice.id == old_invoice_id))
-            old_invoice = old_invoice_result.scalar_one_or_none()
-            if old_invoice:
-                old_invoice.amount_paid -= old_net_amount
-                old_invoice.amount_due = old_invoice.amount_after_tds - old_invoice.amount_paid
-                if old_invoice.amount_due >= old_invoice.amount_after_tds:
-                    old_invoice.status = InvoiceStatus.SENT
+    # Re-allocate when the allocation inputs or the amount change
+    if (allocations_data is not None or auto_allocate or
+            "invoice_id" in update_data or payment.net_amount != old_net_amount):
+        if allocations_data is None and not auto_allocate and "invoice_id" not in update_data and len(previous) > 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Payment is allocated to several invoices; provide allocations when changing its amount"
+            )
+
+        try:
+            await reverse_allocations(db, payment)
+
+            if payment_data.allocations is not None:
+                plan = [(a.invoice_id, a.amount) for a in payment_data.allocations]
+            elif auto_allocate:
+                plan = await plan_auto_allocation(db, payment)
+            elif "invoice_id" in update_data:
+                plan = await plan_invoice_allocation(db, payment, payment.invoice_id) if payment.invoice_id else []
+            elif previous:
+                invoice_id, amount = previous[0]
+                if amount == old_net_amount:
+                    plan = await plan_invoice_allocation(db, payment, invoice_id)
                 else:
-                    old_invoice.status = InvoiceStatus.PARTIAL
-
-        # Apply new invoice update
-        if payment.invoice_id:
-            new_invoice_result = await db.execute(select(Invoice).where(Invoice.id == payment.invoice_id))
-            new_invoice = new_invoice_result.scalar_one_or_none()
-            if new_invoice:
-                new_invoice.amount_paid += payment.net_amount
-                new_invoice.amount_due = new_invoice.amount_after_tds - new_invoice.amount_paid
-                if new_invoice.amount_due <= 0:
-                    new_invoice.status = InvoiceStatus.PAID
-                elif new_invoice.amount_paid > 0:
-                    new_invoice.status = InvoiceStatus.PARTIAL
-    # If net amount changed but invoice_id same, update the invoice
-    elif old_invoice_id and payment.net_amount != old_net_amount:
-        invoice_result = await db.execute(select(Invoice).where(Invoice.id == old_invoice_id))
-        invoice = invoice_result.scalar_one_or_none()
-        if invoice:
-            # Remove old amount and add new amount
-            invoice.amount_paid = invoice.amount_paid - old_net_amount + payment.net_amount
-            invoice.amount_due = invoice.amount_after_tds - invoice.amount_paid
-            if invoice.amount_due <= 0:
-                invoice.status = InvoiceStatus.PAID
-            elif invoice.amount_paid > 0:
-                invoice.status = InvoiceStatus.PARTIAL
+                    plan = [(invoice_id, min(amount, payment.net_amount))]
             else:
-                invoice.status = InvoiceStatus.SENT
+                plan = []
+            await apply_allocations(db, payment, plan)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        if payment_data.allocations is not None or auto_allocate:
+            payment.invoice_id = plan[0][0] if len(plan) == 1 else None
 
     await db.commit()
     await db.refresh(payment)
@@ -266,7 +274,8 @@ async def update_payment(
             selectinload(Payment.client),
             selectinload(Payment.vendor),
             selectinload(Payment.branch),
-            selectinload(Payment.bank_account_ref)
+            selectinload(Payment.bank_account_ref),
+            selectinload(Payment.allocations)
         )
         .where(Payment.id == payment.id)
     )
@@ -294,17 +303,8 @@ async def delete_payment(
             except Exception as e:
                 logger.error(f"Failed to reverse ledger for payment {payment.payment_number}: {str(e)}")
 
-    # Reverse invoice update if linked
-    if payment.invoice_id:
-        invoice_result = await db.execute(select(Invoice).where(Invoice.id == payment.invoice_id))
-        invoice = invoice_result.scalar_one_or_none()
-        if invoice:
-            invoice.amount_paid -= payment.net_amount
-            invoice.amount_due = invoice.amount_after_tds - invoice.amount_paid
-            if invoice.amount_due >= invoice.amount_after_tds:
-                invoice.status = InvoiceStatus.SENT
-            else:
-                invoice.status = InvoiceStatus.PARTIAL
+    # Restore balances of the invoices this payment settled
+    await reverse_allocations(db, payment)
 
     await db.delete(payment)
     await db.commit()
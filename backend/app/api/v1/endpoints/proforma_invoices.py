@@ -15,10 +15,14 @@ from app.models.invoice import Invoice, InvoiceItem, InvoiceType, InvoiceStatus
 from app.models.billing_schedule import BillingSchedule, ScheduleStatus
 from app.models.bank_account import BankAccount
 from app.models.user import User
-from app.schemas.proforma_invoice import PICreate, PIUpdate, PIResponse, PIListResponse
+from app.schemas.proforma_invoice import (
+    PICreate, PIUpdate, PIResponse, PIListResponse,
+    PIBulkGenerateRequest, PIBulkGenerateResult, PIBulkGenerateResponse,
+)
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
 from app.services.number_generator import generate_pi_number, generate_invoice_number
+from app.services.fulfillment import refresh_po_fulfillment, convert_pis_to_invoices
 
 router = APIRouter()
 
@@ -474,6 +478,46 @@ async def update_pi_status(
         raise HTTPException(status_code=400, detail=f"Invalid status: {status_update}")
 
 
+@router.post("/generate-invoices", response_model=PIBulkGenerateResponse)
+async def generate_invoices_from_pis(
+    request: PIBulkGenerateRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Generate invoices from several Proforma Invoices in one transaction.
+
+    PIs that are not DRAFT or SENT are reported and skipped.
+    """
+    try:
+        outcome = await convert_pis_to_invoices(db, request.pi_ids, request.invoice_date)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error generating invoices from PIs: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate invoices: {str(e)}"
+        )
+
+    results = []
+    for pi_id in dict.fromkeys(request.pi_ids):
+        converted = outcome[pi_id]
+        if isinstance(converted, tuple):
+            results.append(PIBulkGenerateResult(
+                pi_id=pi_id, success=True, invoice_id=converted[0], invoice_number=converted[1]
+            ))
+        else:
+            results.append(PIBulkGenerateResult(pi_id=pi_id, success=False, message=converted))
+
+    generated_count = sum(1 for r in results if r.success)
+    return PIBulkGenerateResponse(
+        generated_count=generated_count,
+        failed_count=len(results) - generated_count,
+        results=results,
+    )
+
+
 @router.post("/{pi_id}/generate-invoice", response_model=dict)
 async def generate_invoice_from_pi(
     pi_id: int,
@@ -567,21 +611,30 @@ async def generate_invoice_from_pi(
             )
             invoice.items.append(invoice_item)
 
-        db.add(invoice)
-
-        # Update PI status
-        pi.status = PIStatus.GENERATED
-        pi.invoice_id = invoice.id
-
         # Update billing schedule if linked
+        schedule = None
         if pi.billing_schedule_id:
             schedule_result = await db.execute(
                 select(BillingSchedule).where(BillingSchedule.id == pi.billing_schedule_id)
             )
             schedule = schedule_result.scalar_one_or_none()
-            if schedule:
-                schedule.invoice_id = invoice.id
-                schedule.status = ScheduleStatus.INVOICED
+            if schedule and not invoice.client_po_id:
+                invoice.client_po_id = schedule.client_po_id
+
+        db.add(invoice)
+        await db.flush()  # Get the invoice ID
+
+        # Update PI status
+        pi.status = PIStatus.GENERATED
+        pi.invoice_id = invoice.id
+
+        if schedule:
+            schedule.invoice_id = invoice.id
+            schedule.status = ScheduleStatus.INVOICED
+
+        # Update PO fulfillment
+        if invoice.client_po_id:
+            await refresh_po_fulfillment(db, [invoice.client_po_id])
 
         await db.commit()
         await db.refresh(invoice)
@@ -9,9 +9,13 @@ from app.models.user import User
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
+from app.core.responses import orm_response, paginated_response, response_adapter
 
 router = APIRouter()
 
+PROJECT_PAGE = response_adapter(PaginatedResponse[ProjectResponse])
+PROJECT_LIST = response_adapter(List[ProjectResponse])
+
 
 @router.get("", response_model=PaginatedResponse[ProjectResponse])
 async def get_projects(
@@ -48,13 +52,7 @@ async def get_projects(
     result = await db.execute(query)
     projects = result.scalars().all()
 
-    return PaginatedResponse(
-        items=[ProjectResponse.model_validate(p) for p in projects],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return paginated_response(PROJECT_PAGE, projects, total, page, page_size)
 
 
 @router.get("/active", response_model=List[ProjectResponse])
@@ -66,7 +64,7 @@ async def get_active_projects(
     query = select(Project).where(Project.is_active == True).order_by(Project.name)
     result = await db.execute(query)
     projects = result.scalars().all()
-    return [ProjectResponse.model_validate(p) for p in projects]
+    return orm_response(PROJECT_LIST, projects)
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
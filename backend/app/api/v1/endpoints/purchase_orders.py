@@ -18,10 +18,13 @@ from app.schemas.purchase_order import (
 )
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
+from app.core.responses import paginated_response, response_adapter
 from app.services.number_generator import generate_po_number
 
 router = APIRouter()
 
+PURCHASE_ORDER_PAGE = response_adapter(PaginatedResponse[PurchaseOrderResponse])
+
 
 def calculate_item_amounts(item_data: dict, is_igst: bool) -> dict:
     """Calculate amounts for a PO item."""
@@ -95,13 +98,7 @@ async def get_purchase_orders(
     result = await db.execute(query)
     pos = result.scalars().all()
 
-    return PaginatedResponse(
-        items=[PurchaseOrderResponse.model_validate(po) for po in pos],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return paginated_response(PURCHASE_ORDER_PAGE, pos, total, page, page_size)
 
 
 @router.get("/{po_id}", response_model=PurchaseOrderResponse)
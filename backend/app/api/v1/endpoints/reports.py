@@ -8,7 +8,7 @@ from datetime import date, datetime, timedelta
 from decimal import Decimal
 import io
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.models.invoice import Invoice, InvoiceType, InvoiceStatus
 from app.models.payment import Payment, PaymentType
 from app.models.client import Client
@@ -17,7 +17,13 @@ from app.models.user import User
 from app.models.settings import CompanySettings
 from app.models.billing_schedule import BillingSchedule, ScheduleStatus
 from app.models.client_po import ClientPO
+from app.models.branch import Branch
 from app.core.security import get_current_user
+from app.core.config import settings
+from app.core.responses import FastJSONResponse, JSONRows, StreamingJSONResponse
+from app.services.cash_flow_forecast import (
+    OVERDUE, forecast_period, forecast_query, build_forecast, detail_query,
+)
 import calendar
 
 router = APIRouter()
@@ -28,7 +34,7 @@ async def get_dashboard_stats(
     branch_id: Optional[int] = None,
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get dashboard statistics with optional branch and date filtering."""
@@ -166,23 +172,23 @@ async def get_dashboard_stats(
     tds_result = await db.execute(tds_query)
     tds_liability = tds_result.scalar() or Decimal('0')
 
-    return {
-        "total_receivables": float(total_receivables),
-        "total_payables": float(total_payables),
-        "revenue_this_month": float(revenue_this_month),
-        "expenses_this_month": float(expenses_this_month),
+    return FastJSONResponse({
+        "total_receivables": total_receivables,
+        "total_payables": total_payables,
+        "revenue_this_month": revenue_this_month,
+        "expenses_this_month": expenses_this_month,
         "pending_invoices": pending_invoices,
         "overdue_invoices": overdue_invoices,
-        "gst_liability": float(gst_liability),
-        "tds_liability": float(tds_liability),
-    }
+        "gst_liability": gst_liability,
+        "tds_liability": tds_liability,
+    })
 
 
 @router.get("/gst-summary")
 async def get_gst_summary(
     from_date: date = Query(...),
     to_date: date = Query(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get GST summary for a period."""
@@ -218,31 +224,31 @@ async def get_gst_summary(
     )
     input_tax = input_result.one()
 
-    return {
+    return FastJSONResponse({
         "period": f"{from_date} to {to_date}",
         "output_tax": {
-            "taxable_amount": float(output.taxable or 0),
-            "cgst": float(output.cgst or 0),
-            "sgst": float(output.sgst or 0),
-            "igst": float(output.igst or 0),
-            "cess": float(output.cess or 0),
-            "total": float((output.cgst or 0) + (output.sgst or 0) + (output.igst or 0) + (output.cess or 0)),
+            "taxable_amount": output.taxable or 0,
+            "cgst": output.cgst or 0,
+            "sgst": output.sgst or 0,
+            "igst": output.igst or 0,
+            "cess": output.cess or 0,
+            "total": (output.cgst or 0) + (output.sgst or 0) + (output.igst or 0) + (output.cess or 0),
         },
         "input_tax": {
-            "taxable_amount": float(input_tax.taxable or 0),
-            "cgst": float(input_tax.cgst or 0),
-            "sgst": float(input_tax.sgst or 0),
-            "igst": float(input_tax.igst or 0),
-            "cess": float(input_tax.cess or 0),
-            "total": float((input_tax.cgst or 0) + (input_tax.sgst or 0) + (input_tax.igst or 0) + (input_tax.cess or 0)),
+            "taxable_amount": input_tax.taxable or 0,
+            "cgst": input_tax.cgst or 0,
+            "sgst": input_tax.sgst or 0,
+            "igst": input_tax.igst or 0,
+            "cess": input_tax.cess or 0,
+            "total": (input_tax.cgst or 0) + (input_tax.sgst or 0) + (input_tax.igst or 0) + (input_tax.cess or 0),
         },
         "net_liability": {
-            "cgst": float((output.cgst or 0) - (input_tax.cgst or 0)),
-            "sgst": float((output.sgst or 0) - (input_tax.sgst or 0)),
-            "igst": float((output.igst or 0) - (input_tax.igst or 0)),
-            "cess": float((output.cess or 0) - (input_tax.cess or 0)),
+            "cgst": (output.cgst or 0) - (input_tax.cgst or 0),
+            "sgst": (output.sgst or 0) - (input_tax.sgst or 0),
+            "igst": (output.igst or 0) - (input_tax.igst or 0),
+            "cess": (output.cess or 0) - (input_tax.cess or 0),
         }
-    }
+    })
 
 
 @router.get("/tds-summary")
@@ -250,7 +256,7 @@ async def get_tds_summary(
     from_date: date = Query(...),
     to_date: date = Query(...),
     branch_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get TDS summary for a period."""
@@ -279,22 +285,22 @@ async def get_tds_summary(
         summary.append({
             "section": row.tds_section or "N/A",
             "deductee_count": row.count,
-            "total_payment": float(row.payment_amount or 0),
-            "total_tds": float(row.tds_amount or 0),
+            "total_payment": row.payment_amount or 0,
+            "total_tds": row.tds_amount or 0,
         })
 
-    return {
+    return FastJSONResponse({
         "period": f"{from_date} to {to_date}",
         "summary": summary,
         "total_tds": sum(s['total_tds'] for s in summary),
-    }
+    })
 
 
 @router.get("/aging")
 async def get_aging_report(
     report_type: str = Query("receivables", enum=["receivables", "payables"]),
     as_on_date: Optional[date] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get aging report for receivables or payables."""
@@ -302,68 +308,64 @@ async def get_aging_report(
         as_on_date = datetime.now().date()
 
     invoice_type = InvoiceType.SALES if report_type == "receivables" else InvoiceType.PURCHASE
+    filters = [
+        Invoice.invoice_type == invoice_type,
+        Invoice.amount_due > 0,
+        Invoice.status.not_in([InvoiceStatus.CANCELLED, InvoiceStatus.PAID]),
+    ]
 
-    result = await db.execute(
-        select(Invoice)
-        .where(Invoice.invoice_type == invoice_type)
-        .where(Invoice.amount_due > 0)
-        .where(Invoice.status.not_in([InvoiceStatus.CANCELLED, InvoiceStatus.PAID]))
+    # Categorize by aging buckets: 0-30, 31-60, 61-90 and 90+ days overdue
+    bucket = case(
+        (Invoice.due_date >= as_on_date - timedelta(days=30), "current"),
+        (Invoice.due_date >= as_on_date - timedelta(days=60), "30_60"),
+        (Invoice.due_date >= as_on_date - timedelta(days=90), "60_90"),
+        else_="90_plus",
     )
-    invoices = result.scalars().all()
-
-    # Categorize by aging buckets
-    buckets = {
-        "current": Decimal('0'),  # 0-30 days
-        "30_60": Decimal('0'),    # 31-60 days
-        "60_90": Decimal('0'),    # 61-90 days
-        "90_plus": Decimal('0'),  # 90+ days
-    }
-
-    details = []
-    for inv in invoices:
-        days_overdue = (as_on_date - inv.due_date).days
-
-        if days_overdue <= 0:
-            bucket = "current"
-        elif days_overdue <= 30:
-            bucket = "current"
-        elif days_overdue <= 60:
-            bucket = "30_60"
-        elif days_overdue <= 90:
-            bucket = "60_90"
-        else:
-            bucket = "90_plus"
-
-        buckets[bucket] += inv.amount_due
+    bucket_result = await db.execute(
+        select(bucket.label("bucket"), func.sum(Invoice.amount_due)).where(*filters).group_by(bucket)
+    )
+    buckets = {"current": Decimal('0'), "30_60": Decimal('0'), "60_90": Decimal('0'), "90_plus": Decimal('0')}
+    buckets.update(bucket_result.all())
 
-        details.append({
+    # Details are streamed while the invoices are read
+    invoices = await db.stream(
+        select(
+            Invoice.invoice_number, Invoice.invoice_date, Invoice.due_date, Invoice.amount_due, bucket.label("bucket"),
+        )
+        .where(*filters)
+        .execution_options(yield_per=settings.RESPONSE_STREAM_BATCH_SIZE)
+    )
+    details = (
+        {
             "invoice_number": inv.invoice_number,
             "invoice_date": str(inv.invoice_date),
             "due_date": str(inv.due_date),
-            "days_overdue": max(0, days_overdue),
-            "amount_due": float(inv.amount_due),
-            "bucket": bucket,
-        })
+            "days_overdue": max(0, (as_on_date - inv.due_date).days),
+            "amount_due": inv.amount_due,
+            "bucket": inv.bucket,
+        }
+        async for inv in invoices
+    )
 
-    return {
+    return StreamingJSONResponse({
         "as_on_date": str(as_on_date),
         "report_type": report_type,
         "summary": {
-            "current": float(buckets["current"]),
-            "30_60_days": float(buckets["30_60"]),
-            "60_90_days": float(buckets["60_90"]),
-            "90_plus_days": float(buckets["90_plus"]),
-            "total": float(sum(buckets.values())),
+            "current": buckets["current"],
+            "30_60_days": buckets["30_60"],
+            "60_90_days": buckets["60_90"],
+            "90_plus_days": buckets["90_plus"],
+            "total": sum(buckets.values()),
         },
-        "details": details,
-    }
+        "details": JSONRows(details),
+    })
 
 
 @router.get("/gstr-1")
 async def get_gstr1_report(
     from_date: date = Query(...),
     to_date: date = Query(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get GSTR-1 report format for the period."""
@@ -378,6 +380,7 @@ async def get_gstr1_report(
     )
     invoices = result.scalars().all()
 
+    # Invoices per section; their rows are built while the response is written
     # B2B Supplies (with GSTIN)
     b2b_supplies = []
     # B2C Large (> 2.5 lakh)
@@ -398,54 +401,16 @@ async def get_gstr1_report(
 
         if inv.invoice_type == InvoiceType.CREDIT_NOTE:
             # Credit Notes
-            credit_debit_notes.append({
-                "note_type": "C",  # C for Credit Note
-                "note_number": inv.invoice_number,
-                "note_date": str(inv.invoice_date),
-                "invoice_number": "",  # Original invoice number
-                "invoice_date": "",
-                "party_name": client.name,
-                "gstin": client.gstin or "",
-                "place_of_supply": inv.place_of_supply,
-                "taxable_value": float(inv.taxable_amount),
-                "cgst": float(inv.cgst_amount),
-                "sgst": float(inv.sgst_amount),
-                "igst": float(inv.igst_amount),
-                "cess": float(inv.cess_amount),
-            })
+            credit_debit_notes.append(inv)
             continue
 
         # For regular sales invoices
         if client.gstin and client.client_type in ['B2B', 'B2G']:
             # B2B Supply (registered)
-            b2b_supplies.append({
-                "invoice_number": inv.invoice_number,
-                "invoice_date": str(inv.invoice_date),
-                "party_name": client.name,
-                "gstin": client.gstin,
-                "place_of_supply": inv.place_of_supply,
-                "reverse_charge": "Y" if inv.reverse_charge else "N",
-                "invoice_type": "Regular",
-                "taxable_value": float(inv.taxable_amount),
-                "cgst": float(inv.cgst_amount),
-                "sgst": float(inv.sgst_amount),
-                "igst": float(inv.igst_amount),
-                "cess": float(inv.cess_amount),
-                "total_value": float(inv.total_amount),
-            })
+            b2b_supplies.append(inv)
         elif inv.total_amount > Decimal('250000'):
             # B2C Large (> 2.5 lakh)
-            b2c_large.append({
-                "invoice_number": inv.invoice_number,
-                "invoice_date": str(inv.invoice_date),
-                "place_of_supply": inv.place_of_supply,
-                "taxable_value": float(inv.taxable_amount),
-                "cgst": float(inv.cgst_amount),
-                "sgst": float(inv.sgst_amount),
-                "igst": float(inv.igst_amount),
-                "cess": float(inv.cess_amount),
-                "total_value": float(inv.total_amount),
-            })
+            b2c_large.append(inv)
         else:
             # B2C Small (< 2.5 lakh) - summarized by state and rate
             key = (inv.place_of_supply, "CGST/SGST" if not inv.is_igst else "IGST")
@@ -469,7 +434,7 @@ async def get_gstr1_report(
         for item in inv.items:
             hsn = item.hsn_sac or "N/A"
             gst_rate = item.gst_rate
-            key = (hsn, float(gst_rate))
+            key = (hsn, gst_rate)
 
             if key not in hsn_summary:
                 hsn_summary[key] = {
@@ -481,7 +446,7 @@ async def get_gstr1_report(
                     "sgst": Decimal('0'),
                     "igst": Decimal('0'),
                     "cess": Decimal('0'),
-                    "rate": float(gst_rate),
+                    "rate": gst_rate,
                 }
             hsn_summary[key]["quantity"] += item.quantity
             hsn_summary[key]["taxable_value"] += item.taxable_amount
@@ -490,46 +455,74 @@ async def get_gstr1_report(
             hsn_summary[key]["igst"] += item.igst_amount
             hsn_summary[key]["cess"] += item.cess_amount
 
-    # Convert b2c_small_summary and hsn_summary to lists
-    b2c_small = [
-        {
-            **v,
-            "taxable_value": float(v["taxable_value"]),
-            "cgst": float(v["cgst"]),
-            "sgst": float(v["sgst"]),
-            "igst": float(v["igst"]),
-            "cess": float(v["cess"]),
-        }
-        for v in b2c_small_summary.values()
-    ]
+    b2c_small = list(b2c_small_summary.values())
 
-    hsn_list = [
-        {
-            **v,
-            "quantity": float(v["quantity"]),
-            "taxable_value": float(v["taxable_value"]),
-            "cgst": float(v["cgst"]),
-            "sgst": float(v["sgst"]),
-            "igst": float(v["igst"]),
-            "cess": float(v["cess"]),
-        }
-        for v in hsn_summary.values()
-    ]
+    hsn_list = list(hsn_summary.values())
 
-    return {
+    return StreamingJSONResponse({
         "period": f"{from_date} to {to_date}",
         "gstin": "",  # Should be fetched from company settings
         "legal_name": "",  # Should be fetched from company settings
-        "b2b_supplies": b2b_supplies,
-        "b2c_large": b2c_large,
+        "b2b_supplies": JSONRows(_gstr1_b2b_row(inv) for inv in b2b_supplies),
+        "b2c_large": JSONRows(_gstr1_b2c_large_row(inv) for inv in b2c_large),
         "b2c_small": b2c_small,
-        "credit_debit_notes": credit_debit_notes,
+        "credit_debit_notes": JSONRows(_gstr1_note_row(inv) for inv in credit_debit_notes),
         "hsn_summary": hsn_list,
         "document_summary": {
             "total_invoices": len([inv for inv in invoices if inv.invoice_type == InvoiceType.SALES]),
             "total_credit_notes": len([inv for inv in invoices if inv.invoice_type == InvoiceType.CREDIT_NOTE]),
             "cancelled": 0,
         }
+    })
+
+
+def _gstr1_b2b_row(inv: Invoice) -> dict:
+    return {
+        "invoice_number": inv.invoice_number,
+        "invoice_date": str(inv.invoice_date),
+        "party_name": inv.client.name,
+        "gstin": inv.client.gstin,
+        "place_of_supply": inv.place_of_supply,
+        "reverse_charge": "Y" if inv.reverse_charge else "N",
+        "invoice_type": "Regular",
+        "taxable_value": inv.taxable_amount,
+        "cgst": inv.cgst_amount,
+        "sgst": inv.sgst_amount,
+        "igst": inv.igst_amount,
+        "cess": inv.cess_amount,
+        "total_value": inv.total_amount,
+    }
+
+
+def _gstr1_b2c_large_row(inv: Invoice) -> dict:
+    return {
+        "invoice_number": inv.invoice_number,
+        "invoice_date": str(inv.invoice_date),
+        "place_of_supply": inv.place_of_supply,
+        "taxable_value": inv.taxable_amount,
+        "cgst": inv.cgst_amount,
+        "sgst": inv.sgst_amount,
+        "igst": inv.igst_amount,
+        "cess": inv.cess_amount,
+        "total_value": inv.total_amount,
+    }
+
+
+def _gstr1_note_row(inv: Invoice) -> dict:
+    return {
+        "note_type": "C",  # C for Credit Note
+        "note_number": inv.invoice_number,
+        "note_date": str(inv.invoice_date),
+        "invoice_number": "",  # Original invoice number
+        "invoice_date": "",
+        "party_name": inv.client.name,
+        "gstin": inv.client.gstin or "",
+        "place_of_supply": inv.place_of_supply,
+        "taxable_value": inv.taxable_amount,
+        "cgst": inv.cgst_amount,
+        "sgst": inv.sgst_amount,
+        "igst": inv.igst_amount,
+        "cess": inv.cess_amount,
     }
 
 
@@ -537,7 +530,7 @@ async def get_gstr1_report(
 async def get_gstr3b_report(
     from_date: date = Query(...),
     to_date: date = Query(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get GSTR-3B report format for the period."""
@@ -590,17 +583,17 @@ async def get_gstr3b_report(
     )
     purchases = purchase_result.one()
 
-    return {
+    return FastJSONResponse({
         "period": f"{from_date} to {to_date}",
         "gstin": "",  # Should be fetched from company settings
         "legal_name": "",  # Should be fetched from company settings
         "section_3_1": {
             "description": "Outward taxable supplies (other than zero rated, nil rated and exempted)",
-            "taxable_value": float(sales.taxable or 0),
-            "cgst": float(sales.cgst or 0),
-            "sgst": float(sales.sgst or 0),
-            "igst": float(sales.igst or 0),
-            "cess": float(sales.cess or 0),
+            "taxable_value": sales.taxable or 0,
+            "cgst": sales.cgst or 0,
+            "sgst": sales.sgst or 0,
+            "igst": sales.igst or 0,
+            "cess": sales.cess or 0,
         },
         "section_3_2": {
             "description": "Outward taxable supplies (zero rated)",
@@ -612,29 +605,29 @@ async def get_gstr3b_report(
         },
         "section_4": {
             "description": "Inward supplies liable to reverse charge",
-            "taxable_value": float(reverse_charge.taxable or 0),
-            "cgst": float(reverse_charge.cgst or 0),
-            "sgst": float(reverse_charge.sgst or 0),
-            "igst": float(reverse_charge.igst or 0),
-            "cess": float(reverse_charge.cess or 0),
+            "taxable_value": reverse_charge.taxable or 0,
+            "cgst": reverse_charge.cgst or 0,
+            "sgst": reverse_charge.sgst or 0,
+            "igst": reverse_charge.igst or 0,
+            "cess": reverse_charge.cess or 0,
         },
         "section_4_itc": {
             "description": "Eligible ITC",
             "import_of_goods": {"igst": 0, "cess": 0},
             "import_of_services": {"igst": 0, "cess": 0},
             "inputs": {
-                "cgst": float(purchases.cgst or 0),
-                "sgst": float(purchases.sgst or 0),
-                "igst": float(purchases.igst or 0),
-                "cess": float(purchases.cess or 0),
+                "cgst": purchases.cgst or 0,
+                "sgst": purchases.sgst or 0,
+                "igst": purchases.igst or 0,
+                "cess": purchases.cess or 0,
             },
             "capital_goods": {"cgst": 0, "sgst": 0, "igst": 0, "cess": 0},
             "itc_reversed": {"cgst": 0, "sgst": 0, "igst": 0, "cess": 0},
             "net_itc_available": {
-                "cgst": float(purchases.cgst or 0),
-                "sgst": float(purchases.sgst or 0),
-                "igst": float(purchases.igst or 0),
-                "cess": float(purchases.cess or 0),
+                "cgst": purchases.cgst or 0,
+                "sgst": purchases.sgst or 0,
+                "igst": purchases.igst or 0,
+                "cess": purchases.cess or 0,
             },
         },
         "section_5_exempt": {
@@ -644,12 +637,12 @@ async def get_gstr3b_report(
         },
         "section_6_net_tax": {
             "description": "Net tax liability",
-            "cgst": float((sales.cgst or 0) - (purchases.cgst or 0)),
-            "sgst": float((sales.sgst or 0) - (purchases.sgst or 0)),
-            "igst": float((sales.igst or 0) - (purchases.igst or 0)),
-            "cess": float((sales.cess or 0) - (purchases.cess or 0)),
+            "cgst": (sales.cgst or 0) - (purchases.cgst or 0),
+            "sgst": (sales.sgst or 0) - (purchases.sgst or 0),
+            "igst": (sales.igst or 0) - (purchases.igst or 0),
+            "cess": (sales.cess or 0) - (purchases.cess or 0),
         },
-    }
+    })
 
 
 @router.get("/profit-loss")
@@ -657,7 +650,7 @@ async def get_profit_loss(
     from_date: date = Query(...),
     to_date: date = Query(...),
     branch_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get Profit & Loss statement for a period."""
@@ -685,7 +678,7 @@ async def get_profit_loss(
         .having(func.sum(LedgerEntry.credit - LedgerEntry.debit) != 0)
     )
     revenue_items = revenue_result.all()
-    total_revenue = sum(float(r.amount or 0) for r in revenue_items)
+    total_revenue = sum(r.amount or 0 for r in revenue_items)
 
     # Cost of Goods Sold (Debit balance in EXPENSE accounts with group 'COGS' or 'Cost of Goods Sold')
     cogs_result = await db.execute(
@@ -702,7 +695,7 @@ async def get_profit_loss(
         .having(func.sum(LedgerEntry.debit - LedgerEntry.credit) != 0)
     )
     cogs_items = cogs_result.all()
-    total_cogs = sum(float(r.amount or 0) for r in cogs_items)
+    total_cogs = sum(r.amount or 0 for r in cogs_items)
 
     # Operating Expenses (Debit balance in EXPENSE accounts excluding COGS)
     expenses_result = await db.execute(
@@ -719,26 +712,26 @@ async def get_profit_loss(
         .having(func.sum(LedgerEntry.debit - LedgerEntry.credit) != 0)
     )
     expense_items = expenses_result.all()
-    total_expenses = sum(float(r.amount or 0) for r in expense_items)
+    total_expenses = sum(r.amount or 0 for r in expense_items)
 
     # Calculate summary
     gross_profit = total_revenue - total_cogs
     operating_profit = gross_profit - total_expenses
     net_profit = operating_profit  # Add other income/expenses if needed
 
-    return {
+    return FastJSONResponse({
         "period": f"{from_date} to {to_date}",
         "branch_id": branch_id,
         "revenue": {
             "items": [
-                {"account_code": r.account_code, "account_name": r.account_name, "amount": float(r.amount or 0)}
+                {"account_code": r.account_code, "account_name": r.account_name, "amount": r.amount or 0}
                 for r in revenue_items
             ],
             "total": total_revenue,
         },
         "cost_of_goods_sold": {
             "items": [
-                {"account_code": r.account_code, "account_name": r.account_name, "amount": float(r.amount or 0)}
+                {"account_code": r.account_code, "account_name": r.account_name, "amount": r.amount or 0}
                 for r in cogs_items
             ],
             "total": total_cogs,
@@ -746,21 +739,21 @@ async def get_profit_loss(
         "gross_profit": gross_profit,
         "operating_expenses": {
             "items": [
-                {"account_code": r.account_code, "account_name": r.account_name, "amount": float(r.amount or 0)}
+                {"account_code": r.account_code, "account_name": r.account_name, "amount": r.amount or 0}
                 for r in expense_items
             ],
             "total": total_expenses,
         },
         "operating_profit": operating_profit,
         "net_profit": net_profit,
-    }
+    })
 
 
 @router.get("/balance-sheet")
 async def get_balance_sheet(
     as_on_date: date = Query(...),
     branch_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get Balance Sheet as on a specific date."""
@@ -792,9 +785,9 @@ async def get_balance_sheet(
     fixed_assets = [a for a in asset_items if a.account_group in ['Fixed Assets', 'Property', 'Equipment']]
     other_assets = [a for a in asset_items if a not in current_assets and a not in fixed_assets]
 
-    total_current_assets = sum(float(a.amount or 0) for a in current_assets)
-    total_fixed_assets = sum(float(a.amount or 0) for a in fixed_assets)
-    total_other_assets = sum(float(a.amount or 0) for a in other_assets)
+    total_current_assets = sum(a.amount or 0 for a in current_assets)
+    total_fixed_assets = sum(a.amount or 0 for a in fixed_assets)
+    total_other_assets = sum(a.amount or 0 for a in other_assets)
     total_assets = total_current_assets + total_fixed_assets + total_other_assets
 
     # Liabilities (Credit balance)
@@ -818,9 +811,9 @@ async def get_balance_sheet(
     long_term_liabilities = [l for l in liability_items if l.account_group in ['Long Term Liabilities', 'Loans']]
     other_liabilities = [l for l in liability_items if l not in current_liabilities and l not in long_term_liabilities]
 
-    total_current_liabilities = sum(float(l.amount or 0) for l in current_liabilities)
-    total_long_term_liabilities = sum(float(l.amount or 0) for l in long_term_liabilities)
-    total_other_liabilities = sum(float(l.amount or 0) for l in other_liabilities)
+    total_current_liabilities = sum(l.amount or 0 for l in current_liabilities)
+    total_long_term_liabilities = sum(l.amount or 0 for l in long_term_liabilities)
+    total_other_liabilities = sum(l.amount or 0 for l in other_liabilities)
     total_liabilities = total_current_liabilities + total_long_term_liabilities + total_other_liabilities
 
     # Equity (Credit balance)
@@ -837,7 +830,7 @@ async def get_balance_sheet(
         .having(func.sum(LedgerEntry.credit - LedgerEntry.debit) != 0)
     )
     equity_items = equity_result.all()
-    total_equity = sum(float(e.amount or 0) for e in equity_items)
+    total_equity = sum(e.amount or 0 for e in equity_items)
 
     # Calculate retained earnings (Revenue - Expenses for all time)
     retained_earnings_result = await db.execute(
@@ -853,58 +846,58 @@ async def get_balance_sheet(
         .where(ChartOfAccount.account_type.in_(['REVENUE', 'EXPENSE']))
         .where(*base_where)
     )
-    retained_earnings = float(retained_earnings_result.scalar() or 0)
+    retained_earnings = retained_earnings_result.scalar() or 0
 
     total_equity_with_retained = total_equity + retained_earnings
 
-    return {
+    return FastJSONResponse({
         "as_on_date": str(as_on_date),
         "branch_id": branch_id,
         "assets": {
             "current_assets": {
-                "items": [{"account_code": a.account_code, "account_name": a.account_name, "amount": float(a.amount or 0)} for a in current_assets],
+                "items": [{"account_code": a.account_code, "account_name": a.account_name, "amount": a.amount or 0} for a in current_assets],
                 "total": total_current_assets,
             },
             "fixed_assets": {
-                "items": [{"account_code": a.account_code, "account_name": a.account_name, "amount": float(a.amount or 0)} for a in fixed_assets],
+                "items": [{"account_code": a.account_code, "account_name": a.account_name, "amount": a.amount or 0} for a in fixed_assets],
                 "total": total_fixed_assets,
             },
             "other_assets": {
-                "items": [{"account_code": a.account_code, "account_name": a.account_name, "amount": float(a.amount or 0)} for a in other_assets],
+                "items": [{"account_code": a.account_code, "account_name": a.account_name, "amount": a.amount or 0} for a in other_assets],
                 "total": total_other_assets,
             },
             "total": total_assets,
         },
         "liabilities": {
             "current_liabilities": {
-                "items": [{"account_code": l.account_code, "account_name": l.account_name, "amount": float(l.amount or 0)} for l in current_liabilities],
+                "items": [{"account_code": l.account_code, "account_name": l.account_name, "amount": l.amount or 0} for l in current_liabilities],
                 "total": total_current_liabilities,
             },
             "long_term_liabilities": {
-                "items": [{"account_code": l.account_code, "account_name": l.account_name, "amount": float(l.amount or 0)} for l in long_term_liabilities],
+                "items": [{"account_code": l.account_code, "account_name": l.account_name, "amount": l.amount or 0} for l in long_term_liabilities],
                 "total": total_long_term_liabilities,
             },
             "other_liabilities": {
-                "items": [{"account_code": l.account_code, "account_name": l.account_name, "amount": float(l.amount or 0)} for l in other_liabilities],
+                "items": [{"account_code": l.account_code, "account_name": l.account_name, "amount": l.amount or 0} for l in other_liabilities],
                 "total": total_other_liabilities,
             },
             "total": total_liabilities,
         },
         "equity": {
-            "items": [{"account_code": e.account_code, "account_name": e.account_name, "amount": float(e.amount or 0)} for e in equity_items],
+            "items": [{"account_code": e.account_code, "account_name": e.account_name, "amount": e.amount or 0} for e in equity_items],
             "retained_earnings": retained_earnings,
             "total": total_equity_with_retained,
         },
         "total_liabilities_and_equity": total_liabilities + total_equity_with_retained,
-        "balanced": abs(total_assets - (total_liabilities + total_equity_with_retained)) < 0.01,
-    }
+        "balanced": abs(total_assets - (total_liabilities + total_equity_with_retained)) < Decimal("0.01"),
+    })
 
 
 @router.get("/recent-invoices")
 async def get_recent_invoices(
     limit: int = Query(5, ge=1, le=20),
     branch_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get recent invoices for dashboard."""
@@ -923,19 +916,19 @@ async def get_recent_invoices(
     result = await db.execute(query)
     invoices = result.scalars().all()
 
-    return [
+    return FastJSONResponse([
         {
             "id": inv.id,
             "invoice_number": inv.invoice_number,
             "invoice_date": str(inv.invoice_date),
             "client_name": inv.client.name if inv.client else "N/A",
-            "total_amount": float(inv.total_amount),
-            "amount_due": float(inv.amount_due),
+            "total_amount": inv.total_amount,
+            "amount_due": inv.amount_due,
             "due_date": str(inv.due_date) if inv.due_date else None,
             "status": inv.status.value,
         }
         for inv in invoices
-    ]
+    ])
 
 
 @router.get("/upcoming-payments")
@@ -943,7 +936,7 @@ async def get_upcoming_payments(
     limit: int = Query(5, ge=1, le=20),
     days_ahead: int = Query(30, ge=1, le=90),
     branch_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get upcoming payments due (purchase invoices with outstanding amount)."""
@@ -967,20 +960,20 @@ async def get_upcoming_payments(
     result = await db.execute(query)
     invoices = result.scalars().all()
 
-    return [
+    return FastJSONResponse([
         {
             "id": inv.id,
             "invoice_number": inv.invoice_number,
             "invoice_date": str(inv.invoice_date),
             "vendor_name": inv.vendor.name if inv.vendor else "N/A",
-            "total_amount": float(inv.total_amount),
-            "amount_due": float(inv.amount_due),
+            "total_amount": inv.total_amount,
+            "amount_due": inv.amount_due,
             "due_date": str(inv.due_date) if inv.due_date else None,
             "days_until_due": (inv.due_date - today).days if inv.due_date else None,
             "status": inv.status.value,
         }
         for inv in invoices
-    ]
+    ])
 
 
 @router.get("/party-ledger/{party_type}/{party_id}")
@@ -989,7 +982,7 @@ async def get_party_ledger(
     party_id: int,
     from_date: date = Query(...),
     to_date: date = Query(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -1004,6 +997,11 @@ async def get_party_ledger(
     Returns:
         Party details, opening balance, transactions with running balance, and closing balance.
     """
+    return StreamingJSONResponse(await _party_ledger(party_type, party_id, from_date, to_date, db))
+
+
+async def _party_ledger(party_type: str, party_id: int, from_date: date, to_date: date, db: AsyncSession) -> dict:
+    """Party ledger data, shared by the JSON and PDF endpoints."""
     from app.models.payment import PaymentMode
 
     # Validate party type
@@ -1093,9 +1091,9 @@ async def get_party_ledger(
             .where(Payment.payment_date < from_date)
         )
 
-    opening_invoices = float(opening_invoices_result.scalar() or 0)
-    opening_credit_notes = float(opening_credit_notes_result.scalar() or 0)
-    opening_payments = float(opening_payments_result.scalar() or 0)
+    opening_invoices = opening_invoices_result.scalar() or 0
+    opening_credit_notes = opening_credit_notes_result.scalar() or 0
+    opening_payments = opening_payments_result.scalar() or 0
     opening_balance = opening_invoices - opening_credit_notes - opening_payments
 
     # Get all transactions within the period
@@ -1128,24 +1126,24 @@ async def get_party_ledger(
         if party_type == 'client':
             # For client: Sales/Debit Note = Debit (they owe us), Credit Note = Credit (we owe them)
             if inv.invoice_type in [InvoiceType.SALES, InvoiceType.DEBIT_NOTE]:
-                debit = float(inv.total_amount)
+                debit = inv.total_amount
                 credit = 0
                 inv_type = "INVOICE" if inv.invoice_type == InvoiceType.SALES else "DEBIT_NOTE"
                 description = f"Sales Invoice" if inv.invoice_type == InvoiceType.SALES else "Debit Note"
             else:
                 debit = 0
-                credit = float(inv.total_amount)
+                credit = inv.total_amount
                 inv_type = "CREDIT_NOTE"
                 description = "Credit Note"
         else:
             # For vendor: Purchase/Credit Note = Credit (we owe them), Debit Note = Debit (they owe us)
             if inv.invoice_type in [InvoiceType.PURCHASE, InvoiceType.CREDIT_NOTE]:
                 debit = 0
-                credit = float(inv.total_amount)
+                credit = inv.total_amount
                 inv_type = "INVOICE" if inv.invoice_type == InvoiceType.PURCHASE else "CREDIT_NOTE"
                 description = f"Purchase Invoice" if inv.invoice_type == InvoiceType.PURCHASE else "Credit Note"
             else:
-                debit = float(inv.total_amount)
+                debit = inv.total_amount
                 credit = 0
                 inv_type = "DEBIT_NOTE"
                 description = "Debit Note"
@@ -1186,9 +1184,9 @@ async def get_party_ledger(
         # For vendor: Payment made = Debit (we paid them)
         if party_type == 'client':
             debit = 0
-            credit = float(pmt.net_amount)
+            credit = pmt.net_amount
         else:
-            debit = float(pmt.net_amount)
+            debit = pmt.net_amount
             credit = 0
 
         # Get payment mode description
@@ -1244,7 +1242,7 @@ async def get_party_ledger_pdf(
     party_id: int,
     from_date: date = Query(...),
     to_date: date = Query(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -1258,7 +1256,7 @@ async def get_party_ledger_pdf(
     import base64
 
     # Get ledger data using the same logic
-    ledger_data = await get_party_ledger(party_type, party_id, from_date, to_date, db, current_user)
+    ledger_data = await _party_ledger(party_type, party_id, from_date, to_date, db)
 
     # Get company settings
     settings_result = await db.execute(select(CompanySettings).where(CompanySettings.is_active == True))
@@ -1462,7 +1460,7 @@ async def get_party_ledger_pdf(
 async def get_invoices_monthly_summary(
     financial_year: str = Query(..., description="Financial year in format YYYY-YYYY (e.g., 2025-2026)"),
     branch_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -1568,27 +1566,27 @@ async def get_invoices_monthly_summary(
             "year": data["year"],
             "month_name": data["month_name"],
             "transactions": data["transactions"],
-            "invoice_value": float(data["invoice_value"]),
-            "cgst": float(data["cgst"]),
-            "sgst": float(data["sgst"]),
-            "igst": float(data["igst"]),
-            "paid": float(data["paid"]),
-            "due": float(data["due"]),
+            "invoice_value": data["invoice_value"],
+            "cgst": data["cgst"],
+            "sgst": data["sgst"],
+            "igst": data["igst"],
+            "paid": data["paid"],
+            "due": data["due"],
         })
 
-    return {
+    return FastJSONResponse({
         "financial_year": financial_year,
         "summary": {
             "total_transactions": total_summary["total_transactions"],
-            "total_invoice_value": float(total_summary["total_invoice_value"]),
-            "total_cgst": float(total_summary["total_cgst"]),
-            "total_sgst": float(total_summary["total_sgst"]),
-            "total_igst": float(total_summary["total_igst"]),
-            "total_paid": float(total_summary["total_paid"]),
-            "total_due": float(total_summary["total_due"]),
+            "total_invoice_value": total_summary["total_invoice_value"],
+            "total_cgst": total_summary["total_cgst"],
+            "total_sgst": total_summary["total_sgst"],
+            "total_igst": total_summary["total_igst"],
+            "total_paid": total_summary["total_paid"],
+            "total_due": total_summary["total_due"],
         },
         "months": months_list,
-    }
+    })
 
 
 @router.get("/expected-income")
@@ -1596,7 +1594,9 @@ async def get_expected_income(
     from_month: Optional[str] = Query(None, description="Start month in YYYY-MM format"),
     to_month: Optional[str] = Query(None, description="End month in YYYY-MM format"),
     client_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -1606,7 +1606,7 @@ async def get_expected_income(
         - Total expected income
         - Monthly forecast with schedule counts
         - Client-wise summary
-        - Detailed pending schedules
+        - Detailed pending schedules, paginated by page/page_size
     """
     # Default to next 12 months if not specified
     today = datetime.now().date()
@@ -1630,115 +1630,208 @@ async def get_expected_income(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid to_month format. Use YYYY-MM")
 
-    # Build query for pending schedules
-    query = (
-        select(BillingSchedule)
-        .options(
-            selectinload(BillingSchedule.client_po).selectinload(ClientPO.client)
-        )
-        .where(BillingSchedule.status == ScheduleStatus.PENDING)
-        .where(BillingSchedule.due_date >= from_date)
-        .where(BillingSchedule.due_date <= to_date)
-    )
-
+    # Pending schedules in the period, aggregated in SQL
+    filters = [
+        BillingSchedule.status == ScheduleStatus.PENDING,
+        BillingSchedule.due_date >= from_date,
+        BillingSchedule.due_date <= to_date,
+    ]
     if client_id:
-        query = query.join(ClientPO).where(ClientPO.client_id == client_id)
-
-    query = query.order_by(BillingSchedule.due_date)
+        filters.append(ClientPO.client_id == client_id)
 
-    result = await db.execute(query)
-    schedules = result.scalars().all()
-
-    # Aggregate by month
-    monthly_data = {}
-    client_data = {}
-    details = []
-
-    total_amount = Decimal('0')
-    total_gst = Decimal('0')
-    total_total = Decimal('0')
-
-    for schedule in schedules:
-        # Monthly aggregation
-        month_key = schedule.due_date.strftime("%Y-%m")
-        month_name = schedule.due_date.strftime("%B %Y")
-
-        if month_key not in monthly_data:
-            monthly_data[month_key] = {
-                "month": month_key,
-                "month_name": month_name,
-                "schedule_count": 0,
-                "amount": Decimal('0'),
-                "gst_amount": Decimal('0'),
-                "total_amount": Decimal('0'),
-            }
-
-        monthly_data[month_key]["schedule_count"] += 1
-        monthly_data[month_key]["amount"] += schedule.amount
-        monthly_data[month_key]["gst_amount"] += schedule.gst_amount
-        monthly_data[month_key]["total_amount"] += schedule.total_amount
-
-        # Client aggregation
-        client_po = schedule.client_po
-        if client_po and client_po.client:
-            client = client_po.client
-            if client.id not in client_data:
-                client_data[client.id] = {
-                    "client_id": client.id,
-                    "client_name": client.name,
-                    "schedule_count": 0,
-                    "total_expected": Decimal('0'),
-                }
-            client_data[client.id]["schedule_count"] += 1
-            client_data[client.id]["total_expected"] += schedule.total_amount
-
-        # Totals
-        total_amount += schedule.amount
-        total_gst += schedule.gst_amount
-        total_total += schedule.total_amount
-
-        # Detail record
-        details.append({
-            "id": schedule.id,
-            "client_po_id": schedule.client_po_id,
-            "client_po_number": client_po.internal_number if client_po else None,
-            "client_name": client_po.client.name if client_po and client_po.client else None,
-            "installment_number": schedule.installment_number,
-            "description": schedule.description,
-            "due_date": str(schedule.due_date),
-            "amount": float(schedule.amount),
-            "gst_amount": float(schedule.gst_amount),
-            "total_amount": float(schedule.total_amount),
-        })
-
-    # Convert aggregated data to lists
+    month_key = func.to_char(BillingSchedule.due_date, "YYYY-MM")
+    monthly_result = await db.execute(
+        select(
+            month_key.label("month"),
+            func.count().label("schedule_count"),
+            func.sum(BillingSchedule.amount).label("amount"),
+            func.sum(BillingSchedule.gst_amount).label("gst_amount"),
+            func.sum(BillingSchedule.total_amount).label("total_amount"),
+        )
+        .join(ClientPO, ClientPO.id == BillingSchedule.client_po_id)
+        .where(*filters)
+        .group_by(month_key)
+        .order_by(month_key)
+    )
     monthly_forecast = [
         {
-            **data,
-            "amount": float(data["amount"]),
-            "gst_amount": float(data["gst_amount"]),
-            "total_amount": float(data["total_amount"]),
+            "month": row.month,
+            "month_name": datetime.strptime(row.month, "%Y-%m").strftime("%B %Y"),
+            "schedule_count": row.schedule_count,
+            "amount": row.amount,
+            "gst_amount": row.gst_amount,
+            "total_amount": row.total_amount,
         }
-        for data in sorted(monthly_data.values(), key=lambda x: x["month"])
+        for row in monthly_result.all()
     ]
 
+    client_result = await db.execute(
+        select(
+            Client.id.label("client_id"),
+            Client.name.label("client_name"),
+            func.count().label("schedule_count"),
+            func.sum(BillingSchedule.total_amount).label("total_expected"),
+        )
+        .join(ClientPO, ClientPO.id == BillingSchedule.client_po_id)
+        .join(Client, Client.id == ClientPO.client_id)
+        .where(*filters)
+        .group_by(Client.id, Client.name)
+        .order_by(func.sum(BillingSchedule.total_amount).desc())
+    )
     client_summary = [
         {
-            **data,
-            "total_expected": float(data["total_expected"]),
+            "client_id": row.client_id,
+            "client_name": row.client_name,
+            "schedule_count": row.schedule_count,
+            "total_expected": row.total_expected,
         }
-        for data in sorted(client_data.values(), key=lambda x: x["total_expected"], reverse=True)
+        for row in client_result.all()
     ]
 
-    return {
+    # Detailed pending schedules, one page at a time
+    total_schedules = sum(m["schedule_count"] for m in monthly_forecast)
+    details_result = await db.stream(
+        select(
+            BillingSchedule.id,
+            BillingSchedule.client_po_id,
+            ClientPO.internal_number.label("client_po_number"),
+            Client.name.label("client_name"),
+            BillingSchedule.installment_number,
+            BillingSchedule.description,
+            BillingSchedule.due_date,
+            BillingSchedule.amount,
+            BillingSchedule.gst_amount,
+            BillingSchedule.total_amount,
+        )
+        .join(ClientPO, ClientPO.id == BillingSchedule.client_po_id)
+        .outerjoin(Client, Client.id == ClientPO.client_id)
+        .where(*filters)
+        .order_by(BillingSchedule.due_date, BillingSchedule.id)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .execution_options(yield_per=settings.RESPONSE_STREAM_BATCH_SIZE)
+    )
+    details = (
+        {
+            "id": row.id,
+            "client_po_id": row.client_po_id,
+            "client_po_number": row.client_po_number,
+            "client_name": row.client_name,
+            "installment_number": row.installment_number,
+            "description": row.description,
+            "due_date": str(row.due_date),
+            "amount": row.amount,
+            "gst_amount": row.gst_amount,
+            "total_amount": row.total_amount,
+        }
+        async for row in details_result
+    )
+
+    return StreamingJSONResponse({
         "period": {"from": str(from_date), "to": str(to_date)},
         "summary": {
-            "total_schedules": len(schedules),
-            "total_amount": float(total_amount),
-            "total_gst": float(total_gst),
-            "total_expected": float(total_total),
+            "total_schedules": total_schedules,
+            "total_amount": sum(m["amount"] for m in monthly_forecast),
+            "total_gst": sum(m["gst_amount"] for m in monthly_forecast),
+            "total_expected": sum(m["total_amount"] for m in monthly_forecast),
         },
         "monthly_forecast": monthly_forecast,
         "client_summary": client_summary,
-        "details": details,
-    }
+        "details": JSONRows(details),
+        "details_page": {
+            "total": total_schedules,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total_schedules + page_size - 1) // page_size,
+        },
+    })
+
+
+def _parse_month(value: str) -> date:
+    """First day of a YYYY-MM month."""
+    try:
+        return datetime.strptime(value + "-01", "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid month '{value}'. Use YYYY-MM")
+
+
+@router.get("/cash-flow-forecast")
+async def get_cash_flow_forecast(
+    from_month: Optional[str] = Query(None, description="First month in YYYY-MM format"),
+    months: int = Query(12, ge=1, le=24),
+    branch_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Monthly cash-flow projection per branch.
+
+    Combines pending billing schedules, open receivables and open payables
+    by due date. Amounts due before from_month are returned as overdue.
+    Line items are available from /cash-flow-forecast/details.
+    """
+    from_date = _parse_month(from_month) if from_month else datetime.now().date().replace(day=1)
+    to_date = forecast_period(from_date, months)
+
+    result = await db.execute(forecast_query(from_date, to_date, branch_id))
+    rows = result.all()
+
+    branch_ids = {row.branch_id for row in rows if row.branch_id}
+    branch_names = {}
+    if branch_ids:
+        branch_result = await db.execute(
+            select(Branch.id, Branch.branch_name).where(Branch.id.in_(branch_ids))
+        )
+        branch_names = dict(branch_result.all())
+
+    return FastJSONResponse({
+        "period": {"from": str(from_date), "to": str(to_date), "months": months},
+        "branch_id": branch_id,
+        **build_forecast(rows, from_date, months, branch_names),
+    })
+
+
+@router.get("/cash-flow-forecast/details")
+async def get_cash_flow_forecast_details(
+    source: str = Query(..., pattern="^(billing|receivable|payable)$"),
+    from_month: Optional[str] = Query(None, description="First month in YYYY-MM format"),
+    months: int = Query(12, ge=1, le=24),
+    month: Optional[str] = Query(None, description="YYYY-MM, or 'overdue'"),
+    branch_id: Optional[int] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Paginated line items behind one source of the cash-flow forecast."""
+    from_date = _parse_month(from_month) if from_month else datetime.now().date().replace(day=1)
+    to_date = forecast_period(from_date, months)
+    if month and month != OVERDUE:
+        _parse_month(month)
+
+    query = detail_query(source, from_date, to_date, month, branch_id)
+    total_result = await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    total = total_result.scalar()
+
+    result = await db.execute(query.offset((page - 1) * page_size).limit(page_size))
+    items = [
+        {
+            "id": row.id,
+            "source": row.source,
+            "reference": row.reference,
+            "party_name": row.party_name,
+            "description": row.description,
+            "due_date": str(row.due_date),
+            "amount": row.amount,
+            "branch_id": row.branch_id,
+        }
+        for row in result.all()
+    ]
+
+    return FastJSONResponse({
+        "items": items,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (total + page_size - 1) // page_size,
+    })
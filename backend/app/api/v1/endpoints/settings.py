@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import base64
@@ -12,28 +12,36 @@ from app.schemas.settings import (
     CompanySettingsResponse,
 )
 from app.core.security import get_current_user
+from app.core.http_cache import cached_response
+from app.core.responses import orm_response, response_adapter
 
 router = APIRouter()
 
+COMPANY_SETTINGS = response_adapter(CompanySettingsResponse)
+
 
 @router.get("", response_model=CompanySettingsResponse)
 async def get_company_settings(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get company settings."""
-    result = await db.execute(
-        select(CompanySettings).where(CompanySettings.is_active == True)
-    )
-    settings = result.scalar_one_or_none()
-
-    if not settings:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Company settings not found. Please create settings first."
+    async def load():
+        result = await db.execute(
+            select(CompanySettings).where(CompanySettings.is_active == True)
         )
+        settings = result.scalar_one_or_none()
 
-    return settings
+        if not settings:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Company settings not found. Please create settings first."
+            )
+
+        return orm_response(COMPANY_SETTINGS, settings)
+
+    return await cached_response(request, db, CompanySettings, load)
 
 
 @router.post("", response_model=CompanySettingsResponse, status_code=status.HTTP_201_CREATED)
@@ -1,5 +1,5 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -8,22 +8,30 @@ from app.models.state import State
 from app.models.user import User
 from app.schemas.state import StateResponse
 from app.core.security import get_current_user
+from app.core.http_cache import cached_response
+from app.core.responses import orm_response, response_adapter
 
 router = APIRouter()
 
+STATE_LIST = response_adapter(List[StateResponse])
+
 
 @router.get("", response_model=List[StateResponse])
 async def get_states(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get all active states."""
-    result = await db.execute(
-        select(State)
-        .where(State.is_active == True)
-        .order_by(State.code)
-    )
-    return result.scalars().all()
+    async def load():
+        result = await db.execute(
+            select(State)
+            .where(State.is_active == True)
+            .order_by(State.code)
+        )
+        return orm_response(STATE_LIST, result.scalars().all())
+
+    return await cached_response(request, db, State, load)
 
 
 @router.get("/{state_code}", response_model=StateResponse)
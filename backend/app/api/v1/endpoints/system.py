@@ -0,0 +1,61 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+
+from app.models.user import User
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.db.pool import pool_status
+from app.db.session import engine, read_engine, WRITE_ROLE_SETTINGS, READ_ROLE_SETTINGS
+from app.services.overdue_sweeper import run_sweep, get_last_run_stats
+
+router = APIRouter()
+
+
+@router.get("/overdue-sweep")
+async def get_overdue_sweep_status(
+    current_user: User = Depends(get_current_user),
+):
+    """Get configuration and statistics of the last overdue sweep."""
+    return {
+        "enabled": settings.OVERDUE_SWEEP_ENABLED,
+        "interval_minutes": settings.OVERDUE_SWEEP_INTERVAL_MINUTES,
+        "batch_size": settings.OVERDUE_SWEEP_BATCH_SIZE,
+        "last_run": get_last_run_stats(),
+    }
+
+
+@router.post("/overdue-sweep/run")
+async def run_overdue_sweep(
+    as_of_date: Optional[date] = Query(None, description="Sweep as of this date (defaults to today)"),
+    current_user: User = Depends(get_current_user),
+):
+    """Run the overdue sweep immediately and return its statistics."""
+    return await run_sweep(as_of_date)
+
+
+@router.get("/db-pool")
+async def get_db_pool_status(
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Connection pool configuration and live state of this worker process.
+
+    checked_out/idle/overflow are current counts; checkout_wait_ms is a
+    cumulative histogram of the time taken to get a connection.
+    """
+    engines = {"primary": {**pool_status(engine), "role_settings": WRITE_ROLE_SETTINGS}}
+    if read_engine is not None:
+        engines["read"] = {**pool_status(read_engine), "role_settings": READ_ROLE_SETTINGS}
+    return {
+        "config": {
+            "pool_size": settings.DATABASE_POOL_SIZE,
+            "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+            "pool_timeout_seconds": settings.DATABASE_POOL_TIMEOUT,
+            "pool_recycle_seconds": settings.DATABASE_POOL_RECYCLE,
+            "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        },
+        "engines": engines,
+    }
@@ -1,13 +1,15 @@
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
 from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, cast, extract, Integer, Numeric, insert, update, literal, values, column
 from sqlalchemy.orm import selectinload
 from datetime import date, datetime
 from decimal import Decimal
+from starlette.background import BackgroundTask
 import io
 import logging
+import os
 
 from app.db.session import get_db
 from app.models.user import User
@@ -18,6 +20,15 @@ from app.models.tds_challan import TDSChallan, TDSChallanEntry, TDSType
 from app.models.tds_return import TDSReturn, ReturnStatus
 from app.core.security import get_current_user
 from app.core.config import settings
+from app.services.ledger_posting import get_company_settings
+from app.services.tds_return_file import (
+    QUARTER_MONTHS,
+    entry_rows_query,
+    get_challan_summaries,
+    get_validation_summary,
+    iter_return_text,
+    write_return_xlsx,
+)
 from app.schemas.tds import (
     TDSChallanCreate,
     TDSChallanUpdate,
@@ -33,6 +44,20 @@ from app.schemas.tds import (
     QuarterData,
     TDSReturnExportEntry,
     TDSReturnExportResponse,
+    TDSThresholdCheckResponse,
+    VendorTDSAggregateResponse,
+    TDSThresholdRebuildResponse,
+    Form16AJobResponse,
+    TDSInterestResponse,
+)
+from app.models.tds_threshold import VendorTDSAggregate
+from app.services.tds_threshold import get_threshold_status, rebuild_tds_aggregates
+from app.services.form16a import start_certificate_job, get_job_status, get_job_file
+from app.services.tds_interest import (
+    compute_interest_batch,
+    deposit_due_date,
+    late_filing_fee,
+    return_due_date,
 )
 
 router = APIRouter()
@@ -108,90 +133,125 @@ async def get_tds_sheet(
                 "has_challan_files": False,
                 "tds_deducted": Decimal("0"),
                 "has_pending": False,
+                "interest_accrued": Decimal("0"),
             }
 
-        # Get all challans for the FY
+        # Challan totals grouped by month (entries are not needed for the sheet)
         challan_query = (
-            select(TDSChallan)
-            .options(selectinload(TDSChallan.entries))
+            select(
+                TDSChallan.month,
+                func.sum(TDSChallan.tds_amount),
+                func.sum(TDSChallan.total_amount),
+                func.sum(TDSChallan.penalty),
+                func.sum(TDSChallan.interest),
+                func.count(),
+                func.count(TDSChallan.challan_filename),
+            )
             .where(TDSChallan.financial_year == financial_year)
             .where(TDSChallan.tds_type == tds_type)
+            .group_by(TDSChallan.month)
         )
         if branch_id:
             challan_query = challan_query.where(TDSChallan.branch_id == branch_id)
 
         result = await db.execute(challan_query)
-        challans = result.scalars().all()
-
-        for challan in challans:
-            m = challan.month
+        for m, tds_amount, total_amount, penalty, interest, challan_count, file_count in result.all():
             if m in month_data:
-                month_data[m]["tds_payable"] += challan.tds_amount
-                month_data[m]["tds_paid"] += challan.total_amount
-                month_data[m]["penalty"] += challan.penalty
-                month_data[m]["interest"] += challan.interest
-                month_data[m]["challan_count"] += 1
-                if challan.challan_filename:
-                    month_data[m]["has_challan_files"] = True
-
-        # Get TDS deducted from invoices (not yet linked to challan)
+                month_data[m]["tds_payable"] = tds_amount or Decimal("0")
+                month_data[m]["tds_paid"] = total_amount or Decimal("0")
+                month_data[m]["penalty"] = penalty or Decimal("0")
+                month_data[m]["interest"] = interest or Decimal("0")
+                month_data[m]["challan_count"] = challan_count
+                month_data[m]["has_challan_files"] = file_count > 0
+
+        # TDS deducted on invoices and pending (not yet linked to challan) count, grouped by month
         invoice_type = InvoiceType.PURCHASE if tds_type == TDSType.PAYABLE else InvoiceType.SALES
+        invoice_month = cast(extract("month", Invoice.invoice_date), Integer)
 
-        for m in [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]:
-            first_day, last_day = get_fy_dates(financial_year, m)
-
-            # Total TDS from invoices in this month
-            tds_query = (
-                select(func.sum(Invoice.tds_amount))
-                .where(Invoice.invoice_type == invoice_type)
-                .where(Invoice.tds_applicable == True)
-                .where(Invoice.invoice_date >= first_day)
-                .where(Invoice.invoice_date <= last_day)
+        tds_query = (
+            select(
+                invoice_month,
+                func.sum(Invoice.tds_amount),
+                func.count().filter(Invoice.tds_challan_id.is_(None)),
             )
-            if branch_id:
-                tds_query = tds_query.where(Invoice.branch_id == branch_id)
+            .where(Invoice.invoice_type == invoice_type)
+            .where(Invoice.tds_applicable == True)
+            .where(Invoice.invoice_date >= fy_start)
+            .where(Invoice.invoice_date <= fy_end)
+            .group_by(invoice_month)
+        )
+        if branch_id:
+            tds_query = tds_query.where(Invoice.branch_id == branch_id)
 
-            result = await db.execute(tds_query)
-            total_tds = result.scalar() or Decimal("0")
-            month_data[m]["tds_deducted"] = total_tds
+        result = await db.execute(tds_query)
+        for m, total_tds, pending_count in result.all():
+            month_data[m]["tds_deducted"] = total_tds or Decimal("0")
+            month_data[m]["has_pending"] = pending_count > 0
 
-            # Check for pending invoices (TDS applicable but not linked to challan)
+        # Interest accrued on TDS payable not yet deposited, as if paid today.
+        # Interest depends only on the deduction date, so pending TDS is
+        # summed per invoice date and the calculator runs once per day.
+        today = date.today()
+        if tds_type == TDSType.PAYABLE:
             pending_query = (
-                select(func.count())
+                select(Invoice.invoice_date, func.sum(Invoice.tds_amount))
                 .where(Invoice.invoice_type == invoice_type)
                 .where(Invoice.tds_applicable == True)
                 .where(Invoice.tds_challan_id.is_(None))
-                .where(Invoice.invoice_date >= first_day)
-                .where(Invoice.invoice_date <= last_day)
+                .where(Invoice.invoice_date >= fy_start)
+                .where(Invoice.invoice_date <= fy_end)
+                .group_by(Invoice.invoice_date)
             )
             if branch_id:
                 pending_query = pending_query.where(Invoice.branch_id == branch_id)
 
             result = await db.execute(pending_query)
-            pending_count = result.scalar() or 0
-            month_data[m]["has_pending"] = pending_count > 0
-
-        # Get quarterly return data
-        quarter_data = {}
-        for q in [1, 2, 3, 4]:
-            return_query = (
-                select(TDSReturn)
-                .where(TDSReturn.financial_year == financial_year)
-                .where(TDSReturn.quarter == q)
-                .where(TDSReturn.tds_type == tds_type)
+            pending = [(d, amount or Decimal("0")) for d, amount in result.all()]
+            for (invoice_date, _), (_, _, interest) in zip(pending, compute_interest_batch(pending, today)):
+                month_data[invoice_date.month]["interest_accrued"] += interest
+
+        # Quarterly returns for the FY in one query
+        quarter_data = {
+            q: {
+                "quarter": q, "return_status": None, "has_return_file": False,
+                "return_id": None, "filed_date": None, "late_filing_fee": Decimal("0"),
+            }
+            for q in [1, 2, 3, 4]
+        }
+        return_query = (
+            select(
+                TDSReturn.id, TDSReturn.quarter, TDSReturn.status,
+                TDSReturn.return_filename, TDSReturn.filed_date
             )
-            if branch_id:
-                return_query = return_query.where(TDSReturn.branch_id == branch_id)
-
-            result = await db.execute(return_query)
-            tds_return = result.scalar_one_or_none()
+            .where(TDSReturn.financial_year == financial_year)
+            .where(TDSReturn.tds_type == tds_type)
+            .order_by(TDSReturn.quarter, TDSReturn.id)
+        )
+        if branch_id:
+            return_query = return_query.where(TDSReturn.branch_id == branch_id)
+
+        result = await db.execute(return_query)
+        for return_id, q, return_status, return_filename, filed_date in result.all():
+            if q in quarter_data:
+                quarter_data[q].update({
+                    "quarter": q,
+                    "return_status": return_status,
+                    "has_return_file": bool(return_filename),
+                    "return_id": return_id,
+                    "filed_date": filed_date,
+                })
 
-            quarter_data[q] = {
-                "quarter": q,
-                "return_status": tds_return.status if tds_return else None,
-                "has_return_file": bool(tds_return and tds_return.return_filename),
-                "return_id": tds_return.id if tds_return else None,
-            }
+        # Section 234E fee for returns filed late, or still unfiled past the due date
+        if tds_type == TDSType.PAYABLE:
+            for q, data in quarter_data.items():
+                filed_on = data["filed_date"] if data["return_status"] != ReturnStatus.DRAFT else None
+                quarter_tds = sum(
+                    month_data[m]["tds_deducted"]
+                    for m in month_data if get_quarter_for_month(m) == q
+                )
+                data["late_filing_fee"] = late_filing_fee(
+                    financial_year, q, filed_on or today, quarter_tds
+                )
 
         # Calculate totals
         totals = {
@@ -200,6 +260,8 @@ async def get_tds_sheet(
             "penalty": sum(month_data[m]["penalty"] for m in month_data),
             "interest": sum(month_data[m]["interest"] for m in month_data),
             "tds_deducted": sum(month_data[m]["tds_deducted"] for m in month_data),
+            "interest_accrued": sum(month_data[m]["interest_accrued"] for m in month_data),
+            "late_filing_fee": sum(quarter_data[q]["late_filing_fee"] for q in quarter_data),
         }
 
         return {
@@ -288,19 +350,116 @@ async def get_pending_tds(
         )
 
 
+@router.get("/interest/{financial_year}", response_model=TDSInterestResponse)
+async def calculate_tds_interest(
+    financial_year: str,
+    month: Optional[int] = Query(None, ge=1, le=12),
+    quarter: Optional[int] = Query(None, ge=1, le=4),
+    payment_date: date = Query(default_factory=date.today),
+    filed_date: Optional[date] = None,
+    branch_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Calculate interest on pending TDS payable for a month or quarter.
+
+    Section 201(1A) interest is computed for every invoice not yet linked to
+    a challan, assuming deposit on payment_date; the total prefills the
+    challan interest. For a quarter, the section 234E fee is computed for
+    filing the return on filed_date (default: payment_date).
+    """
+    if (month is None) == (quarter is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either month or quarter"
+        )
+
+    if month is not None:
+        first_day, last_day = get_fy_dates(financial_year, month)
+    else:
+        months = QUARTER_MONTHS[quarter]
+        first_day = get_fy_dates(financial_year, months[0])[0]
+        last_day = get_fy_dates(financial_year, months[-1])[1]
+
+    query = (
+        select(Invoice.id, Invoice.invoice_number, Invoice.invoice_date, Invoice.tds_amount)
+        .where(Invoice.invoice_type == InvoiceType.PURCHASE)
+        .where(Invoice.tds_applicable == True)
+        .where(Invoice.tds_challan_id.is_(None))
+        .where(Invoice.invoice_date >= first_day)
+        .where(Invoice.invoice_date <= last_day)
+        .order_by(Invoice.invoice_date, Invoice.id)
+    )
+    if branch_id:
+        query = query.where(Invoice.branch_id == branch_id)
+
+    result = await db.execute(query)
+    rows = result.all()
+    computed = compute_interest_batch([(row.invoice_date, row.tds_amount) for row in rows], payment_date)
+
+    entries = [
+        {
+            "invoice_id": row.id,
+            "invoice_number": row.invoice_number,
+            "invoice_date": row.invoice_date,
+            "tds_amount": row.tds_amount,
+            "due_date": deposit_due_date(row.invoice_date),
+            "months": months_late,
+            "interest": interest,
+        }
+        for row, (_, months_late, interest) in zip(rows, computed)
+    ]
+    total_tds = sum((row.tds_amount for row in rows), Decimal("0"))
+
+    response = {
+        "financial_year": financial_year,
+        "month": month,
+        "quarter": quarter,
+        "payment_date": payment_date,
+        "entries": entries,
+        "total_tds": total_tds,
+        "total_interest": sum((e["interest"] for e in entries), Decimal("0")),
+    }
+    if quarter is not None:
+        # The fee is capped at all TDS of the quarter, deposited or not
+        quarter_query = (
+            select(func.coalesce(func.sum(Invoice.tds_amount), 0))
+            .where(Invoice.invoice_type == InvoiceType.PURCHASE)
+            .where(Invoice.tds_applicable == True)
+            .where(Invoice.invoice_date >= first_day)
+            .where(Invoice.invoice_date <= last_day)
+        )
+        if branch_id:
+            quarter_query = quarter_query.where(Invoice.branch_id == branch_id)
+        quarter_tds = (await db.execute(quarter_query)).scalar()
+
+        response["return_due_date"] = return_due_date(financial_year, quarter)
+        response["late_filing_fee"] = late_filing_fee(
+            financial_year, quarter, filed_date or payment_date, quarter_tds
+        )
+    return response
+
+
 @router.post("/challan", status_code=status.HTTP_201_CREATED)
 async def create_challan(
     challan_data: TDSChallanCreate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Create a new TDS challan with selected invoices."""
+    """
+    Create a new TDS challan with selected invoices.
+
+    Entry rows are derived from the invoices and their party in one
+    INSERT ... SELECT; invoices are linked with one UPDATE that skips any
+    already linked to a challan, and the challan totals are computed in SQL.
+    For TDS payable, section 201(1A) interest is computed per entry from the
+    invoice date and the challan payment date; the challan interest is their
+    sum unless given explicitly.
+    """
     try:
-        # Calculate TDS amount from entries
-        tds_amount = sum(entry.tds_amount for entry in challan_data.entries)
-        penalty = challan_data.penalty
-        interest = challan_data.interest
-        total_amount = tds_amount + penalty + interest
+        invoice_ids = list(dict.fromkeys(challan_data.invoice_ids))
+        invoice_type = InvoiceType.PURCHASE if challan_data.tds_type == TDSType.PAYABLE else InvoiceType.SALES
 
         # Create challan
         challan = TDSChallan(
@@ -310,10 +469,10 @@ async def create_challan(
             month=challan_data.month,
             quarter=get_quarter_for_month(challan_data.month),
             tds_type=challan_data.tds_type,
-            tds_amount=tds_amount,
-            penalty=penalty,
-            interest=interest,
-            total_amount=total_amount,
+            tds_amount=Decimal("0"),
+            penalty=challan_data.penalty,
+            interest=challan_data.interest or Decimal("0"),
+            total_amount=challan_data.penalty + (challan_data.interest or Decimal("0")),
             payment_date=challan_data.payment_date,
             transaction_id=challan_data.transaction_id,
             branch_id=challan_data.branch_id,
@@ -322,44 +481,121 @@ async def create_challan(
         db.add(challan)
         await db.flush()
 
-        # Create entries and update invoices
-        for entry_data in challan_data.entries:
-            entry = TDSChallanEntry(
-                challan_id=challan.id,
-                invoice_id=entry_data.invoice_id,
-                party_name=entry_data.party_name,
-                party_pan=entry_data.party_pan,
-                invoice_number=entry_data.invoice_number,
-                invoice_date=entry_data.invoice_date,
-                base_amount=entry_data.base_amount,
-                tds_rate=entry_data.tds_rate,
-                tds_section=entry_data.tds_section,
-                tds_amount=entry_data.tds_amount,
-                penalty=entry_data.penalty,
-                interest=entry_data.interest,
+        # Link invoices, guarding against invoices already in another challan
+        result = await db.execute(
+            update(Invoice)
+            .where(Invoice.id.in_(invoice_ids))
+            .where(Invoice.tds_challan_id.is_(None))
+            .where(Invoice.invoice_type == invoice_type)
+            .where(Invoice.tds_applicable == True)
+            .values(tds_challan_id=challan.id)
+            .returning(Invoice.id)
+            .execution_options(synchronize_session=False)
+        )
+        linked_ids = set(result.scalars().all())
+        if len(linked_ids) != len(invoice_ids):
+            unavailable = [i for i in invoice_ids if i not in linked_ids]
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Invoices not available for this challan (already linked, not found or no TDS): {unavailable}"
+            )
+
+        # Derive entries from the linked invoices and their party
+        party = Vendor if challan_data.tds_type == TDSType.PAYABLE else Client
+        party_id = Invoice.vendor_id if challan_data.tds_type == TDSType.PAYABLE else Invoice.client_id
+        await db.execute(
+            insert(TDSChallanEntry).from_select(
+                [
+                    "challan_id", "invoice_id", "party_name", "party_pan",
+                    "invoice_number", "invoice_date", "base_amount", "tds_rate",
+                    "tds_section", "tds_amount", "penalty", "interest",
+                    "created_at", "updated_at",
+                ],
+                select(
+                    literal(challan.id),
+                    Invoice.id,
+                    func.coalesce(party.name, "Unknown"),
+                    party.pan,
+                    Invoice.invoice_number,
+                    Invoice.invoice_date,
+                    Invoice.taxable_amount,
+                    func.coalesce(Invoice.tds_rate, 0),
+                    func.coalesce(Invoice.tds_section, "194C"),
+                    Invoice.tds_amount,
+                    literal(Decimal("0")),
+                    literal(Decimal("0")),
+                    func.now(),
+                    func.now(),
+                )
+                .select_from(Invoice)
+                .outerjoin(party, party_id == party.id)
+                .where(Invoice.tds_challan_id == challan.id)
             )
-            db.add(entry)
+        )
 
-            # Update invoice to link to challan
+        # Late payment interest per entry
+        interest_total = Decimal("0")
+        if challan_data.tds_type == TDSType.PAYABLE:
             result = await db.execute(
-                select(Invoice).where(Invoice.id == entry_data.invoice_id)
+                select(TDSChallanEntry.id, TDSChallanEntry.invoice_date, TDSChallanEntry.tds_amount)
+                .where(TDSChallanEntry.challan_id == challan.id)
             )
-            invoice = result.scalar_one_or_none()
-            if invoice:
-                invoice.tds_challan_id = challan.id
+            rows = result.all()
+            computed = compute_interest_batch(
+                [(row.invoice_date, row.tds_amount) for row in rows], challan_data.payment_date
+            )
+            entry_interest = [
+                (row.id, interest) for row, (_, _, interest) in zip(rows, computed) if interest > 0
+            ]
+            if entry_interest:
+                data = values(
+                    column("entry_id", Integer),
+                    column("interest", Numeric(15, 2)),
+                    name="entry_interest",
+                ).data(entry_interest)
+                await db.execute(
+                    update(TDSChallanEntry)
+                    .where(TDSChallanEntry.id == data.c.entry_id)
+                    .values(interest=data.c.interest)
+                    .execution_options(synchronize_session=False)
+                )
+                interest_total = sum((interest for _, interest in entry_interest), Decimal("0"))
+
+        # Totals from the entries
+        entry_total = (
+            select(func.coalesce(func.sum(TDSChallanEntry.tds_amount), 0))
+            .where(TDSChallanEntry.challan_id == challan.id)
+            .scalar_subquery()
+        )
+        challan_interest = challan_data.interest if challan_data.interest is not None else interest_total
+        result = await db.execute(
+            update(TDSChallan)
+            .where(TDSChallan.id == challan.id)
+            .values(
+                tds_amount=entry_total,
+                interest=challan_interest,
+                total_amount=entry_total + TDSChallan.penalty + challan_interest,
+            )
+            .returning(TDSChallan.tds_amount, TDSChallan.total_amount)
+            .execution_options(synchronize_session=False)
+        )
+        challan.tds_amount, challan.total_amount = result.one()
 
         await db.commit()
-        await db.refresh(challan)
 
         # Load entries for response
         result = await db.execute(
             select(TDSChallan)
             .options(selectinload(TDSChallan.entries))
             .where(TDSChallan.id == challan.id)
+            .execution_options(populate_existing=True)
         )
         challan = result.scalar_one()
 
         return challan
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
         await db.rollback()
         logger.error(f"Error creating challan: {str(e)}")
@@ -559,6 +795,56 @@ async def list_challans(
 
 # TDS Return endpoints
 
+@router.get("/threshold/check", response_model=TDSThresholdCheckResponse)
+async def check_tds_threshold(
+    vendor_id: int,
+    amount: Decimal = Query(..., gt=0),
+    invoice_date: date = Query(default_factory=date.today),
+    section: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Check whether a purchase bill crosses the vendor's TDS threshold.
+
+    Uses the vendor's default section when none is given. The rate accounts
+    for individual/HUF deductees and the higher rate for a missing PAN.
+    """
+    try:
+        return await get_threshold_status(db, vendor_id, amount, invoice_date, section)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/threshold/vendor/{vendor_id}", response_model=List[VendorTDSAggregateResponse])
+async def get_vendor_tds_aggregates(
+    vendor_id: int,
+    financial_year: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get a vendor's running purchase totals per TDS section and financial year."""
+    query = select(VendorTDSAggregate).where(VendorTDSAggregate.vendor_id == vendor_id)
+    if financial_year:
+        query = query.where(VendorTDSAggregate.financial_year == financial_year)
+    result = await db.execute(
+        query.order_by(VendorTDSAggregate.financial_year.desc(), VendorTDSAggregate.tds_section)
+    )
+    return result.scalars().all()
+
+
+@router.post("/threshold/rebuild", response_model=TDSThresholdRebuildResponse)
+async def rebuild_tds_thresholds(
+    financial_year: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Rebuild vendor TDS running totals from purchase invoices."""
+    rows_written = await rebuild_tds_aggregates(db, financial_year)
+    await db.commit()
+    return TDSThresholdRebuildResponse(financial_year=financial_year, rows_written=rows_written)
+
+
 @router.get("/return/{financial_year}/{quarter}")
 async def get_tds_return(
     financial_year: str,
@@ -721,33 +1007,82 @@ async def export_tds_return(
     quarter: int,
     tds_type: TDSType,
     branch_id: Optional[int] = None,
+    file_format: str = Query("json", alias="format", pattern="^(json|txt|xlsx)$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Export quarterly TDS return data as Excel."""
-    try:
-        # Get quarter months
-        quarter_months = {
-            1: [4, 5, 6],
-            2: [7, 8, 9],
-            3: [10, 11, 12],
-            4: [1, 2, 3],
-        }
-        months = quarter_months.get(quarter, [])
+    """
+    Export quarterly TDS return data.
+
+    format=json returns the entries for the frontend, format=txt streams the
+    NSDL/Protean NS1 return text file (Form 26Q, payable TDS only) and
+    format=xlsx returns the same rows as an Excel workbook. Entries with a
+    missing/invalid PAN are flagged in the file and entries whose section has
+    no Form 26Q code are listed on the workbook's Issues sheet; the text file
+    is refused while any remain. The counts are returned in the
+    X-Invalid-PAN-Count and X-Invalid-Section-Count headers.
+    """
+    if quarter not in QUARTER_MONTHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Quarter must be between 1 and 4"
+        )
 
-        # Get all challans for the quarter
-        query = (
-            select(TDSChallan)
-            .options(selectinload(TDSChallan.entries))
-            .where(TDSChallan.financial_year == financial_year)
-            .where(TDSChallan.tds_type == tds_type)
-            .where(TDSChallan.month.in_(months))
+    if file_format == "txt":
+        if tds_type != TDSType.PAYABLE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Return text file can only be generated for TDS payable"
+            )
+        company = await get_company_settings(db)
+        if not company or not company.tan:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Company TAN must be configured to generate the return file"
+            )
+        issues = await get_validation_summary(db, financial_year, quarter, tds_type, branch_id)
+        if issues["invalid_section"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f"{issues['invalid_section']} entries have a TDS section without a Form 26Q code; "
+                    "export as xlsx to see them on the Issues sheet"
+                ),
+            )
+        challans = await get_challan_summaries(db, financial_year, quarter, tds_type, branch_id)
+        filename = f"26Q_{company.tan}_{financial_year}_Q{quarter}.txt"
+        return StreamingResponse(
+            iter_return_text(company, financial_year, quarter, tds_type, challans, branch_id),
+            media_type="text/plain",
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "X-Invalid-PAN-Count": str(issues["invalid_pan"]),
+                "X-Invalid-Section-Count": str(issues["invalid_section"]),
+            },
         )
-        if branch_id:
-            query = query.where(TDSChallan.branch_id == branch_id)
 
-        result = await db.execute(query)
-        challans = result.scalars().all()
+    if file_format == "xlsx":
+        issues = await get_validation_summary(db, financial_year, quarter, tds_type, branch_id)
+        try:
+            path = await write_return_xlsx(db, financial_year, quarter, tds_type, branch_id)
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="openpyxl is required for Excel export"
+            )
+        return FileResponse(
+            path=path,
+            filename=f"TDS_{tds_type.value}_{financial_year}_Q{quarter}.xlsx",
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            headers={
+                "X-Invalid-PAN-Count": str(issues["invalid_pan"]),
+                "X-Invalid-Section-Count": str(issues["invalid_section"]),
+            },
+            background=BackgroundTask(os.remove, path),
+        )
+
+    try:
+        result = await db.execute(entry_rows_query(financial_year, quarter, tds_type, branch_id))
 
         entries = []
         total_tds = Decimal("0")
@@ -755,30 +1090,29 @@ async def export_tds_return(
         total_interest = Decimal("0")
         total_payable = Decimal("0")
 
-        for challan in challans:
-            for entry in challan.entries:
-                tds_payable = entry.tds_amount + entry.penalty + entry.interest
-                entries.append({
-                    "vendor_name": entry.party_name,
-                    "pan": entry.party_pan,
-                    "base_amount": entry.base_amount,
-                    "tds": entry.tds_amount,
-                    "penalty": entry.penalty,
-                    "interest": entry.interest,
-                    "tds_payable": tds_payable,
-                    "payment_date": challan.payment_date,
-                    "challan_no": challan.challan_number,
-                    "bsr_code": challan.bsr_code,
-                    "payment": challan.total_amount,
-                    "invoice_date": entry.invoice_date,
-                    "invoice_number": entry.invoice_number,
-                    "section_name": entry.tds_section,
-                    "tds_percent": entry.tds_rate,
-                })
-                total_tds += entry.tds_amount
-                total_penalty += entry.penalty
-                total_interest += entry.interest
-                total_payable += tds_payable
+        for row in result.all():
+            tds_payable = row.tds_amount + row.penalty + row.interest
+            entries.append({
+                "vendor_name": row.party_name,
+                "pan": row.party_pan,
+                "base_amount": row.base_amount,
+                "tds": row.tds_amount,
+                "penalty": row.penalty,
+                "interest": row.interest,
+                "tds_payable": tds_payable,
+                "payment_date": row.payment_date,
+                "challan_no": row.challan_number,
+                "bsr_code": row.bsr_code,
+                "payment": row.challan_total,
+                "invoice_date": row.invoice_date,
+                "invoice_number": row.invoice_number,
+                "section_name": row.tds_section,
+                "tds_percent": row.tds_rate,
+            })
+            total_tds += row.tds_amount
+            total_penalty += row.penalty
+            total_interest += row.interest
+            total_payable += tds_payable
 
         return {
             "financial_year": financial_year,
@@ -796,3 +1130,57 @@ async def export_tds_return(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+
+@router.post(
+    "/certificates/{financial_year}/{quarter}/generate",
+    response_model=Form16AJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def generate_tds_certificates(
+    financial_year: str,
+    quarter: int,
+    branch_id: Optional[int] = None,
+    restart: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Start generating Form 16A certificates for all deductees of a quarter.
+
+    Runs in the background; poll the status endpoint. An interrupted job
+    resumes from its last checkpoint, and deductees added since a completed
+    run are appended. Use restart=true to regenerate every certificate.
+    """
+    try:
+        return await start_certificate_job(db, financial_year, quarter, branch_id, restart)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/certificates/{financial_year}/{quarter}/status", response_model=Form16AJobResponse)
+async def get_tds_certificates_status(
+    financial_year: str,
+    quarter: int,
+    branch_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+):
+    """Get progress of the quarter's certificate generation."""
+    return get_job_status(financial_year, quarter, branch_id)
+
+
+@router.get("/certificates/{financial_year}/{quarter}/download")
+async def download_tds_certificates(
+    financial_year: str,
+    quarter: int,
+    branch_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+):
+    """Download the ZIP of generated certificates."""
+    zip_path = get_job_file(financial_year, quarter, branch_id)
+    if not zip_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Certificates have not been generated for this quarter"
+        )
+    return FileResponse(path=str(zip_path), filename=zip_path.name, media_type="application/zip")
@@ -9,9 +9,12 @@ from app.models.user import User
 from app.schemas.vendor import VendorCreate, VendorUpdate, VendorResponse
 from app.schemas.common import PaginatedResponse, Message
 from app.core.security import get_current_user
+from app.core.responses import paginated_response, response_adapter
 
 router = APIRouter()
 
+VENDOR_PAGE = response_adapter(PaginatedResponse[VendorResponse])
+
 
 @router.get("", response_model=PaginatedResponse[VendorResponse])
 async def get_vendors(
@@ -43,13 +46,7 @@ async def get_vendors(
     result = await db.execute(query)
     vendors = result.scalars().all()
 
-    return PaginatedResponse(
-        items=[VendorResponse.model_validate(v) for v in vendors],
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return paginated_response(VENDOR_PAGE, vendors, total, page, page_size)
 
 
 @router.get("/{vendor_id}", response_model=VendorResponse)
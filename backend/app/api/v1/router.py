@@ -21,6 +21,8 @@ from app.api.v1.endpoints import (
     client_pos,
     proforma_invoices,
     tds,
+    system,
+    bank_reconciliation,
 )
 
 api_router = APIRouter()
@@ -45,3 +47,5 @@ api_router.include_router(items.router, prefix="/items", tags=["Items"])
 api_router.include_router(client_pos.router, prefix="/client-pos", tags=["Client POs"])
 api_router.include_router(proforma_invoices.router, prefix="/proforma-invoices", tags=["Proforma Invoices"])
 api_router.include_router(tds.router, prefix="/tds", tags=["TDS"])
+api_router.include_router(bank_reconciliation.router, prefix="/bank-reconciliation", tags=["Bank Reconciliation"])
+api_router.include_router(system.router, prefix="/system", tags=["System"])
@@ -0,0 +1,117 @@
+"""
+Response Compression
+
+Reports and 1,000-row invoice pages are several megabytes of highly
+repetitive JSON. CompressionMiddleware negotiates the encoding from
+Accept-Encoding (q-values honoured):
+
+- br when the optional brotli package is installed and the client accepts it
+- gzip otherwise
+- bodies under RESPONSE_COMPRESSION_MIN_SIZE, already encoded responses
+  and binary downloads (PDF, XLSX, ZIP, images) are sent as they are
+
+Streamed responses are compressed chunk by chunk, so compression does not
+buffer the body either. The responders build on Starlette's gzip ones,
+whose async apply_compression/exclude_content_types API needs Starlette
+1.5 or later (see requirements.txt).
+"""
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, GZipResponder, IdentityResponder
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+EXCLUDED_CONTENT_TYPES = DEFAULT_EXCLUDED_CONTENT_TYPES + (
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+)
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: tuple) -> Optional[str]:
+    """
+    The available encoding the client prefers, earlier entries of available
+    winning ties; None for identity.
+
+    Example:
+        >>> negotiate_encoding("gzip, deflate, br", ("br", "gzip"))
+        'br'
+        >>> negotiate_encoding("br;q=0.5, gzip", ("br", "gzip"))
+        'gzip'
+        >>> negotiate_encoding("*;q=0", ("br", "gzip")) is None, negotiate_encoding(None, ("gzip",)) is None
+        (True, True)
+        >>> negotiate_encoding("*", ("br", "gzip"))
+        'br'
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in available:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int, *, exclude_content_types: tuple):
+        super().__init__(app, minimum_size, exclude_content_types=exclude_content_types)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        data = self._compressor.process(body)
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware:
+    """gzip/brotli compression negotiated per request."""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        if encoding == "br":
+            responder = BrotliResponder(
+                self.app, self.minimum_size, self.brotli_quality,
+                exclude_content_types=EXCLUDED_CONTENT_TYPES,
+            )
+        elif encoding == "gzip":
+            responder = GZipResponder(
+                self.app, self.minimum_size, self.gzip_level,
+                exclude_content_types=EXCLUDED_CONTENT_TYPES,
+            )
+        else:
+            responder = IdentityResponder(
+                self.app, self.minimum_size, exclude_content_types=EXCLUDED_CONTENT_TYPES,
+            )
+        await responder(scope, receive, send)
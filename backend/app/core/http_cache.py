@@ -0,0 +1,124 @@
+"""
+Conditional GET for Master Data
+
+States, branches, items, expense categories, the chart of accounts and
+company settings change rarely but are refetched on every page. Their GET
+responses carry an ETag derived from the table's version in table_versions,
+read with one primary-key lookup:
+
+- If-None-Match with the current ETag: 304 without loading any rows
+- otherwise the serialized body is served from an in-process cache keyed
+  by path and query string, and rebuilt only when the table has changed
+
+Writes need no hook in the endpoints: a statement-level trigger bumps the
+version inside the writing transaction, so every commit to the table, in
+whatever order concurrent transactions commit, changes the ETag for every
+worker process. (updated_at cannot serve: it is stamped at flush, so a
+transaction committing after a later-stamped one leaves MAX(updated_at)
+unchanged.) Cache-Control: no-cache makes browsers revalidate with
+If-None-Match instead of refetching.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.table_version import TableVersion
+
+CACHE_CONTROL = "private, no-cache"
+
+
+class ResponseCache:
+    """Bounded LRU cache of serialized response bodies, valid for one ETag."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str, etag: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] != etag:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, etag: str, body: bytes) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (etag, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+master_data_cache = ResponseCache(settings.MASTER_DATA_CACHE_SIZE)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against an ETag.
+
+    Example:
+        >>> etag_matches('W/"a1", "b2"', '"b2"'), etag_matches('"a1"', 'W/"a1"'), etag_matches(None, '"a1"')
+        (True, True, False)
+        >>> etag_matches("*", '"a1"')
+        True
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _cache_key(request: Request) -> str:
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+async def table_etag(db: AsyncSession, model, key: str) -> str:
+    """ETag of the response at key over model's table, from its table version."""
+    version = (await db.execute(
+        select(TableVersion.version).where(TableVersion.table_name == model.__tablename__)
+    )).scalar()
+    digest = hashlib.blake2b(f"{key}|{version}".encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+async def cached_response(
+    request: Request,
+    db: AsyncSession,
+    model,
+    load: Callable[[], Awaitable[Response]],
+) -> Response:
+    """
+    Serve a master-data GET with ETag revalidation.
+
+    load() queries and serializes the rows; it only runs when the client's
+    copy and the process cache are both out of date.
+    """
+    key = _cache_key(request)
+    etag = await table_etag(db, model, key)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = master_data_cache.get(key, etag)
+    if body is None:
+        response = await load()
+        if response.status_code != 200:
+            return response
+        body = response.body
+        master_data_cache.set(key, etag, body)
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,58 @@
+"""
+In-process metrics primitives.
+
+Metrics are kept per worker process and reset on restart; they are meant
+for live diagnostics through the system endpoints, not long-term storage.
+"""
+from typing import List, Sequence
+
+# Upper bounds in milliseconds for latency histograms
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with Prometheus-style cumulative buckets.
+
+    Example:
+        >>> h = Histogram((10, 100))
+        >>> for value in (3, 40, 40, 500):
+        ...     h.observe(value)
+        >>> h.snapshot()
+        {'count': 4, 'sum': 583.0, 'max': 500.0, 'buckets': [{'le': 10, 'count': 1}, {'le': 100, 'count': 3}, {'le': '+Inf', 'count': 4}]}
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.reset()
+
+    def reset(self) -> None:
+        self._counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self._counts[index] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = float(value)
+
+    def snapshot(self) -> dict:
+        buckets = []
+        cumulative = 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self._counts):
+            cumulative += count
+            buckets.append({"le": bound, "count": cumulative})
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "max": round(self.max, 3),
+            "buckets": buckets,
+        }
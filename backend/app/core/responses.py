@@ -0,0 +1,280 @@
+"""
+JSON Responses
+
+- FastJSONResponse: the application's default response class. Serializes
+  with orjson when it is installed, otherwise with compact json.dumps, and
+  writes Decimal values as exact JSON numbers instead of rounding them
+  through float.
+- response_adapter() / orm_response(): list endpoints validate their ORM
+  rows once against a TypeAdapter compiled at import time and return the
+  JSON bytes directly, skipping FastAPI's second validation and
+  serialization pass. The response_model on the route still documents
+  the schema.
+- StreamingJSONResponse / NDJSONResponse: large collections are encoded
+  and sent a batch of rows at a time while they are still being read, so
+  time to first byte and peak memory no longer grow with the row count.
+
+Response schemas inherit the input checks of their Create schemas
+(EmailStr, GSTIN, IFSC, pincode). Rows read back from the database were
+checked on the way in, so response_adapter() compiles a copy of the schema
+without field validators; re-validating every client email made up most of
+the serialization time of a 1,000-invoice page.
+"""
+import copy
+import inspect
+import json
+import re
+import types
+import typing
+from datetime import date, time
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, EmailStr, TypeAdapter, create_model
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Decimals are first written as marked strings, then unquoted into numbers
+_DECIMAL_NUMBER = re.compile(rb'"\\u0000([-+0-9.Ee]+)\\u0000"')
+
+# Streamed bodies are sent in pieces of at least this many bytes
+STREAM_CHUNK_BYTES = 16 * 1024
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return f"\x00{value}\x00" if value.is_finite() else None
+    if orjson is None:
+        if isinstance(value, (date, time)):
+            return value.isoformat()
+        if isinstance(value, Enum):
+            return value.value
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    JSON bytes with Decimals as exact numbers.
+
+    Example:
+        >>> dumps({"amount": Decimal("1234567.89"), "rate": Decimal("18.00"), "on": date(2025, 3, 31)})
+        b'{"amount":1234567.89,"rate":18.00,"on":"2025-03-31"}'
+    """
+    if orjson is not None:
+        body = orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        body = json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+    if b"\\u0000" in body:
+        body = _DECIMAL_NUMBER.sub(rb"\1", body)
+    return body
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _output_type(annotation: Any) -> Any:
+    """annotation with EmailStr as str and models replaced by their output copies."""
+    if annotation is EmailStr:
+        return str
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _output_model(annotation)
+    origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+    if origin is None or not args:
+        return annotation
+    args = tuple(_output_type(arg) for arg in args)
+    if origin in (typing.Union, types.UnionType):
+        return typing.Union[args]
+    return origin[args if len(args) > 1 else args[0]]
+
+
+@lru_cache(maxsize=None)
+def _output_model(model: type) -> type:
+    decorators = model.__pydantic_decorators__
+    if decorators.field_serializers or decorators.model_serializers or decorators.computed_fields:
+        return model
+    fields = {}
+    for name, field in model.model_fields.items():
+        field = copy.copy(field)
+        field.annotation = _output_type(field.annotation)
+        fields[name] = (field.annotation, field)
+    return create_model(
+        model.__name__,
+        __config__={**model.model_config, "from_attributes": True},
+        **fields,
+    )
+
+
+def response_adapter(schema: Any) -> TypeAdapter:
+    """
+    TypeAdapter for serializing stored rows as schema, without the input
+    validators of the schema and its nested models.
+    """
+    return TypeAdapter(_output_type(schema))
+
+
+def orm_response(adapter: TypeAdapter, content: Any, status_code: int = 200) -> Response:
+    """Validate content (ORM objects allowed) once and return it as JSON."""
+    value = adapter.validate_python(content, from_attributes=True)
+    return Response(adapter.dump_json(value), status_code=status_code, media_type="application/json")
+
+
+def paginated_response(adapter: TypeAdapter, items: list, total: int, page: int, page_size: int) -> Response:
+    """orm_response() for a PaginatedResponse page."""
+    return orm_response(adapter, {
+        "items": items,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (total + page_size - 1) // page_size,
+    })
+
+
+class JSONRows:
+    """
+    A JSON array written while its rows are still being read.
+
+    source is an iterable or async iterable (e.g. AsyncSession.stream_scalars()).
+    With adapter (response_adapter() of the row schema) rows are ORM objects
+    validated one at a time; without it they are plain values for dumps().
+    """
+
+    def __init__(self, source: Any, adapter: Optional[TypeAdapter] = None, batch_size: Optional[int] = None):
+        self.source = source
+        self.adapter = adapter
+        self.batch_size = batch_size or settings.RESPONSE_STREAM_BATCH_SIZE
+
+    def encode(self, row: Any) -> bytes:
+        if self.adapter is None:
+            return dumps(row)
+        return self.adapter.dump_json(self.adapter.validate_python(row, from_attributes=True))
+
+    async def _rows(self) -> AsyncIterator[Any]:
+        if hasattr(self.source, "__aiter__"):
+            async for row in self.source:
+                yield row
+        else:
+            for row in self.source:
+                yield row
+
+    async def batches(self, separator: bytes) -> AsyncIterator[bytes]:
+        """Encoded rows joined by separator, batch_size rows per chunk."""
+        batch = []
+        async for row in self._rows():
+            batch.append(self.encode(row))
+            if len(batch) >= self.batch_size:
+                yield separator.join(batch)
+                batch = []
+        if batch:
+            yield separator.join(batch)
+
+
+def _streams(value: Any) -> bool:
+    if isinstance(value, JSONRows) or (callable(value) and not isinstance(value, type)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return len(value) > settings.RESPONSE_STREAM_BATCH_SIZE
+    if isinstance(value, dict):
+        return any(_streams(item) for item in value.values())
+    return False
+
+
+async def iter_json(content: Any) -> AsyncIterator[bytes]:
+    """
+    Encode content piece by piece, with the same output as dumps().
+
+    JSONRows and lists longer than one batch are written a batch at a time;
+    a zero-argument function (sync or async) is called when the encoder
+    reaches it, so a summary placed after streamed rows can be computed
+    from them.
+
+    Example:
+        >>> import asyncio
+        >>> async def body(content):
+        ...     return b"".join([chunk async for chunk in iter_json(content)])
+        >>> asyncio.run(body({"rows": JSONRows(iter([{"n": 1}, {"n": 2}]), batch_size=1), "total": lambda: Decimal("2.50")}))
+        b'{"rows":[{"n":1},{"n":2}],"total":2.50}'
+    """
+    if isinstance(content, JSONRows):
+        yield b"["
+        first = True
+        async for chunk in content.batches(b","):
+            yield chunk if first else b"," + chunk
+            first = False
+        yield b"]"
+    elif not _streams(content):
+        yield dumps(content)
+    elif isinstance(content, dict):
+        separator = b"{"
+        for key, value in content.items():
+            yield separator + dumps(str(key)) + b":"
+            separator = b","
+            async for chunk in iter_json(value):
+                yield chunk
+        yield b"}"
+    elif isinstance(content, (list, tuple)):
+        async for chunk in iter_json(JSONRows(content)):
+            yield chunk
+    else:
+        value = content()
+        if inspect.isawaitable(value):
+            value = await value
+        async for chunk in iter_json(value):
+            yield chunk
+
+
+async def _buffered(chunks: AsyncIterator[bytes], size: int = STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    buffer = []
+    buffered = 0
+    async for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+class StreamingJSONResponse(StreamingResponse):
+    """JSON response encoded by iter_json() while it is sent."""
+
+    def __init__(self, content: Any, status_code: int = 200, headers: Optional[dict] = None):
+        super().__init__(
+            _buffered(iter_json(content)), status_code=status_code, headers=headers, media_type="application/json",
+        )
+
+
+async def _ndjson(rows: JSONRows) -> AsyncIterator[bytes]:
+    async for chunk in rows.batches(b"\n"):
+        yield chunk + b"\n"
+
+
+class NDJSONResponse(StreamingResponse):
+    """Newline-delimited JSON, one row per line."""
+
+    def __init__(self, rows: JSONRows, status_code: int = 200, headers: Optional[dict] = None):
+        super().__init__(
+            _buffered(_ndjson(rows)), status_code=status_code, headers=headers, media_type="application/x-ndjson",
+        )
+
+
+def wants_ndjson(request: Request) -> bool:
+    """Whether the client asked for newline-delimited JSON rows."""
+    accept = request.headers.get("accept", "")
+    return any(media_type in accept for media_type in NDJSON_MEDIA_TYPES)
@@ -1,8 +1,13 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -13,27 +18,146 @@ from app.db.session import get_db
 security = HTTPBearer()
 
 
+def _password_bytes(password: str) -> bytes:
+    # Bcrypt has a 72 byte limit
+    return password.encode('utf-8')[:72]
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
     return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
+        _password_bytes(plain_password),
         hashed_password.encode('utf-8')
     )
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt."""
-    # Bcrypt has a 72 byte limit
-    password_bytes = password.encode('utf-8')
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
+    """Hash a password using bcrypt at the configured cost."""
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_password_bytes(password), salt).decode('utf-8')
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    True when a hash was made with a different cost than BCRYPT_ROUNDS.
+
+    Example:
+        >>> password_needs_rehash("$2b$04$" + "x" * 53) == (settings.BCRYPT_ROUNDS != 4)
+        True
+        >>> password_needs_rehash("not-a-bcrypt-hash")
+        True
+    """
+    parts = hashed_password.split("$")
+    if len(parts) != 4 or not parts[2].isdigit():
+        return True
+    return int(parts[2]) != settings.BCRYPT_ROUNDS
+
+
+# Bcrypt runs in its own bounded pool so that a burst of logins neither
+# blocks the event loop nor starves the default executor used for file I/O.
+_password_executor = ThreadPoolExecutor(
+    max_workers=max(settings.PASSWORD_HASH_WORKERS, 1),
+    thread_name_prefix="bcrypt",
+)
+_password_pending = 0
+
+
+async def _run_password_op(func, *args):
+    """
+    Run a bcrypt call in the password pool.
+
+    At most PASSWORD_HASH_MAX_PENDING calls may be running or queued; beyond
+    that the request is rejected with 503 instead of queueing for seconds.
+    """
+    global _password_pending
+    if _password_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent sign-ins, please retry",
+            headers={"Retry-After": "1"},
+        )
+    _password_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, func, *args)
+    finally:
+        _password_pending -= 1
+
 
-    # Generate salt and hash the password
-    salt = bcrypt.gensalt(rounds=12)
-    hashed = bcrypt.hashpw(password_bytes, salt)
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password off the event loop."""
+    return await _run_password_op(verify_password, plain_password, hashed_password)
 
-    # Return as string
-    return hashed.decode('utf-8')
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash off the event loop."""
+    return await _run_password_op(get_password_hash, password)
+
+
+class LoginThrottle:
+    """
+    Per-account login throttling.
+
+    After max_failures failed attempts within window_seconds, further
+    attempts for the account are refused until the oldest failure leaves
+    the window. Accounts are keyed by lower-cased email; state is
+    per-process and bounded to maxsize accounts (LRU).
+
+    Example:
+        >>> throttle = LoginThrottle(max_failures=2, window_seconds=60)
+        >>> throttle.failure("a@x.in", now=0); throttle.failure("A@x.in", now=10)
+        >>> throttle.retry_after("a@x.in", now=20)
+        40
+        >>> throttle.retry_after("a@x.in", now=61)
+        0
+        >>> throttle.success("a@x.in"); throttle.retry_after("a@x.in", now=20)
+        0
+    """
+
+    def __init__(self, max_failures: int, window_seconds: int, maxsize: int = 10000):
+        self.max_failures = max_failures
+        self.window_seconds = window_seconds
+        self.maxsize = maxsize
+        self._failures: "OrderedDict[str, deque]" = OrderedDict()
+
+    def _recent(self, key: str, now: float) -> Optional[deque]:
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and failures[0] <= now - self.window_seconds:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def retry_after(self, email: str, now: Optional[float] = None) -> int:
+        """Seconds until the account may try again; 0 when allowed."""
+        if self.max_failures <= 0:
+            return 0
+        now = time.monotonic() if now is None else now
+        failures = self._recent(email.lower(), now)
+        if failures is None or len(failures) < self.max_failures:
+            return 0
+        return max(math.ceil(failures[0] + self.window_seconds - now), 1)
+
+    def failure(self, email: str, now: Optional[float] = None) -> None:
+        if self.max_failures <= 0:
+            return
+        key = email.lower()
+        now = time.monotonic() if now is None else now
+        failures = self._recent(key, now) or deque(maxlen=self.max_failures)
+        failures.append(now)
+        self._failures[key] = failures
+        self._failures.move_to_end(key)
+        while len(self._failures) > self.maxsize:
+            self._failures.popitem(last=False)
+
+    def success(self, email: str) -> None:
+        self._failures.pop(email.lower(), None)
+
+
+login_throttle = LoginThrottle(settings.LOGIN_MAX_FAILURES, settings.LOGIN_FAILURE_WINDOW_SECONDS)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -47,7 +171,94 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def create_user_token(user, expires_delta: Optional[timedelta] = None) -> str:
+    """
+    Access token for a user.
+
+    Besides the user id it carries the token version, which is checked on
+    every request, and the principal fields used by stateless reads.
+    """
+    return create_access_token(
+        data={
+            "sub": str(user.id),
+            "ver": user.token_version or 0,
+            "email": user.email,
+            "name": user.name,
+            "role": user.role.value,
+            "su": user.is_superuser,
+        },
+        expires_delta=expires_delta,
+    )
+
+
+class UserCache:
+    """
+    Bounded TTL + LRU cache of authenticated user principals.
+
+    Entries are keyed by user id and only served for the token version they
+    were loaded with. Bumping a user's token_version (deactivation, password
+    change) invalidates the entry here; other processes drop it within the
+    TTL.
+    """
+
+    FIELDS = (
+        "id", "email", "name", "role", "is_active", "is_superuser",
+        "token_version", "created_at", "updated_at",
+    )
+
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+
+    def get(self, user_id: int, token_version: int) -> Optional[dict]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, version, principal = entry
+        if version != token_version or expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return principal
+
+    def set(self, user) -> None:
+        if self.maxsize <= 0:
+            return
+        principal = {field: getattr(user, field) for field in self.FIELDS}
+        self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user.token_version, principal)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS)
+
+
+def bump_token_version(user) -> None:
+    """
+    Revoke all tokens issued to a user.
+
+    Call user_cache.invalidate(user.id) after committing, so a concurrent
+    request cannot re-cache the old version.
+    """
+    user.token_version = (user.token_version or 0) + 1
+
+
+def _principal(fields: dict):
+    """Detached User built from cached or token fields."""
+    from app.models.user import User
+    return User(**fields)
+
+
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
 ):
@@ -62,12 +273,36 @@ async def get_current_user(
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-    except JWTError:
+        user_id = int(user_id)
+        token_version = int(payload.get("ver", 0))
+    except (JWTError, ValueError):
         raise credentials_exception
 
-    from app.models.user import User
-    result = await db.execute(select(User).where(User.id == int(user_id)))
+    from app.models.user import User, UserRole
+
+    # Stateless reads: the signed claims are the principal, no lookup
+    if settings.AUTH_STATELESS_READS and request.method in ("GET", "HEAD") and "role" in payload:
+        try:
+            role = UserRole(payload["role"])
+        except ValueError:
+            raise credentials_exception
+        return _principal({
+            "id": user_id,
+            "email": payload.get("email"),
+            "name": payload.get("name"),
+            "role": role,
+            "is_active": True,
+            "is_superuser": bool(payload.get("su", False)),
+            "token_version": token_version,
+        })
+
+    cached = user_cache.get(user_id, token_version)
+    if cached is not None:
+        return _principal(cached)
+
+    result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
-    if user is None:
+    if user is None or not user.is_active or (user.token_version or 0) != token_version:
         raise credentials_exception
+    user_cache.set(user)
     return user
@@ -0,0 +1,306 @@
+"""
+SQL Instrumentation
+
+Cursor-execute hooks on every engine record, for the current request, the
+number of statements, the total time spent in the database and the slowest
+statement. SQLMetricsMiddleware opens a RequestSQLStats per request,
+returns the figures as response headers and folds them into per-route
+totals that /metrics exposes in Prometheus text format.
+
+Repeated statement shapes (the same SQL with different parameters) are the
+signature of N+1 loading. A request over SQL_QUERY_BUDGET statements, or
+repeating one shape more than SQL_REPEAT_LIMIT times, is logged; with
+SQL_BUDGET_STRICT (test mode) it raises QueryBudgetExceeded instead.
+query_budget() applies the same check to any block of code.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Collectors (request stats, query_budget blocks) active in this context
+_collectors: ContextVar[Tuple["RequestSQLStats", ...]] = ContextVar("sql_collectors", default=())
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|:\w+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\?(\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    SQL with parameters and IN-lists collapsed, so that statements that
+    differ only in their parameters compare equal.
+
+    Example:
+        >>> statement_shape("SELECT * FROM invoices\\n WHERE id IN ($1, $2, $3) AND branch_id = $4")
+        'SELECT * FROM invoices WHERE id IN (?) AND branch_id = ?'
+    """
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request or block issued more statements than its budget allows."""
+
+
+class RequestSQLStats:
+    """Statements issued within one request or query_budget() block."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+        if elapsed_ms >= self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+
+    def most_repeated(self) -> Tuple[Optional[str], int]:
+        if not self.shapes:
+            return None, 0
+        return self.shapes.most_common(1)[0]
+
+    def violations(self, max_queries: int = 0, max_repeats: int = 0) -> List[str]:
+        """Budget violations; 0 disables a limit."""
+        problems = []
+        if max_queries and self.count > max_queries:
+            problems.append(f"{self.count} queries, budget is {max_queries}")
+        shape, repeats = self.most_repeated()
+        if max_repeats and repeats > max_repeats:
+            problems.append(f"statement repeated {repeats} times (limit {max_repeats}): {shape[:300]}")
+        return problems
+
+
+@contextmanager
+def collect_sql():
+    """Collect the statements issued in this context into a RequestSQLStats."""
+    stats = RequestSQLStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int = 0, max_repeats: int = 0):
+    """
+    Fail when the block issues more than max_queries statements or repeats
+    one statement shape more than max_repeats times.
+
+    Usage in tests:
+        with query_budget(max_queries=5, max_repeats=2):
+            await get_trial_balance(db=db, current_user=user)
+    """
+    with collect_sql() as stats:
+        yield stats
+    problems = stats.violations(max_queries, max_repeats)
+    if problems:
+        raise QueryBudgetExceeded("; ".join(problems))
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.budget_violations = 0
+        self.queries_per_request = Histogram((1, 2, 5, 10, 20, 50, 100, 250))
+
+
+# Process-wide totals, rendered by /metrics
+query_duration_ms = Histogram()
+queries_total = 0
+routes: Dict[Tuple[str, str], RouteStats] = {}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    global queries_total
+    elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+    queries_total += 1
+    query_duration_ms.observe(elapsed_ms)
+    for stats in _collectors.get():
+        stats.record(statement, elapsed_ms)
+
+
+def instrument_engine(engine) -> None:
+    """Attach the timing hooks to an AsyncEngine."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def record_request(method: str, route: str, stats: RequestSQLStats) -> List[str]:
+    """Fold a finished request into the route totals; returns budget violations."""
+    route_stats = routes.get((method, route))
+    if route_stats is None:
+        route_stats = routes[(method, route)] = RouteStats()
+    route_stats.requests += 1
+    route_stats.queries += stats.count
+    route_stats.db_seconds += stats.total_ms / 1000
+    route_stats.queries_per_request.observe(stats.count)
+
+    problems = stats.violations(settings.SQL_QUERY_BUDGET, settings.SQL_REPEAT_LIMIT)
+    if problems:
+        route_stats.budget_violations += 1
+    return problems
+
+
+def _header_value(value: str, limit: int = 200) -> str:
+    value = _WHITESPACE.sub(" ", value)[:limit]
+    return value.encode("latin-1", "replace").decode("latin-1")
+
+
+class SQLMetricsMiddleware:
+    """
+    Per-request SQL statistics.
+
+    Adds X-DB-Query-Count, X-DB-Time-Ms, X-DB-Slowest-Ms and a Server-Timing
+    entry to every HTTP response; with SQL_DEBUG_HEADERS also
+    X-DB-Slowest-Statement, which carries raw SQL text.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with collect_sql() as stats:
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers += [
+                        (b"x-db-query-count", str(stats.count).encode()),
+                        (b"x-db-time-ms", f"{stats.total_ms:.1f}".encode()),
+                        (b"x-db-slowest-ms", f"{stats.slowest_ms:.1f}".encode()),
+                        (b"server-timing", f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'.encode()),
+                    ]
+                    if settings.SQL_DEBUG_HEADERS and stats.slowest_statement:
+                        headers.append((
+                            b"x-db-slowest-statement",
+                            _header_value(stats.slowest_statement).encode("latin-1"),
+                        ))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                route = scope.get("route")
+                problems = record_request(
+                    scope["method"], getattr(route, "path", "unmatched"), stats
+                )
+
+        if problems:
+            message = f"{scope['method']} {scope['path']}: " + "; ".join(problems)
+            if settings.SQL_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(f"Query budget exceeded, {message}")
+
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    """
+    Example:
+        >>> _labels(method="GET", route='/a"b')
+        'method="GET",route="/a\\\\"b"'
+    """
+    return ",".join(f'{key}="{_label_value(value)}"' for key, value in labels.items())
+
+
+def _histogram_lines(name: str, histogram: Histogram, scale: float = 1.0, **labels) -> List[str]:
+    """Prometheus histogram series; scale converts bucket bounds and the sum."""
+    lines = []
+    label_prefix = _labels(**labels)
+    separator = "," if label_prefix else ""
+    for bucket in histogram.snapshot()["buckets"]:
+        le = bucket["le"] if bucket["le"] == "+Inf" else f"{bucket['le'] * scale:g}"
+        lines.append(f'{name}_bucket{{{label_prefix}{separator}le="{le}"}} {bucket["count"]}')
+    suffix = f"{{{label_prefix}}}" if label_prefix else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum * scale:.6f}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+
+def render_prometheus(engines: Dict[str, object]) -> str:
+    """Metrics in Prometheus text exposition format."""
+    from app.db.pool import TimedQueuePool
+
+    lines = [
+        "# HELP hisaab_db_queries_total SQL statements executed by this process.",
+        "# TYPE hisaab_db_queries_total counter",
+        f"hisaab_db_queries_total {queries_total}",
+        "# HELP hisaab_db_query_duration_seconds SQL statement execution time.",
+        "# TYPE hisaab_db_query_duration_seconds histogram",
+        *_histogram_lines("hisaab_db_query_duration_seconds", query_duration_ms, scale=0.001),
+    ]
+
+    per_route = [
+        ("hisaab_http_requests_total", "counter", "HTTP requests handled.", "requests"),
+        ("hisaab_http_db_queries_total", "counter", "SQL statements issued by requests.", "queries"),
+        ("hisaab_http_db_seconds_total", "counter", "Database time spent by requests.", "db_seconds"),
+        ("hisaab_http_query_budget_violations_total", "counter",
+         "Requests over the query budget or repeat limit.", "budget_violations"),
+    ]
+    ordered = sorted(routes.items())
+    for name, kind, help_text, attribute in per_route:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for (method, route), route_stats in ordered:
+            value = getattr(route_stats, attribute)
+            value = f"{value:.6f}" if isinstance(value, float) else value
+            lines.append(f"{name}{{{_labels(method=method, route=route)}}} {value}")
+    lines += [
+        "# HELP hisaab_http_db_queries_per_request SQL statements per request.",
+        "# TYPE hisaab_http_db_queries_per_request histogram",
+    ]
+    for (method, route), route_stats in ordered:
+        lines += _histogram_lines(
+            "hisaab_http_db_queries_per_request", route_stats.queries_per_request,
+            method=method, route=route,
+        )
+
+    gauges = [
+        ("hisaab_db_pool_checked_out", "Connections in use.", lambda pool: pool.checkedout()),
+        ("hisaab_db_pool_idle", "Idle connections in the pool.", lambda pool: pool.checkedin()),
+        ("hisaab_db_pool_overflow", "Connections open beyond pool_size.", lambda pool: max(pool.overflow(), 0)),
+    ]
+    for name, help_text, read in gauges:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        for engine_name, engine in engines.items():
+            lines.append(f"{name}{{{_labels(engine=engine_name)}}} {read(engine.pool)}")
+    lines += [
+        "# HELP hisaab_db_pool_checkout_seconds Time taken to get a connection from the pool.",
+        "# TYPE hisaab_db_pool_checkout_seconds histogram",
+    ]
+    for engine_name, engine in engines.items():
+        if isinstance(engine.pool, TimedQueuePool):
+            lines += _histogram_lines(
+                "hisaab_db_pool_checkout_seconds", engine.pool.wait_ms, scale=0.001, engine=engine_name
+            )
+    return "\n".join(lines) + "\n"
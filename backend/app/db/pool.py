@@ -0,0 +1,47 @@
+"""
+Connection pool instrumentation.
+
+TimedQueuePool is the default asyncio queue pool plus a histogram of how
+long each checkout took (queueing for a free connection, opening a new one
+and the pre-ping) and a count of checkouts that timed out.
+"""
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import Histogram
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_ms = Histogram()
+        self.timeouts = 0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_ms.observe((time.perf_counter() - start) * 1000)
+
+
+def pool_status(engine) -> dict:
+    """Live connection counts and checkout wait times of an engine's pool."""
+    pool = engine.pool
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # QueuePool counts overflow from -size; only connections beyond size are overflow
+        "overflow": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, TimedQueuePool):
+        status["checkout_timeouts"] = pool.timeouts
+        status["checkout_wait_ms"] = pool.wait_ms.snapshot()
+    return status
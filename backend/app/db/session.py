@@ -1,14 +1,57 @@
+import logging
+import time
 from collections.abc import AsyncGenerator
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
+from app.db.instrumentation import instrument_engine
+from app.db.pool import TimedQueuePool
+
+logger = logging.getLogger(__name__)
+
+
+def _role_settings(statement_timeout_ms: int, work_mem: str) -> dict:
+    """Postgres settings of a session role; empty values keep the server default."""
+    role_settings = {}
+    if statement_timeout_ms:
+        role_settings["statement_timeout"] = str(statement_timeout_ms)
+    if work_mem:
+        role_settings["work_mem"] = work_mem
+    return role_settings
+
+
+WRITE_ROLE_SETTINGS = _role_settings(settings.DATABASE_STATEMENT_TIMEOUT_MS, settings.DATABASE_WORK_MEM)
+READ_ROLE_SETTINGS = _role_settings(settings.DATABASE_READ_STATEMENT_TIMEOUT_MS, settings.DATABASE_READ_WORK_MEM)
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DATABASE_ECHO,
-    future=True,
-)
+
+def _engine_options(server_settings: dict, **connect_args) -> dict:
+    return {
+        "echo": settings.DATABASE_ECHO,
+        "future": True,
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+        "connect_args": {
+            # asyncpg's own cache and the one SQLAlchemy's asyncpg dialect keeps
+            # for the statements it prepares; both must be 0 behind pgbouncer
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+            **connect_args,
+        },
+    }
+
+
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options(WRITE_ROLE_SETTINGS))
+instrument_engine(engine)
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -18,6 +61,28 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Optional read replica for get_read_db; reads use the primary when unset
+read_engine = create_async_engine(
+    settings.DATABASE_READ_URL,
+    **_engine_options(
+        READ_ROLE_SETTINGS,
+        timeout=settings.DATABASE_READ_CONNECT_TIMEOUT,
+    ),
+) if settings.DATABASE_READ_URL else None
+if read_engine is not None:
+    instrument_engine(read_engine)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+) if read_engine is not None else None
+
+# Monotonic time before which the replica is skipped after a failed connect
+_replica_retry_at = 0.0
+
 Base = declarative_base()
 
 
@@ -31,3 +96,51 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+async def _begin_read_only(session_factory) -> AsyncSession:
+    session = session_factory()
+    try:
+        await session.execute(text("SET TRANSACTION READ ONLY"))
+        if session_factory is AsyncSessionLocal and READ_ROLE_SETTINGS:
+            # Primary connections carry the write role; apply the read role to this transaction
+            await session.execute(
+                text("SELECT " + ", ".join(
+                    f"set_config('{name}', :{name}, true)" for name in READ_ROLE_SETTINGS
+                )),
+                READ_ROLE_SETTINGS,
+            )
+    except BaseException:
+        await session.close()
+        raise
+    return session
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only endpoints.
+
+    The transaction is READ ONLY, so an accidental write fails instead of
+    being committed, and it is never committed; closing the session ends
+    it. Uses the DATABASE_READ_URL replica when configured. If the replica
+    cannot be reached, reads fall back to the primary and the replica is
+    retried after DATABASE_READ_RETRY_SECONDS.
+
+    Replica reads may lag the primary slightly, so endpoints that must see
+    the caller's own just-committed writes should keep using get_db.
+    """
+    global _replica_retry_at
+    session: Optional[AsyncSession] = None
+    if AsyncReadSessionLocal is not None and time.monotonic() >= _replica_retry_at:
+        try:
+            session = await _begin_read_only(AsyncReadSessionLocal)
+        except (OSError, TimeoutError, DBAPIError) as e:
+            logger.warning(f"Read replica unavailable, using primary: {str(e)}")
+            _replica_retry_at = time.monotonic() + settings.DATABASE_READ_RETRY_SECONDS
+    if session is None:
+        session = await _begin_read_only(AsyncSessionLocal)
+
+    try:
+        yield session
+    finally:
+        await session.close()
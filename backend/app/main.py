@@ -1,8 +1,34 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import IntegrityError
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.responses import FastJSONResponse
 from app.api.v1.router import api_router
+from app.db.instrumentation import SQLMetricsMiddleware, render_prometheus
+from app.db.session import engine, read_engine
+from app.services.overdue_sweeper import sweeper_loop
+
+# SQLSTATE of asyncpg.UniqueViolationError
+UNIQUE_VIOLATION = "23505"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweeper_task = None
+    if settings.OVERDUE_SWEEP_ENABLED:
+        sweeper_task = asyncio.create_task(sweeper_loop())
+    yield
+    if sweeper_task:
+        sweeper_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await sweeper_task
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -10,6 +36,8 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     docs_url=f"{settings.API_V1_PREFIX}/docs",
     redoc_url=f"{settings.API_V1_PREFIX}/redoc",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS middleware
@@ -21,15 +49,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL statistics (response headers and /metrics)
+app.add_middleware(SQLMetricsMiddleware)
+
+# gzip/brotli response compression (outermost, so it sees the final body)
+if settings.RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE,
+        gzip_level=settings.RESPONSE_GZIP_LEVEL,
+        brotli_quality=settings.RESPONSE_BROTLI_QUALITY,
+    )
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request: Request, exc: IntegrityError):
+    """
+    A unique violation that slipped past the endpoint's own checks, e.g. two
+    concurrent requests taking the same invoice or payment number, is a
+    conflict the client can retry rather than a server error. Foreign-key,
+    NOT NULL and check violations cannot succeed on retry and are re-raised.
+    """
+    driver_error = getattr(exc.orig, "__cause__", None) or exc.orig
+    sqlstate = getattr(driver_error, "sqlstate", None) or getattr(exc.orig, "pgcode", None)
+    if sqlstate != UNIQUE_VIOLATION:
+        raise exc
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={
+            "detail": "Conflicting change, please retry",
+            "constraint": getattr(driver_error, "constraint_name", None),
+        },
+    )
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "app": settings.APP_NAME, "version": settings.APP_VERSION}
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this worker process."""
+    engines = {"primary": engine}
+    if read_engine is not None:
+        engines["read"] = read_engine
+    return render_prometheus(engines)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -6,7 +6,7 @@ from app.models.bank_account import BankAccount
 from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem
 from app.models.invoice import Invoice, InvoiceItem
 from app.models.invoice_attachment import InvoiceAttachment
-from app.models.payment import Payment
+from app.models.payment import Payment, PaymentAllocation
 from app.models.ledger import LedgerEntry, ChartOfAccount
 from app.models.settings import CompanySettings
 from app.models.expense_category import ExpenseCategory
@@ -19,6 +19,9 @@ from app.models.billing_schedule import BillingSchedule, ScheduleStatus
 from app.models.proforma_invoice import ProformaInvoice, ProformaInvoiceItem, PIStatus
 from app.models.tds_challan import TDSChallan, TDSChallanEntry, TDSType
 from app.models.tds_return import TDSReturn, ReturnStatus
+from app.models.bank_statement import BankStatement, BankStatementLine, ReconciliationStatus, MatchType
+from app.models.tds_threshold import VendorTDSAggregate
+from app.models.table_version import TableVersion
 
 __all__ = [
     "User",
@@ -32,6 +35,7 @@ __all__ = [
     "InvoiceItem",
     "InvoiceAttachment",
     "Payment",
+    "PaymentAllocation",
     "LedgerEntry",
     "ChartOfAccount",
     "CompanySettings",
@@ -54,4 +58,10 @@ __all__ = [
     "TDSType",
     "TDSReturn",
     "ReturnStatus",
+    "BankStatement",
+    "BankStatementLine",
+    "ReconciliationStatus",
+    "MatchType",
+    "VendorTDSAggregate",
+    "TableVersion",
 ]
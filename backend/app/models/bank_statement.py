@@ -0,0 +1,71 @@
+from sqlalchemy import Column, String, Integer, Numeric, Date, ForeignKey, Text
+from sqlalchemy.orm import relationship
+import enum
+
+from app.models.base import BaseModel
+
+
+class ReconciliationStatus(str, enum.Enum):
+    UNMATCHED = "UNMATCHED"
+    MATCHED = "MATCHED"
+    EXPENSE_CREATED = "EXPENSE_CREATED"  # Cash expense created from the line
+    IGNORED = "IGNORED"
+
+
+class MatchType(str, enum.Enum):
+    REFERENCE = "REFERENCE"  # Exact reference / UTR match
+    AMOUNT_DATE = "AMOUNT_DATE"  # Same amount within the date window
+    NARRATION = "NARRATION"  # Same amount, fuzzy narration match
+    MANUAL = "MANUAL"
+
+
+class BankStatement(BaseModel):
+    """Imported bank statement file"""
+    __tablename__ = "bank_statements"
+
+    bank_account_id = Column(Integer, ForeignKey("bank_accounts.id"), nullable=False, index=True)
+    file_name = Column(String(255), nullable=False)
+
+    # Period covered by the statement lines
+    statement_from = Column(Date, nullable=True)
+    statement_to = Column(Date, nullable=True)
+
+    # Summary
+    total_lines = Column(Integer, default=0, nullable=False)
+    matched_lines = Column(Integer, default=0, nullable=False)
+    total_debit = Column(Numeric(15, 2), default=0, nullable=False)
+    total_credit = Column(Numeric(15, 2), default=0, nullable=False)
+
+    # Relationships
+    bank_account = relationship("BankAccount")
+    lines = relationship(
+        "BankStatementLine", back_populates="statement", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+
+class BankStatementLine(BaseModel):
+    """Single bank statement line and its reconciliation result"""
+    __tablename__ = "bank_statement_lines"
+
+    statement_id = Column(Integer, ForeignKey("bank_statements.id", ondelete="CASCADE"), nullable=False, index=True)
+    line_number = Column(Integer, nullable=False)
+
+    # Line Details
+    transaction_date = Column(Date, nullable=False, index=True)
+    narration = Column(Text, nullable=True)
+    reference = Column(String(100), nullable=True, index=True)
+    transaction_type = Column(String(10), nullable=False)  # DEBIT or CREDIT
+    amount = Column(Numeric(15, 2), nullable=False)
+    balance = Column(Numeric(15, 2), nullable=True)
+
+    # Reconciliation
+    status = Column(String(20), default=ReconciliationStatus.UNMATCHED.value, nullable=False, index=True)
+    match_type = Column(String(20), nullable=True)
+    match_score = Column(Numeric(5, 2), nullable=True)
+    payment_id = Column(Integer, ForeignKey("payments.id", ondelete="SET NULL"), nullable=True, index=True)
+    cash_expense_id = Column(Integer, ForeignKey("cash_expenses.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    # Relationships
+    statement = relationship("BankStatement", back_populates="lines")
+    payment = relationship("Payment")
+    cash_expense = relationship("CashExpense")
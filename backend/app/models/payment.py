@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Numeric, Date, ForeignKey, Text, Enum, Boolean
+from sqlalchemy import Column, String, Integer, Numeric, Date, ForeignKey, Text, Enum, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 import enum
 
@@ -79,3 +79,22 @@ class Payment(BaseModel):
     branch = relationship("Branch", back_populates="payments")
     bank_account_ref = relationship("BankAccount", back_populates="payments")
     invoice = relationship("Invoice", back_populates="payments")
+    allocations = relationship(
+        "PaymentAllocation", back_populates="payment", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+
+class PaymentAllocation(BaseModel):
+    """Portion of a payment settled against an invoice"""
+    __tablename__ = "payment_allocations"
+    __table_args__ = (
+        UniqueConstraint("payment_id", "invoice_id", name="uq_payment_allocation_payment_invoice"),
+    )
+
+    payment_id = Column(Integer, ForeignKey("payments.id", ondelete="CASCADE"), nullable=False, index=True)
+    invoice_id = Column(Integer, ForeignKey("invoices.id"), nullable=False, index=True)
+    amount = Column(Numeric(15, 2), nullable=False)
+
+    # Relationships
+    payment = relationship("Payment", back_populates="allocations")
+    invoice = relationship("Invoice")
@@ -10,6 +10,7 @@ class PIStatus(str, enum.Enum):
     SENT = "SENT"
     GENERATED = "GENERATED"  # Invoice has been generated from this PI
     CANCELLED = "CANCELLED"
+    EXPIRED = "EXPIRED"  # Past valid_until without being converted
 
 
 class ProformaInvoice(BaseModel):
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, BigInteger
+
+from app.db.session import Base
+
+
+class TableVersion(Base):
+    """
+    Change counter of a cached table, bumped by a statement-level trigger on
+    every INSERT, UPDATE, DELETE and TRUNCATE. The bump is part of the
+    writing transaction, so the version changes exactly when a commit makes
+    new rows visible.
+    """
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(63), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Integer, Numeric, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from app.models.base import BaseModel
+
+
+class VendorTDSAggregate(BaseModel):
+    """Running purchase total per vendor, TDS section and financial year."""
+    __tablename__ = "vendor_tds_aggregates"
+    __table_args__ = (
+        UniqueConstraint("vendor_id", "tds_section", "financial_year", name="uq_vendor_tds_aggregate"),
+    )
+
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=False, index=True)
+    tds_section = Column(String(10), nullable=False)
+    financial_year = Column(String(9), nullable=False)  # "2024-2025"
+
+    # Taxable value of non-cancelled purchase invoices
+    total_amount = Column(Numeric(15, 2), nullable=False, default=0)
+    # Portion of total_amount on which TDS has already been applied
+    tds_base_amount = Column(Numeric(15, 2), nullable=False, default=0)
+    invoice_count = Column(Integer, nullable=False, default=0)
+
+    # Relationships
+    vendor = relationship("Vendor")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Enum
+from sqlalchemy import Column, String, Boolean, Enum, Integer
 import enum
 
 from app.models.base import BaseModel
@@ -19,3 +19,7 @@ class User(BaseModel):
     role = Column(Enum(UserRole), default=UserRole.VIEWER, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     is_superuser = Column(Boolean, default=False, nullable=False)
+
+    # Bumped on deactivation or password change; tokens carrying an older
+    # version are rejected
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
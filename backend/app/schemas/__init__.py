@@ -21,6 +21,7 @@ from app.schemas.client_po import (
     ClientPOListResponse,
     ClientPOItemCreate,
     ClientPOStatusUpdate,
+    POFulfillmentReconcileResponse,
 )
 from app.schemas.billing_schedule import (
     BillingScheduleCreate,
@@ -29,6 +30,10 @@ from app.schemas.billing_schedule import (
     BillingScheduleWithPOResponse,
     BillingScheduleStatusUpdate,
     GenerateSchedulesRequest,
+    BillingRunRequest,
+    BillingRunResponse,
+    BulkGenerateSchedulesRequest,
+    BulkGenerateSchedulesResponse,
 )
 from app.schemas.common import PaginatedResponse, Message
 from app.schemas.tds import (
@@ -45,6 +50,11 @@ from app.schemas.tds import (
     PendingTDSTransaction,
     PendingTDSResponse,
     TDSReturnExportResponse,
+    TDSThresholdCheckResponse,
+    VendorTDSAggregateResponse,
+    TDSThresholdRebuildResponse,
+    Form16AJobResponse,
+    TDSInterestResponse,
 )
 
 __all__ = [
@@ -89,12 +99,17 @@ __all__ = [
     "ClientPOListResponse",
     "ClientPOItemCreate",
     "ClientPOStatusUpdate",
+    "POFulfillmentReconcileResponse",
     "BillingScheduleCreate",
     "BillingScheduleUpdate",
     "BillingScheduleResponse",
     "BillingScheduleWithPOResponse",
     "BillingScheduleStatusUpdate",
     "GenerateSchedulesRequest",
+    "BillingRunRequest",
+    "BillingRunResponse",
+    "BulkGenerateSchedulesRequest",
+    "BulkGenerateSchedulesResponse",
     "PaginatedResponse",
     "Message",
     "TDSChallanCreate",
@@ -110,4 +125,9 @@ __all__ = [
     "PendingTDSTransaction",
     "PendingTDSResponse",
     "TDSReturnExportResponse",
+    "TDSThresholdCheckResponse",
+    "VendorTDSAggregateResponse",
+    "TDSThresholdRebuildResponse",
+    "Form16AJobResponse",
+    "TDSInterestResponse",
 ]
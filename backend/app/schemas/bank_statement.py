@@ -0,0 +1,69 @@
+from typing import Optional, List, Dict
+from pydantic import BaseModel
+from datetime import date, datetime
+from decimal import Decimal
+
+from app.models.bank_statement import ReconciliationStatus
+
+
+class BankStatementResponse(BaseModel):
+    id: int
+    bank_account_id: int
+    file_name: str
+    statement_from: Optional[date] = None
+    statement_to: Optional[date] = None
+    total_lines: int
+    matched_lines: int
+    total_debit: Decimal
+    total_credit: Decimal
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class BankStatementImportResponse(BaseModel):
+    statement: BankStatementResponse
+    matches_by_type: Dict[str, int]
+    unmatched_lines: int
+
+
+class BankStatementLineResponse(BaseModel):
+    id: int
+    statement_id: int
+    line_number: int
+    transaction_date: date
+    narration: Optional[str] = None
+    reference: Optional[str] = None
+    transaction_type: str
+    amount: Decimal
+    balance: Optional[Decimal] = None
+    status: str
+    match_type: Optional[str] = None
+    match_score: Optional[Decimal] = None
+    payment_id: Optional[int] = None
+    cash_expense_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class BankStatementLineUpdate(BaseModel):
+    """Manually match, unmatch or ignore a line"""
+    status: ReconciliationStatus
+    payment_id: Optional[int] = None
+    cash_expense_id: Optional[int] = None
+
+
+class CreateExpensesFromLinesRequest(BaseModel):
+    """Create cash expenses from unmatched statement lines"""
+    line_ids: Optional[List[int]] = None  # Defaults to all unmatched lines
+    expense_category_id: Optional[int] = None
+    project_id: Optional[int] = None
+    branch_id: Optional[int] = None
+
+
+class CreateExpensesFromLinesResponse(BaseModel):
+    created_count: int
+    expense_ids: List[int]
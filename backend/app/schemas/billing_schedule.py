@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import date, datetime
 from decimal import Decimal
@@ -66,3 +66,61 @@ class CreateInvoiceFromScheduleRequest(BaseModel):
     due_date: Optional[date] = None
     bank_account_id: Optional[int] = None
     notes: Optional[str] = None
+
+
+class BillingRunRequest(BaseModel):
+    """Request to invoice every pending schedule due up to a date"""
+    run_date: date
+    invoice_date: Optional[date] = None
+    due_date: Optional[date] = None
+    bank_account_id: Optional[int] = None
+    client_id: Optional[int] = None
+    branch_id: Optional[int] = None
+    client_po_ids: Optional[List[int]] = None
+    dry_run: bool = False
+
+
+class BillingRunItem(BaseModel):
+    schedule_id: int
+    client_po_id: int
+    client_po_internal_number: str
+    client_name: Optional[str] = None
+    installment_number: int
+    description: Optional[str] = None
+    due_date: date
+    amount: Decimal
+    gst_amount: Decimal
+    total_amount: Decimal
+    invoice_id: Optional[int] = None
+    invoice_number: Optional[str] = None
+
+
+class BillingRunResponse(BaseModel):
+    dry_run: bool
+    run_date: date
+    schedule_count: int
+    po_count: int
+    amount: Decimal
+    gst_amount: Decimal
+    total_amount: Decimal
+    items: List[BillingRunItem]
+
+
+class BulkGenerateSchedulesRequest(BaseModel):
+    """Request to regenerate billing schedules for many Client POs"""
+    client_po_ids: List[int]
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+
+class BulkGenerateSchedulesResult(BaseModel):
+    client_po_id: int
+    success: bool
+    schedule_count: int = 0
+    message: Optional[str] = None
+
+
+class BulkGenerateSchedulesResponse(BaseModel):
+    generated_count: int
+    failed_count: int
+    results: List[BulkGenerateSchedulesResult]
@@ -152,3 +152,23 @@ class ClientPOListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# ==================== Fulfillment Reconciliation Schemas ====================
+
+class POFulfillmentCorrection(BaseModel):
+    client_po_id: int
+    internal_number: str
+    old_invoiced_amount: Decimal
+    invoiced_amount: Decimal
+    remaining_amount: Decimal
+    old_status: ClientPOStatus
+    status: ClientPOStatus
+
+    class Config:
+        from_attributes = True
+
+
+class POFulfillmentReconcileResponse(BaseModel):
+    corrected_count: int
+    corrections: List[POFulfillmentCorrection]
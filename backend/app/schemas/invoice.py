@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date, datetime
 from decimal import Decimal
 
@@ -76,6 +76,8 @@ class InvoiceBase(BaseModel):
 
 class InvoiceCreate(InvoiceBase):
     items: List[InvoiceItemCreate]
+    # Purchase invoices: set TDS section/rate from the vendor's FY threshold status
+    auto_tds: bool = False
 
 
 class InvoiceUpdate(BaseModel):
@@ -136,3 +138,26 @@ class InvoiceResponse(InvoiceBase):
 
     class Config:
         from_attributes = True
+
+
+class InvoiceBulkStatusRequest(BaseModel):
+    """Request to move many invoices to a new status"""
+    invoice_ids: List[int] = Field(..., min_length=1, max_length=5000)
+    status: InvoiceStatus
+
+
+class InvoiceBulkStatusResult(BaseModel):
+    invoice_id: int
+    success: bool
+    status: Optional[InvoiceStatus] = None
+    voucher_number: Optional[str] = None
+    message: Optional[str] = None
+
+
+class InvoiceBulkStatusResponse(BaseModel):
+    status: InvoiceStatus
+    updated_count: int
+    posted_count: int
+    reversed_count: int
+    failed_count: int
+    results: List[InvoiceBulkStatusResult]
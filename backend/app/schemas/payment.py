@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import Optional, List
+from pydantic import BaseModel, Field
 from datetime import date, datetime
 from decimal import Decimal
 
@@ -10,6 +10,20 @@ from app.schemas.branch import BranchResponse
 from app.schemas.bank_account import BankAccountResponse
 
 
+class PaymentAllocationCreate(BaseModel):
+    invoice_id: int
+    amount: Decimal = Field(..., gt=0)
+
+
+class PaymentAllocationResponse(BaseModel):
+    id: int
+    invoice_id: int
+    amount: Decimal
+
+    class Config:
+        from_attributes = True
+
+
 class PaymentBase(BaseModel):
     payment_date: date
     payment_type: PaymentType
@@ -28,7 +42,10 @@ class PaymentBase(BaseModel):
 
 
 class PaymentCreate(PaymentBase):
-    pass
+    # Settle several invoices at once; takes precedence over invoice_id
+    allocations: Optional[List[PaymentAllocationCreate]] = None
+    # Settle the party's open invoices oldest-first
+    auto_allocate: bool = False
 
 
 class PaymentUpdate(BaseModel):
@@ -46,6 +63,8 @@ class PaymentUpdate(BaseModel):
     cheque_date: Optional[date] = None
     notes: Optional[str] = None
     status: Optional[PaymentStatus] = None
+    allocations: Optional[List[PaymentAllocationCreate]] = None
+    auto_allocate: Optional[bool] = None
 
 
 class PaymentResponse(PaymentBase):
@@ -58,6 +77,7 @@ class PaymentResponse(PaymentBase):
     vendor: Optional[VendorResponse] = None
     branch: Optional[BranchResponse] = None
     bank_account_ref: Optional[BankAccountResponse] = None
+    allocations: List[PaymentAllocationResponse] = []
     created_at: datetime
     updated_at: datetime
 
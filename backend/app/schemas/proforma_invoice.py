@@ -141,3 +141,23 @@ class PIListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PIBulkGenerateRequest(BaseModel):
+    """Convert several PIs to invoices in one transaction"""
+    pi_ids: List[int]
+    invoice_date: Optional[date] = None
+
+
+class PIBulkGenerateResult(BaseModel):
+    pi_id: int
+    success: bool
+    invoice_id: Optional[int] = None
+    invoice_number: Optional[str] = None
+    message: Optional[str] = None
+
+
+class PIBulkGenerateResponse(BaseModel):
+    generated_count: int
+    failed_count: int
+    results: List[PIBulkGenerateResult]
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date, datetime
 from decimal import Decimal
 
@@ -51,9 +51,11 @@ class TDSChallanBase(BaseModel):
 
 
 class TDSChallanCreate(TDSChallanBase):
-    entries: List[TDSChallanEntryCreate]
+    # Entries are derived from these invoices on the server
+    invoice_ids: List[int] = Field(..., min_length=1)
     penalty: Decimal = Decimal("0")
-    interest: Decimal = Decimal("0")
+    # Section 201(1A) interest; computed from the entries when omitted
+    interest: Optional[Decimal] = None
 
 
 class TDSChallanUpdate(BaseModel):
@@ -145,6 +147,7 @@ class MonthData(BaseModel):
     has_challan_files: bool = False
     tds_deducted: Optional[Decimal] = None  # Sum of TDS from invoices
     has_pending: bool = False  # Whether there are unpaid invoices with TDS
+    interest_accrued: Optional[Decimal] = None  # 201(1A) interest on pending TDS as of today
 
 
 class QuarterData(BaseModel):
@@ -152,6 +155,8 @@ class QuarterData(BaseModel):
     return_status: Optional[ReturnStatus] = None
     has_return_file: bool = False
     return_id: Optional[int] = None
+    filed_date: Optional[date] = None
+    late_filing_fee: Optional[Decimal] = None  # Section 234E
 
 
 class TDSSheetRow(BaseModel):
@@ -219,3 +224,77 @@ class TDSReturnExportResponse(BaseModel):
     total_penalty: Decimal
     total_interest: Decimal
     total_payable: Decimal
+
+
+# Vendor TDS Threshold Tracking
+class TDSThresholdCheckResponse(BaseModel):
+    vendor_id: int
+    financial_year: str
+    section: str
+    previous_total: Decimal
+    new_total: Decimal
+    single_limit: Optional[Decimal] = None
+    aggregate_limit: Optional[Decimal] = None
+    threshold_crossed: bool
+    crossed_now: bool
+    tds_applicable: bool
+    pan_valid: bool
+    rate: Decimal
+    taxable_base: Decimal
+    catch_up_base: Decimal
+    tds_amount: Decimal
+
+
+class VendorTDSAggregateResponse(BaseModel):
+    vendor_id: int
+    tds_section: str
+    financial_year: str
+    total_amount: Decimal
+    tds_base_amount: Decimal
+    invoice_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class TDSThresholdRebuildResponse(BaseModel):
+    financial_year: Optional[str] = None
+    rows_written: int
+
+
+# Form 16A Certificate Generation
+class Form16AJobResponse(BaseModel):
+    key: str
+    financial_year: str
+    quarter: int
+    branch_id: Optional[int] = None
+    status: str  # idle, running, interrupted, completed, failed
+    total: int = 0
+    generated: int = 0
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    file_name: Optional[str] = None
+    error: Optional[str] = None
+
+
+# TDS Interest / Late Fee Calculator
+class TDSInterestEntry(BaseModel):
+    invoice_id: int
+    invoice_number: str
+    invoice_date: date
+    tds_amount: Decimal
+    due_date: date
+    months: int
+    interest: Decimal
+
+
+class TDSInterestResponse(BaseModel):
+    financial_year: str
+    month: Optional[int] = None
+    quarter: Optional[int] = None
+    payment_date: date
+    entries: List[TDSInterestEntry]
+    total_tds: Decimal
+    total_interest: Decimal
+    return_due_date: Optional[date] = None
+    late_filing_fee: Decimal = Decimal("0")
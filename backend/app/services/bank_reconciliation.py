@@ -0,0 +1,547 @@
+"""
+Bank Reconciliation Service
+
+Imports bank statements (CSV or XLSX) and matches their lines against
+payments and cash expenses recorded for the same bank account.
+
+Statements are read row by row, so large files are never loaded whole. The
+unreconciled payments and cash expenses are loaded once and indexed in memory
+by reference and by (direction, amount in paise), so matching a line is a
+dictionary lookup instead of a query. Matching runs in tiers over all lines:
+1. REFERENCE   - statement reference / UTR equals the record's reference
+2. AMOUNT_DATE - same amount, dates within the date window
+3. NARRATION   - same amount within a wider window, narration similar to the
+                 record's party name / description
+Each record can match at most one line, and stronger tiers claim first.
+"""
+import csv
+import difflib
+import io
+import re
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select, insert, update, values, column, exists, func, or_, Integer, String, Numeric
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.bank_statement import BankStatement, BankStatementLine, ReconciliationStatus, MatchType
+from app.models.cash_expense import CashExpense
+from app.models.payment import Payment, PaymentType, PaymentStatus
+from app.models.client import Client
+from app.models.vendor import Vendor
+
+INSERT_CHUNK_SIZE = 5000
+NARRATION_WINDOW_DAYS = 15
+NARRATION_MIN_RATIO = 0.6
+HEADER_SCAN_ROWS = 30
+
+# Normalized header -> field. Banks label the same columns differently.
+HEADER_ALIASES = {
+    "date": "date",
+    "txn date": "date",
+    "tran date": "date",
+    "transaction date": "date",
+    "posting date": "date",
+    "value date": "value_date",
+    "narration": "narration",
+    "description": "narration",
+    "particulars": "narration",
+    "remarks": "narration",
+    "details": "narration",
+    "transaction details": "narration",
+    "transaction remarks": "narration",
+    "ref no": "reference",
+    "reference": "reference",
+    "reference no": "reference",
+    "ref no/cheque no": "reference",
+    "chq/ref no": "reference",
+    "chq no": "reference",
+    "cheque no": "reference",
+    "cheque number": "reference",
+    "utr": "reference",
+    "utr no": "reference",
+    "debit": "debit",
+    "debit amount": "debit",
+    "withdrawal": "debit",
+    "withdrawals": "debit",
+    "withdrawal amt": "debit",
+    "withdrawal amount": "debit",
+    "dr": "debit",
+    "credit": "credit",
+    "credit amount": "credit",
+    "deposit": "credit",
+    "deposits": "credit",
+    "deposit amt": "credit",
+    "deposit amount": "credit",
+    "cr": "credit",
+    "amount": "amount",
+    "transaction amount": "amount",
+    "type": "dr_cr",
+    "dr/cr": "dr_cr",
+    "cr/dr": "dr_cr",
+    "balance": "balance",
+    "closing balance": "balance",
+}
+
+DATE_FORMATS = [
+    "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%m-%y", "%Y-%m-%d",
+    "%d-%b-%Y", "%d %b %Y", "%d-%b-%y", "%d %b %y", "%d.%m.%Y",
+]
+
+_HEADER_CLEAN = re.compile(r"[^a-z/ ]+")
+_REF_CLEAN = re.compile(r"[^A-Z0-9]+")
+_REF_TOKEN_SPLIT = re.compile(r"[/\-:\s|]+")
+_WORDS = re.compile(r"[a-z]+")
+
+
+def _normalize_header(value) -> str:
+    text = _HEADER_CLEAN.sub("", str(value or "").lower().replace(".", " "))
+    return " ".join(text.split()).replace(" /", "/").replace("/ ", "/")
+
+
+def normalize_reference(value) -> str:
+    """Normalize a reference / UTR / cheque number for comparison."""
+    return _REF_CLEAN.sub("", str(value or "").upper())
+
+
+def _reference_tokens(narration: str) -> List[str]:
+    """Candidate references embedded in a narration (e.g. NEFT/N123456789012/ACME)."""
+    tokens = []
+    for token in _REF_TOKEN_SPLIT.split(narration.upper()):
+        token = normalize_reference(token)
+        if len(token) >= 6 and any(ch.isdigit() for ch in token):
+            tokens.append(token)
+    return tokens
+
+
+def _text_key(value: str) -> str:
+    return " ".join(_WORDS.findall((value or "").lower()))
+
+
+def to_paise(amount: Decimal) -> int:
+    """Amount as integer paise, used as the hash key for amount matching."""
+    return int((amount * 100).to_integral_value())
+
+
+def _parse_amount(value) -> Decimal:
+    if value is None:
+        return Decimal("0")
+    if isinstance(value, (int, float, Decimal)):
+        return Decimal(str(value)).quantize(Decimal("0.01"))
+    text = str(value).strip().replace(",", "")
+    for suffix in ("CR", "DR", "Cr", "Dr", "cr", "dr"):
+        if text.endswith(suffix):
+            text = text[:-2].strip()
+    if not text or text in ("-", "--"):
+        return Decimal("0")
+    try:
+        return Decimal(text).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value}")
+
+
+class _DateParser:
+    """Parses statement dates, remembering the first format that worked."""
+
+    def __init__(self):
+        self.format: Optional[str] = None
+
+    def parse(self, value) -> Optional[date]:
+        if value is None or value == "":
+            return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        text = str(value).strip()
+        if self.format:
+            try:
+                return datetime.strptime(text, self.format).date()
+            except ValueError:
+                pass
+        for fmt in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(text, fmt).date()
+            except ValueError:
+                continue
+            self.format = fmt
+            return parsed
+        return None
+
+
+def _iter_csv_rows(file_obj) -> Iterator[list]:
+    text_stream = io.TextIOWrapper(file_obj, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        yield from csv.reader(text_stream)
+    finally:
+        text_stream.detach()
+
+
+def _iter_xlsx_rows(file_obj) -> Iterator[list]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX statements require openpyxl to be installed")
+
+    workbook = load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+def _find_header(rows: Iterator[list]) -> Dict[str, int]:
+    """Skip preamble rows until a header with a date and amount columns is found."""
+    for _ in range(HEADER_SCAN_ROWS):
+        row = next(rows, None)
+        if row is None:
+            break
+        mapping: Dict[str, int] = {}
+        for index, cell in enumerate(row):
+            field = HEADER_ALIASES.get(_normalize_header(cell))
+            if field and field not in mapping:
+                mapping[field] = index
+        if "date" not in mapping and "value_date" in mapping:
+            mapping["date"] = mapping["value_date"]
+        has_amount = ("debit" in mapping and "credit" in mapping) or "amount" in mapping
+        if "date" in mapping and has_amount:
+            return mapping
+    raise ValueError("Could not find a header row with date and debit/credit or amount columns")
+
+
+def iter_statement_lines(file_obj, file_name: str) -> Iterator[dict]:
+    """
+    Stream parsed statement lines from a CSV or XLSX file.
+
+    Rows without a parseable date or with a zero amount (opening balance,
+    totals, footer text) are skipped.
+
+    Yields:
+        Dicts with line_number, transaction_date, narration, reference,
+        transaction_type ("DEBIT"/"CREDIT"), amount and balance
+    """
+    if file_name.lower().endswith((".xlsx", ".xlsm")):
+        rows = _iter_xlsx_rows(file_obj)
+    elif file_name.lower().endswith((".csv", ".txt")):
+        rows = _iter_csv_rows(file_obj)
+    else:
+        raise ValueError("Unsupported statement format. Upload a CSV or XLSX file.")
+
+    rows = iter(rows)
+    mapping = _find_header(rows)
+    dates = _DateParser()
+
+    def cell(row, field):
+        index = mapping.get(field)
+        if index is None or index >= len(row):
+            return None
+        return row[index]
+
+    line_number = 0
+    for row in rows:
+        if not row:
+            continue
+        transaction_date = dates.parse(cell(row, "date"))
+        if transaction_date is None:
+            continue
+
+        if "debit" in mapping and "credit" in mapping:
+            debit = _parse_amount(cell(row, "debit"))
+            credit = _parse_amount(cell(row, "credit"))
+        else:
+            amount = _parse_amount(cell(row, "amount"))
+            marker = str(cell(row, "dr_cr") or "").strip().upper()
+            is_debit = marker.startswith("D") or (not marker and amount < 0)
+            debit, credit = (abs(amount), Decimal("0")) if is_debit else (Decimal("0"), abs(amount))
+
+        if debit == 0 and credit == 0:
+            continue
+
+        line_number += 1
+        narration = str(cell(row, "narration") or "").strip()
+        reference = str(cell(row, "reference") or "").strip()
+        balance = cell(row, "balance")
+        yield {
+            "line_number": line_number,
+            "transaction_date": transaction_date,
+            "narration": narration or None,
+            "reference": reference[:100] or None,
+            "transaction_type": "DEBIT" if debit > 0 else "CREDIT",
+            "amount": debit if debit > 0 else credit,
+            "balance": _parse_amount(balance) if balance not in (None, "") else None,
+        }
+
+
+def parse_statement(file_obj, file_name: str) -> List[dict]:
+    """Parse a whole statement file into line dicts (run in a worker thread)."""
+    return list(iter_statement_lines(file_obj, file_name))
+
+
+async def load_candidates(
+    db: AsyncSession,
+    bank_account_id: int,
+    date_from: date,
+    date_to: date
+) -> List[tuple]:
+    """
+    Load unreconciled payments and cash expenses for a bank account.
+
+    Only the columns needed for matching are selected. A record is
+    unreconciled while no statement line points at it.
+
+    Returns:
+        List of (kind, id, date, direction, paise, reference, text) tuples where
+        kind is "payment" or "expense" and direction is "DEBIT"/"CREDIT"
+        from the bank's point of view
+    """
+    matched_payment = exists().where(BankStatementLine.payment_id == Payment.id)
+    payments = await db.execute(
+        select(
+            Payment.id, Payment.payment_date, Payment.payment_type, Payment.net_amount,
+            Payment.reference_number, Payment.notes, Client.name, Vendor.name
+        )
+        .outerjoin(Client, Payment.client_id == Client.id)
+        .outerjoin(Vendor, Payment.vendor_id == Vendor.id)
+        .where(or_(Payment.bank_account_id == bank_account_id, Payment.bank_account_id.is_(None)))
+        .where(Payment.status == PaymentStatus.COMPLETED)
+        .where(Payment.payment_date.between(date_from, date_to))
+        .where(~matched_payment)
+    )
+
+    candidates = []
+    for row in payments.all():
+        direction = "CREDIT" if row[2] == PaymentType.RECEIPT else "DEBIT"
+        party = row[6] or row[7] or ""
+        candidates.append((
+            "payment", row[0], row[1], direction, to_paise(row[3]),
+            normalize_reference(row[4]), _text_key(f"{party} {row[5] or ''}")
+        ))
+
+    matched_expense = exists().where(BankStatementLine.cash_expense_id == CashExpense.id)
+    expenses = await db.execute(
+        select(
+            CashExpense.id, CashExpense.transaction_date, CashExpense.transaction_type,
+            CashExpense.amount, CashExpense.transaction_ref, CashExpense.description
+        )
+        .where(CashExpense.bank_account_id == bank_account_id)
+        .where(CashExpense.transaction_date.between(date_from, date_to))
+        .where(~matched_expense)
+    )
+    for row in expenses.all():
+        candidates.append((
+            "expense", row[0], row[1], row[2], to_paise(row[3]),
+            normalize_reference(row[4]), _text_key(row[5] or "")
+        ))
+
+    return candidates
+
+
+def match_lines(
+    lines: List[dict],
+    candidates: List[tuple],
+    date_window_days: int = 3
+) -> Dict[int, Tuple[str, int, str, Decimal]]:
+    """
+    Match statement lines to candidate records in tiers.
+
+    Args:
+        lines: Parsed lines; each needs line_number, transaction_date,
+            transaction_type, amount, reference and narration
+        candidates: Tuples from load_candidates
+        date_window_days: Max days between line and record for AMOUNT_DATE
+
+    Returns:
+        Dict of line_number -> (kind, record_id, match_type, score)
+
+    Example:
+        >>> line = {"line_number": 1, "transaction_date": date(2024, 5, 2),
+        ...         "transaction_type": "CREDIT", "amount": Decimal("1180.00"),
+        ...         "reference": None, "narration": "NEFT/N12345678/ACME LTD"}
+        >>> cand = ("payment", 7, date(2024, 5, 1), "CREDIT", 118000, "N12345678", "acme ltd")
+        >>> match_lines([line], [cand])
+        {1: ('payment', 7, 'REFERENCE', Decimal('100'))}
+    """
+    by_reference: Dict[str, List[tuple]] = {}
+    by_amount: Dict[Tuple[str, int], List[tuple]] = {}
+    for cand in candidates:
+        if cand[5]:
+            by_reference.setdefault(cand[5], []).append(cand)
+        by_amount.setdefault((cand[3], cand[4]), []).append(cand)
+
+    used = set()
+    matches: Dict[int, Tuple[str, int, str, Decimal]] = {}
+    window = timedelta(days=date_window_days)
+    wide_window = timedelta(days=max(NARRATION_WINDOW_DAYS, date_window_days))
+
+    keyed = [(line, line["transaction_type"], to_paise(line["amount"])) for line in lines]
+
+    # Tier 1: exact reference (reference column or tokens in the narration)
+    for line, direction, paise in keyed:
+        refs = []
+        if line.get("reference"):
+            refs.append(normalize_reference(line["reference"]))
+        if line.get("narration"):
+            refs.extend(_reference_tokens(line["narration"]))
+        for ref in refs:
+            found = None
+            for cand in by_reference.get(ref, ()):
+                if (cand[0], cand[1]) not in used and cand[3] == direction and cand[4] == paise:
+                    found = cand
+                    break
+            if found:
+                used.add((found[0], found[1]))
+                matches[line["line_number"]] = (found[0], found[1], MatchType.REFERENCE.value, Decimal("100"))
+                break
+
+    # Tier 2: same amount, closest date within the window
+    for line, direction, paise in keyed:
+        if line["line_number"] in matches:
+            continue
+        best = None
+        best_gap = None
+        for cand in by_amount.get((direction, paise), ()):
+            if (cand[0], cand[1]) in used:
+                continue
+            gap = abs(cand[2] - line["transaction_date"])
+            if gap <= window and (best_gap is None or gap < best_gap):
+                best, best_gap = cand, gap
+        if best:
+            used.add((best[0], best[1]))
+            score = Decimal("90") - Decimal(best_gap.days * 5)
+            matches[line["line_number"]] = (best[0], best[1], MatchType.AMOUNT_DATE.value, score)
+
+    # Tier 3: same amount in a wider window, most similar narration
+    for line, direction, paise in keyed:
+        if line["line_number"] in matches or not line.get("narration"):
+            continue
+        narration = _text_key(line["narration"])
+        if not narration:
+            continue
+        best = None
+        best_ratio = 0.0
+        for cand in by_amount.get((direction, paise), ()):
+            if (cand[0], cand[1]) in used or not cand[6]:
+                continue
+            if abs(cand[2] - line["transaction_date"]) > wide_window:
+                continue
+            matcher = difflib.SequenceMatcher(None, narration, cand[6])
+            if matcher.real_quick_ratio() < NARRATION_MIN_RATIO or matcher.quick_ratio() < NARRATION_MIN_RATIO:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= NARRATION_MIN_RATIO and ratio > best_ratio:
+                best, best_ratio = cand, ratio
+        if best:
+            used.add((best[0], best[1]))
+            score = Decimal(str(round(best_ratio * 80, 2)))
+            matches[line["line_number"]] = (best[0], best[1], MatchType.NARRATION.value, score)
+
+    return matches
+
+
+async def insert_statement_lines(
+    db: AsyncSession,
+    statement_id: int,
+    lines: List[dict],
+    matches: Dict[int, Tuple[str, int, str, Decimal]]
+) -> None:
+    """Insert parsed lines with their match results in chunks."""
+    now = datetime.utcnow()
+    for start in range(0, len(lines), INSERT_CHUNK_SIZE):
+        rows = []
+        for line in lines[start:start + INSERT_CHUNK_SIZE]:
+            match = matches.get(line["line_number"])
+            rows.append({
+                **line,
+                "statement_id": statement_id,
+                "status": ReconciliationStatus.MATCHED.value if match else ReconciliationStatus.UNMATCHED.value,
+                "match_type": match[2] if match else None,
+                "match_score": match[3] if match else None,
+                "payment_id": match[1] if match and match[0] == "payment" else None,
+                "cash_expense_id": match[1] if match and match[0] == "expense" else None,
+                "created_at": now,
+                "updated_at": now,
+            })
+        await db.execute(insert(BankStatementLine), rows)
+
+
+async def apply_matches(
+    db: AsyncSession,
+    statement_id: int,
+    matches: Dict[int, Tuple[str, int, str, Decimal]]
+) -> int:
+    """Write match results for existing lines with one UPDATE ... FROM (VALUES ...)."""
+    if not matches:
+        return 0
+
+    rows = [
+        (
+            line_number,
+            match[2],
+            match[3],
+            match[1] if match[0] == "payment" else None,
+            match[1] if match[0] == "expense" else None,
+        )
+        for line_number, match in matches.items()
+    ]
+    matched = values(
+        column("line_number", Integer),
+        column("match_type", String(20)),
+        column("match_score", Numeric(5, 2)),
+        column("payment_id", Integer),
+        column("cash_expense_id", Integer),
+        name="matched",
+    ).data(rows)
+
+    result = await db.execute(
+        update(BankStatementLine)
+        .where(BankStatementLine.statement_id == statement_id)
+        .where(BankStatementLine.line_number == matched.c.line_number)
+        .where(BankStatementLine.status == ReconciliationStatus.UNMATCHED.value)
+        .values(
+            status=ReconciliationStatus.MATCHED.value,
+            match_type=matched.c.match_type,
+            match_score=matched.c.match_score,
+            payment_id=matched.c.payment_id,
+            cash_expense_id=matched.c.cash_expense_id,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+async def refresh_statement_summary(db: AsyncSession, statement: BankStatement) -> None:
+    """Recompute a statement's matched line count."""
+    result = await db.execute(
+        select(func.count())
+        .select_from(BankStatementLine)
+        .where(BankStatementLine.statement_id == statement.id)
+        .where(BankStatementLine.status != ReconciliationStatus.UNMATCHED.value)
+    )
+    statement.matched_lines = result.scalar() or 0
+
+
+async def load_unmatched_lines(db: AsyncSession, statement_id: int) -> List[dict]:
+    """Load the fields of unmatched lines needed for matching."""
+    result = await db.execute(
+        select(
+            BankStatementLine.line_number,
+            BankStatementLine.transaction_date,
+            BankStatementLine.transaction_type,
+            BankStatementLine.amount,
+            BankStatementLine.reference,
+            BankStatementLine.narration,
+        )
+        .where(BankStatementLine.statement_id == statement_id)
+        .where(BankStatementLine.status == ReconciliationStatus.UNMATCHED.value)
+    )
+    return [dict(row._mapping) for row in result.all()]
+
+
+def summarize_matches(matches: Dict[int, Tuple[str, int, str, Decimal]]) -> Dict[str, int]:
+    """Count matches per tier."""
+    summary = {match_type.value: 0 for match_type in MatchType if match_type != MatchType.MANUAL}
+    for match in matches.values():
+        summary[match[2]] += 1
+    return summary
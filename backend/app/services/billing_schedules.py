@@ -0,0 +1,160 @@
+"""
+Billing Schedule Generation
+
+Builds recurring billing schedules for Client POs.
+
+- build_schedules() is a pure function: frequency, amounts and dates in,
+  installment rows out. Amounts are rounded to paise and the rounding
+  residue goes to the last installment, so installments always add up to
+  the PO amounts exactly.
+- regenerate_schedules() replaces the PENDING schedules of one or many POs
+  with one DELETE and one multi-row INSERT ... RETURNING.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.billing_schedule import BillingSchedule, ScheduleStatus
+from app.models.client_po import ClientPO, BillingFrequency
+
+# Billing frequency -> months between installments
+FREQUENCY_MONTHS = {
+    BillingFrequency.MONTHLY: 1,
+    BillingFrequency.QUARTERLY: 3,
+    BillingFrequency.HALF_YEARLY: 6,
+    BillingFrequency.YEARLY: 12,
+}
+
+PAISE = Decimal("0.01")
+
+
+def installment_dates(frequency: BillingFrequency, start_date: date, end_date: date) -> List[date]:
+    """
+    Due dates from start_date up to (excluding) end_date; at least one.
+
+    Each date is offset from start_date, so month-end starts do not drift.
+
+    Example:
+        >>> installment_dates(BillingFrequency.QUARTERLY, date(2025, 1, 1), date(2026, 1, 1))
+        [datetime.date(2025, 1, 1), datetime.date(2025, 4, 1), datetime.date(2025, 7, 1), datetime.date(2025, 10, 1)]
+        >>> installment_dates(BillingFrequency.MONTHLY, date(2025, 1, 31), date(2025, 4, 1))
+        [datetime.date(2025, 1, 31), datetime.date(2025, 2, 28), datetime.date(2025, 3, 31)]
+        >>> installment_dates(BillingFrequency.YEARLY, date(2025, 6, 1), date(2025, 6, 1))
+        [datetime.date(2025, 6, 1)]
+    """
+    if frequency not in FREQUENCY_MONTHS:
+        raise ValueError(f"Cannot generate schedules for {frequency.value} billing")
+    months = FREQUENCY_MONTHS[frequency]
+
+    dates = []
+    due_date = start_date
+    while due_date < end_date:
+        dates.append(due_date)
+        due_date = start_date + relativedelta(months=months * len(dates))
+    return dates or [start_date]
+
+
+def split_amount(total: Decimal, count: int) -> List[Decimal]:
+    """
+    Split an amount into count installments rounded to paise; the last one
+    absorbs the rounding residue.
+
+    Example:
+        >>> split_amount(Decimal("1000"), 3)
+        [Decimal('333.33'), Decimal('333.33'), Decimal('333.34')]
+        >>> sum(split_amount(Decimal("99999.99"), 7))
+        Decimal('99999.99')
+    """
+    share = (Decimal(total) / count).quantize(PAISE)
+    return [share] * (count - 1) + [Decimal(total) - share * (count - 1)]
+
+
+def build_schedules(
+    frequency: BillingFrequency,
+    taxable_amount: Decimal,
+    gst_amount: Decimal,
+    start_date: date,
+    end_date: date,
+) -> List[dict]:
+    """
+    Installment rows for a recurring PO.
+
+    Example:
+        >>> rows = build_schedules(BillingFrequency.MONTHLY, Decimal("10000"), Decimal("1800"), date(2025, 1, 1), date(2025, 4, 1))
+        >>> [(r["installment_number"], r["description"], str(r["total_amount"])) for r in rows]
+        [(1, 'MONTHLY - January 2025', '3933.33'), (2, 'MONTHLY - February 2025', '3933.33'), (3, 'MONTHLY - March 2025', '3933.34')]
+    """
+    dates = installment_dates(frequency, start_date, end_date)
+    amounts = split_amount(taxable_amount, len(dates))
+    gst_amounts = split_amount(gst_amount, len(dates))
+    return [
+        {
+            "installment_number": number,
+            "description": f"{frequency.value} - {due_date.strftime('%B %Y')}",
+            "due_date": due_date,
+            "amount": amount,
+            "gst_amount": gst,
+            "total_amount": amount + gst,
+        }
+        for number, (due_date, amount, gst) in enumerate(zip(dates, amounts, gst_amounts), start=1)
+    ]
+
+
+async def regenerate_schedules(
+    db: AsyncSession,
+    client_pos: List[ClientPO],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Dict[int, List[BillingSchedule]]:
+    """
+    Replace the PENDING schedules of the given POs.
+
+    Each PO's schedule runs from start_date (default: valid_from) to
+    end_date (default: valid_until). The caller validates the POs and
+    commits.
+
+    Returns:
+        Mapping of PO id to its new schedules
+    """
+    rows = []
+    for client_po in client_pos:
+        po_end_date = end_date or client_po.valid_until
+        if not po_end_date:
+            raise ValueError(f"End date is required for {client_po.internal_number}")
+        gst_amount = client_po.cgst_amount + client_po.sgst_amount + client_po.igst_amount
+        for row in build_schedules(
+            client_po.billing_frequency,
+            client_po.taxable_amount,
+            gst_amount,
+            start_date or client_po.valid_from,
+            po_end_date,
+        ):
+            row["client_po_id"] = client_po.id
+            rows.append(row)
+
+    po_ids = [client_po.id for client_po in client_pos]
+    await db.execute(
+        delete(BillingSchedule)
+        .where(BillingSchedule.client_po_id.in_(po_ids))
+        .where(BillingSchedule.status == ScheduleStatus.PENDING)
+        .execution_options(synchronize_session=False)
+    )
+
+    generated: Dict[int, List[BillingSchedule]] = {po_id: [] for po_id in po_ids}
+    if not rows:
+        return generated
+
+    now = datetime.utcnow()
+    for row in rows:
+        row.update(status=ScheduleStatus.PENDING, created_at=now, updated_at=now)
+    result = await db.scalars(
+        insert(BillingSchedule).returning(BillingSchedule, sort_by_parameter_order=True),
+        rows,
+    )
+    for schedule in result.all():
+        generated[schedule.client_po_id].append(schedule)
+    return generated
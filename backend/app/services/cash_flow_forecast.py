@@ -0,0 +1,286 @@
+"""
+Cash Flow Forecast Service
+
+Projects cash in and out by month from three sources, each aggregated in
+SQL by month and branch:
+
+- billing: PENDING billing schedules by due_date (not yet invoiced)
+- receivable: open SALES invoices by due_date (amount_due)
+- payable: open PURCHASE invoices by due_date (amount_due)
+
+All three are fetched with one UNION ALL query; only the pivot into months
+and branches happens in Python. Items due before the forecast start are
+reported as overdue. Line-level details are served separately, paginated.
+"""
+import calendar
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import select, func, case, cast, literal, null, union_all, String
+from sqlalchemy.sql import Select
+
+from app.models.billing_schedule import BillingSchedule, ScheduleStatus
+from app.models.client import Client
+from app.models.client_po import ClientPO
+from app.models.invoice import Invoice, InvoiceType, InvoiceStatus
+from app.models.vendor import Vendor
+
+BILLING = "billing"
+RECEIVABLE = "receivable"
+PAYABLE = "payable"
+SOURCES = [BILLING, RECEIVABLE, PAYABLE]
+
+OVERDUE = "overdue"
+
+OPEN_INVOICE_EXCLUDED = [InvoiceStatus.PAID, InvoiceStatus.CANCELLED]
+
+
+def forecast_period(from_date: date, months: int) -> date:
+    """
+    Last day of the forecast window.
+
+    Example:
+        >>> forecast_period(date(2025, 4, 1), 12)
+        datetime.date(2026, 3, 31)
+        >>> forecast_period(date(2025, 1, 1), 2)
+        datetime.date(2025, 2, 28)
+    """
+    last_month = from_date + relativedelta(months=months - 1)
+    return last_month.replace(day=calendar.monthrange(last_month.year, last_month.month)[1])
+
+
+def month_keys(from_date: date, months: int) -> List[str]:
+    """
+    Example:
+        >>> month_keys(date(2025, 11, 1), 3)
+        ['2025-11', '2025-12', '2026-01']
+    """
+    return [(from_date + relativedelta(months=i)).strftime("%Y-%m") for i in range(months)]
+
+
+def _month_bucket(due_date_column, from_date: date):
+    """YYYY-MM of the due date, or NULL when due before the forecast start."""
+    return case(
+        (due_date_column < from_date, null()),
+        else_=func.to_char(func.date_trunc("month", due_date_column), "YYYY-MM"),
+    )
+
+
+def _source_query(source: str, from_date: date, to_date: date, branch_id: Optional[int]) -> Select:
+    """Per-branch monthly totals of one source."""
+    if source == BILLING:
+        due_date = BillingSchedule.due_date
+        branch = ClientPO.branch_id
+        amount = BillingSchedule.total_amount
+        query = (
+            select()
+            .select_from(BillingSchedule)
+            .join(ClientPO, ClientPO.id == BillingSchedule.client_po_id)
+            .where(BillingSchedule.status == ScheduleStatus.PENDING)
+        )
+    else:
+        due_date = Invoice.due_date
+        branch = Invoice.branch_id
+        amount = Invoice.amount_due
+        invoice_type = InvoiceType.SALES if source == RECEIVABLE else InvoiceType.PURCHASE
+        query = (
+            select()
+            .select_from(Invoice)
+            .where(Invoice.invoice_type == invoice_type)
+            .where(Invoice.status.not_in(OPEN_INVOICE_EXCLUDED))
+            .where(Invoice.amount_due > 0)
+        )
+
+    bucket = _month_bucket(due_date, from_date)
+    query = (
+        query.add_columns(
+            literal(source, String).label("source"),
+            branch.label("branch_id"),
+            bucket.label("month"),
+            func.count().label("count"),
+            func.coalesce(func.sum(amount), 0).label("amount"),
+        )
+        .where(due_date <= to_date)
+        .group_by(branch, bucket)
+    )
+    if branch_id:
+        query = query.where(branch == branch_id)
+    return query
+
+
+def forecast_query(from_date: date, to_date: date, branch_id: Optional[int] = None):
+    """One statement returning (source, branch_id, month, count, amount) rows."""
+    return union_all(*(_source_query(source, from_date, to_date, branch_id) for source in SOURCES))
+
+
+def _empty_bucket() -> dict:
+    bucket = {}
+    for source in SOURCES:
+        bucket[f"{source}_count"] = 0
+        bucket[source] = Decimal("0")
+    return bucket
+
+
+def _finish(bucket: dict) -> dict:
+    """Copy of the bucket with the net flow added."""
+    return {**bucket, "net": bucket[BILLING] + bucket[RECEIVABLE] - bucket[PAYABLE]}
+
+
+def build_forecast(
+    rows,
+    from_date: date,
+    months: int,
+    branch_names: Dict[Optional[int], str],
+) -> dict:
+    """
+    Pivot forecast rows into monthly totals, overall and per branch.
+
+    Net = billing + receivable - payable. The running cumulative net starts
+    at zero in the first month; overdue amounts are reported separately.
+
+    Example:
+        >>> rows = [
+        ...     ("billing", 1, "2025-04", 2, Decimal("1000")),
+        ...     ("payable", 1, "2025-05", 1, Decimal("300")),
+        ...     ("receivable", None, None, 1, Decimal("50")),
+        ... ]
+        >>> f = build_forecast(rows, date(2025, 4, 1), 2, {1: "HQ"})
+        >>> [(m["month"], m["net"], m["cumulative_net"]) for m in f["months"]]
+        [('2025-04', Decimal('1000'), Decimal('1000')), ('2025-05', Decimal('-300'), Decimal('700'))]
+        >>> f["overdue"]["receivable"], [b["branch_name"] for b in f["branches"]]
+        (Decimal('50'), ['HQ', 'Unassigned'])
+    """
+    keys = month_keys(from_date, months)
+    overall = {key: _empty_bucket() for key in keys}
+    overdue = _empty_bucket()
+    branches: Dict[Optional[int], dict] = {}
+
+    for source, branch_id, month, count, amount in rows:
+        month = month or OVERDUE
+        if month != OVERDUE and month not in overall:
+            continue
+        target = overdue if month == OVERDUE else overall[month]
+        target[f"{source}_count"] += count
+        target[source] += amount
+
+        branch = branches.setdefault(branch_id, {
+            "overdue": _empty_bucket(),
+            "months": {key: _empty_bucket() for key in keys},
+        })
+        target = branch["overdue"] if month == OVERDUE else branch["months"][month]
+        target[f"{source}_count"] += count
+        target[source] += amount
+
+    month_list = []
+    cumulative = Decimal("0")
+    for key in keys:
+        bucket = overall[key]
+        cumulative += bucket[BILLING] + bucket[RECEIVABLE] - bucket[PAYABLE]
+        month_list.append({
+            "month": key,
+            "month_name": date(int(key[:4]), int(key[5:]), 1).strftime("%B %Y"),
+            **_finish(bucket),
+            "cumulative_net": cumulative,
+        })
+
+    totals = _empty_bucket()
+    for bucket in overall.values():
+        for key in totals:
+            totals[key] += bucket[key]
+
+    branch_list = []
+    for branch_id, branch in sorted(branches.items(), key=lambda item: (item[0] is None, item[0] or 0)):
+        branch_totals = _empty_bucket()
+        for bucket in branch["months"].values():
+            for key in branch_totals:
+                branch_totals[key] += bucket[key]
+        branch_list.append({
+            "branch_id": branch_id,
+            "branch_name": branch_names.get(branch_id) or "Unassigned",
+            "totals": _finish(branch_totals),
+            "overdue": _finish(branch["overdue"]),
+            "months": [{"month": key, **_finish(branch["months"][key])} for key in keys],
+        })
+
+    return {
+        "summary": _finish(totals),
+        "overdue": _finish(overdue),
+        "months": month_list,
+        "branches": branch_list,
+    }
+
+
+def detail_query(
+    source: str,
+    from_date: date,
+    to_date: date,
+    month: Optional[str] = None,
+    branch_id: Optional[int] = None,
+) -> Select:
+    """
+    Line items behind one source of the forecast, ordered by due date.
+
+    month is YYYY-MM, or "overdue" for items due before from_date; when
+    omitted the whole window including overdue items is returned.
+    """
+    if source == BILLING:
+        due_date = BillingSchedule.due_date
+        branch = ClientPO.branch_id
+        query = (
+            select(
+                BillingSchedule.id,
+                literal(BILLING, String).label("source"),
+                (ClientPO.internal_number + " #" + cast(BillingSchedule.installment_number, String)).label("reference"),
+                Client.name.label("party_name"),
+                BillingSchedule.description,
+                BillingSchedule.due_date,
+                BillingSchedule.total_amount.label("amount"),
+                ClientPO.branch_id,
+            )
+            .join(ClientPO, ClientPO.id == BillingSchedule.client_po_id)
+            .join(Client, Client.id == ClientPO.client_id)
+            .where(BillingSchedule.status == ScheduleStatus.PENDING)
+            .order_by(BillingSchedule.due_date, BillingSchedule.id)
+        )
+    elif source in (RECEIVABLE, PAYABLE):
+        due_date = Invoice.due_date
+        branch = Invoice.branch_id
+        if source == RECEIVABLE:
+            invoice_type, party = InvoiceType.SALES, Client
+            party_join = Client.id == Invoice.client_id
+        else:
+            invoice_type, party = InvoiceType.PURCHASE, Vendor
+            party_join = Vendor.id == Invoice.vendor_id
+        query = (
+            select(
+                Invoice.id,
+                literal(source, String).label("source"),
+                Invoice.invoice_number.label("reference"),
+                party.name.label("party_name"),
+                Invoice.notes.label("description"),
+                Invoice.due_date,
+                Invoice.amount_due.label("amount"),
+                Invoice.branch_id,
+            )
+            .outerjoin(party, party_join)
+            .where(Invoice.invoice_type == invoice_type)
+            .where(Invoice.status.not_in(OPEN_INVOICE_EXCLUDED))
+            .where(Invoice.amount_due > 0)
+            .order_by(Invoice.due_date, Invoice.id)
+        )
+    else:
+        raise ValueError(f"Unknown source: {source}")
+
+    if month == OVERDUE:
+        query = query.where(due_date < from_date)
+    elif month:
+        month_start = date(int(month[:4]), int(month[5:7]), 1)
+        query = query.where(due_date >= max(month_start, from_date)).where(
+            due_date <= forecast_period(month_start, 1)
+        )
+    query = query.where(due_date <= to_date)
+    if branch_id:
+        query = query.where(branch == branch_id)
+    return query
@@ -0,0 +1,200 @@
+"""
+TDS Certificate PDF Rendering
+
+Renders Form 16A style TDS certificates with reportlab. This module only
+depends on reportlab so it is cheap to import in process-pool workers:
+init_worker() builds the paragraph/table styles, registers the optional
+TTF font and stores the deductor block once per process, and
+render_certificate() then renders one deductee's certificate to bytes.
+"""
+import hashlib
+import io
+from collections import OrderedDict
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+# Per-process template shared by all renders in the worker
+_template: Optional[dict] = None
+
+
+def init_worker(deductor: dict, font_path: Optional[str] = None) -> None:
+    """
+    Build styles and register fonts once per worker process.
+
+    Args:
+        deductor: Company name, address, TAN and PAN printed on every certificate
+        font_path: Optional TTF font (e.g. for non-Latin deductee names)
+    """
+    global _template
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+
+    font_name, bold_font_name = "Helvetica", "Helvetica-Bold"
+    if font_path:
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        pdfmetrics.registerFont(TTFont("CertificateFont", font_path))
+        font_name = bold_font_name = "CertificateFont"
+
+    styles = getSampleStyleSheet()
+    _template = {
+        "deductor": deductor,
+        "title": ParagraphStyle(
+            "CertTitle", parent=styles["Heading1"], fontName=bold_font_name,
+            fontSize=14, alignment=1, spaceAfter=2,
+        ),
+        "subtitle": ParagraphStyle(
+            "CertSubtitle", parent=styles["Normal"], fontName=font_name,
+            fontSize=9, alignment=1, spaceAfter=8,
+        ),
+        "heading": ParagraphStyle(
+            "CertHeading", parent=styles["Normal"], fontName=bold_font_name,
+            fontSize=10, spaceBefore=8, spaceAfter=4,
+        ),
+        "normal": ParagraphStyle(
+            "CertNormal", parent=styles["Normal"], fontName=font_name, fontSize=9,
+        ),
+        "table": TableStyle([
+            ("FONTNAME", (0, 0), (-1, -1), font_name),
+            ("FONTNAME", (0, 0), (-1, 0), bold_font_name),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#E8EEF7")),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("ALIGN", (-2, 1), (-1, -1), "RIGHT"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ]),
+        "info": TableStyle([
+            ("FONTNAME", (0, 0), (-1, -1), font_name),
+            ("FONTNAME", (0, 0), (0, -1), bold_font_name),
+            ("FONTNAME", (2, 0), (2, -1), bold_font_name),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]),
+    }
+
+
+def _money(value: Decimal) -> str:
+    return f"{value:,.2f}"
+
+
+def _challan_rows(entries: List[dict]) -> List[Tuple[str, str, str, Decimal]]:
+    """Sum the deductee's TDS per challan, in deposit order."""
+    challans: "OrderedDict[tuple, Decimal]" = OrderedDict()
+    for entry in sorted(entries, key=lambda e: (str(e["payment_date"]), e["challan_number"])):
+        key = (entry["bsr_code"], str(entry["payment_date"]), entry["challan_number"])
+        challans[key] = challans.get(key, Decimal("0")) + entry["tds_amount"]
+    return [(*key, amount) for key, amount in challans.items()]
+
+
+def certificate_filename(certificate: dict) -> str:
+    """
+    Deductees without a PAN are grouped by their exact party name; the slug
+    of the name is followed by a short hash of it, so names that slug alike
+    ("A & B Traders", "A-B Traders") still get distinct ZIP entries.
+
+    Example:
+        >>> certificate_filename({"pan": "AAACB1234F", "party_name": "X", "financial_year": "2024-2025", "quarter": 1})
+        'Form16A_AAACB1234F_2024-2025_Q1.pdf'
+        >>> certificate_filename({"pan": None, "party_name": "A & B Traders", "financial_year": "2024-2025", "quarter": 2})
+        'Form16A_NOPAN_A_B_Traders_fda0c62f_2024-2025_Q2.pdf'
+        >>> certificate_filename({"pan": None, "party_name": "A-B Traders", "financial_year": "2024-2025", "quarter": 2})
+        'Form16A_NOPAN_A_B_Traders_b6ff12af_2024-2025_Q2.pdf'
+    """
+    if certificate.get("pan"):
+        key = certificate["pan"]
+    else:
+        name = certificate["party_name"]
+        safe = "".join(c if c.isalnum() else "_" for c in name)
+        digest = hashlib.blake2b(name.encode(), digest_size=4).hexdigest()
+        key = "NOPAN_" + "_".join([part for part in safe.split("_") if part] + [digest])
+    return f"Form16A_{key}_{certificate['financial_year']}_Q{certificate['quarter']}.pdf"
+
+
+def render_certificate(certificate: dict) -> Tuple[str, bytes]:
+    """
+    Render one deductee's certificate.
+
+    Args:
+        certificate: pan, party_name, financial_year, quarter and entries
+            (invoice_number, invoice_date, tds_section, base_amount,
+            tds_amount, challan_number, bsr_code, payment_date)
+
+    Returns:
+        Tuple of (file name, PDF bytes)
+    """
+    if _template is None:
+        raise RuntimeError("init_worker() must be called before rendering")
+
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+
+    t = _template
+    deductor = t["deductor"]
+    entries = certificate["entries"]
+    start_year = int(certificate["financial_year"].split("-")[0])
+    assessment_year = f"{start_year + 1}-{str(start_year + 2)[-2:]}"
+    total_paid = sum((e["base_amount"] for e in entries), Decimal("0"))
+    total_tds = sum((e["tds_amount"] for e in entries), Decimal("0"))
+
+    elements = [
+        Paragraph("FORM No. 16A", t["title"]),
+        Paragraph(
+            "[See rule 31(1)(b)] Certificate under section 203 of the Income-tax Act, 1961 "
+            "for tax deducted at source", t["subtitle"]
+        ),
+    ]
+
+    info = Table(
+        [
+            ["Deductor", deductor.get("name", ""), "Deductee", certificate["party_name"]],
+            ["Address", Paragraph(escape(deductor.get("address", "")), t["normal"]), "PAN of Deductee", certificate.get("pan") or "PANNOTAVBL"],
+            ["TAN", deductor.get("tan") or "", "Quarter", f"Q{certificate['quarter']}"],
+            ["PAN", deductor.get("pan") or "", "Assessment Year", assessment_year],
+        ],
+        colWidths=[28 * mm, 62 * mm, 32 * mm, 48 * mm],
+    )
+    info.setStyle(t["info"])
+    elements.append(info)
+
+    elements.append(Paragraph("Summary of payment", t["heading"]))
+    summary = [["Invoice No", "Date", "Section", "Amount Paid/Credited", "TDS"]]
+    for e in entries:
+        summary.append([
+            e["invoice_number"], str(e["invoice_date"]), e["tds_section"],
+            _money(e["base_amount"]), _money(e["tds_amount"]),
+        ])
+    summary.append(["Total", "", "", _money(total_paid), _money(total_tds)])
+    table = Table(summary, colWidths=[40 * mm, 25 * mm, 20 * mm, 45 * mm, 40 * mm], repeatRows=1)
+    table.setStyle(t["table"])
+    elements.append(table)
+
+    elements.append(Paragraph("Details of tax deposited through challan", t["heading"]))
+    challans = [["BSR Code", "Date of Deposit", "Challan Serial No", "Tax Deposited"]]
+    for bsr_code, payment_date, challan_number, amount in _challan_rows(entries):
+        challans.append([bsr_code, payment_date, challan_number, _money(amount)])
+    table = Table(challans, colWidths=[35 * mm, 40 * mm, 55 * mm, 40 * mm], repeatRows=1)
+    table.setStyle(t["table"])
+    elements.append(table)
+
+    elements.append(Spacer(1, 8 * mm))
+    elements.append(Paragraph(
+        f"Certified that a sum of Rs. {_money(total_tds)} has been deducted and deposited to the "
+        f"credit of the Central Government as per the challan details above.",
+        t["normal"],
+    ))
+    elements.append(Spacer(1, 12 * mm))
+    elements.append(Paragraph(f"For {escape(deductor.get('name', ''))}", t["normal"]))
+    elements.append(Paragraph("Authorised Signatory", t["normal"]))
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4, invariant=1,
+        leftMargin=20 * mm, rightMargin=20 * mm, topMargin=15 * mm, bottomMargin=15 * mm,
+        title=f"Form 16A {certificate.get('pan') or certificate['party_name']}",
+    )
+    doc.build(elements)
+    return certificate_filename(certificate), buffer.getvalue()
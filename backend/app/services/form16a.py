@@ -0,0 +1,329 @@
+"""
+Form 16A Generation Service
+
+Generates the quarter's TDS certificates for every deductee as a background
+job and writes them into a single ZIP under UPLOAD_DIR/form16a.
+
+- Challan entries are grouped by deductee PAN in one query (json_agg).
+- PDFs are rendered in a process pool; each worker builds the styles,
+  fonts and deductor block once (certificate_pdf.init_worker).
+- Certificates are appended to the ZIP in checkpoints. After each
+  checkpoint the ZIP is closed and its size and contents are recorded in a
+  progress file, so an interrupted job resumes from the last checkpoint
+  instead of starting over.
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, case, literal
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.settings import CompanySettings
+from app.models.tds_challan import TDSChallan, TDSChallanEntry, TDSType
+from app.services.certificate_pdf import init_worker, render_certificate, certificate_filename
+from app.services.ledger_posting import get_company_settings
+from app.services.tds_return_file import QUARTER_MONTHS
+
+logger = logging.getLogger(__name__)
+
+CERTIFICATE_DIR = "form16a"
+
+# In-process job state, keyed by job key
+_jobs: Dict[str, dict] = {}
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+def job_key(financial_year: str, quarter: int, branch_id: Optional[int] = None) -> str:
+    """
+    Example:
+        >>> job_key("2024-2025", 1)
+        '2024-2025_Q1'
+        >>> job_key("2024-2025", 3, 2)
+        '2024-2025_Q3_B2'
+    """
+    key = f"{financial_year}_Q{quarter}"
+    return f"{key}_B{branch_id}" if branch_id else key
+
+
+def _job_paths(key: str) -> Tuple[Path, Path]:
+    directory = Path(settings.UPLOAD_DIR) / CERTIFICATE_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"Form16A_{key}.zip", directory / f"Form16A_{key}.progress.json"
+
+
+def _read_progress(progress_path: Path) -> Optional[dict]:
+    if not progress_path.exists():
+        return None
+    try:
+        return json.loads(progress_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_progress(progress_path: Path, progress: dict) -> None:
+    tmp_path = progress_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(progress, default=str))
+    os.replace(tmp_path, progress_path)
+
+
+def _deductor_block(company: CompanySettings) -> dict:
+    address = ", ".join(
+        part for part in [company.address, company.city, company.state, company.pincode] if part
+    )
+    return {"name": company.company_name, "address": address, "tan": company.tan, "pan": company.pan}
+
+
+async def load_certificates(
+    db: AsyncSession,
+    financial_year: str,
+    quarter: int,
+    branch_id: Optional[int] = None
+) -> List[dict]:
+    """
+    One certificate payload per deductee, grouped by PAN in a single query.
+
+    Entries without a PAN are grouped by party name.
+    """
+    pan = func.coalesce(func.upper(func.trim(TDSChallanEntry.party_pan)), "")
+    name_key = case((pan == "", TDSChallanEntry.party_name), else_=literal(""))
+    entry_json = func.json_build_object(
+        "invoice_number", TDSChallanEntry.invoice_number,
+        "invoice_date", TDSChallanEntry.invoice_date,
+        "tds_section", TDSChallanEntry.tds_section,
+        "base_amount", TDSChallanEntry.base_amount,
+        "tds_amount", TDSChallanEntry.tds_amount,
+        "challan_number", TDSChallan.challan_number,
+        "bsr_code", TDSChallan.bsr_code,
+        "payment_date", TDSChallan.payment_date,
+    )
+    query = (
+        select(
+            pan.label("pan"),
+            func.min(TDSChallanEntry.party_name).label("party_name"),
+            func.json_agg(
+                aggregate_order_by(entry_json, TDSChallanEntry.invoice_date, TDSChallanEntry.id)
+            ).label("entries"),
+        )
+        .join(TDSChallan, TDSChallan.id == TDSChallanEntry.challan_id)
+        .where(TDSChallan.financial_year == financial_year)
+        .where(TDSChallan.tds_type == TDSType.PAYABLE)
+        .where(TDSChallan.month.in_(QUARTER_MONTHS.get(quarter, [])))
+        .group_by(pan, name_key)
+        .order_by(pan, name_key)
+    )
+    if branch_id:
+        query = query.where(TDSChallan.branch_id == branch_id)
+
+    result = await db.execute(query)
+    certificates = []
+    for row in result.all():
+        entries = row.entries
+        if isinstance(entries, str):
+            entries = json.loads(entries, parse_float=Decimal, parse_int=Decimal)
+        else:
+            for entry in entries:
+                entry["base_amount"] = Decimal(str(entry["base_amount"]))
+                entry["tds_amount"] = Decimal(str(entry["tds_amount"]))
+        certificates.append({
+            "pan": row.pan or None,
+            "party_name": row.party_name,
+            "financial_year": financial_year,
+            "quarter": quarter,
+            "entries": entries,
+        })
+    return certificates
+
+
+def _append_to_zip(zip_path: Path, rendered: List[Tuple[str, bytes]]) -> int:
+    """Append rendered certificates and close the ZIP; returns its new size."""
+    mode = "a" if zip_path.exists() and zip_path.stat().st_size > 0 else "w"
+    with zipfile.ZipFile(zip_path, mode, compression=zipfile.ZIP_DEFLATED) as archive:
+        for filename, pdf in rendered:
+            archive.writestr(filename, pdf)
+    return zip_path.stat().st_size
+
+
+def _prepare_zip(zip_path: Path, progress: Optional[dict]) -> set:
+    """
+    Restore the ZIP to its last checkpoint and return the files it holds.
+
+    A crash after the last checkpoint leaves a partially written entry behind
+    the recorded size; truncating drops it and restores the valid central
+    directory written at the checkpoint.
+    """
+    if not progress or not progress.get("done") or not zip_path.exists():
+        if zip_path.exists():
+            zip_path.unlink()
+        return set()
+    with open(zip_path, "r+b") as f:
+        f.truncate(progress["zip_size"])
+    return set(progress["done"])
+
+
+def get_job_status(financial_year: str, quarter: int, branch_id: Optional[int] = None) -> dict:
+    """Status of the certificate job, falling back to the progress file after a restart."""
+    key = job_key(financial_year, quarter, branch_id)
+    if key in _jobs:
+        return dict(_jobs[key])
+
+    zip_path, progress_path = _job_paths(key)
+    progress = _read_progress(progress_path)
+    if not progress:
+        return {
+            "key": key, "financial_year": financial_year, "quarter": quarter,
+            "branch_id": branch_id, "status": "idle", "total": 0, "generated": 0,
+        }
+    return {
+        "key": key,
+        "financial_year": financial_year,
+        "quarter": quarter,
+        "branch_id": branch_id,
+        "status": "completed" if progress.get("completed") else "interrupted",
+        "total": progress.get("total", 0),
+        "generated": len(progress.get("done", [])),
+        "started_at": progress.get("started_at"),
+        "finished_at": progress.get("finished_at"),
+        "file_name": zip_path.name if progress.get("completed") else None,
+    }
+
+
+def get_job_file(financial_year: str, quarter: int, branch_id: Optional[int] = None) -> Optional[Path]:
+    """Path of the completed ZIP, or None if the job has not completed."""
+    key = job_key(financial_year, quarter, branch_id)
+    zip_path, progress_path = _job_paths(key)
+    progress = _read_progress(progress_path)
+    if progress and progress.get("completed") and zip_path.exists():
+        return zip_path
+    return None
+
+
+async def run_certificate_job(
+    financial_year: str,
+    quarter: int,
+    branch_id: Optional[int] = None,
+    restart: bool = False,
+) -> dict:
+    """
+    Generate all certificates of a quarter into the job ZIP.
+
+    Resumes from the last checkpoint unless restart is True.
+    """
+    key = job_key(financial_year, quarter, branch_id)
+    zip_path, progress_path = _job_paths(key)
+    stats = {
+        "key": key,
+        "financial_year": financial_year,
+        "quarter": quarter,
+        "branch_id": branch_id,
+        "status": "running",
+        "total": 0,
+        "generated": 0,
+        "started_at": datetime.utcnow(),
+        "finished_at": None,
+        "file_name": None,
+        "error": None,
+    }
+    _jobs[key] = stats
+
+    try:
+        async with AsyncSessionLocal() as db:
+            company = await get_company_settings(db)
+            certificates = await load_certificates(db, financial_year, quarter, branch_id)
+
+        if restart and progress_path.exists():
+            progress_path.unlink()
+        progress = _read_progress(progress_path)
+        done = await run_in_threadpool(_prepare_zip, zip_path, progress)
+        progress = {
+            "key": key,
+            "total": len(certificates),
+            "done": sorted(done),
+            "zip_size": progress["zip_size"] if done else 0,
+            "started_at": (progress or {}).get("started_at") if done else stats["started_at"],
+            "completed": False,
+        }
+        pending = [c for c in certificates if certificate_filename(c) not in done]
+        stats.update(total=len(certificates), generated=len(certificates) - len(pending))
+
+        if pending:
+            workers = settings.FORM16A_WORKERS or os.cpu_count() or 1
+            pool = ProcessPoolExecutor(
+                max_workers=min(workers, len(pending)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(_deductor_block(company), settings.FORM16A_FONT_PATH or None),
+            )
+            loop = asyncio.get_running_loop()
+            checkpoint = max(settings.FORM16A_CHECKPOINT_SIZE, 1)
+            try:
+                for start in range(0, len(pending), checkpoint):
+                    batch = pending[start:start + checkpoint]
+                    rendered = await asyncio.gather(
+                        *(loop.run_in_executor(pool, render_certificate, c) for c in batch)
+                    )
+                    progress["zip_size"] = await run_in_threadpool(_append_to_zip, zip_path, rendered)
+                    progress["done"].extend(filename for filename, _ in rendered)
+                    await run_in_threadpool(_write_progress, progress_path, progress)
+                    stats["generated"] += len(batch)
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        if not zip_path.exists():
+            await run_in_threadpool(_append_to_zip, zip_path, [])
+
+        progress.update(completed=True, finished_at=datetime.utcnow())
+        await run_in_threadpool(_write_progress, progress_path, progress)
+        stats.update(status="completed", file_name=zip_path.name)
+    except Exception as e:
+        logger.error(f"Form 16A generation failed for {key}: {str(e)}")
+        stats.update(status="failed", error=str(e))
+    finally:
+        stats["finished_at"] = datetime.utcnow()
+
+    return dict(stats)
+
+
+async def start_certificate_job(
+    db: AsyncSession,
+    financial_year: str,
+    quarter: int,
+    branch_id: Optional[int] = None,
+    restart: bool = False,
+) -> dict:
+    """
+    Start the certificate job in the background unless it is already running.
+
+    Raises:
+        ValueError: If the company TAN is not configured or the quarter is invalid
+    """
+    if quarter not in QUARTER_MONTHS:
+        raise ValueError("Quarter must be between 1 and 4")
+    company = await get_company_settings(db)
+    if not company or not company.tan:
+        raise ValueError("Company TAN must be configured to issue TDS certificates")
+
+    key = job_key(financial_year, quarter, branch_id)
+    task = _tasks.get(key)
+    if task is None or task.done():
+        _jobs[key] = {
+            **get_job_status(financial_year, quarter, branch_id),
+            "status": "running",
+            "started_at": datetime.utcnow(),
+        }
+        _tasks[key] = asyncio.create_task(
+            run_certificate_job(financial_year, quarter, branch_id, restart)
+        )
+    return dict(_jobs[key])
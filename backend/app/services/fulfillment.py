@@ -6,19 +6,21 @@ Handles:
 - Creating invoices from billing schedules
 - Updating billing schedule status
 - Updating ClientPO fulfillment amounts
+- Billing runs that invoice every due schedule in one transaction
 """
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, insert, func, case, literal, values, column, Integer
+from sqlalchemy.orm import selectinload, aliased
 
-from app.models.client_po import ClientPO, ClientPOStatus
+from app.models.client_po import ClientPO, ClientPOItem, ClientPOStatus
 from app.models.billing_schedule import BillingSchedule, ScheduleStatus
 from app.models.invoice import Invoice, InvoiceItem, InvoiceType, InvoiceStatus
 from app.models.proforma_invoice import ProformaInvoice, ProformaInvoiceItem, PIStatus
 from app.models.client import Client
-from app.services.number_generator import generate_invoice_number, generate_pi_number
+from app.services.number_generator import generate_invoice_number, generate_pi_number, reserve_invoice_numbers
 
 
 async def update_schedule_status(
@@ -43,40 +45,99 @@ async def update_schedule_status(
     return schedule
 
 
-async def update_po_fulfillment(db: AsyncSession, client_po_id: int) -> ClientPO:
+def _fulfillment_status(invoiced, current_status, total_amount):
+    """PO status for an invoiced amount, as a SQL expression."""
+    status_type = ClientPO.__table__.c.status.type
+    return case(
+        (
+            (invoiced == 0) & current_status.notin_(
+                [ClientPOStatus.DRAFT, ClientPOStatus.CANCELLED, ClientPOStatus.EXPIRED]
+            ),
+            literal(ClientPOStatus.ACTIVE, status_type),
+        ),
+        (invoiced == 0, current_status),
+        (invoiced >= total_amount, literal(ClientPOStatus.COMPLETED, status_type)),
+        else_=literal(ClientPOStatus.PARTIAL, status_type),
+    )
+
+
+async def refresh_po_fulfillment(db: AsyncSession, client_po_ids: Optional[List[int]] = None) -> list:
     """
-    Recalculate and update ClientPO fulfillment amounts.
-    Based on the total amount of linked invoices that are not cancelled.
+    Recalculate ClientPO fulfillment amounts and status in one UPDATE.
+
+    invoiced_amount is the sum of the PO's non-cancelled invoices, summed in
+    a single grouped subquery, and the status is derived from it in SQL:
+    nothing invoiced -> ACTIVE (unless DRAFT/CANCELLED/EXPIRED), fully
+    invoiced -> COMPLETED, otherwise PARTIAL.
+
+    Only POs whose values change are written. With client_po_ids=None every
+    PO is checked, which repairs any drift.
+
+    Returns:
+        One row per corrected PO with its old and new amounts and status
     """
+    if client_po_ids is not None and not client_po_ids:
+        return []
+
+    totals = (
+        select(
+            ClientPO.id.label("client_po_id"),
+            func.coalesce(func.sum(Invoice.total_amount), 0).label("invoiced"),
+        )
+        .outerjoin(
+            Invoice,
+            (Invoice.client_po_id == ClientPO.id) & (Invoice.status != InvoiceStatus.CANCELLED)
+        )
+        .group_by(ClientPO.id)
+    )
+    if client_po_ids is not None:
+        totals = totals.where(ClientPO.id.in_(client_po_ids))
+    totals = totals.subquery("totals")
+
+    old = aliased(ClientPO, name="old")
+    invoiced = totals.c.invoiced
+    remaining = ClientPO.total_amount - invoiced
+    new_status = _fulfillment_status(invoiced, ClientPO.status, ClientPO.total_amount)
+
     result = await db.execute(
-        select(ClientPO)
-        .options(selectinload(ClientPO.invoices))
-        .where(ClientPO.id == client_po_id)
+        update(ClientPO)
+        .where(ClientPO.id == totals.c.client_po_id)
+        .where(old.id == ClientPO.id)
+        .where(
+            ClientPO.invoiced_amount.is_distinct_from(invoiced)
+            | ClientPO.remaining_amount.is_distinct_from(remaining)
+            | ClientPO.status.is_distinct_from(new_status)
+        )
+        .values(
+            invoiced_amount=invoiced,
+            remaining_amount=remaining,
+            status=new_status,
+            updated_at=func.now(),
+        )
+        .returning(
+            ClientPO.id.label("client_po_id"),
+            ClientPO.internal_number,
+            old.invoiced_amount.label("old_invoiced_amount"),
+            ClientPO.invoiced_amount,
+            ClientPO.remaining_amount,
+            old.status.label("old_status"),
+            ClientPO.status,
+        )
+        .execution_options(synchronize_session=False)
     )
-    client_po = result.scalar_one_or_none()
+    return result.all()
 
-    if not client_po:
-        raise ValueError(f"ClientPO {client_po_id} not found")
 
-    # Sum up invoiced amounts from non-cancelled invoices
-    invoiced_amount = Decimal('0')
-    for invoice in client_po.invoices:
-        if invoice.status != InvoiceStatus.CANCELLED:
-            invoiced_amount += invoice.total_amount
-
-    client_po.invoiced_amount = invoiced_amount
-    client_po.remaining_amount = client_po.total_amount - invoiced_amount
-
-    # Update PO status based on fulfillment
-    if invoiced_amount == Decimal('0'):
-        if client_po.status not in [ClientPOStatus.DRAFT, ClientPOStatus.CANCELLED, ClientPOStatus.EXPIRED]:
-            client_po.status = ClientPOStatus.ACTIVE
-    elif invoiced_amount >= client_po.total_amount:
-        client_po.status = ClientPOStatus.COMPLETED
-    else:
-        client_po.status = ClientPOStatus.PARTIAL
+async def update_po_fulfillment(db: AsyncSession, client_po_id: int) -> None:
+    """
+    Recalculate and update ClientPO fulfillment amounts.
+    Based on the total amount of linked invoices that are not cancelled.
+    """
+    result = await db.execute(select(ClientPO.id).where(ClientPO.id == client_po_id))
+    if result.scalar_one_or_none() is None:
+        raise ValueError(f"ClientPO {client_po_id} not found")
 
-    return client_po
+    await refresh_po_fulfillment(db, [client_po_id])
 
 
 async def create_invoice_from_schedule(
@@ -300,6 +361,7 @@ async def create_pi_from_schedule(
         client_id=client_po.client_id,
         branch_id=client_po.branch_id,
         bank_account_id=bank_account_id,
+        client_po_id=client_po.id,
         billing_schedule_id=schedule.id,
         place_of_supply=client_po.place_of_supply or "",
         place_of_supply_code=client_po.place_of_supply_code or "",
@@ -361,3 +423,396 @@ async def create_pi_from_schedule(
     schedule.proforma_invoice_id = pi.id
 
     return pi
+
+
+# PO statuses whose due schedules are picked up by a billing run
+BILLABLE_PO_STATUSES = [ClientPOStatus.ACTIVE, ClientPOStatus.PARTIAL]
+
+
+def _split_gst(gst_amount: Decimal, is_igst: bool):
+    """Split GST into (cgst, sgst, igst), keeping cgst + sgst equal to the total."""
+    if is_igst:
+        return Decimal('0'), Decimal('0'), gst_amount
+    cgst_amount = (gst_amount / 2).quantize(Decimal('0.01'))
+    return cgst_amount, gst_amount - cgst_amount, Decimal('0')
+
+
+async def get_due_schedules(
+    db: AsyncSession,
+    run_date: date,
+    client_id: Optional[int] = None,
+    branch_id: Optional[int] = None,
+    client_po_ids: Optional[List[int]] = None,
+    lock: bool = False,
+) -> list:
+    """
+    Pending schedules due on or before run_date, with the PO fields needed to
+    invoice them, in one query.
+
+    With lock=True the schedule rows are locked for the rest of the
+    transaction; rows locked by a concurrent run are skipped.
+    """
+    first_hsn = (
+        select(ClientPOItem.hsn_sac)
+        .where(ClientPOItem.client_po_id == ClientPO.id)
+        .order_by(ClientPOItem.serial_no, ClientPOItem.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    query = (
+        select(
+            BillingSchedule.id,
+            BillingSchedule.installment_number,
+            BillingSchedule.description,
+            BillingSchedule.due_date,
+            BillingSchedule.amount,
+            BillingSchedule.gst_amount,
+            BillingSchedule.total_amount,
+            BillingSchedule.notes,
+            ClientPO.id.label("client_po_id"),
+            ClientPO.internal_number,
+            ClientPO.subject,
+            ClientPO.client_id,
+            ClientPO.branch_id,
+            ClientPO.place_of_supply,
+            ClientPO.place_of_supply_code,
+            ClientPO.is_igst,
+            Client.name.label("client_name"),
+            first_hsn.label("hsn_sac"),
+        )
+        .join(ClientPO, ClientPO.id == BillingSchedule.client_po_id)
+        .join(Client, Client.id == ClientPO.client_id)
+        .where(BillingSchedule.status == ScheduleStatus.PENDING)
+        .where(BillingSchedule.due_date <= run_date)
+        .where(ClientPO.status.in_(BILLABLE_PO_STATUSES))
+        .order_by(BillingSchedule.due_date, ClientPO.id, BillingSchedule.installment_number)
+    )
+    if client_id:
+        query = query.where(ClientPO.client_id == client_id)
+    if branch_id:
+        query = query.where(ClientPO.branch_id == branch_id)
+    if client_po_ids:
+        query = query.where(ClientPO.id.in_(client_po_ids))
+    if lock:
+        query = query.with_for_update(of=BillingSchedule, skip_locked=True)
+
+    result = await db.execute(query)
+    return result.all()
+
+
+async def run_billing(
+    db: AsyncSession,
+    run_date: date,
+    invoice_date: date = None,
+    due_date: date = None,
+    bank_account_id: int = None,
+    client_id: int = None,
+    branch_id: int = None,
+    client_po_ids: List[int] = None,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Invoice every pending billing schedule due on or before run_date.
+
+    This will:
+    1. Select the due schedules with their PO details in one query
+    2. Reserve a block of invoice numbers
+    3. Insert the invoices and their items in bulk
+    4. Mark the schedules INVOICED with one UPDATE
+    5. Recalculate fulfillment for the affected POs with one UPDATE
+
+    With dry_run the schedules are only listed; nothing is written.
+    The caller commits.
+    """
+    schedules = await get_due_schedules(
+        db, run_date, client_id, branch_id, client_po_ids, lock=not dry_run
+    )
+    items = [
+        {
+            "schedule_id": s.id,
+            "client_po_id": s.client_po_id,
+            "client_po_internal_number": s.internal_number,
+            "client_name": s.client_name,
+            "installment_number": s.installment_number,
+            "description": s.description,
+            "due_date": s.due_date,
+            "amount": s.amount,
+            "gst_amount": s.gst_amount,
+            "total_amount": s.total_amount,
+            "invoice_id": None,
+            "invoice_number": None,
+        }
+        for s in schedules
+    ]
+    summary = {
+        "dry_run": dry_run,
+        "run_date": run_date,
+        "schedule_count": len(schedules),
+        "po_count": len({s.client_po_id for s in schedules}),
+        "amount": sum((s.amount for s in schedules), Decimal('0')),
+        "gst_amount": sum((s.gst_amount for s in schedules), Decimal('0')),
+        "total_amount": sum((s.total_amount for s in schedules), Decimal('0')),
+        "items": items,
+    }
+    if dry_run or not schedules:
+        return summary
+
+    if invoice_date is None:
+        invoice_date = date.today()
+    invoice_numbers = await reserve_invoice_numbers(db, InvoiceType.SALES.value, len(schedules))
+    now = datetime.utcnow()
+
+    invoice_rows = []
+    for s, invoice_number in zip(schedules, invoice_numbers):
+        cgst_amount, sgst_amount, igst_amount = _split_gst(s.gst_amount, s.is_igst)
+        invoice_rows.append({
+            "invoice_number": invoice_number,
+            "invoice_date": invoice_date,
+            "invoice_type": InvoiceType.SALES,
+            "client_id": s.client_id,
+            "branch_id": s.branch_id,
+            "bank_account_id": bank_account_id,
+            "client_po_id": s.client_po_id,
+            "billing_schedule_id": s.id,
+            "place_of_supply": s.place_of_supply or "",
+            "place_of_supply_code": s.place_of_supply_code or "",
+            "is_igst": s.is_igst,
+            "reverse_charge": False,
+            "subtotal": s.amount,
+            "discount_percent": Decimal('0'),
+            "discount_amount": Decimal('0'),
+            "taxable_amount": s.amount,
+            "cgst_amount": cgst_amount,
+            "sgst_amount": sgst_amount,
+            "igst_amount": igst_amount,
+            "cess_amount": Decimal('0'),
+            "round_off": Decimal('0'),
+            "total_amount": s.total_amount,
+            "tds_applicable": False,
+            "tds_rate": Decimal('0'),
+            "tds_amount": Decimal('0'),
+            "tcs_applicable": False,
+            "tcs_rate": Decimal('0'),
+            "tcs_amount": Decimal('0'),
+            "amount_after_tds": s.total_amount,
+            "amount_due": s.total_amount,
+            "amount_paid": Decimal('0'),
+            "due_date": due_date or s.due_date,
+            "notes": s.notes,
+            "status": InvoiceStatus.DRAFT,
+            "is_posted": False,
+            "created_at": now,
+            "updated_at": now,
+        })
+    result = await db.execute(
+        insert(Invoice).returning(Invoice.id, sort_by_parameter_order=True),
+        invoice_rows,
+    )
+    invoice_ids = list(result.scalars().all())
+
+    item_rows = []
+    for s, row, invoice_id in zip(schedules, invoice_rows, invoice_ids):
+        if s.amount > 0:
+            gst_rate = (s.gst_amount / s.amount * 100).quantize(Decimal('0.01'))
+        else:
+            gst_rate = Decimal('18')
+        item_rows.append({
+            "invoice_id": invoice_id,
+            "serial_no": 1,
+            "description": s.description or f"Invoice for {s.subject or s.internal_number}",
+            "hsn_sac": s.hsn_sac,
+            "quantity": Decimal('1'),
+            "unit": "NOS",
+            "rate": s.amount,
+            "amount": s.amount,
+            "discount_percent": Decimal('0'),
+            "discount_amount": Decimal('0'),
+            "taxable_amount": s.amount,
+            "gst_rate": gst_rate,
+            "cgst_rate": gst_rate / 2 if not s.is_igst else Decimal('0'),
+            "cgst_amount": row["cgst_amount"],
+            "sgst_rate": gst_rate / 2 if not s.is_igst else Decimal('0'),
+            "sgst_amount": row["sgst_amount"],
+            "igst_rate": gst_rate if s.is_igst else Decimal('0'),
+            "igst_amount": row["igst_amount"],
+            "cess_rate": Decimal('0'),
+            "cess_amount": Decimal('0'),
+            "total_amount": s.total_amount,
+            "created_at": now,
+            "updated_at": now,
+        })
+    await db.execute(insert(InvoiceItem), item_rows)
+
+    invoiced = values(
+        column("schedule_id", Integer),
+        column("invoice_id", Integer),
+        name="invoiced",
+    ).data([(s.id, invoice_id) for s, invoice_id in zip(schedules, invoice_ids)])
+    await db.execute(
+        update(BillingSchedule)
+        .where(BillingSchedule.id == invoiced.c.schedule_id)
+        .values(
+            status=ScheduleStatus.INVOICED,
+            invoice_id=invoiced.c.invoice_id,
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    await refresh_po_fulfillment(db, sorted({s.client_po_id for s in schedules}))
+
+    for item, invoice_id, invoice_number in zip(items, invoice_ids, invoice_numbers):
+        item["invoice_id"] = invoice_id
+        item["invoice_number"] = invoice_number
+    return summary
+
+
+# PI statuses that can still be converted to an invoice
+CONVERTIBLE_PI_STATUSES = [PIStatus.DRAFT, PIStatus.SENT]
+
+# Columns copied from proforma_invoice_items to invoice_items
+PI_ITEM_COLUMNS = [
+    "item_id", "serial_no", "description", "hsn_sac", "quantity", "unit", "rate",
+    "amount", "discount_percent", "discount_amount", "taxable_amount", "gst_rate",
+    "cgst_rate", "cgst_amount", "sgst_rate", "sgst_amount", "igst_rate",
+    "igst_amount", "cess_rate", "cess_amount", "total_amount",
+]
+
+
+async def convert_pis_to_invoices(
+    db: AsyncSession,
+    pi_ids: List[int],
+    invoice_date: date = None,
+) -> dict:
+    """
+    Convert many Proforma Invoices to SALES invoices in one transaction.
+
+    This will:
+    1. Lock the convertible PIs (DRAFT or SENT) in one query
+    2. Reserve a block of invoice numbers and insert the invoice headers
+    3. Copy all PI items with one INSERT ... SELECT
+    4. Mark the PIs GENERATED and their schedules INVOICED with one UPDATE each
+    5. Recalculate fulfillment for the affected POs
+
+    The caller commits.
+
+    Returns:
+        Mapping of PI id to (invoice_id, invoice_number), or to an error message
+    """
+    result = await db.execute(
+        select(ProformaInvoice, BillingSchedule.client_po_id.label("schedule_po_id"))
+        .outerjoin(BillingSchedule, BillingSchedule.id == ProformaInvoice.billing_schedule_id)
+        .where(ProformaInvoice.id.in_(pi_ids))
+        .order_by(ProformaInvoice.id)
+        .with_for_update(of=ProformaInvoice)
+    )
+    found = {pi.id: (pi, schedule_po_id) for pi, schedule_po_id in result.all()}
+
+    outcome = {}
+    pis = []
+    for pi_id in pi_ids:
+        if pi_id not in found:
+            outcome[pi_id] = "Proforma Invoice not found"
+        elif found[pi_id][0].status not in CONVERTIBLE_PI_STATUSES:
+            outcome[pi_id] = f"Cannot generate invoice from a PI in {found[pi_id][0].status.value} status"
+        elif pi_id not in outcome:
+            outcome[pi_id] = None
+            pis.append(found[pi_id])
+    if not pis:
+        return outcome
+
+    if invoice_date is None:
+        invoice_date = date.today()
+    invoice_numbers = await reserve_invoice_numbers(db, InvoiceType.SALES.value, len(pis))
+    now = datetime.utcnow()
+
+    result = await db.execute(
+        insert(Invoice).returning(Invoice.id, sort_by_parameter_order=True),
+        [
+            {
+                "invoice_number": invoice_number,
+                "invoice_date": invoice_date,
+                "invoice_type": InvoiceType.SALES,
+                "client_id": pi.client_id,
+                "branch_id": pi.branch_id,
+                "bank_account_id": pi.bank_account_id,
+                "client_po_id": pi.client_po_id or schedule_po_id,
+                "billing_schedule_id": pi.billing_schedule_id,
+                "place_of_supply": pi.place_of_supply,
+                "place_of_supply_code": pi.place_of_supply_code,
+                "is_igst": pi.is_igst,
+                "reverse_charge": pi.reverse_charge,
+                "subtotal": pi.subtotal,
+                "discount_percent": pi.discount_percent,
+                "discount_amount": pi.discount_amount,
+                "taxable_amount": pi.taxable_amount,
+                "cgst_amount": pi.cgst_amount,
+                "sgst_amount": pi.sgst_amount,
+                "igst_amount": pi.igst_amount,
+                "cess_amount": pi.cess_amount,
+                "round_off": pi.round_off,
+                "total_amount": pi.total_amount,
+                "tds_applicable": pi.tds_applicable,
+                "tds_section": pi.tds_section,
+                "tds_rate": pi.tds_rate,
+                "tds_amount": pi.tds_amount,
+                "tcs_applicable": pi.tcs_applicable,
+                "tcs_rate": pi.tcs_rate,
+                "tcs_amount": pi.tcs_amount,
+                "amount_after_tds": pi.amount_after_tds,
+                "amount_due": pi.amount_after_tds,
+                "amount_paid": Decimal('0'),
+                "due_date": pi.due_date,
+                "status": InvoiceStatus.DRAFT,
+                "is_posted": False,
+                "notes": pi.notes,
+                "terms_conditions": pi.terms_conditions,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for (pi, schedule_po_id), invoice_number in zip(pis, invoice_numbers)
+        ],
+    )
+    invoice_ids = list(result.scalars().all())
+
+    converted = values(
+        column("pi_id", Integer),
+        column("invoice_id", Integer),
+        column("schedule_id", Integer),
+        name="converted",
+    ).data([(pi.id, invoice_id, pi.billing_schedule_id) for (pi, _), invoice_id in zip(pis, invoice_ids)])
+
+    item_table = ProformaInvoiceItem.__table__
+    copied = [
+        func.left(item_table.c.item_name, InvoiceItem.__table__.c.item_name.type.length)
+    ] + [item_table.c[name] for name in PI_ITEM_COLUMNS]
+    await db.execute(
+        insert(InvoiceItem).from_select(
+            ["invoice_id", "item_name", *PI_ITEM_COLUMNS, "created_at", "updated_at"],
+            select(converted.c.invoice_id, *copied, func.now(), func.now())
+            .select_from(item_table)
+            .join(converted, converted.c.pi_id == item_table.c.proforma_invoice_id)
+            .order_by(item_table.c.proforma_invoice_id, item_table.c.serial_no),
+        )
+    )
+
+    await db.execute(
+        update(ProformaInvoice)
+        .where(ProformaInvoice.id == converted.c.pi_id)
+        .values(status=PIStatus.GENERATED, invoice_id=converted.c.invoice_id, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(BillingSchedule)
+        .where(BillingSchedule.id == converted.c.schedule_id)
+        .values(status=ScheduleStatus.INVOICED, invoice_id=converted.c.invoice_id, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+    await refresh_po_fulfillment(
+        db, sorted({pi.client_po_id or schedule_po_id for pi, schedule_po_id in pis} - {None})
+    )
+
+    for (pi, _), invoice_id, invoice_number in zip(pis, invoice_ids, invoice_numbers):
+        outcome[pi.id] = (invoice_id, invoice_number)
+    return outcome
@@ -1,8 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from decimal import Decimal
 from datetime import date
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from app.models.ledger import LedgerEntry, ReferenceType
 from app.models.invoice import Invoice, InvoiceType
@@ -79,9 +79,14 @@ async def get_company_settings(db: AsyncSession) -> Optional[CompanySettings]:
     return result.scalar_one_or_none()
 
 
-async def post_sales_invoice(db: AsyncSession, invoice: Invoice, settings: CompanySettings) -> List[LedgerEntry]:
+def build_sales_invoice_entries(
+    invoice: Invoice,
+    settings: CompanySettings,
+    voucher_number: str,
+    financial_year: str
+) -> List[LedgerEntry]:
     """
-    Create ledger entries for a sales invoice.
+    Build ledger entries for a sales invoice without adding them to a session.
 
     Double Entry:
     - Debit: Accounts Receivable (Customer owes money)
@@ -94,10 +99,6 @@ async def post_sales_invoice(db: AsyncSession, invoice: Invoice, settings: Compa
     """
     entries: List[LedgerEntry] = []
 
-    fy_start = settings.financial_year_start_month or 4
-    financial_year = get_financial_year(invoice.invoice_date, fy_start)
-    voucher_number = await generate_voucher_number(db, ReferenceType.INVOICE, financial_year)
-
     common_fields = {
         "entry_date": invoice.invoice_date,
         "voucher_number": voucher_number,
@@ -185,6 +186,16 @@ async def post_sales_invoice(db: AsyncSession, invoice: Invoice, settings: Compa
                 narration=f"Sales Invoice {invoice.invoice_number} - Round off"
             ))
 
+    return entries
+
+
+async def post_sales_invoice(db: AsyncSession, invoice: Invoice, settings: CompanySettings) -> List[LedgerEntry]:
+    """Create and add ledger entries for a sales invoice."""
+    fy_start = settings.financial_year_start_month or 4
+    financial_year = get_financial_year(invoice.invoice_date, fy_start)
+    voucher_number = await generate_voucher_number(db, ReferenceType.INVOICE, financial_year)
+
+    entries = build_sales_invoice_entries(invoice, settings, voucher_number, financial_year)
     for entry in entries:
         db.add(entry)
 
@@ -193,9 +204,14 @@ async def post_sales_invoice(db: AsyncSession, invoice: Invoice, settings: Compa
     return entries
 
 
-async def post_purchase_invoice(db: AsyncSession, invoice: Invoice, settings: CompanySettings) -> List[LedgerEntry]:
+def build_purchase_invoice_entries(
+    invoice: Invoice,
+    settings: CompanySettings,
+    voucher_number: str,
+    financial_year: str
+) -> List[LedgerEntry]:
     """
-    Create ledger entries for a purchase invoice.
+    Build ledger entries for a purchase invoice without adding them to a session.
 
     Double Entry:
     - Debit: Purchase Expense
@@ -207,10 +223,6 @@ async def post_purchase_invoice(db: AsyncSession, invoice: Invoice, settings: Co
     """
     entries: List[LedgerEntry] = []
 
-    fy_start = settings.financial_year_start_month or 4
-    financial_year = get_financial_year(invoice.invoice_date, fy_start)
-    voucher_number = await generate_voucher_number(db, ReferenceType.INVOICE, financial_year)
-
     common_fields = {
         "entry_date": invoice.invoice_date,
         "voucher_number": voucher_number,
@@ -298,6 +310,16 @@ async def post_purchase_invoice(db: AsyncSession, invoice: Invoice, settings: Co
                 narration=f"Purchase Invoice {invoice.invoice_number} - Round off"
             ))
 
+    return entries
+
+
+async def post_purchase_invoice(db: AsyncSession, invoice: Invoice, settings: CompanySettings) -> List[LedgerEntry]:
+    """Create and add ledger entries for a purchase invoice."""
+    fy_start = settings.financial_year_start_month or 4
+    financial_year = get_financial_year(invoice.invoice_date, fy_start)
+    voucher_number = await generate_voucher_number(db, ReferenceType.INVOICE, financial_year)
+
+    entries = build_purchase_invoice_entries(invoice, settings, voucher_number, financial_year)
     for entry in entries:
         db.add(entry)
 
@@ -306,25 +328,28 @@ async def post_purchase_invoice(db: AsyncSession, invoice: Invoice, settings: Co
     return entries
 
 
-async def post_invoice(db: AsyncSession, invoice: Invoice, settings: CompanySettings) -> List[LedgerEntry]:
+def build_invoice_entries(
+    invoice: Invoice,
+    settings: CompanySettings,
+    voucher_number: str,
+    financial_year: str
+) -> List[LedgerEntry]:
     """
-    Post ledger entries for an invoice based on its type.
+    Build ledger entries for an invoice based on its type.
+    Credit and debit notes mirror the sales and purchase entries with sides swapped.
     """
-    if invoice.is_posted:
-        raise ValueError(f"Invoice {invoice.invoice_number} is already posted")
-
     if invoice.invoice_type == InvoiceType.SALES:
-        return await post_sales_invoice(db, invoice, settings)
+        return build_sales_invoice_entries(invoice, settings, voucher_number, financial_year)
     elif invoice.invoice_type == InvoiceType.PURCHASE:
-        return await post_purchase_invoice(db, invoice, settings)
+        return build_purchase_invoice_entries(invoice, settings, voucher_number, financial_year)
     elif invoice.invoice_type == InvoiceType.CREDIT_NOTE:
-        entries = await post_sales_invoice(db, invoice, settings)
+        entries = build_sales_invoice_entries(invoice, settings, voucher_number, financial_year)
         for entry in entries:
             entry.debit, entry.credit = entry.credit, entry.debit
             entry.narration = entry.narration.replace("Sales Invoice", "Credit Note")
         return entries
     elif invoice.invoice_type == InvoiceType.DEBIT_NOTE:
-        entries = await post_purchase_invoice(db, invoice, settings)
+        entries = build_purchase_invoice_entries(invoice, settings, voucher_number, financial_year)
         for entry in entries:
             entry.debit, entry.credit = entry.credit, entry.debit
             entry.narration = entry.narration.replace("Purchase Invoice", "Debit Note")
@@ -333,6 +358,96 @@ async def post_invoice(db: AsyncSession, invoice: Invoice, settings: CompanySett
         raise ValueError(f"Unknown invoice type: {invoice.invoice_type}")
 
 
+async def post_invoice(db: AsyncSession, invoice: Invoice, settings: CompanySettings) -> List[LedgerEntry]:
+    """
+    Post ledger entries for an invoice based on its type.
+    """
+    if invoice.is_posted:
+        raise ValueError(f"Invoice {invoice.invoice_number} is already posted")
+
+    fy_start = settings.financial_year_start_month or 4
+    financial_year = get_financial_year(invoice.invoice_date, fy_start)
+    voucher_number = await generate_voucher_number(db, ReferenceType.INVOICE, financial_year)
+
+    entries = build_invoice_entries(invoice, settings, voucher_number, financial_year)
+    for entry in entries:
+        db.add(entry)
+
+    invoice.is_posted = True
+
+    return entries
+
+
+async def _get_entry_counts_by_year(
+    db: AsyncSession,
+    reference_type: ReferenceType,
+    financial_years: List[str]
+) -> Dict[str, int]:
+    """Count existing ledger entries per financial year for a reference type in one query."""
+    result = await db.execute(
+        select(LedgerEntry.financial_year, func.count())
+        .where(
+            LedgerEntry.reference_type == reference_type,
+            LedgerEntry.financial_year.in_(financial_years)
+        )
+        .group_by(LedgerEntry.financial_year)
+    )
+    counts = {fy: 0 for fy in financial_years}
+    counts.update({fy: count for fy, count in result.all()})
+    return counts
+
+
+async def post_invoices_bulk(
+    db: AsyncSession,
+    invoices: List[Invoice],
+    settings: CompanySettings
+) -> Dict[int, str]:
+    """
+    Post ledger entries for many invoices in one pass.
+
+    Voucher numbers are allocated from a single count per financial year and
+    advanced in memory, matching what posting the invoices one at a time would
+    produce. All entries are inserted in one flush and `is_posted` is set with
+    a single UPDATE.
+
+    Returns:
+        Dict of invoice id -> voucher number for the invoices posted
+    """
+    fy_start = settings.financial_year_start_month or 4
+    invoices = [inv for inv in invoices if not inv.is_posted]
+    if not invoices:
+        return {}
+
+    fy_by_invoice = {inv.id: get_financial_year(inv.invoice_date, fy_start) for inv in invoices}
+    counts = await _get_entry_counts_by_year(
+        db, ReferenceType.INVOICE, sorted(set(fy_by_invoice.values()))
+    )
+
+    vouchers: Dict[int, str] = {}
+    all_entries: List[LedgerEntry] = []
+    for invoice in sorted(invoices, key=lambda inv: (inv.invoice_date, inv.id)):
+        financial_year = fy_by_invoice[invoice.id]
+        voucher_number = f"INV/{financial_year}/{counts[financial_year] + 1:04d}"
+        entries = build_invoice_entries(invoice, settings, voucher_number, financial_year)
+        counts[financial_year] += len(entries)
+        all_entries.extend(entries)
+        vouchers[invoice.id] = voucher_number
+
+    db.add_all(all_entries)
+    await db.flush()
+
+    await db.execute(
+        update(Invoice)
+        .where(Invoice.id.in_(list(vouchers.keys())))
+        .values(is_posted=True)
+        .execution_options(synchronize_session=False)
+    )
+    for invoice in invoices:
+        invoice.is_posted = True
+
+    return vouchers
+
+
 async def post_receipt(db: AsyncSession, payment: Payment, settings: CompanySettings) -> List[LedgerEntry]:
     """
     Create ledger entries for a receipt (money received from client).
@@ -529,6 +644,82 @@ async def reverse_invoice_posting(db: AsyncSession, invoice: Invoice, settings:
     return reversal_entries
 
 
+async def reverse_invoice_postings_bulk(
+    db: AsyncSession,
+    invoices: List[Invoice],
+    settings: CompanySettings
+) -> Dict[int, str]:
+    """
+    Reverse ledger entries for many invoices in one pass (for bulk cancellation).
+
+    Original entries are loaded with a single query and reversal vouchers are
+    numbered the same way as `post_invoices_bulk`.
+
+    Returns:
+        Dict of invoice id -> reversal voucher number
+    """
+    fy_start = settings.financial_year_start_month or 4
+    invoices = [inv for inv in invoices if inv.is_posted]
+    if not invoices:
+        return {}
+
+    result = await db.execute(
+        select(LedgerEntry)
+        .where(
+            LedgerEntry.reference_type == ReferenceType.INVOICE,
+            LedgerEntry.reference_id.in_([inv.id for inv in invoices])
+        )
+        .order_by(LedgerEntry.id)
+    )
+    originals_by_invoice: Dict[int, List[LedgerEntry]] = {}
+    for entry in result.scalars().all():
+        originals_by_invoice.setdefault(entry.reference_id, []).append(entry)
+
+    fy_by_invoice = {inv.id: get_financial_year(inv.invoice_date, fy_start) for inv in invoices}
+    counts = await _get_entry_counts_by_year(
+        db, ReferenceType.INVOICE, sorted(set(fy_by_invoice.values()))
+    )
+
+    today = date.today()
+    vouchers: Dict[int, str] = {}
+    reversal_entries: List[LedgerEntry] = []
+    for invoice in sorted(invoices, key=lambda inv: (inv.invoice_date, inv.id)):
+        financial_year = fy_by_invoice[invoice.id]
+        voucher_number = f"INV/{financial_year}/{counts[financial_year] + 1:04d}"
+        originals = originals_by_invoice.get(invoice.id, [])
+        for entry in originals:
+            reversal_entries.append(LedgerEntry(
+                entry_date=today,
+                voucher_number=voucher_number,
+                account_id=entry.account_id,
+                debit=entry.credit,
+                credit=entry.debit,
+                reference_type=ReferenceType.INVOICE,
+                reference_id=invoice.id,
+                narration=f"Reversal: {entry.narration}",
+                client_id=entry.client_id,
+                vendor_id=entry.vendor_id,
+                branch_id=entry.branch_id,
+                financial_year=financial_year
+            ))
+        counts[financial_year] += len(originals)
+        vouchers[invoice.id] = voucher_number
+
+    db.add_all(reversal_entries)
+    await db.flush()
+
+    await db.execute(
+        update(Invoice)
+        .where(Invoice.id.in_(list(vouchers.keys())))
+        .values(is_posted=False)
+        .execution_options(synchronize_session=False)
+    )
+    for invoice in invoices:
+        invoice.is_posted = False
+
+    return vouchers
+
+
 async def reverse_payment_posting(db: AsyncSession, payment: Payment, settings: CompanySettings) -> List[LedgerEntry]:
     """
     Reverse ledger entries for a payment (for cancellation).
@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, cast, Integer
+from sqlalchemy import select, func, cast, Integer, text
 
 from app.models.purchase_order import PurchaseOrder
 from app.models.invoice import Invoice
@@ -44,19 +45,22 @@ async def generate_po_number(db: AsyncSession) -> str:
     return f"{prefix}{str(max_num + 1).zfill(4)}"
 
 
-async def generate_invoice_number(db: AsyncSession, invoice_type: str) -> str:
-    """Generate unique invoice number."""
+def _invoice_prefix(invoice_type: str) -> str:
+    """Number prefix for an invoice type in the current financial year."""
     fy = get_financial_year()
 
     if invoice_type == "SALES":
-        prefix = f"INV/{fy}/"
+        return f"INV/{fy}/"
     elif invoice_type == "PURCHASE":
-        prefix = f"BILL/{fy}/"
+        return f"BILL/{fy}/"
     elif invoice_type == "CREDIT_NOTE":
-        prefix = f"CN/{fy}/"
-    else:
-        prefix = f"DN/{fy}/"
+        return f"CN/{fy}/"
+    return f"DN/{fy}/"
+
 
+async def generate_invoice_number(db: AsyncSession, invoice_type: str) -> str:
+    """Generate unique invoice number."""
+    prefix = _invoice_prefix(invoice_type)
     prefix_len = len(prefix)
 
     # Get max sequence number by extracting numeric part
@@ -146,6 +150,50 @@ async def generate_expense_number(db: AsyncSession) -> str:
     return f"{prefix}{str(max_num + 1).zfill(4)}"
 
 
+async def reserve_expense_numbers(db: AsyncSession, count: int) -> List[str]:
+    """
+    Reserve a block of consecutive cash expense numbers for a bulk insert.
+
+    A transaction-scoped advisory lock on the prefix serializes concurrent
+    reservations, so the block stays unique until the caller commits.
+    """
+    fy = get_financial_year()
+    prefix = f"EXP/{fy}/"
+    max_num = await _lock_and_get_max(db, CashExpense.expense_number, prefix)
+    return [f"{prefix}{str(max_num + i).zfill(4)}" for i in range(1, count + 1)]
+
+
+async def reserve_invoice_numbers(db: AsyncSession, invoice_type: str, count: int) -> List[str]:
+    """
+    Reserve a block of consecutive invoice numbers for a bulk insert.
+
+    Uses the same advisory lock as reserve_expense_numbers, keyed on the
+    invoice prefix.
+    """
+    prefix = _invoice_prefix(invoice_type)
+    max_num = await _lock_and_get_max(db, Invoice.invoice_number, prefix)
+    return [f"{prefix}{str(max_num + i).zfill(4)}" for i in range(1, count + 1)]
+
+
+async def _lock_and_get_max(db: AsyncSession, number_column, prefix: str) -> int:
+    """Take an advisory lock for a number prefix and return its current max sequence."""
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+        {"key": prefix}
+    )
+    result = await db.execute(
+        select(
+            func.max(
+                cast(
+                    func.substr(number_column, len(prefix) + 1),
+                    Integer
+                )
+            )
+        ).where(number_column.like(f"{prefix}%"))
+    )
+    return result.scalar() or 0
+
+
 async def generate_client_po_number(db: AsyncSession) -> str:
     """Generate unique Client PO internal number (CPO/2024-25/0001)."""
     fy = get_financial_year()
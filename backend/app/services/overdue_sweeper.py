@@ -0,0 +1,178 @@
+"""
+Overdue Sweeper Service
+
+Periodically moves documents whose due/validity date has passed into their
+expired state using set-based UPDATE statements:
+- Invoices in SENT/PARTIAL past due_date -> OVERDUE
+- Proforma invoices in DRAFT/SENT past valid_until -> EXPIRED
+- Client POs in DRAFT/ACTIVE/PARTIAL past valid_until -> EXPIRED
+
+Invoices are swept in id-range batches, each committed separately, so row
+locks are held only for a single batch at a time.
+"""
+import asyncio
+import logging
+import time
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.proforma_invoice import ProformaInvoice, PIStatus
+from app.models.client_po import ClientPO, ClientPOStatus
+
+logger = logging.getLogger(__name__)
+
+OVERDUE_FROM_STATUSES = [InvoiceStatus.SENT, InvoiceStatus.PARTIAL]
+PI_EXPIRABLE_STATUSES = [PIStatus.DRAFT, PIStatus.SENT]
+PO_EXPIRABLE_STATUSES = [ClientPOStatus.DRAFT, ClientPOStatus.ACTIVE, ClientPOStatus.PARTIAL]
+
+# Stats of the most recent sweep, exposed through the system endpoints
+_last_run: dict = {
+    "started_at": None,
+    "finished_at": None,
+    "as_of_date": None,
+    "duration_ms": None,
+    "invoices_marked_overdue": 0,
+    "invoice_batches": 0,
+    "proforma_invoices_expired": 0,
+    "client_pos_expired": 0,
+    "error": None,
+}
+_sweep_lock = asyncio.Lock()
+
+
+def get_last_run_stats() -> dict:
+    """Get statistics of the most recent sweep."""
+    return dict(_last_run)
+
+
+async def sweep_overdue_invoices(
+    db: AsyncSession,
+    as_of_date: date,
+    batch_size: int = 5000
+) -> tuple:
+    """
+    Mark SENT/PARTIAL invoices past their due date as OVERDUE.
+
+    Walks the candidate id range in batches of `batch_size` ids and commits
+    after each batch.
+
+    Returns:
+        Tuple of (invoices_updated, batches_run)
+    """
+    candidate_filter = (
+        (Invoice.due_date < as_of_date) &
+        (Invoice.status.in_(OVERDUE_FROM_STATUSES))
+    )
+
+    bounds = await db.execute(
+        select(func.min(Invoice.id), func.max(Invoice.id)).where(candidate_filter)
+    )
+    min_id, max_id = bounds.one()
+    if min_id is None:
+        return 0, 0
+
+    updated = 0
+    batches = 0
+    lower = min_id
+    while lower <= max_id:
+        upper = lower + batch_size
+        result = await db.execute(
+            update(Invoice)
+            .where(candidate_filter)
+            .where(Invoice.id >= lower)
+            .where(Invoice.id < upper)
+            .values(status=InvoiceStatus.OVERDUE)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        updated += result.rowcount or 0
+        batches += 1
+        lower = upper
+
+    return updated, batches
+
+
+async def expire_proforma_invoices(db: AsyncSession, as_of_date: date) -> int:
+    """Mark DRAFT/SENT proforma invoices past valid_until as EXPIRED."""
+    result = await db.execute(
+        update(ProformaInvoice)
+        .where(ProformaInvoice.valid_until < as_of_date)
+        .where(ProformaInvoice.status.in_(PI_EXPIRABLE_STATUSES))
+        .values(status=PIStatus.EXPIRED)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount or 0
+
+
+async def expire_client_pos(db: AsyncSession, as_of_date: date) -> int:
+    """Mark open Client POs past valid_until as EXPIRED."""
+    result = await db.execute(
+        update(ClientPO)
+        .where(ClientPO.valid_until < as_of_date)
+        .where(ClientPO.status.in_(PO_EXPIRABLE_STATUSES))
+        .values(status=ClientPOStatus.EXPIRED)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount or 0
+
+
+async def run_sweep(as_of_date: Optional[date] = None) -> dict:
+    """
+    Run a full sweep in its own session and record the stats.
+    Concurrent calls are serialized; a sweep never overlaps another.
+    """
+    if as_of_date is None:
+        as_of_date = date.today()
+
+    async with _sweep_lock:
+        started = time.perf_counter()
+        stats = {
+            "started_at": datetime.utcnow(),
+            "finished_at": None,
+            "as_of_date": as_of_date,
+            "duration_ms": None,
+            "invoices_marked_overdue": 0,
+            "invoice_batches": 0,
+            "proforma_invoices_expired": 0,
+            "client_pos_expired": 0,
+            "error": None,
+        }
+
+        async with AsyncSessionLocal() as db:
+            try:
+                updated, batches = await sweep_overdue_invoices(
+                    db, as_of_date, settings.OVERDUE_SWEEP_BATCH_SIZE
+                )
+                stats["invoices_marked_overdue"] = updated
+                stats["invoice_batches"] = batches
+                stats["proforma_invoices_expired"] = await expire_proforma_invoices(db, as_of_date)
+                stats["client_pos_expired"] = await expire_client_pos(db, as_of_date)
+            except Exception as e:
+                await db.rollback()
+                stats["error"] = str(e)
+                logger.error(f"Overdue sweep failed: {str(e)}")
+
+        stats["finished_at"] = datetime.utcnow()
+        stats["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        _last_run.update(stats)
+
+    return get_last_run_stats()
+
+
+async def sweeper_loop() -> None:
+    """Background loop that runs the sweep on a fixed interval."""
+    interval = settings.OVERDUE_SWEEP_INTERVAL_MINUTES * 60
+    while True:
+        try:
+            await run_sweep()
+        except Exception as e:
+            logger.error(f"Overdue sweeper loop error: {str(e)}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,246 @@
+"""
+Payment Allocation Service
+
+Settles a payment against one or more invoices. Invoice balances are changed
+with a single atomic UPDATE ... FROM (VALUES ...) RETURNING statement per
+call, so concurrent receipts against the same invoice cannot lose updates and
+an allocation can never take an invoice's amount_due below zero.
+
+Invoice rows are always locked in id order before they are changed, so two
+receipts touching overlapping invoices wait for each other instead of
+deadlocking.
+"""
+from decimal import Decimal
+from typing import List, Tuple
+
+from sqlalchemy import select, update, delete, values, column, case, literal, Integer, Numeric
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.invoice import Invoice, InvoiceType, InvoiceStatus
+from app.models.payment import Payment, PaymentAllocation, PaymentType
+
+# Invoices that can receive allocations
+ALLOCATABLE_STATUSES = [
+    InvoiceStatus.DRAFT,
+    InvoiceStatus.SENT,
+    InvoiceStatus.PARTIAL,
+    InvoiceStatus.OVERDUE,
+]
+
+
+def _status_literal(value: InvoiceStatus):
+    return literal(value, type_=Invoice.__table__.c.status.type)
+
+
+def _allocation_values(allocations: List[Tuple[int, Decimal]]):
+    return values(
+        column("invoice_id", Integer),
+        column("amount", Numeric(15, 2)),
+        name="alloc",
+    ).data([(invoice_id, amount) for invoice_id, amount in allocations])
+
+
+async def _lock_invoices(db: AsyncSession, invoice_ids: List[int]) -> None:
+    """Lock invoice rows with SELECT ... FOR UPDATE in id order."""
+    await db.execute(
+        select(Invoice.id).where(Invoice.id.in_(invoice_ids)).order_by(Invoice.id).with_for_update()
+    )
+
+
+async def apply_allocations(
+    db: AsyncSession,
+    payment: Payment,
+    allocations: List[Tuple[int, Decimal]]
+) -> List[PaymentAllocation]:
+    """
+    Allocate a payment to invoices and reduce their balances atomically.
+
+    Each invoice is updated only if its amount_due covers the allocated amount.
+    If any allocation is rejected, a ValueError is raised and the caller's
+    transaction should be rolled back.
+
+    Args:
+        db: Async database session
+        payment: Payment being allocated (must already be flushed)
+        allocations: List of (invoice_id, amount) tuples
+
+    Returns:
+        The PaymentAllocation rows added to the session
+    """
+    if not allocations:
+        return []
+
+    invoice_ids = [invoice_id for invoice_id, _ in allocations]
+    if len(set(invoice_ids)) != len(invoice_ids):
+        raise ValueError("Each invoice can only be allocated once per payment")
+    for invoice_id, amount in allocations:
+        if amount <= 0:
+            raise ValueError(f"Allocation amount for invoice {invoice_id} must be positive")
+
+    total = sum((amount for _, amount in allocations), Decimal("0"))
+    if total > payment.net_amount:
+        raise ValueError(
+            f"Allocated amount {total} exceeds payment net amount {payment.net_amount}"
+        )
+
+    await _lock_invoices(db, invoice_ids)
+    alloc = _allocation_values(allocations)
+    result = await db.execute(
+        update(Invoice)
+        .where(Invoice.id == alloc.c.invoice_id)
+        .where(Invoice.status.in_(ALLOCATABLE_STATUSES))
+        .where(Invoice.amount_due >= alloc.c.amount)
+        .values(
+            amount_paid=Invoice.amount_paid + alloc.c.amount,
+            amount_due=Invoice.amount_due - alloc.c.amount,
+            status=case(
+                (Invoice.amount_due - alloc.c.amount <= 0, _status_literal(InvoiceStatus.PAID)),
+                else_=_status_literal(InvoiceStatus.PARTIAL),
+            ),
+        )
+        .returning(Invoice.id)
+        .execution_options(synchronize_session=False)
+    )
+    applied = {row.id for row in result.all()}
+
+    rejected = [invoice_id for invoice_id in invoice_ids if invoice_id not in applied]
+    if rejected:
+        result = await db.execute(
+            select(Invoice.id, Invoice.invoice_number, Invoice.status, Invoice.amount_due)
+            .where(Invoice.id.in_(rejected))
+        )
+        found = {row.id: row for row in result.all()}
+        requested = dict(allocations)
+        reasons = []
+        for invoice_id in rejected:
+            row = found.get(invoice_id)
+            if row is None:
+                reasons.append(f"invoice {invoice_id} not found")
+            elif row.status not in ALLOCATABLE_STATUSES:
+                reasons.append(f"{row.invoice_number} is {row.status.value}")
+            else:
+                reasons.append(
+                    f"{row.invoice_number} has {row.amount_due} due, cannot allocate {requested[invoice_id]}"
+                )
+        raise ValueError("Allocation rejected: " + "; ".join(reasons))
+
+    rows = [
+        PaymentAllocation(payment_id=payment.id, invoice_id=invoice_id, amount=amount)
+        for invoice_id, amount in allocations
+    ]
+    db.add_all(rows)
+    await db.flush()
+    db.expire(payment, ["allocations"])
+    return rows
+
+
+async def reverse_allocations(db: AsyncSession, payment: Payment) -> int:
+    """
+    Remove all allocations of a payment and restore the invoice balances atomically.
+
+    Returns:
+        Number of invoices restored
+    """
+    result = await db.execute(
+        select(PaymentAllocation.id, PaymentAllocation.invoice_id, PaymentAllocation.amount)
+        .where(PaymentAllocation.payment_id == payment.id)
+    )
+    existing = result.all()
+    if not existing:
+        return 0
+
+    await _lock_invoices(db, [row.invoice_id for row in existing])
+    alloc = _allocation_values([(row.invoice_id, row.amount) for row in existing])
+    await db.execute(
+        update(Invoice)
+        .where(Invoice.id == alloc.c.invoice_id)
+        .values(
+            amount_paid=Invoice.amount_paid - alloc.c.amount,
+            amount_due=Invoice.amount_due + alloc.c.amount,
+            status=case(
+                (Invoice.status == InvoiceStatus.CANCELLED, Invoice.status),
+                (Invoice.amount_paid - alloc.c.amount <= 0, _status_literal(InvoiceStatus.SENT)),
+                else_=_status_literal(InvoiceStatus.PARTIAL),
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    await db.execute(
+        delete(PaymentAllocation).where(PaymentAllocation.payment_id == payment.id)
+    )
+    db.expire(payment, ["allocations"])
+    return len(existing)
+
+
+async def plan_auto_allocation(
+    db: AsyncSession,
+    payment: Payment
+) -> List[Tuple[int, Decimal]]:
+    """
+    Plan an oldest-first allocation of a payment across the party's open invoices.
+
+    Candidate invoices are locked with SELECT ... FOR UPDATE, in id order
+    like every other allocation lock, so the planned amounts stay valid
+    until the allocation is applied.
+
+    Example:
+        Payment net 25,000 against open invoices due 10,000 (Apr), 12,000 (May)
+        and 8,000 (Jun) plans [(apr, 10000), (may, 12000), (jun, 3000)].
+    """
+    query = (
+        select(Invoice.id, Invoice.invoice_date, Invoice.amount_due)
+        .where(Invoice.status.in_([InvoiceStatus.SENT, InvoiceStatus.PARTIAL, InvoiceStatus.OVERDUE]))
+        .where(Invoice.amount_due > 0)
+    )
+    if payment.payment_type == PaymentType.RECEIPT:
+        if not payment.client_id:
+            raise ValueError("Client is required for auto-allocation of a receipt")
+        query = query.where(Invoice.client_id == payment.client_id).where(Invoice.invoice_type == InvoiceType.SALES)
+    else:
+        if not payment.vendor_id:
+            raise ValueError("Vendor is required for auto-allocation of a payment")
+        query = query.where(Invoice.vendor_id == payment.vendor_id).where(Invoice.invoice_type == InvoiceType.PURCHASE)
+
+    result = await db.execute(query.order_by(Invoice.id).with_for_update())
+    candidates = sorted(result.all(), key=lambda row: (row.invoice_date, row.id))
+
+    remaining = payment.net_amount
+    plan: List[Tuple[int, Decimal]] = []
+    for row in candidates:
+        if remaining <= 0:
+            break
+        amount = min(row.amount_due, remaining)
+        plan.append((row.id, amount))
+        remaining -= amount
+    return plan
+
+
+async def plan_invoice_allocation(
+    db: AsyncSession,
+    payment: Payment,
+    invoice_id: int
+) -> List[Tuple[int, Decimal]]:
+    """
+    Plan the allocation of a payment linked to a single invoice.
+
+    The allocation is capped at the invoice's amount_due; any excess stays
+    unallocated on the payment (on account), as with auto allocation. An
+    invoice that is not open receives nothing. The invoice is locked with
+    SELECT ... FOR UPDATE so the planned amount stays valid.
+
+    Example:
+        Payment net 10,000.50 against an invoice with 10,000 due plans
+        [(invoice, 10000)], leaving 0.50 on account.
+    """
+    result = await db.execute(
+        select(Invoice.id, Invoice.amount_due)
+        .where(Invoice.id == invoice_id)
+        .where(Invoice.status.in_(ALLOCATABLE_STATUSES))
+        .where(Invoice.amount_due > 0)
+        .with_for_update()
+    )
+    row = result.one_or_none()
+    if row is None:
+        return []
+    return [(row.id, min(row.amount_due, payment.net_amount))]
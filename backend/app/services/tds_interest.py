@@ -0,0 +1,200 @@
+"""
+TDS Interest and Late Fee Calculator
+
+Computes interest under section 201(1A) and the late filing fee under
+section 234E for TDS deducted by the company (TDS payable).
+
+- Late deduction: 1% per month or part of a month from the date tax was
+  deductible to the date it was deducted.
+- Late payment: 1.5% per month or part of a month from the date of
+  deduction to the date of payment, when tax is deposited after the due
+  date (7th of the following month; 30th April for March deductions).
+- Months are counted as calendar months, both end months included, which is
+  how TRACES computes the default.
+- Section 234E: Rs. 200 per day from the return due date until filing,
+  capped at the TDS of the quarter.
+
+The batch functions work in integer paise and memoise the month count per
+deduction date, so a financial year of entries is a single pass of integer
+arithmetic.
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATE_DEDUCTION_RATE = Decimal("1")  # % per month, 201(1A)(i)
+LATE_PAYMENT_RATE = Decimal("1.5")  # % per month, 201(1A)(ii)
+LATE_FILING_FEE_PER_DAY = Decimal("200")  # 234E
+
+# Quarter -> (month, day, year offset from FY start) of the return due date
+RETURN_DUE_DATES = {
+    1: (7, 31, 0),
+    2: (10, 31, 0),
+    3: (1, 31, 1),
+    4: (5, 31, 1),
+}
+
+
+def deposit_due_date(deduction_date: date) -> date:
+    """
+    Due date for depositing TDS deducted on a date.
+
+    Example:
+        >>> deposit_due_date(date(2024, 4, 15))
+        datetime.date(2024, 5, 7)
+        >>> deposit_due_date(date(2025, 3, 31))
+        datetime.date(2025, 4, 30)
+        >>> deposit_due_date(date(2024, 12, 2))
+        datetime.date(2025, 1, 7)
+    """
+    if deduction_date.month == 3:
+        return date(deduction_date.year, 4, 30)
+    if deduction_date.month == 12:
+        return date(deduction_date.year + 1, 1, 7)
+    return date(deduction_date.year, deduction_date.month + 1, 7)
+
+
+def months_or_part(from_date: date, to_date: date) -> int:
+    """
+    Calendar months from one date to another, both end months counted.
+
+    Example:
+        >>> months_or_part(date(2024, 4, 15), date(2024, 5, 10))
+        2
+        >>> months_or_part(date(2025, 3, 31), date(2025, 5, 2))
+        3
+        >>> months_or_part(date(2024, 5, 10), date(2024, 5, 1))
+        0
+    """
+    if to_date < from_date:
+        return 0
+    return (to_date.year - from_date.year) * 12 + to_date.month - from_date.month + 1
+
+
+def late_payment_months(deduction_date: date, payment_date: date) -> int:
+    """
+    Months of 201(1A)(ii) interest; zero when deposited by the due date.
+
+    Example:
+        >>> late_payment_months(date(2024, 4, 15), date(2024, 5, 7))
+        0
+        >>> late_payment_months(date(2024, 4, 15), date(2024, 5, 8))
+        2
+    """
+    if payment_date <= deposit_due_date(deduction_date):
+        return 0
+    return months_or_part(deduction_date, payment_date)
+
+
+ZERO = Decimal("0.00")
+
+
+def _to_paise(amount) -> int:
+    # Amounts are stored with two decimals, so this is exact
+    return int(Decimal(amount) * 100)
+
+
+def _interest_paise(paise: int, months: int, rate_tenths: int) -> int:
+    """Interest in paise, rounded half up; rate in tenths of a percent."""
+    return (paise * months * rate_tenths + 500) // 1000
+
+
+def compute_interest_batch(
+    rows: Sequence[Tuple[date, Decimal]],
+    payment_date: date,
+    deductible_dates: Optional[Sequence[Optional[date]]] = None,
+) -> List[Tuple[int, int, Decimal]]:
+    """
+    Section 201(1A) interest for many deductions paid on one date.
+
+    Args:
+        rows: (deduction_date, tds_amount) per entry
+        payment_date: Date the challan was (or will be) paid
+        deductible_dates: Optional date each tax became deductible, when it
+            was deducted later than that
+
+    Returns:
+        (late_deduction_months, late_payment_months, interest) per entry
+
+    Example:
+        >>> compute_interest_batch(
+        ...     [(date(2024, 4, 15), Decimal("10000")),
+        ...      (date(2024, 4, 30), Decimal("2500.50")),
+        ...      (date(2024, 5, 2), Decimal("10000"))],
+        ...     date(2024, 5, 10),
+        ... )
+        [(0, 2, Decimal('300.00')), (0, 2, Decimal('75.02')), (0, 0, Decimal('0.00'))]
+        >>> compute_interest_batch(
+        ...     [(date(2024, 6, 20), Decimal("10000"))], date(2024, 7, 5),
+        ...     deductible_dates=[date(2024, 4, 10)],
+        ... )
+        [(3, 0, Decimal('300.00'))]
+    """
+    late_payment_rate = int(LATE_PAYMENT_RATE * 10)
+    late_deduction_rate = int(LATE_DEDUCTION_RATE * 10)
+    payment_months: Dict[date, int] = {}
+    results = []
+    for i, (deduction_date, amount) in enumerate(rows):
+        months = payment_months.get(deduction_date)
+        if months is None:
+            months = payment_months[deduction_date] = late_payment_months(deduction_date, payment_date)
+
+        deduction_months = 0
+        if deductible_dates is not None and deductible_dates[i] and deductible_dates[i] < deduction_date:
+            deduction_months = months_or_part(deductible_dates[i], deduction_date)
+
+        if not months and not deduction_months:
+            results.append((0, 0, ZERO))
+            continue
+
+        paise = _to_paise(amount)
+        interest = (
+            _interest_paise(paise, months, late_payment_rate)
+            + _interest_paise(paise, deduction_months, late_deduction_rate)
+        )
+        results.append((deduction_months, months, Decimal(interest).scaleb(-2)))
+    return results
+
+
+def total_interest(rows: Iterable[Tuple[date, Decimal]], payment_date: date) -> Decimal:
+    """
+    Total late-payment interest for (deduction_date, amount) rows.
+
+    Example:
+        >>> total_interest([(date(2024, 4, 15), Decimal("10000")), (date(2024, 4, 20), Decimal("5000"))], date(2024, 6, 1))
+        Decimal('675.00')
+    """
+    return sum(
+        (interest for _, _, interest in compute_interest_batch(list(rows), payment_date)),
+        ZERO,
+    )
+
+
+def return_due_date(financial_year: str, quarter: int) -> date:
+    """
+    Example:
+        >>> return_due_date("2024-2025", 1)
+        datetime.date(2024, 7, 31)
+        >>> return_due_date("2024-2025", 4)
+        datetime.date(2025, 5, 31)
+    """
+    month, day, offset = RETURN_DUE_DATES[quarter]
+    return date(int(financial_year.split("-")[0]) + offset, month, day)
+
+
+def late_filing_fee(financial_year: str, quarter: int, filed_date: date, tds_amount: Decimal) -> Decimal:
+    """
+    Section 234E fee for filing the quarterly return on filed_date.
+
+    Example:
+        >>> late_filing_fee("2024-2025", 1, date(2024, 8, 10), Decimal("50000"))
+        Decimal('2000')
+        >>> late_filing_fee("2024-2025", 1, date(2025, 3, 31), Decimal("12000"))
+        Decimal('12000')
+        >>> late_filing_fee("2024-2025", 1, date(2024, 7, 31), Decimal("50000"))
+        Decimal('0')
+    """
+    days = (filed_date - return_due_date(financial_year, quarter)).days
+    if days <= 0:
+        return Decimal("0")
+    return min(LATE_FILING_FEE_PER_DAY * days, Decimal(tds_amount))
@@ -0,0 +1,500 @@
+"""
+TDS Return File Service
+
+Builds the quarterly TDS return (Form 26Q) from challan entries, either as a
+'^'-delimited text file following the NSDL/Protean NS1 record layout
+(FH file header, BH batch header, CD challan detail, DD deductee detail) or
+as an XLSX workbook.
+
+Deductee rows are read through a server-side cursor ordered by challan, so a
+quarter with tens of thousands of entries is exported with bounded memory.
+Challan counts and totals needed by the header records are fetched up front
+with a single grouped query. PAN and section codes are validated per row as
+the file is written: a missing or invalid PAN is reported with the return
+utility's placeholder, while a section without a Form 26Q code stops the text
+file and is listed on the Issues sheet of the workbook.
+
+Fields the application does not track (e.g. TDS certificate numbers, lower
+deduction certificates) are emitted empty; the generated text file should be
+run through the Protean File Validation Utility before filing.
+"""
+import os
+import re
+import tempfile
+from datetime import date
+from decimal import Decimal
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.settings import CompanySettings
+from app.models.tds_challan import TDSChallan, TDSChallanEntry, TDSType
+
+PAN_REGEX = r"^[A-Z]{5}[0-9]{4}[A-Z]$"
+_PAN_PATTERN = re.compile(PAN_REGEX)
+
+# Whitespace and hyphens ignored when matching a section, here and in SQL
+SECTION_STRIP = r"[\s-]"
+
+# Placeholders accepted by the return utility in place of a PAN
+PAN_NOT_AVAILABLE = "PANNOTAVBL"
+PAN_INVALID = "PANINVALID"
+
+# Deductee remark for higher deduction due to missing/invalid PAN (section 206AA)
+REMARK_NO_PAN = "C"
+
+# Income Tax Act section -> Form 26Q section code
+SECTION_CODES: Dict[str, str] = {
+    "193": "193",
+    "194": "194",
+    "194A": "94A",
+    "194B": "94B",
+    "194C": "94C",
+    "194D": "94D",
+    "194G": "94G",
+    "194H": "94H",
+    "194I(A)": "4IA",  # Rent on plant and machinery
+    "194I(B)": "4IB",  # Rent on land and buildings
+    "194IA": "9IA",  # Transfer of immovable property
+    "194J": "94J",
+    "194K": "94K",
+    "194M": "94M",
+    "194N": "94N",
+    "194O": "94O",
+    "194Q": "94Q",
+    "194R": "94R",
+    "194S": "94S",
+}
+
+# Bare 194I recorded before 194I(a)/194I(b) were selectable; reported under
+# settings.TDS_194I_RETURN_SECTION when that names one of RENT_SECTIONS
+LEGACY_RENT_SECTION = "194I"
+RENT_SECTIONS = ("194I(A)", "194I(B)")
+
+# Sections that cannot be reported in the 26Q stream as recorded
+SECTION_ISSUES: Dict[str, str] = {
+    "194I": (
+        "Section 194I must be recorded as 194I(a) (plant and machinery) or 194I(b) "
+        "(land and buildings), or mapped with TDS_194I_RETURN_SECTION"
+    ),
+    "194IB": "Section 194IB is filed on Form 26QC, not 26Q",
+}
+
+QUARTER_MONTHS = {
+    1: [4, 5, 6],
+    2: [7, 8, 9],
+    3: [10, 11, 12],
+    4: [1, 2, 3],
+}
+
+# Rows fetched per round trip from the server-side cursor
+STREAM_BATCH_SIZE = 1000
+
+XLSX_ISSUE_HEADERS = ["Row", "Challan No", "Invoice No", "Party Name", "PAN", "Section", "Issue"]
+
+XLSX_HEADERS = [
+    "Challan No", "BSR Code", "Challan Date", "Deductee Code", "PAN",
+    "Party Name", "Section", "Section Code", "Invoice No", "Invoice Date",
+    "Amount Paid", "TDS Rate", "TDS", "Penalty", "Interest", "TDS Payable",
+    "Remarks",
+]
+
+
+def validate_pan(pan: Optional[str]) -> Tuple[str, Optional[str]]:
+    """
+    Normalise a deductee PAN for the return file.
+
+    Returns:
+        Tuple of (value to write, validation issue or None)
+
+    Example:
+        >>> validate_pan("aaacb1234f")
+        ('AAACB1234F', None)
+        >>> validate_pan("AAACB1234")
+        ('PANINVALID', 'Invalid PAN AAACB1234')
+        >>> validate_pan(None)
+        ('PANNOTAVBL', 'PAN not available')
+    """
+    if not pan or not pan.strip():
+        return PAN_NOT_AVAILABLE, "PAN not available"
+    value = pan.strip().upper()
+    if not _PAN_PATTERN.match(value):
+        return PAN_INVALID, f"Invalid PAN {value}"
+    return value, None
+
+
+def section_key(section: Optional[str]) -> str:
+    """
+    Example:
+        >>> section_key(" 194-i (b)\t")
+        '194I(B)'
+    """
+    return re.sub(SECTION_STRIP, "", section or "").upper()
+
+
+def legacy_rent_section() -> Optional[str]:
+    """Section that bare 194I entries are reported under, None if unmapped."""
+    key = section_key(settings.TDS_194I_RETURN_SECTION)
+    return key if key in RENT_SECTIONS else None
+
+
+def reportable_sections() -> List[str]:
+    """Section keys validate_section() maps to a Form 26Q code."""
+    keys = list(SECTION_CODES)
+    if legacy_rent_section():
+        keys.append(LEGACY_RENT_SECTION)
+    return keys
+
+
+def validate_section(section: Optional[str]) -> Tuple[str, Optional[str]]:
+    """
+    Map an Income Tax Act section to its Form 26Q section code.
+
+    Example:
+        >>> validate_section("194J")
+        ('94J', None)
+        >>> validate_section("194I(b)"), validate_section("194-IA")
+        (('4IB', None), ('9IA', None))
+        >>> validate_section("194I")
+        ('', 'Section 194I must be recorded as 194I(a) (plant and machinery) or 194I(b) (land and buildings), or mapped with TDS_194I_RETURN_SECTION')
+        >>> validate_section("194-Z")
+        ('', 'Unknown section 194Z')
+    """
+    key = section_key(section)
+    if key == LEGACY_RENT_SECTION:
+        key = legacy_rent_section() or key
+    if key in SECTION_ISSUES:
+        return "", SECTION_ISSUES[key]
+    code = SECTION_CODES.get(key)
+    if code is None:
+        return "", f"Unknown section {key or '(blank)'}"
+    return code, None
+
+
+def deductee_code(pan: str) -> str:
+    """Deductee code: 01 for companies (4th PAN character 'C'), 02 otherwise."""
+    if len(pan) == 10 and pan[3] == "C":
+        return "01"
+    return "02"
+
+
+def _amount(value: Optional[Decimal]) -> str:
+    return f"{(value or Decimal('0')):.2f}"
+
+
+def _date(value: Optional[date]) -> str:
+    return value.strftime("%d%m%Y") if value else ""
+
+
+def _record(*fields) -> str:
+    return "^".join("" if f is None else str(f) for f in fields) + "\n"
+
+
+def _period_codes(financial_year: str) -> Tuple[str, str]:
+    """
+    Financial and assessment year codes used in the batch header.
+
+    Example:
+        >>> _period_codes("2024-2025")
+        ('202425', '202526')
+    """
+    start = int(financial_year.split("-")[0])
+    return f"{start}{str(start + 1)[-2:]}", f"{start + 1}{str(start + 2)[-2:]}"
+
+
+def _challan_filter(query, financial_year: str, quarter: int, tds_type: TDSType, branch_id: Optional[int]):
+    query = (
+        query.where(TDSChallan.financial_year == financial_year)
+        .where(TDSChallan.tds_type == tds_type)
+        .where(TDSChallan.month.in_(QUARTER_MONTHS.get(quarter, [])))
+    )
+    if branch_id:
+        query = query.where(TDSChallan.branch_id == branch_id)
+    return query
+
+
+def entry_rows_query(financial_year: str, quarter: int, tds_type: TDSType, branch_id: Optional[int] = None):
+    """Flat challan + entry rows for a quarter, grouped by challan."""
+    query = (
+        select(
+            TDSChallan.id.label("challan_id"),
+            TDSChallan.challan_number,
+            TDSChallan.bsr_code,
+            TDSChallan.payment_date,
+            TDSChallan.total_amount.label("challan_total"),
+            TDSChallanEntry.party_name,
+            TDSChallanEntry.party_pan,
+            TDSChallanEntry.invoice_number,
+            TDSChallanEntry.invoice_date,
+            TDSChallanEntry.base_amount,
+            TDSChallanEntry.tds_rate,
+            TDSChallanEntry.tds_section,
+            TDSChallanEntry.tds_amount,
+            TDSChallanEntry.penalty,
+            TDSChallanEntry.interest,
+        )
+        .join(TDSChallanEntry, TDSChallanEntry.challan_id == TDSChallan.id)
+    )
+    return _challan_filter(query, financial_year, quarter, tds_type, branch_id).order_by(
+        TDSChallan.payment_date, TDSChallan.id, TDSChallanEntry.id
+    )
+
+
+async def get_challan_summaries(
+    db: AsyncSession,
+    financial_year: str,
+    quarter: int,
+    tds_type: TDSType,
+    branch_id: Optional[int] = None
+) -> List[dict]:
+    """Challans of the quarter with their deductee counts, in export order."""
+    query = (
+        select(
+            TDSChallan.id,
+            TDSChallan.challan_number,
+            TDSChallan.bsr_code,
+            TDSChallan.payment_date,
+            TDSChallan.tds_amount,
+            TDSChallan.interest,
+            TDSChallan.penalty,
+            TDSChallan.total_amount,
+            func.count(TDSChallanEntry.id).label("entry_count"),
+            func.coalesce(func.sum(TDSChallanEntry.tds_amount), 0).label("entries_tds"),
+        )
+        .outerjoin(TDSChallanEntry, TDSChallanEntry.challan_id == TDSChallan.id)
+        .group_by(TDSChallan.id)
+    )
+    query = _challan_filter(query, financial_year, quarter, tds_type, branch_id).order_by(
+        TDSChallan.payment_date, TDSChallan.id
+    )
+    result = await db.execute(query)
+    return [dict(row._mapping) for row in result.all()]
+
+
+async def get_validation_summary(
+    db: AsyncSession,
+    financial_year: str,
+    quarter: int,
+    tds_type: TDSType,
+    branch_id: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Count entries whose PAN or section would be flagged in the return file,
+    normalising both the way validate_pan() and validate_section() do.
+    """
+    bad_pan = or_(
+        TDSChallanEntry.party_pan.is_(None),
+        ~func.upper(func.trim(TDSChallanEntry.party_pan)).regexp_match(PAN_REGEX),
+    )
+    entry_section = func.upper(
+        func.regexp_replace(func.coalesce(TDSChallanEntry.tds_section, ""), SECTION_STRIP, "", "g")
+    )
+    query = (
+        select(
+            func.count().filter(bad_pan).label("invalid_pan"),
+            func.count().filter(entry_section.not_in(reportable_sections())).label("invalid_section"),
+        )
+        .select_from(TDSChallan)
+        .join(TDSChallanEntry, TDSChallanEntry.challan_id == TDSChallan.id)
+    )
+    row = (await db.execute(_challan_filter(query, financial_year, quarter, tds_type, branch_id))).one()
+    return {"invalid_pan": row.invalid_pan or 0, "invalid_section": row.invalid_section or 0}
+
+
+def _file_header(line_no: int, company: CompanySettings) -> str:
+    return _record(
+        line_no, "FH", "NS1", "R", _date(date.today()), 1, "D", company.tan,
+        1, "hisaab", "", "", "", "", "", "", "", "",
+    )
+
+
+def _batch_header(
+    line_no: int,
+    company: CompanySettings,
+    financial_year: str,
+    quarter: int,
+    challans: List[dict],
+) -> str:
+    fy_code, ay_code = _period_codes(financial_year)
+    address = [part.strip() for part in (company.address or "").splitlines() if part.strip()]
+    address = (address + [""] * 3)[:3]
+    total_deposit = sum((c["total_amount"] for c in challans), Decimal("0"))
+    return _record(
+        line_no, "BH", 1, len(challans), "26Q", "", "", "", "", "", "",
+        company.tan, "", company.pan, ay_code, fy_code, f"Q{quarter}",
+        company.company_name, "", *address, company.city, company.state_code,
+        company.pincode, company.email, "", "", company.phone, "N", "K",
+        "", "", "", "", "", "", "", "", "", "", "", "",
+        _amount(total_deposit), "", sum(c["entry_count"] for c in challans), "N",
+    )
+
+
+def _challan_detail(line_no: int, serial: int, challan: dict) -> str:
+    return _record(
+        line_no, "CD", 1, serial, challan["entry_count"], "N", "", "", "", "", "", "",
+        challan["bsr_code"], "", _date(challan["payment_date"]), "", "",
+        challan["challan_number"], "", _amount(challan["tds_amount"]), "0.00", "0.00",
+        _amount(challan["interest"]), _amount(challan["penalty"]),
+        _amount(challan["total_amount"]), "", _amount(challan["entries_tds"]),
+        _amount(challan["entries_tds"]), "0.00", "0.00", _amount(challan["entries_tds"]),
+        _amount(challan["interest"]), _amount(challan["penalty"]), "", "N", "", "", "", "",
+    )
+
+
+def _deductee_detail(line_no: int, challan_serial: int, serial: int, row) -> str:
+    """
+    DD record of one entry. A missing or invalid PAN is written as the
+    placeholder with remark C; a section without a code cannot be filed.
+    """
+    pan, pan_issue = validate_pan(row.party_pan)
+    section_code, section_issue = validate_section(row.tds_section)
+    if section_issue:
+        raise ValueError(f"Invoice {row.invoice_number} ({row.party_name}): {section_issue}")
+    return _record(
+        line_no, "DD", 1, challan_serial, serial, "O", "", deductee_code(pan), "",
+        pan, "", "", row.party_name, _amount(row.tds_amount), "0.00", "0.00",
+        _amount(row.tds_amount), "", _amount(row.tds_amount), "", "",
+        _amount(row.base_amount), _date(row.invoice_date), _date(row.invoice_date),
+        "", f"{row.tds_rate:.4f}", "", "", "", "", section_code,
+        REMARK_NO_PAN if pan_issue else "", "", "", "", "",
+    )
+
+
+async def iter_return_text(
+    company: CompanySettings,
+    financial_year: str,
+    quarter: int,
+    tds_type: TDSType,
+    challans: List[dict],
+    branch_id: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """
+    Yield the NS1 text file in chunks.
+
+    Opens its own session because the response body is produced after the
+    request's dependencies have been closed. Callers check
+    get_validation_summary() first; an entry whose section has no Form 26Q
+    code raises ValueError rather than being written with a blank code.
+    """
+    buffer: List[str] = [
+        _file_header(1, company),
+        _batch_header(2, company, financial_year, quarter, challans),
+    ]
+    line_no = 2
+    pending = iter(enumerate(challans, start=1))
+    current_id = None
+    challan_serial = 0
+    deductee_serial = 0
+
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(
+            entry_rows_query(financial_year, quarter, tds_type, branch_id)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for row in result:
+            if row.challan_id != current_id:
+                # Emit challan records up to and including this row's challan;
+                # challans without entries are emitted as empty CD records
+                for challan_serial, challan in pending:
+                    line_no += 1
+                    buffer.append(_challan_detail(line_no, challan_serial, challan))
+                    if challan["id"] == row.challan_id:
+                        break
+                current_id = row.challan_id
+                deductee_serial = 0
+
+            deductee_serial += 1
+            line_no += 1
+            buffer.append(_deductee_detail(line_no, challan_serial, deductee_serial, row))
+
+            if len(buffer) >= STREAM_BATCH_SIZE:
+                yield "".join(buffer)
+                buffer = []
+
+    for challan_serial, challan in pending:
+        line_no += 1
+        buffer.append(_challan_detail(line_no, challan_serial, challan))
+    if buffer:
+        yield "".join(buffer)
+
+
+async def write_return_xlsx(
+    db: AsyncSession,
+    financial_year: str,
+    quarter: int,
+    tds_type: TDSType,
+    branch_id: Optional[int] = None,
+) -> str:
+    """
+    Write the quarter's deductee rows to a temporary XLSX file.
+
+    The workbook is created in write-only mode so rows are flushed to disk as
+    they are appended. Appending and zipping the workbook run in the thread
+    pool, one batch of rows at a time, so they do not block the event loop.
+    Entries with a PAN or section issue are also listed on an Issues sheet,
+    referring to their row on the first sheet. Returns the file path; the
+    caller removes it.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(f"26Q Q{quarter}")
+    sheet.append(XLSX_HEADERS)
+    issue_sheet = workbook.create_sheet("Issues")
+    issue_sheet.append(XLSX_ISSUE_HEADERS)
+
+    result = await db.stream(
+        entry_rows_query(financial_year, quarter, tds_type, branch_id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    batch, issue_batch = [], []
+    sheet_row = 1
+    async for row in result:
+        sheet_row += 1
+        pan, pan_issue = validate_pan(row.party_pan)
+        section_code, section_issue = validate_section(row.tds_section)
+        issues = [i for i in (pan_issue, section_issue) if i]
+        batch.append([
+            row.challan_number,
+            row.bsr_code,
+            row.payment_date,
+            deductee_code(pan),
+            pan,
+            row.party_name,
+            row.tds_section,
+            section_code,
+            row.invoice_number,
+            row.invoice_date,
+            row.base_amount,
+            row.tds_rate,
+            row.tds_amount,
+            row.penalty,
+            row.interest,
+            row.tds_amount + row.penalty + row.interest,
+            "; ".join(issues),
+        ])
+        issue_batch.extend(
+            [sheet_row, row.challan_number, row.invoice_number, row.party_name, row.party_pan, row.tds_section, issue]
+            for issue in issues
+        )
+        if len(batch) >= STREAM_BATCH_SIZE:
+            await run_in_threadpool(_append_rows, sheet, batch)
+            await run_in_threadpool(_append_rows, issue_sheet, issue_batch)
+            batch, issue_batch = [], []
+    if batch:
+        await run_in_threadpool(_append_rows, sheet, batch)
+        await run_in_threadpool(_append_rows, issue_sheet, issue_batch)
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx", prefix="tds_return_")
+    os.close(fd)
+    await run_in_threadpool(workbook.save, path)
+    return path
+
+
+def _append_rows(sheet, rows: List[list]) -> None:
+    for row in rows:
+        sheet.append(row)
@@ -0,0 +1,349 @@
+"""
+TDS Threshold Service
+
+Keeps a running taxable total of purchase invoices per (vendor, TDS section,
+financial year) in vendor_tds_aggregates. The table is adjusted with an
+atomic INSERT ... ON CONFLICT DO UPDATE whenever a purchase invoice is
+created, edited, cancelled or deleted, so checking whether a new bill crosses
+a section's single-bill or aggregate threshold is a single unique-key lookup
+instead of a scan over the vendor's invoices.
+
+The section of an invoice is its own tds_section, falling back to the
+vendor's default section. Invoices without either are not tracked.
+rebuild_tds_aggregates() reconstructs the table from invoices.
+"""
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select, delete, func, and_, case, cast, extract, insert, Integer, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.invoice import Invoice, InvoiceType, InvoiceStatus
+from app.models.tds_threshold import VendorTDSAggregate
+from app.models.vendor import Vendor
+from app.services.tds_return_file import validate_pan
+
+# Thresholds and rates per section (Income Tax Act, FY 2025-26).
+#   single_limit:    a single bill above this attracts TDS
+#   aggregate_limit: FY total above this attracts TDS
+#   rate:            rate (%) with a valid PAN
+#   individual_rate: rate for individuals/HUFs (4th PAN character P or H)
+#   no_pan_rate:     rate without a valid PAN (section 206AA); defaults to
+#                    the higher of twice the rate and 20%
+#   on_excess:       TDS applies only to the amount above aggregate_limit
+# 194I(a)/(b) are approximated as a per-bill limit of one month's rent; the
+# bare 194I of invoices recorded before the split keeps the 194I(b) rule.
+TDS_THRESHOLD_RULES: Dict[str, dict] = {
+    "194A": {"single_limit": None, "aggregate_limit": Decimal("10000"), "rate": Decimal("10")},
+    "194C": {
+        "single_limit": Decimal("30000"),
+        "aggregate_limit": Decimal("100000"),
+        "rate": Decimal("2"),
+        "individual_rate": Decimal("1"),
+    },
+    "194H": {"single_limit": None, "aggregate_limit": Decimal("20000"), "rate": Decimal("2")},
+    "194I": {"single_limit": Decimal("50000"), "aggregate_limit": None, "rate": Decimal("10")},
+    "194I(A)": {"single_limit": Decimal("50000"), "aggregate_limit": None, "rate": Decimal("2")},
+    "194I(B)": {"single_limit": Decimal("50000"), "aggregate_limit": None, "rate": Decimal("10")},
+    "194J": {"single_limit": None, "aggregate_limit": Decimal("50000"), "rate": Decimal("10")},
+    "194Q": {
+        "single_limit": None,
+        "aggregate_limit": Decimal("5000000"),
+        "rate": Decimal("0.1"),
+        "no_pan_rate": Decimal("5"),
+        "on_excess": True,
+    },
+}
+
+ZERO = Decimal("0")
+
+
+def normalize_section(section: Optional[str]) -> Optional[str]:
+    """
+    Example:
+        >>> normalize_section(" 194-c ")
+        '194C'
+    """
+    if not section:
+        return None
+    return section.strip().upper().replace("-", "").replace(" ", "") or None
+
+
+def tds_financial_year(value: date) -> str:
+    """
+    Financial year of a date in the TDS format.
+
+    Example:
+        >>> tds_financial_year(date(2025, 3, 31))
+        '2024-2025'
+        >>> tds_financial_year(date(2025, 4, 1))
+        '2025-2026'
+    """
+    start = value.year if value.month >= 4 else value.year - 1
+    return f"{start}-{start + 1}"
+
+
+def _financial_year_expr(date_column):
+    year = cast(extract("year", date_column), Integer)
+    start = case((extract("month", date_column) >= 4, year), else_=year - 1)
+    return func.concat(cast(start, String), "-", cast(start + 1, String))
+
+
+def _section_expr(section_column):
+    """SQL counterpart of normalize_section(): blank sections become NULL."""
+    return func.nullif(
+        func.upper(func.replace(func.replace(func.trim(section_column), "-", ""), " ", "")), ""
+    )
+
+
+def evaluate_threshold(
+    section: str,
+    previous_total: Decimal,
+    amount: Decimal,
+    pan: Optional[str],
+    previous_tds_base: Decimal = ZERO,
+) -> dict:
+    """
+    Decide whether TDS applies to a bill given the vendor's FY total so far.
+
+    When a bill takes the FY total over the aggregate limit for the first
+    time, TDS is also due on the earlier bills that were below the limit
+    (catch_up_base), except for sections taxed only on the excess (194Q).
+
+    Example:
+        >>> r = evaluate_threshold("194C", Decimal("80000"), Decimal("25000"), "AAAPL1234C")
+        >>> r["tds_applicable"], r["crossed_now"], r["rate"], r["catch_up_base"], r["tds_amount"]
+        (True, True, Decimal('1'), Decimal('80000'), Decimal('1050.00'))
+        >>> r = evaluate_threshold("194C", Decimal("10000"), Decimal("25000"), "AAACB1234F")
+        >>> r["tds_applicable"], r["tds_amount"]
+        (False, Decimal('0.00'))
+        >>> r = evaluate_threshold("194Q", Decimal("4900000"), Decimal("300000"), "AAACB1234F")
+        >>> r["taxable_base"], r["tds_amount"]
+        (Decimal('200000'), Decimal('200.00'))
+        >>> evaluate_threshold("194J", ZERO, Decimal("60000"), None)["rate"]
+        Decimal('20')
+    """
+    rule = TDS_THRESHOLD_RULES.get(section)
+    if rule is None:
+        raise ValueError(f"No threshold rule configured for section {section}")
+
+    single_limit = rule.get("single_limit")
+    aggregate_limit = rule.get("aggregate_limit")
+    new_total = previous_total + amount
+
+    over_single = single_limit is not None and amount > single_limit
+    over_aggregate = aggregate_limit is not None and new_total > aggregate_limit
+    was_over = aggregate_limit is not None and previous_total > aggregate_limit
+    applicable = over_single or over_aggregate
+
+    pan_value, pan_issue = validate_pan(pan)
+    pan_valid = pan_issue is None
+    rate = rule["rate"]
+    if pan_valid and "individual_rate" in rule and pan_value[3] in ("P", "H"):
+        rate = rule["individual_rate"]
+    if not pan_valid:
+        rate = rule.get("no_pan_rate", max(rate * 2, Decimal("20")))
+
+    catch_up_base = ZERO
+    if not applicable:
+        taxable_base = ZERO
+    elif rule.get("on_excess"):
+        taxable_base = new_total - max(aggregate_limit, previous_total) if over_aggregate else ZERO
+        applicable = taxable_base > 0
+    else:
+        taxable_base = amount
+        if over_aggregate and not was_over:
+            catch_up_base = max(previous_total - previous_tds_base, ZERO)
+
+    tds_amount = ((taxable_base + catch_up_base) * rate / 100).quantize(Decimal("0.01"), ROUND_HALF_UP)
+
+    return {
+        "section": section,
+        "previous_total": previous_total,
+        "new_total": new_total,
+        "single_limit": single_limit,
+        "aggregate_limit": aggregate_limit,
+        "threshold_crossed": over_single or over_aggregate,
+        "crossed_now": over_aggregate and not was_over,
+        "tds_applicable": applicable,
+        "pan_valid": pan_valid,
+        "rate": rate,
+        "taxable_base": taxable_base,
+        "catch_up_base": catch_up_base,
+        "tds_amount": tds_amount,
+    }
+
+
+async def get_threshold_status(
+    db: AsyncSession,
+    vendor_id: int,
+    amount: Decimal,
+    invoice_date: date,
+    section: Optional[str] = None,
+) -> dict:
+    """
+    Evaluate a prospective purchase bill against the vendor's running total.
+
+    Reads the vendor and its aggregate row in one query on the
+    (vendor_id, tds_section, financial_year) unique key.
+    """
+    financial_year = tds_financial_year(invoice_date)
+    section = normalize_section(section)
+    section_key = section if section else _section_expr(Vendor.tds_section)
+
+    result = await db.execute(
+        select(
+            Vendor.pan,
+            Vendor.tds_section,
+            VendorTDSAggregate.total_amount,
+            VendorTDSAggregate.tds_base_amount,
+        )
+        .outerjoin(
+            VendorTDSAggregate,
+            and_(
+                VendorTDSAggregate.vendor_id == Vendor.id,
+                VendorTDSAggregate.tds_section == section_key,
+                VendorTDSAggregate.financial_year == financial_year,
+            ),
+        )
+        .where(Vendor.id == vendor_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise ValueError("Vendor not found")
+
+    section = section or normalize_section(row.tds_section)
+    if not section:
+        raise ValueError("No TDS section on the invoice or the vendor")
+
+    status = evaluate_threshold(
+        section,
+        row.total_amount or ZERO,
+        amount,
+        row.pan,
+        row.tds_base_amount or ZERO,
+    )
+    status.update(vendor_id=vendor_id, financial_year=financial_year)
+    return status
+
+
+async def record_invoice_amounts(db: AsyncSession, invoices: Iterable, sign: int = 1) -> int:
+    """
+    Add (sign=1) or remove (sign=-1) purchase invoices from the running totals.
+
+    Accepts Invoice objects or rows with invoice_type, vendor_id, tds_section,
+    invoice_date, taxable_amount and tds_applicable. Deltas are summed per key
+    and applied with one multi-row upsert.
+
+    Returns:
+        Number of aggregate rows touched
+    """
+    purchases = [
+        i for i in invoices
+        if i.invoice_type == InvoiceType.PURCHASE and i.vendor_id
+    ]
+    if not purchases:
+        return 0
+
+    missing = {i.vendor_id for i in purchases if not normalize_section(i.tds_section)}
+    default_sections = {}
+    if missing:
+        result = await db.execute(
+            select(Vendor.id, Vendor.tds_section).where(Vendor.id.in_(missing))
+        )
+        default_sections = {row.id: normalize_section(row.tds_section) for row in result.all()}
+
+    deltas: Dict[Tuple[int, str, str], list] = {}
+    for invoice in purchases:
+        section = normalize_section(invoice.tds_section) or default_sections.get(invoice.vendor_id)
+        if not section:
+            continue
+        key = (invoice.vendor_id, section, tds_financial_year(invoice.invoice_date))
+        delta = deltas.setdefault(key, [ZERO, ZERO, 0])
+        amount = invoice.taxable_amount or ZERO
+        delta[0] += sign * amount
+        delta[1] += sign * amount if invoice.tds_applicable else ZERO
+        delta[2] += sign
+
+    if not deltas:
+        return 0
+
+    now = datetime.utcnow()
+    stmt = pg_insert(VendorTDSAggregate).values([
+        {
+            "vendor_id": vendor_id,
+            "tds_section": section,
+            "financial_year": financial_year,
+            "total_amount": total,
+            "tds_base_amount": tds_base,
+            "invoice_count": count,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for (vendor_id, section, financial_year), (total, tds_base, count) in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_vendor_tds_aggregate",
+        set_={
+            "total_amount": VendorTDSAggregate.total_amount + stmt.excluded.total_amount,
+            "tds_base_amount": VendorTDSAggregate.tds_base_amount + stmt.excluded.tds_base_amount,
+            "invoice_count": VendorTDSAggregate.invoice_count + stmt.excluded.invoice_count,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    await db.execute(stmt)
+    return len(deltas)
+
+
+async def rebuild_tds_aggregates(db: AsyncSession, financial_year: Optional[str] = None) -> int:
+    """
+    Reconstruct running totals from invoices with one INSERT ... SELECT.
+
+    Args:
+        financial_year: Limit the rebuild to one year ("2024-2025"); all years if None
+
+    Returns:
+        Number of aggregate rows written
+    """
+    section = func.coalesce(_section_expr(Invoice.tds_section), _section_expr(Vendor.tds_section))
+    fy = _financial_year_expr(Invoice.invoice_date)
+
+    source = (
+        select(
+            Invoice.vendor_id,
+            section,
+            fy,
+            func.sum(Invoice.taxable_amount),
+            func.coalesce(func.sum(Invoice.taxable_amount).filter(Invoice.tds_applicable), 0),
+            func.count(),
+            func.now(),
+            func.now(),
+        )
+        .join(Vendor, Vendor.id == Invoice.vendor_id)
+        .where(Invoice.invoice_type == InvoiceType.PURCHASE)
+        .where(Invoice.status != InvoiceStatus.CANCELLED)
+        .where(section.is_not(None))
+        .group_by(Invoice.vendor_id, section, fy)
+    )
+
+    clear = delete(VendorTDSAggregate)
+    if financial_year:
+        start_year = int(financial_year.split("-")[0])
+        source = source.where(
+            Invoice.invoice_date.between(date(start_year, 4, 1), date(start_year + 1, 3, 31))
+        )
+        clear = clear.where(VendorTDSAggregate.financial_year == financial_year)
+
+    await db.execute(clear)
+    result = await db.execute(
+        insert(VendorTDSAggregate).from_select(
+            [
+                "vendor_id", "tds_section", "financial_year", "total_amount",
+                "tds_base_amount", "invoice_count", "created_at", "updated_at",
+            ],
+            source,
+        )
+    )
+    return result.rowcount
@@ -0,0 +1,288 @@
+"""
+Endpoint Latency Benchmark
+
+Calls every GET endpoint of the reports, ledger, tds and invoices routers
+in-process through the ASGI app with httpx, against a database filled by
+benchmarks.synthetic_data, and records per endpoint:
+
+- p50/p95/mean latency over --iterations calls (after --warmup calls)
+- SQL statements per call (X-DB-Query-Count from SQLMetricsMiddleware)
+- peak Python memory allocated during one call (tracemalloc, measured in a
+  separate pass so tracing does not distort the timings)
+
+Endpoints are discovered from the OpenAPI schema; path and required query
+parameters are filled from sample rows of the dataset. File downloads and
+attachments are skipped.
+
+Usage (from backend/):
+    python -m benchmarks.endpoint_latency --output benchmarks/baseline.json
+    python -m benchmarks.endpoint_latency --compare benchmarks/baseline.json
+
+With --compare the run fails (exit code 1) when an endpoint's p95 grows by
+more than --max-regression (and by at least --min-delta-ms), when it issues
+more statements than the baseline, or when its status code changes.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import select, func, text
+
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.db.session import AsyncSessionLocal
+from app.main import app
+from app.models.invoice import Invoice, InvoiceType
+from app.models.ledger import ChartOfAccount, LedgerEntry
+from app.models.tds_challan import TDSChallan
+from app.models.user import User, UserRole
+from app.services.tds_threshold import tds_financial_year
+from benchmarks.stats import percentile
+
+MODULES = ("reports", "ledger", "tds", "invoices")
+SKIP_PATTERN = r"/download$|/attachments"
+DATASET_TABLES = ("clients", "vendors", "invoices", "invoice_items", "payments", "ledger_entries", "tds_challan_entries")
+
+
+def _benchmark_user() -> User:
+    return User(
+        id=0, email="benchmark@hisaab.local", name="Benchmark", role=UserRole.ADMIN,
+        is_active=True, is_superuser=True, token_version=0,
+    )
+
+
+async def sample_parameters(as_of: date) -> Dict[str, object]:
+    """Values for path and required query parameters, taken from the dataset."""
+    async with AsyncSessionLocal() as db:
+        busiest_client = (await db.execute(
+            select(Invoice.client_id).where(Invoice.invoice_type == InvoiceType.SALES)
+            .group_by(Invoice.client_id).order_by(func.count().desc()).limit(1)
+        )).scalar()
+        busiest_vendor = (await db.execute(
+            select(Invoice.vendor_id).where(Invoice.invoice_type == InvoiceType.PURCHASE)
+            .group_by(Invoice.vendor_id).order_by(func.count().desc()).limit(1)
+        )).scalar()
+        invoice_id = (await db.execute(select(func.min(Invoice.id)))).scalar()
+        challan_id = (await db.execute(select(func.min(TDSChallan.id)))).scalar()
+        busiest_account = (await db.execute(
+            select(LedgerEntry.account_id).group_by(LedgerEntry.account_id)
+            .order_by(func.count().desc()).limit(1)
+        )).scalar() or (await db.execute(select(func.min(ChartOfAccount.id)))).scalar()
+
+    financial_year = tds_financial_year(as_of)
+    fy_start = date(int(financial_year[:4]), 4, 1)
+    return {
+        "invoice_id": invoice_id,
+        "account_id": busiest_account,
+        "party_type": "client",
+        "party_id": busiest_client,
+        "vendor_id": busiest_vendor,
+        "challan_id": challan_id,
+        "financial_year": financial_year,
+        "year": as_of.year,
+        "month": as_of.month,
+        "quarter": (as_of.month - 4) % 12 // 3 + 1,
+        "from_date": fy_start.isoformat(),
+        "to_date": as_of.isoformat(),
+        "as_on_date": as_of.isoformat(),
+        "tds_type": "PAYABLE",
+        "source": "receivable",
+        "amount": 100000,
+    }
+
+
+def discover_endpoints(samples: Dict[str, object], include: Optional[str]) -> tuple:
+    """(name -> url, name -> skip reason) for the benchmarked GET endpoints."""
+    endpoints, skipped = {}, {}
+    prefixes = tuple(f"{settings.API_V1_PREFIX}/{module}" for module in MODULES)
+    for path, operations in app.openapi()["paths"].items():
+        if "get" not in operations or not path.startswith(prefixes):
+            continue
+        name = f"GET {path}"
+        if re.search(SKIP_PATTERN, path) or (include and not re.search(include, path)):
+            continue
+
+        url, query, missing = path, {}, []
+        for parameter in operations["get"].get("parameters", []):
+            if parameter["in"] not in ("path", "query"):
+                continue
+            if parameter["in"] == "query" and not parameter.get("required"):
+                continue
+            value = samples.get(parameter["name"])
+            if value is None:
+                missing.append(parameter["name"])
+            elif parameter["in"] == "path":
+                url = url.replace("{" + parameter["name"] + "}", str(value))
+            else:
+                query[parameter["name"]] = value
+        if missing:
+            skipped[name] = f"no sample value for {', '.join(missing)}"
+            continue
+        endpoints[name] = str(httpx.URL(url, params=query))
+    return endpoints, skipped
+
+
+async def measure(client: httpx.AsyncClient, url: str, warmup: int, iterations: int) -> dict:
+    for _ in range(warmup):
+        await client.get(url)
+
+    timings, queries, db_times = [], [], []
+    response = None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = await client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        queries.append(int(response.headers.get("x-db-query-count", 0)))
+        db_times.append(float(response.headers.get("x-db-time-ms", 0)))
+
+    return {
+        "url": url,
+        "status": response.status_code,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "db_ms": round(statistics.median(db_times), 2),
+        "queries": max(queries),
+        "response_bytes": len(response.content),
+    }
+
+
+async def measure_memory(client: httpx.AsyncClient, url: str) -> int:
+    """Peak traced memory in KiB allocated while serving one call."""
+    gc.collect()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    await client.get(url)
+    return max(tracemalloc.get_traced_memory()[1] - baseline, 0) // 1024
+
+
+async def dataset_counts() -> Dict[str, int]:
+    async with AsyncSessionLocal() as db:
+        return {
+            table: (await db.execute(text(f"SELECT COUNT(*) FROM {table}"))).scalar()
+            for table in DATASET_TABLES
+        }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    app.dependency_overrides[get_current_user] = _benchmark_user
+    samples = await sample_parameters(args.as_of)
+    endpoints, skipped = discover_endpoints(samples, args.include)
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for name, url in endpoints.items():
+            results[name] = await measure(client, url, args.warmup, args.iterations)
+            r = results[name]
+            print(f"{r['status']:>4} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['queries']:>5}  {name}", flush=True)
+
+        tracemalloc.start()
+        try:
+            for name, url in endpoints.items():
+                results[name]["peak_memory_kb"] = await measure_memory(client, url)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "as_of": args.as_of.isoformat(),
+            "warmup": args.warmup,
+            "iterations": args.iterations,
+            "dataset": await dataset_counts(),
+        },
+        "endpoints": results,
+        "skipped": skipped,
+    }
+
+
+def compare(current: dict, baseline: dict, max_regression: float, min_delta_ms: float) -> List[str]:
+    """
+    Regressions of the current run against a baseline.
+
+    Example:
+        >>> base = {"endpoints": {"GET /a": {"status": 200, "p95_ms": 100.0, "queries": 3}}}
+        >>> run = {"endpoints": {"GET /a": {"status": 200, "p95_ms": 140.0, "queries": 4}}}
+        >>> compare(run, base, max_regression=0.25, min_delta_ms=5)
+        ['GET /a: p95 100.0 -> 140.0 ms (+40%)', 'GET /a: queries 3 -> 4']
+    """
+    problems = []
+    for name, base in baseline["endpoints"].items():
+        result = current["endpoints"].get(name)
+        if result is None:
+            continue
+        if result["status"] != base["status"]:
+            problems.append(f"{name}: status {base['status']} -> {result['status']}")
+        delta = result["p95_ms"] - base["p95_ms"]
+        if delta > min_delta_ms and result["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            problems.append(
+                f"{name}: p95 {base['p95_ms']} -> {result['p95_ms']} ms "
+                f"(+{delta / base['p95_ms']:.0%})"
+            )
+        if result["queries"] > base["queries"]:
+            problems.append(f"{name}: queries {base['queries']} -> {result['queries']}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark report and list endpoints")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date(2025, 3, 31),
+                        help="Report date; match synthetic_data --end-date")
+    parser.add_argument("--include", help="Only endpoints whose path matches this regex")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed p95 growth (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore p95 changes smaller than this")
+    args = parser.parse_args()
+
+    print(f"{'code':>4} {'p50 ms':>9} {'p95 ms':>9} {'sql':>5}  endpoint")
+    results = asyncio.run(run(args))
+    for name, reason in results["skipped"].items():
+        print(f"skipped {name}: {reason}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        problems = compare(results, baseline, args.max_regression, args.min_delta_ms)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
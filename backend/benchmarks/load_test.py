@@ -0,0 +1,438 @@
+"""
+Mixed-Workload Load Test
+
+Drives a running server (uvicorn against a local Postgres filled by
+benchmarks.synthetic_data) with concurrent virtual users. Each user logs in
+once, then repeatedly picks a weighted scenario modelled on the real mix of
+traffic and waits a think time between scenarios:
+
+- dashboard: dashboard summary, recent invoices, upcoming payments
+- browse_invoices: an invoice list page, then one invoice
+- create_invoice: a sales invoice for a random client and branch
+- record_payment: a receipt against an open sales invoice
+- reports: GST summary, trial balance, profit & loss
+- party_ledger_pdf: a client statement PDF
+- login: a fresh login (bcrypt)
+
+The number of users follows a ramp profile of stages, e.g.
+"30s:20,2m:100,30s:0" ramps to 20 users over 30 seconds, to 100 over the
+next two minutes and back to zero. Every --interval seconds a line reports
+active users, throughput, error rate, conflicts (409, e.g. a duplicate
+invoice or payment number) and latency percentiles; a per-step summary
+follows at the end.
+
+Usage (from backend/, with the server running):
+    python -m benchmarks.load_test --email admin@example.com --password secret \\
+        --stages 30s:20,2m:100,30s:0 --output benchmarks/load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.stats import percentile
+
+API_PREFIX = "/api/v1"
+DEFAULT_WEIGHTS = {
+    "dashboard": 35,
+    "browse_invoices": 20,
+    "create_invoice": 15,
+    "record_payment": 10,
+    "reports": 10,
+    "party_ledger_pdf": 5,
+    "login": 5,
+}
+OUTCOMES = ("ok", "conflict", "throttled", "client_error", "server_error", "transport")
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: str) -> float:
+    """
+    Example:
+        >>> parse_duration("90s"), parse_duration("2m"), parse_duration("1.5")
+        (90.0, 120.0, 1.5)
+    """
+    unit = value[-1]
+    if unit in _DURATION_UNITS:
+        return float(value[:-1]) * _DURATION_UNITS[unit]
+    return float(value)
+
+
+def parse_stages(value: str) -> List[Tuple[float, int]]:
+    """
+    Ramp profile as (duration seconds, target users) stages.
+
+    Example:
+        >>> parse_stages("30s:20,2m:100,30s:0")
+        [(30.0, 20), (120.0, 100), (30.0, 0)]
+    """
+    stages = []
+    for stage in value.split(","):
+        duration, users = stage.strip().split(":")
+        stages.append((parse_duration(duration), int(users)))
+    return stages
+
+
+def target_users(stages: List[Tuple[float, int]], elapsed: float) -> Optional[int]:
+    """
+    Users that should be active after elapsed seconds, ramping linearly from
+    the previous stage's target; None once the profile is over.
+
+    Example:
+        >>> stages = parse_stages("10s:20,20s:20,10s:0")
+        >>> [target_users(stages, t) for t in (0, 5, 10, 25, 35, 40)]
+        [0, 10, 20, 20, 10, None]
+    """
+    start, previous = 0.0, 0
+    for duration, users in stages:
+        if elapsed < start + duration:
+            progress = (elapsed - start) / duration if duration else 1.0
+            return round(previous + (users - previous) * progress)
+        start, previous = start + duration, users
+    return None
+
+
+def parse_weights(value: Optional[str]) -> Dict[str, int]:
+    """
+    Scenario weights, defaults overridden by "name=weight,...".
+
+    Example:
+        >>> parse_weights("login=0,reports=40")["reports"]
+        40
+    """
+    weights = dict(DEFAULT_WEIGHTS)
+    for item in filter(None, (value or "").split(",")):
+        name, weight = item.split("=")
+        if name not in weights:
+            raise ValueError(f"Unknown scenario '{name}'")
+        weights[name] = int(weight)
+    return weights
+
+
+def classify(status_code: int) -> str:
+    """
+    Example:
+        >>> [classify(code) for code in (201, 409, 429, 503, 422, 500)]
+        ['ok', 'conflict', 'throttled', 'throttled', 'client_error', 'server_error']
+    """
+    if status_code < 400:
+        return "ok"
+    if status_code == 409:
+        return "conflict"
+    if status_code in (429, 503):
+        return "throttled"
+    if status_code < 500:
+        return "client_error"
+    return "server_error"
+
+
+class Recorder:
+    """Request outcomes and latencies, per interval and per step."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.samples: List[Tuple[float, str, str, float]] = []  # (t, step, outcome, ms)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, step: str, outcome: str, elapsed_ms: float, detail: Optional[str] = None) -> None:
+        self.samples.append((time.monotonic() - self.started, step, outcome, elapsed_ms))
+        if outcome != "ok" and detail:
+            self.errors[f"{step} {outcome}: {detail[:120]}"] += 1
+
+    def window(self, since: float) -> List[Tuple[float, str, str, float]]:
+        return [sample for sample in self.samples if sample[0] >= since]
+
+
+def summarize(samples: List[Tuple[float, str, str, float]], seconds: float) -> dict:
+    """
+    Example:
+        >>> samples = [(0, "a", "ok", 10.0), (1, "a", "conflict", 30.0), (2, "a", "ok", 20.0)]
+        >>> summarize(samples, seconds=3)["error_pct"], summarize(samples, seconds=3)["p50_ms"]
+        (33.3, 20.0)
+    """
+    latencies = [sample[3] for sample in samples]
+    outcomes = defaultdict(int)
+    for sample in samples:
+        outcomes[sample[2]] += 1
+    errors = len(samples) - outcomes["ok"]
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / seconds, 1) if seconds else 0.0,
+        "error_pct": round(errors * 100 / len(samples), 1) if samples else 0.0,
+        "outcomes": {outcome: outcomes[outcome] for outcome in OUTCOMES if outcomes[outcome]},
+        "p50_ms": round(percentile(latencies, 50), 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 1) if latencies else None,
+        "mean_ms": round(statistics.fmean(latencies), 1) if latencies else None,
+    }
+
+
+class Fixtures:
+    """Parties and dates the scenarios draw from, read once through the API."""
+
+    def __init__(self, clients: list, branches: list, as_of: date):
+        self.clients = clients
+        self.branches = branches
+        self.as_of = as_of
+        self.fy_start = date(as_of.year if as_of.month >= 4 else as_of.year - 1, 4, 1)
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, fixtures: Fixtures,
+                 credentials: dict, think_time: float, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.fixtures = fixtures
+        self.credentials = credentials
+        self.think_time = think_time
+        self.rng = rng
+        self.headers: Dict[str, str] = {}
+
+    async def request(self, step: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, API_PREFIX + url, headers=self.headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(step, "transport", (time.perf_counter() - started) * 1000, type(e).__name__)
+            return None
+        outcome = classify(response.status_code)
+        detail = None
+        if outcome != "ok":
+            detail = f"{response.status_code} {response.text}"
+        self.recorder.record(step, outcome, (time.perf_counter() - started) * 1000, detail)
+        return response if outcome == "ok" else None
+
+    async def login(self) -> bool:
+        response = await self.request("POST /auth/login", "POST", "/auth/login", json=self.credentials)
+        if response is None:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def dashboard(self) -> None:
+        await self.request("GET /reports/dashboard", "GET", "/reports/dashboard")
+        await self.request("GET /reports/recent-invoices", "GET", "/reports/recent-invoices")
+        await self.request("GET /reports/upcoming-payments", "GET", "/reports/upcoming-payments")
+
+    async def browse_invoices(self) -> None:
+        response = await self.request(
+            "GET /invoices", "GET", "/invoices",
+            params={"page": self.rng.randint(1, 20), "page_size": 20},
+        )
+        items = response.json()["items"] if response is not None else []
+        if items:
+            invoice = self.rng.choice(items)
+            await self.request("GET /invoices/{id}", "GET", f"/invoices/{invoice['id']}")
+
+    async def create_invoice(self) -> None:
+        client = self.rng.choice(self.fixtures.clients)
+        branch = self.rng.choice(self.fixtures.branches)
+        invoice_date = self.fixtures.as_of - timedelta(days=self.rng.randint(0, 30))
+        items = [
+            {
+                "serial_no": n,
+                "description": f"Load test service {n}",
+                "quantity": str(self.rng.randint(1, 10)),
+                "rate": str(self.rng.randint(500, 50000)),
+                "gst_rate": "18",
+            }
+            for n in range(1, self.rng.randint(1, 5) + 1)
+        ]
+        await self.request("POST /invoices", "POST", "/invoices", json={
+            "invoice_date": invoice_date.isoformat(),
+            "invoice_type": "SALES",
+            "client_id": client["id"],
+            "branch_id": branch["id"],
+            "place_of_supply": client["state"],
+            "place_of_supply_code": client["state_code"],
+            "is_igst": client["state_code"] != branch["state_code"],
+            "due_date": (invoice_date + timedelta(days=30)).isoformat(),
+            "items": items,
+        })
+
+    async def record_payment(self) -> None:
+        response = await self.request(
+            "GET /invoices?status=SENT", "GET", "/invoices",
+            params={"invoice_type": "SALES", "status_filter": "SENT", "page": self.rng.randint(1, 5)},
+        )
+        items = response.json()["items"] if response is not None else []
+        if not items:
+            return
+        invoice = self.rng.choice(items)
+        await self.request("POST /payments", "POST", "/payments", json={
+            "payment_date": self.fixtures.as_of.isoformat(),
+            "payment_type": "RECEIPT",
+            "client_id": invoice["client_id"],
+            "invoice_id": invoice["id"],
+            "gross_amount": str(invoice["amount_due"]),
+            "payment_mode": "NEFT",
+            "reference_number": f"LOAD{self.rng.randrange(10 ** 9):09d}",
+        })
+
+    async def reports(self) -> None:
+        period = {"from_date": self.fixtures.fy_start.isoformat(), "to_date": self.fixtures.as_of.isoformat()}
+        await self.request("GET /reports/gst-summary", "GET", "/reports/gst-summary", params=period)
+        await self.request("GET /ledger/trial-balance", "GET", "/ledger/trial-balance",
+                           params={"as_on_date": self.fixtures.as_of.isoformat()})
+        await self.request("GET /reports/profit-loss", "GET", "/reports/profit-loss", params=period)
+
+    async def party_ledger_pdf(self) -> None:
+        client = self.rng.choice(self.fixtures.clients)
+        await self.request(
+            "GET /reports/party-ledger/pdf", "GET", f"/reports/party-ledger/client/{client['id']}/pdf",
+            params={"from_date": self.fixtures.fy_start.isoformat(), "to_date": self.fixtures.as_of.isoformat()},
+        )
+
+    async def run(self, weights: Dict[str, int], stop: asyncio.Event) -> None:
+        if not await self.login():
+            return
+        names = [name for name, weight in weights.items() if weight > 0]
+        population = [weights[name] for name in names]
+        while not stop.is_set():
+            scenario = self.rng.choices(names, population)[0]
+            await getattr(self, scenario)()
+            # Exponential think time, so users do not fall into lock-step
+            try:
+                await asyncio.wait_for(stop.wait(), self.rng.expovariate(1 / self.think_time))
+            except asyncio.TimeoutError:
+                pass
+
+
+async def load_fixtures(client: httpx.AsyncClient, credentials: dict, as_of: date) -> Fixtures:
+    response = await client.post(f"{API_PREFIX}/auth/login", json=credentials)
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def items(path: str) -> list:
+        response = await client.get(f"{API_PREFIX}{path}", params={"page_size": 100}, headers=headers)
+        response.raise_for_status()
+        return response.json()["items"]
+
+    clients, branches = await items("/clients"), await items("/branches")
+    if not clients or not branches:
+        raise SystemExit("No clients or branches; fill the database with benchmarks.synthetic_data first")
+    return Fixtures(clients, branches, as_of)
+
+
+def _print_interval(elapsed: float, users: int, stats: dict) -> None:
+    conflicts = stats["outcomes"].get("conflict", 0)
+    p = lambda value: f"{value:>8.1f}" if value is not None else f"{'-':>8}"
+    print(
+        f"{elapsed:>6.0f}s {users:>6} {stats['rps']:>8} {stats['error_pct']:>7.1f} {conflicts:>6}"
+        f" {p(stats['p50_ms'])} {p(stats['p95_ms'])} {p(stats['p99_ms'])}",
+        flush=True,
+    )
+
+
+async def run(args) -> dict:
+    stages = parse_stages(args.stages)
+    weights = parse_weights(args.weights)
+    credentials = {"email": args.email, "password": args.password}
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    recorder = Recorder()
+    timeline = []
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        if args.register:
+            await client.post(f"{API_PREFIX}/auth/register", json={**credentials, "name": "Load Test"})
+        fixtures = await load_fixtures(client, credentials, args.as_of)
+
+        users: List[Tuple[asyncio.Task, asyncio.Event]] = []
+        recorder.started = started = time.monotonic()
+        next_report = args.interval
+        print(f"{'time':>7} {'users':>6} {'req/s':>8} {'err %':>7} {'409':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        while True:
+            elapsed = time.monotonic() - started
+            target = target_users(stages, elapsed)
+            if target is None:
+                break
+            while len(users) < target:
+                stop = asyncio.Event()
+                user = VirtualUser(client, recorder, fixtures, credentials, args.think_time,
+                                   random.Random(args.seed * 100003 + len(users)))
+                users.append((asyncio.create_task(user.run(weights, stop)), stop))
+            while len(users) > target:
+                users.pop()[1].set()
+
+            if elapsed >= next_report:
+                stats = summarize(recorder.window(next_report - args.interval), args.interval)
+                timeline.append({"t": round(next_report), "users": len(users), **stats})
+                _print_interval(next_report, len(users), stats)
+                next_report += args.interval
+            await asyncio.sleep(0.1)
+
+        for _, stop in users:
+            stop.set()
+        await asyncio.gather(*(task for task, _ in users))
+        duration = time.monotonic() - started
+
+    steps = defaultdict(list)
+    for sample in recorder.samples:
+        steps[sample[1]].append(sample)
+    return {
+        "meta": {
+            "base_url": args.base_url,
+            "stages": args.stages,
+            "weights": weights,
+            "think_time": args.think_time,
+            "seed": args.seed,
+            "duration_s": round(duration, 1),
+        },
+        "total": summarize(recorder.samples, duration),
+        "steps": {step: summarize(samples, duration) for step, samples in sorted(steps.items())},
+        "timeline": timeline,
+        "errors": dict(sorted(recorder.errors.items(), key=lambda item: -item[1])[:20]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mixed-workload load test against a running server")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--register", action="store_true", help="Register the user first")
+    parser.add_argument("--stages", default="30s:20,2m:50,30s:0", help="Ramp profile, duration:users,...")
+    parser.add_argument("--weights", help="Scenario weight overrides, e.g. login=0,reports=40")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between scenarios")
+    parser.add_argument("--interval", type=float, default=10.0, help="Seconds per timeline line")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Request timeout in seconds")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date(2025, 3, 31),
+                        help="Business date; match synthetic_data --end-date")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    total = results["total"]
+    print(f"\n{total['requests']} requests in {results['meta']['duration_s']}s, "
+          f"{total['rps']} req/s, {total['error_pct']}% errors {total['outcomes']}")
+    print(f"{'requests':>9} {'err %':>7} {'409':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  step")
+    for step, stats in results["steps"].items():
+        print(
+            f"{stats['requests']:>9} {stats['error_pct']:>7.1f} {stats['outcomes'].get('conflict', 0):>5}"
+            f" {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}  {step}"
+        )
+    for error, count in results["errors"].items():
+        print(f"{count:>6}x {error}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Event-loop stall under concurrent logins.
+
+Fires a burst of password verifications at the event loop while a probe
+task sleeps in short ticks and records how late each tick wakes up. The
+lateness is the time every other request on the worker would have waited.
+
+Two modes are compared:
+
+- inline: bcrypt called directly in the coroutine (the old login path)
+- pool: verify_password_async, i.e. the dedicated bcrypt thread pool
+
+Usage (from backend/):
+    python -m benchmarks.login_stall --logins 20 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROBE_INTERVAL = 0.005  # seconds between probe ticks
+
+
+async def _probe(lags: list, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(loop.time() - expected, 0.0))
+
+
+async def _run(mode: str, logins: int, password: str, hashed: str) -> dict:
+    from app.core.security import verify_password, verify_password_async
+
+    async def login_inline():
+        return verify_password(password, hashed)
+
+    async def login_pool():
+        return await verify_password_async(password, hashed)
+
+    login = login_inline if mode == "inline" else login_pool
+    lags: list = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, stop))
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    assert all(results)
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    return {
+        "mode": mode,
+        "logins": logins,
+        "wall_s": round(elapsed, 3),
+        "lag_max_ms": round(lags_ms[-1], 1),
+        "lag_p95_ms": round(lags_ms[int(len(lags_ms) * 0.95) - 1 if len(lags_ms) > 1 else 0], 1),
+        "lag_mean_ms": round(statistics.fmean(lags_ms), 1),
+        "probe_ticks": len(lags),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=20, help="Concurrent login attempts")
+    parser.add_argument("--rounds", type=int, default=12, help="Bcrypt cost factor")
+    args = parser.parse_args()
+
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    from app.core.security import get_password_hash
+
+    password = "correct horse battery staple"
+    hashed = get_password_hash(password)
+
+    print(f"{'mode':<8}{'logins':>8}{'wall s':>9}{'max lag ms':>12}{'p95 lag ms':>12}{'mean lag ms':>13}")
+    for mode in ("inline", "pool"):
+        r = asyncio.run(_run(mode, args.logins, password, hashed))
+        print(
+            f"{r['mode']:<8}{r['logins']:>8}{r['wall_s']:>9}"
+            f"{r['lag_max_ms']:>12}{r['lag_p95_ms']:>12}{r['lag_mean_ms']:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
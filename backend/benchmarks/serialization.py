@@ -0,0 +1,131 @@
+"""
+Invoice page serialization time.
+
+Serializes one page of transient Invoice rows (with items, client, vendor
+and branch loaded) the way GET /invoices used to, and through the
+precompiled output adapter it uses now:
+
+- model_validate: InvoiceResponse.model_validate per row, wrapped in
+  PaginatedResponse, then validated and dumped again by FastAPI
+- adapter: paginated_response(), one validation against the output copy
+  of the schema and one dump_json
+
+No database is needed.
+
+Usage (from backend/):
+    python -m benchmarks.serialization --rows 1000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+from sqlalchemy import Boolean, Date, DateTime, Enum, Integer, Numeric
+
+from app.core.responses import paginated_response, response_adapter
+from app.models.bank_account import BankAccount
+from app.models.branch import Branch
+from app.models.client import Client
+from app.models.invoice import Invoice, InvoiceItem
+from app.models.vendor import Vendor
+from app.schemas.common import PaginatedResponse
+from app.schemas.invoice import InvoiceResponse
+
+# Column values that have to pass the schemas' format validators
+SAMPLE_VALUES = {
+    "gstin": "07AAACH7409R1ZZ",
+    "pan": "AAACH7409R",
+    "state_code": "07",
+    "pincode": "110001",
+    "email": "accounts@example.com",
+    "account_number": "123456789012",
+    "ifsc_code": "HDFC0001234",
+}
+
+
+def _row(model, n: int, **values):
+    """Transient ORM object with every column filled."""
+    for column in model.__table__.columns:
+        if column.name in values:
+            continue
+        if column.name in SAMPLE_VALUES:
+            values[column.name] = SAMPLE_VALUES[column.name]
+        elif column.default is not None and column.default.is_scalar:
+            values[column.name] = column.default.arg
+        elif isinstance(column.type, Enum):
+            values[column.name] = next(iter(column.type.enum_class))
+        elif isinstance(column.type, Boolean):
+            values[column.name] = False
+        elif isinstance(column.type, Numeric):
+            values[column.name] = Decimal("1234.56") + n
+        elif isinstance(column.type, Integer):
+            values[column.name] = n
+        elif isinstance(column.type, DateTime):
+            values[column.name] = datetime(2025, 3, 31, 12, 0)
+        elif isinstance(column.type, Date):
+            values[column.name] = date(2025, 3, 31)
+        else:
+            values[column.name] = f"{column.name} {n}"
+    return model(**values)
+
+
+def invoice_rows(count: int) -> list:
+    client, vendor = _row(Client, 1), _row(Vendor, 1)
+    branch = _row(Branch, 1)
+    bank_account = _row(BankAccount, 1, branch=branch)
+    return [
+        _row(
+            Invoice, n, client=client, vendor=vendor, branch=branch, bank_account=bank_account,
+            items=[_row(InvoiceItem, n * 10 + i, serial_no=i + 1) for i in range(3)],
+        )
+        for n in range(count)
+    ]
+
+
+def _timed(fn, repeat: int) -> list:
+    fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = invoice_rows(args.rows)
+    total = len(rows)
+    response_field = TypeAdapter(PaginatedResponse[InvoiceResponse])
+    page_adapter = response_adapter(PaginatedResponse[InvoiceResponse])
+
+    def model_validate():
+        page = PaginatedResponse(
+            items=[InvoiceResponse.model_validate(row) for row in rows],
+            total=total, page=1, page_size=total, total_pages=1,
+        )
+        return response_field.dump_json(response_field.validate_python(page))
+
+    def adapter():
+        return paginated_response(page_adapter, rows, total, 1, total).body
+
+    assert model_validate() == adapter(), "serializations differ"
+
+    print(f"{'path':<16}{'median ms':>10}{'min ms':>9}  ({args.rows} invoices)")
+    for name, fn in (("model_validate", model_validate), ("adapter", adapter)):
+        timings = _timed(fn, args.repeat)
+        print(f"{name:<16}{statistics.median(timings):>10.1f}{min(timings):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
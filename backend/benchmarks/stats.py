@@ -0,0 +1,17 @@
+"""Statistics helpers shared by the benchmarks."""
+import math
+from typing import List
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Example:
+        >>> percentile([5, 1, 4, 2, 3], 50)
+        3
+        >>> percentile(list(range(1, 101)), 95)
+        95
+    """
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
@@ -0,0 +1,117 @@
+"""
+Streamed and compressed invoice pages.
+
+Serves one page of transient Invoice rows (see benchmarks.serialization)
+through CompressionMiddleware, once built in memory with
+paginated_response() and once streamed with StreamingJSONResponse, and
+records per variant:
+
+- time to first byte and total time
+- peak Python memory allocated while serving (tracemalloc)
+- bytes on the wire with and without Accept-Encoding: gzip
+
+No database is needed; the rows are generated up front, so peak memory
+counts the encoded body, not the rows.
+
+Usage (from backend/):
+    python -m benchmarks.streaming --rows 1000
+"""
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+
+from app.api.v1.endpoints.invoices import INVOICE_PAGE, INVOICE_ROW
+from app.core.compression import CompressionMiddleware
+from app.core.responses import JSONRows, StreamingJSONResponse, paginated_response
+from benchmarks.serialization import invoice_rows
+
+
+def build_app(rows: list) -> FastAPI:
+    total = len(rows)
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/buffered")
+    async def buffered():
+        return paginated_response(INVOICE_PAGE, rows, total, 1, total)
+
+    @app.get("/streamed")
+    async def streamed():
+        return StreamingJSONResponse({
+            "items": JSONRows(rows, INVOICE_ROW),
+            "total": total,
+            "page": 1,
+            "page_size": total,
+            "total_pages": 1,
+        })
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, encoding: str) -> dict:
+    """Drive the ASGI app directly; httpx's ASGI transport buffers the body."""
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            await asyncio.Event().wait()  # the client never disconnects
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    first_byte, wire_bytes = None, 0
+
+    async def send(message):
+        nonlocal first_byte, wire_bytes
+        if message["type"] == "http.response.body":
+            first_byte = first_byte or time.perf_counter()
+            wire_bytes += len(message.get("body", b""))
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"benchmark"), (b"accept-encoding", encoding.encode())],
+        "client": ("127.0.0.1", 0), "server": ("benchmark", 80),
+    }
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    finished = time.perf_counter()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "ttfb_ms": (first_byte - started) * 1000,
+        "total_ms": (finished - started) * 1000,
+        "peak_kb": peak // 1024,
+        "wire_kb": wire_bytes // 1024,
+    }
+
+
+async def run(args) -> None:
+    app = build_app(invoice_rows(args.rows))
+    print(f"{'variant':<20}{'ttfb ms':>9}{'total ms':>10}{'peak KiB':>10}{'wire KiB':>10}  ({args.rows} invoices)")
+    for path in ("/buffered", "/streamed"):
+        for encoding in ("identity", "gzip"):
+            await measure(app, path, encoding)
+            r = await measure(app, path, encoding)
+            name = f"{path[1:]} {encoding}"
+            print(f"{name:<20}{r['ttfb_ms']:>9.1f}{r['total_ms']:>10.1f}{r['peak_kb']:>10}{r['wire_kb']:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
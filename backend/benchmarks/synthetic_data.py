@@ -0,0 +1,692 @@
+"""
+Deterministic Synthetic Dataset
+
+Fills a migrated database with a reproducible accounting dataset for the
+benchmarks: branches, clients, vendors, client POs with items and billing
+schedules, sales and purchase invoices with items, payments with
+allocations, ledger entries and monthly TDS challans with their entries.
+
+- Size is driven by the number of ledger rows (10k to 10M); every other
+  table scales with it (dataset_size).
+- Invoices are generated in date order, in chunks, and written with COPY,
+  so memory stays flat at any scale.
+- Ledger entries come from ledger_posting.build_invoice_entries, so they
+  match what the application posts.
+- The same seed, size and end date always produce the same rows.
+
+Usage (from backend/):
+    python -m benchmarks.synthetic_data --ledger-rows 100000
+    python -m benchmarks.synthetic_data --ledger-rows 10000000 --reset
+
+--reset truncates the tables the generator writes (and, by cascade, rows
+that reference them); use it only on a benchmark database.
+"""
+import argparse
+import asyncio
+import enum
+import os
+import random
+import string
+import sys
+import time
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncpg
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import Enum as SAEnum, select, text
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.billing_schedule import BillingSchedule, ScheduleStatus
+from app.models.branch import Branch
+from app.models.client import Client, ClientType
+from app.models.client_po import ClientPO, ClientPOItem, ClientPOStatus, BillingFrequency
+from app.models.invoice import Invoice, InvoiceItem, InvoiceType, InvoiceStatus
+from app.models.ledger import LedgerEntry, ReferenceType
+from app.models.payment import Payment, PaymentAllocation, PaymentType, PaymentMode, PaymentStatus
+from app.models.settings import CompanySettings
+from app.models.tds_challan import TDSChallan, TDSChallanEntry, TDSType
+from app.models.vendor import Vendor, VendorType
+from app.services.billing_schedules import build_schedules
+from app.services.chart_of_accounts_seeder import DEFAULT_ACCOUNTS, seed_default_accounts
+from app.services.ledger_posting import build_invoice_entries, get_financial_year
+from app.services.tds_threshold import rebuild_tds_aggregates, tds_financial_year
+
+GST_RATE = Decimal("18")
+PAISE = Decimal("0.01")
+
+# (state, state code, city) of the generated branches; parties pick from the same list
+STATES = [
+    ("Maharashtra", "27", "Mumbai"),
+    ("Karnataka", "29", "Bengaluru"),
+    ("Delhi", "07", "New Delhi"),
+    ("Tamil Nadu", "33", "Chennai"),
+    ("Gujarat", "24", "Ahmedabad"),
+]
+BRANCH_COUNT = 3
+
+TDS_SECTIONS = [("194C", Decimal("2")), ("194J", Decimal("10"))]
+SAC_CODES = ["998311", "998313", "998314", "998319", "998361"]
+PAYMENT_MODES = [PaymentMode.NEFT, PaymentMode.RTGS, PaymentMode.UPI, PaymentMode.CHEQUE]
+
+# Tables written by the generator, children first
+GENERATED_MODELS = [
+    LedgerEntry, PaymentAllocation, Payment, TDSChallanEntry, InvoiceItem, Invoice,
+    TDSChallan, BillingSchedule, ClientPOItem, ClientPO, Client, Vendor, Branch,
+]
+
+
+@dataclass
+class DatasetSize:
+    ledger_rows: int
+    invoices: int
+    clients: int
+    vendors: int
+    client_pos: int
+
+
+def dataset_size(ledger_rows: int) -> DatasetSize:
+    """
+    Row counts for a target number of ledger rows.
+
+    A posted invoice produces about 3.7 ledger rows and half the invoices
+    get a 2-row payment, so an invoice accounts for about 4.4 rows.
+
+    Example:
+        >>> dataset_size(10_000)
+        DatasetSize(ledger_rows=10000, invoices=2272, clients=56, vendors=28, client_pos=90)
+    """
+    invoices = max(ledger_rows * 10 // 44, 10)
+    return DatasetSize(
+        ledger_rows=ledger_rows,
+        invoices=invoices,
+        clients=max(invoices // 40, 20),
+        vendors=max(invoices // 80, 10),
+        client_pos=max(invoices // 25, 10),
+    )
+
+
+def _money(value) -> Decimal:
+    return Decimal(value).quantize(PAISE)
+
+
+class TableWriter:
+    """COPY rows of a model's table, filling unset columns from the model defaults."""
+
+    def __init__(self, conn: asyncpg.Connection, model, timestamp: datetime):
+        self.conn = conn
+        self.table = model.__table__
+        self.columns = list(self.table.columns)
+        self.names = [column.name for column in self.columns]
+        self.timestamp = timestamp
+        self.rows = 0
+
+    def _value(self, column, row: dict):
+        if column.name in row:
+            value = row[column.name]
+        elif column.default is not None:
+            value = self.timestamp if column.default.is_callable else column.default.arg
+        else:
+            value = None
+        if isinstance(value, enum.Enum):
+            value = value.name if isinstance(column.type, SAEnum) else value.value
+        return value
+
+    async def write(self, rows: List[dict]) -> None:
+        if not rows:
+            return
+        records = [tuple(self._value(column, row) for column in self.columns) for row in rows]
+        await self.conn.copy_records_to_table(self.table.name, records=records, columns=self.names)
+        self.rows += len(rows)
+
+
+class IdSequence:
+    """Explicit ids for COPY, continuing after the rows already in the table."""
+
+    def __init__(self, start: int):
+        self.next_id = start
+
+    def __call__(self) -> int:
+        value = self.next_id
+        self.next_id += 1
+        return value
+
+
+class SyntheticDataset:
+
+    def __init__(self, size: DatasetSize, seed: int, end_date: date, years: int, chunk_size: int):
+        self.size = size
+        self.rng = random.Random(seed)
+        self.end_date = end_date
+        self.start_date = end_date - relativedelta(years=years) + timedelta(days=1)
+        self.chunk_size = chunk_size
+        self.timestamp = datetime.combine(end_date, datetime.min.time())
+        self.counters: Dict[Tuple[str, str], int] = {}
+
+    # Reference data
+
+    def _pan(self, holder: str) -> str:
+        letters = "".join(self.rng.choice(string.ascii_uppercase) for _ in range(3))
+        return f"{letters}{holder}{self.rng.choice(string.ascii_uppercase)}{self.rng.randrange(10000):04d}{self.rng.choice(string.ascii_uppercase)}"
+
+    def _address(self) -> dict:
+        state, state_code, city = self.rng.choice(STATES)
+        return {
+            "address": f"{self.rng.randrange(1, 999)}, Sector {self.rng.randrange(1, 60)}",
+            "city": city,
+            "state": state,
+            "state_code": state_code,
+            "pincode": f"{self.rng.randrange(110001, 699999)}",
+        }
+
+    def branches(self, next_id: IdSequence) -> List[dict]:
+        rows = []
+        for i, (state, state_code, city) in enumerate(STATES[:BRANCH_COUNT]):
+            pan = "AABCH1234F"
+            rows.append({
+                "id": next_id(),
+                "branch_name": f"{city} Branch",
+                "branch_code": f"BR{i + 1:02d}",
+                "gstin": f"{state_code}{pan}{i + 1}Z5",
+                "state": state,
+                "state_code": state_code,
+                "address": f"{i + 1} Bench Road",
+                "city": city,
+                "pincode": "400001",
+                "is_head_office": i == 0,
+            })
+        return rows
+
+    def clients(self, next_id: IdSequence) -> List[dict]:
+        rows = []
+        for i in range(self.size.clients):
+            pan = self._pan("C")
+            address = self._address()
+            rows.append({
+                "id": next_id(),
+                "name": f"Client {i + 1:06d} Pvt Ltd",
+                "code": f"CL{i + 1:06d}",
+                "gstin": f"{address['state_code']}{pan}1Z{i % 10}",
+                "pan": pan,
+                **address,
+                "email": f"accounts{i + 1}@client.example",
+                "phone": f"98{i:08d}"[:10],
+                "client_type": ClientType.B2B,
+                "payment_terms": self.rng.choice([15, 30, 45, 60]),
+            })
+        return rows
+
+    def vendors(self, next_id: IdSequence) -> List[dict]:
+        rows = []
+        for i in range(self.size.vendors):
+            pan = self._pan("C")
+            address = self._address()
+            section = self.rng.choice(TDS_SECTIONS)[0] if self.rng.random() < 0.6 else None
+            rows.append({
+                "id": next_id(),
+                "name": f"Vendor {i + 1:06d} Services",
+                "code": f"VN{i + 1:06d}",
+                "gstin": f"{address['state_code']}{pan}1Z{i % 10}",
+                "pan": pan,
+                **address,
+                "email": f"billing{i + 1}@vendor.example",
+                "phone": f"97{i:08d}"[:10],
+                "vendor_type": VendorType.SERVICES,
+                "payment_terms": self.rng.choice([15, 30, 45]),
+                "tds_applicable": section is not None,
+                "tds_section": section,
+            })
+        return rows
+
+    def _number(self, prefix: str, on: date, series: Optional[str] = None) -> str:
+        """Next PREFIX/2024-25/0001 style number; series separates counters sharing a prefix."""
+        fy = get_financial_year(on)
+        key = (series or prefix, fy)
+        count = self.counters[key] = self.counters.get(key, 0) + 1
+        return f"{prefix}/{fy}/{count:04d}"
+
+    def client_pos(
+        self,
+        clients: List[dict],
+        branches: List[dict],
+        next_po_id: IdSequence,
+        next_item_id: IdSequence,
+        next_schedule_id: IdSequence,
+    ):
+        """Yield (pos, items, schedules) chunks."""
+        pos, items, schedules = [], [], []
+        span = (self.end_date - self.start_date).days
+        for _ in range(self.size.client_pos):
+            client = clients[int(len(clients) * self.rng.random() ** 2)]
+            branch = self.rng.choice(branches)
+            valid_from = self.start_date + timedelta(days=self.rng.randrange(span))
+            valid_until = valid_from + relativedelta(years=1) - timedelta(days=1)
+            frequency = self.rng.choices(
+                [BillingFrequency.MONTHLY, BillingFrequency.QUARTERLY, BillingFrequency.ONE_TIME],
+                weights=[5, 2, 3],
+            )[0]
+            is_igst = client["state_code"] != branch["state_code"]
+            taxable = _money(self.rng.randrange(50, 500) * 1000)
+            gst = _money(taxable * GST_RATE / 100)
+            po_id = next_po_id()
+            pos.append({
+                "id": po_id,
+                "internal_number": self._number("CPO", valid_from),
+                "client_po_number": f"PO-{self.rng.randrange(10 ** 6):06d}",
+                "client_po_date": valid_from,
+                "received_date": valid_from,
+                "client_id": client["id"],
+                "branch_id": branch["id"],
+                "subject": f"{frequency.value.title()} services",
+                "valid_from": valid_from,
+                "valid_until": valid_until,
+                "billing_frequency": frequency,
+                "place_of_supply": client["state"],
+                "place_of_supply_code": client["state_code"],
+                "is_igst": is_igst,
+                "subtotal": taxable,
+                "taxable_amount": taxable,
+                "cgst_amount": Decimal("0") if is_igst else gst / 2,
+                "sgst_amount": Decimal("0") if is_igst else gst / 2,
+                "igst_amount": gst if is_igst else Decimal("0"),
+                "total_amount": taxable + gst,
+                "remaining_amount": taxable + gst,
+                "status": ClientPOStatus.ACTIVE,
+            })
+            items.append({
+                "id": next_item_id(),
+                "client_po_id": po_id,
+                "serial_no": 1,
+                "description": "Professional services",
+                "hsn_sac": self.rng.choice(SAC_CODES),
+                "quantity": Decimal("1"),
+                "rate": taxable,
+                "amount": taxable,
+                "gst_rate": GST_RATE,
+                "cgst_amount": Decimal("0") if is_igst else gst / 2,
+                "sgst_amount": Decimal("0") if is_igst else gst / 2,
+                "igst_amount": gst if is_igst else Decimal("0"),
+                "total_amount": taxable + gst,
+                "remaining_quantity": Decimal("1"),
+            })
+            if frequency != BillingFrequency.ONE_TIME:
+                for row in build_schedules(frequency, taxable, gst, valid_from, valid_until):
+                    schedules.append({
+                        **row,
+                        "id": next_schedule_id(),
+                        "client_po_id": po_id,
+                        "status": ScheduleStatus.PENDING,
+                    })
+            if len(pos) >= self.chunk_size:
+                yield pos, items, schedules
+                pos, items, schedules = [], [], []
+        yield pos, items, schedules
+
+    def challans(self, branches: List[dict], next_id: IdSequence) -> Tuple[List[dict], Dict[tuple, int]]:
+        """
+        One PAYABLE challan per branch and month, except the last month whose
+        TDS is still pending. Amounts are filled in after the entries exist.
+        """
+        rows, ids = [], {}
+        month = self.start_date.replace(day=1)
+        last_month = self.end_date.replace(day=1)
+        while month < last_month:
+            paid_on = month + relativedelta(months=1, day=7)
+            for branch in branches:
+                challan_id = next_id()
+                ids[(month.year, month.month, branch["id"])] = challan_id
+                rows.append({
+                    "id": challan_id,
+                    "challan_number": f"{self.rng.randrange(10 ** 5):05d}",
+                    "bsr_code": "0510308",
+                    "financial_year": tds_financial_year(month),
+                    "month": month.month,
+                    "quarter": (month.month - 4) % 12 // 3 + 1,
+                    "tds_type": TDSType.PAYABLE,
+                    "payment_date": paid_on,
+                    "branch_id": branch["id"],
+                })
+            month += relativedelta(months=1)
+        return rows, ids
+
+    # Transactions
+
+    def _invoice_status(self, due_date: date) -> Tuple[InvoiceStatus, Decimal]:
+        """Status and the paid share of the amount."""
+        roll = self.rng.random()
+        if roll < 0.05:
+            return InvoiceStatus.DRAFT, Decimal("0")
+        if roll < 0.08:
+            return InvoiceStatus.CANCELLED, Decimal("0")
+        roll = self.rng.random()
+        if due_date < self.end_date:
+            if roll < 0.75:
+                return InvoiceStatus.PAID, Decimal("1")
+            if roll < 0.85:
+                return InvoiceStatus.PARTIAL, Decimal("0.5")
+            return InvoiceStatus.OVERDUE, Decimal("0")
+        if roll < 0.2:
+            return InvoiceStatus.PAID, Decimal("1")
+        return InvoiceStatus.SENT, Decimal("0")
+
+    def invoices(self, parties: dict, branches: List[dict], challan_ids: Dict[tuple, int], ids: dict, posting):
+        """Yield dicts of rows per model, chunk by chunk, in invoice date order."""
+        clients, vendors = parties["clients"], parties["vendors"]
+        span = (self.end_date - self.start_date).days + 1
+        total = self.size.invoices
+        chunk = {model: [] for model in (Invoice, InvoiceItem, Payment, PaymentAllocation, LedgerEntry, TDSChallanEntry)}
+
+        for i in range(total):
+            invoice_date = self.start_date + timedelta(days=i * span // total)
+            branch = self.rng.choice(branches)
+            is_sales = self.rng.random() < 0.7
+            parties_of_type = clients if is_sales else vendors
+            # Squared draw skews activity towards the first parties, like real books
+            party = parties_of_type[int(len(parties_of_type) * self.rng.random() ** 2)]
+            is_igst = party["state_code"] != branch["state_code"]
+            due_date = invoice_date + timedelta(days=party["payment_terms"])
+            status, paid_share = self._invoice_status(due_date)
+            invoice_id = ids[Invoice]()
+
+            subtotal = Decimal("0")
+            gst_total = Decimal("0")
+            for serial_no in range(1, self.rng.randint(1, 3) + 1):
+                quantity = Decimal(self.rng.randint(1, 10))
+                rate = Decimal(self.rng.randrange(500, 50000, 50))
+                amount = quantity * rate
+                gst = _money(amount * GST_RATE / 100)
+                half = _money(gst / 2)
+                subtotal += amount
+                gst_total += gst
+                chunk[InvoiceItem].append({
+                    "id": ids[InvoiceItem](),
+                    "invoice_id": invoice_id,
+                    "serial_no": serial_no,
+                    "description": f"Services - {invoice_date.strftime('%B %Y')}",
+                    "hsn_sac": self.rng.choice(SAC_CODES),
+                    "quantity": quantity,
+                    "rate": rate,
+                    "amount": amount,
+                    "taxable_amount": amount,
+                    "gst_rate": GST_RATE,
+                    "cgst_rate": Decimal("0") if is_igst else GST_RATE / 2,
+                    "cgst_amount": Decimal("0") if is_igst else half,
+                    "sgst_rate": Decimal("0") if is_igst else GST_RATE / 2,
+                    "sgst_amount": Decimal("0") if is_igst else gst - half,
+                    "igst_rate": GST_RATE if is_igst else Decimal("0"),
+                    "igst_amount": gst if is_igst else Decimal("0"),
+                    "total_amount": amount + gst,
+                })
+            cgst = Decimal("0") if is_igst else _money(gst_total / 2)
+            total_amount = subtotal + gst_total
+
+            tds_section, tds_rate, tds_amount, challan_id = None, Decimal("0"), Decimal("0"), None
+            if not is_sales and party["tds_applicable"]:
+                tds_section = party["tds_section"]
+                tds_rate = dict(TDS_SECTIONS)[tds_section]
+                tds_amount = _money(subtotal * tds_rate / 100)
+                if status not in (InvoiceStatus.DRAFT, InvoiceStatus.CANCELLED):
+                    challan_id = challan_ids.get((invoice_date.year, invoice_date.month, branch["id"]))
+            amount_after_tds = total_amount - tds_amount
+            amount_paid = _money(amount_after_tds * paid_share)
+
+            invoice = {
+                "id": invoice_id,
+                "invoice_number": self._number("INV" if is_sales else "BILL", invoice_date),
+                "invoice_date": invoice_date,
+                "invoice_type": InvoiceType.SALES if is_sales else InvoiceType.PURCHASE,
+                "client_id": party["id"] if is_sales else None,
+                "vendor_id": None if is_sales else party["id"],
+                "branch_id": branch["id"],
+                "place_of_supply": party["state"],
+                "place_of_supply_code": party["state_code"],
+                "is_igst": is_igst,
+                "subtotal": subtotal,
+                "taxable_amount": subtotal,
+                "cgst_amount": cgst,
+                "sgst_amount": Decimal("0") if is_igst else gst_total - cgst,
+                "igst_amount": gst_total if is_igst else Decimal("0"),
+                "round_off": Decimal("0"),
+                "total_amount": total_amount,
+                "tds_applicable": tds_amount > 0,
+                "tds_section": tds_section,
+                "tds_rate": tds_rate,
+                "tds_amount": tds_amount,
+                "tds_challan_id": challan_id,
+                "amount_after_tds": amount_after_tds,
+                "amount_paid": amount_paid,
+                "amount_due": Decimal("0") if status == InvoiceStatus.CANCELLED else amount_after_tds - amount_paid,
+                "due_date": due_date,
+                "status": status,
+                "is_posted": status not in (InvoiceStatus.DRAFT, InvoiceStatus.CANCELLED),
+            }
+            chunk[Invoice].append(invoice)
+
+            if invoice["is_posted"]:
+                voucher = self._number("INV", invoice_date, series="voucher-invoice")
+                for entry in build_invoice_entries(
+                    Invoice(**invoice), posting, voucher, get_financial_year(invoice_date)
+                ):
+                    chunk[LedgerEntry].append(self._ledger_row(entry, ids))
+
+            if challan_id:
+                chunk[TDSChallanEntry].append({
+                    "id": ids[TDSChallanEntry](),
+                    "challan_id": challan_id,
+                    "invoice_id": invoice_id,
+                    "party_name": party["name"],
+                    "party_pan": party["pan"],
+                    "invoice_number": invoice["invoice_number"],
+                    "invoice_date": invoice_date,
+                    "base_amount": subtotal,
+                    "tds_rate": tds_rate,
+                    "tds_section": tds_section,
+                    "tds_amount": tds_amount,
+                })
+
+            if amount_paid > 0:
+                self._payment(chunk, invoice, party, ids, posting)
+
+            if len(chunk[Invoice]) >= self.chunk_size:
+                yield chunk
+                chunk = {model: [] for model in chunk}
+        yield chunk
+
+    def _ledger_row(self, entry: LedgerEntry, ids: dict) -> dict:
+        row = {column.name: getattr(entry, column.name) for column in LedgerEntry.__table__.columns}
+        row.update(id=ids[LedgerEntry](), created_at=self.timestamp, updated_at=self.timestamp)
+        return row
+
+    def _payment(self, chunk: dict, invoice: dict, party: dict, ids: dict, posting) -> None:
+        is_sales = invoice["invoice_type"] == InvoiceType.SALES
+        payment_date = min(invoice["invoice_date"] + timedelta(days=self.rng.randint(5, 45)), self.end_date)
+        payment_id = ids[Payment]()
+        amount = invoice["amount_paid"]
+        payment_number = self._number("REC" if is_sales else "PAY", payment_date)
+        chunk[Payment].append({
+            "id": payment_id,
+            "payment_number": payment_number,
+            "payment_date": payment_date,
+            "payment_type": PaymentType.RECEIPT if is_sales else PaymentType.PAYMENT,
+            "client_id": invoice["client_id"],
+            "vendor_id": invoice["vendor_id"],
+            "branch_id": invoice["branch_id"],
+            "invoice_id": invoice["id"],
+            "gross_amount": amount,
+            "net_amount": amount,
+            "payment_mode": self.rng.choice(PAYMENT_MODES),
+            "reference_number": f"UTR{self.rng.randrange(10 ** 12):012d}",
+            "status": PaymentStatus.COMPLETED,
+            "is_posted": True,
+        })
+        chunk[PaymentAllocation].append({
+            "id": ids[PaymentAllocation](),
+            "payment_id": payment_id,
+            "invoice_id": invoice["id"],
+            "amount": amount,
+        })
+
+        # Same two lines as post_receipt / post_payment_to_vendor without TDS
+        party_account = posting.default_ar_account_id if is_sales else posting.default_ap_account_id
+        common = {
+            "entry_date": payment_date,
+            "voucher_number": self._number("PAY", payment_date, series="voucher-payment"),
+            "reference_type": ReferenceType.PAYMENT,
+            "reference_id": payment_id,
+            "client_id": invoice["client_id"],
+            "vendor_id": invoice["vendor_id"],
+            "branch_id": invoice["branch_id"],
+            "financial_year": get_financial_year(payment_date),
+        }
+        bank_side = {"debit": amount, "credit": Decimal("0")} if is_sales else {"debit": Decimal("0"), "credit": amount}
+        party_side = {"debit": bank_side["credit"], "credit": bank_side["debit"]}
+        for account_id, sides in ((posting.default_bank_account_id, bank_side), (party_account, party_side)):
+            chunk[LedgerEntry].append({
+                **common,
+                **sides,
+                "id": ids[LedgerEntry](),
+                "account_id": account_id,
+                "narration": f"{'Receipt' if is_sales else 'Payment'} {payment_number}",
+            })
+
+
+async def _posting_settings(db) -> CompanySettings:
+    """Company settings with the default accounts, created if missing."""
+    company = (await db.execute(select(CompanySettings).limit(1))).scalar_one_or_none()
+    if company is None:
+        db.add(CompanySettings(
+            company_name="Hisaab Benchmark Pvt Ltd",
+            pan="AABCH1234F",
+            tan="MUMH12345A",
+            gstin="27AABCH1234F1Z5",
+            address="1 Bench Road",
+            city="Mumbai",
+            state="Maharashtra",
+            state_code="27",
+            pincode="400001",
+            email="accounts@hisaab.example",
+            phone="9800000000",
+        ))
+        await db.commit()
+    account_ids = await seed_default_accounts(db)
+    posting = CompanySettings()
+    for account in DEFAULT_ACCOUNTS:
+        if account.get("setting_field"):
+            setattr(posting, account["setting_field"], account_ids[account["code"]])
+    return posting
+
+
+async def generate(args) -> dict:
+    size = dataset_size(args.ledger_rows)
+    dataset = SyntheticDataset(size, args.seed, args.end_date, args.years, args.chunk_size)
+    started = time.perf_counter()
+
+    async with AsyncSessionLocal() as db:
+        if args.reset:
+            tables = ", ".join(model.__tablename__ for model in GENERATED_MODELS)
+            await db.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+            await db.commit()
+        elif (await db.execute(text("SELECT EXISTS (SELECT 1 FROM invoices)"))).scalar():
+            raise SystemExit("The database already has invoices; use --reset on a benchmark database")
+        posting = await _posting_settings(db)
+        next_ids = {}
+        for model in GENERATED_MODELS:
+            max_id = (await db.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {model.__tablename__}"))).scalar()
+            next_ids[model] = IdSequence(max_id + 1)
+
+    conn = await asyncpg.connect(args.database_url.replace("postgresql+asyncpg://", "postgresql://"))
+    try:
+        writers = {model: TableWriter(conn, model, dataset.timestamp) for model in GENERATED_MODELS}
+
+        async def write(model, rows):
+            await writers[model].write(rows)
+
+        branches = dataset.branches(next_ids[Branch])
+        await write(Branch, branches)
+        clients = dataset.clients(next_ids[Client])
+        await write(Client, clients)
+        vendors = dataset.vendors(next_ids[Vendor])
+        await write(Vendor, vendors)
+
+        for pos, items, schedules in dataset.client_pos(
+            clients, branches, next_ids[ClientPO], next_ids[ClientPOItem], next_ids[BillingSchedule]
+        ):
+            await write(ClientPO, pos)
+            await write(ClientPOItem, items)
+            await write(BillingSchedule, schedules)
+
+        challans, challan_ids = dataset.challans(branches, next_ids[TDSChallan])
+        await write(TDSChallan, challans)
+
+        parties = {"clients": clients, "vendors": vendors}
+        for chunk in dataset.invoices(parties, branches, challan_ids, next_ids, posting):
+            for model in (Invoice, InvoiceItem, TDSChallanEntry, Payment, PaymentAllocation, LedgerEntry):
+                await write(model, chunk[model])
+            print(f"  {writers[Invoice].rows:>10,} invoices  {writers[LedgerEntry].rows:>12,} ledger rows", flush=True)
+
+        # Challan totals from their entries; months without TDS lose their challan
+        await conn.execute("""
+            UPDATE tds_challans c
+            SET tds_amount = e.tds_amount, total_amount = e.tds_amount
+            FROM (
+                SELECT challan_id, SUM(tds_amount) AS tds_amount
+                FROM tds_challan_entries GROUP BY challan_id
+            ) e
+            WHERE e.challan_id = c.id
+        """)
+        await conn.execute("""
+            DELETE FROM tds_challans c
+            WHERE NOT EXISTS (SELECT 1 FROM tds_challan_entries e WHERE e.challan_id = c.id)
+              AND NOT EXISTS (SELECT 1 FROM invoices i WHERE i.tds_challan_id = c.id)
+        """)
+
+        for model in GENERATED_MODELS:
+            table = model.__tablename__
+            await conn.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {table}), false)"
+            )
+        for model in GENERATED_MODELS:
+            await conn.execute(f"ANALYZE {model.__tablename__}")
+    finally:
+        await conn.close()
+
+    async with AsyncSessionLocal() as db:
+        await rebuild_tds_aggregates(db)
+        await db.commit()
+
+    return {
+        "seed": args.seed,
+        "end_date": args.end_date.isoformat(),
+        "years": args.years,
+        "size": asdict(size),
+        "rows": {model.__tablename__: writers[model].rows for model in GENERATED_MODELS},
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a deterministic benchmark dataset")
+    parser.add_argument("--ledger-rows", type=int, default=100_000, help="Target ledger rows (10k to 10M)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date(2025, 3, 31),
+                        help="Last transaction date (default 2025-03-31)")
+    parser.add_argument("--years", type=int, default=2, help="Years of history before end date")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Invoices per COPY batch")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--reset", action="store_true", help="Truncate the generated tables first")
+    args = parser.parse_args()
+
+    summary = asyncio.run(generate(args))
+    print(f"Generated in {summary['seconds']}s:")
+    for table, rows in summary["rows"].items():
+        print(f"  {table:<22}{rows:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -833,7 +833,11 @@ export function InvoiceForm({ returnPath = '/invoices' }: InvoiceFormProps) {
                         <option value="194C">194C - Contractor</option>
                         <option value="194J">194J - Professional</option>
                         <option value="194H">194H - Commission</option>
-                        <option value="194I">194I - Rent</option>
+                        <option value="194I(A)">194I(a) - Rent (Plant & Machinery)</option>
+                        <option value="194I(B)">194I(b) - Rent (Land & Building)</option>
+                        {formData.tds_section === '194I' && (
+                          <option value="194I">194I - Rent (unclassified)</option>
+                        )}
                         <option value="194Q">194Q - Purchase of Goods</option>
                       </select>
                     </div>
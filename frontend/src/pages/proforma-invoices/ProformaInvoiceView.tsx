@@ -110,6 +110,7 @@ export function ProformaInvoiceView() {
       SENT: 'bg-blue-100 text-blue-800',
       GENERATED: 'bg-green-100 text-green-800',
       CANCELLED: 'bg-red-100 text-red-800',
+      EXPIRED: 'bg-orange-100 text-orange-800',
     };
     return colors[status] || 'bg-gray-100 text-gray-800';
   };
@@ -125,6 +125,7 @@ export function ProformaInvoices() {
       SENT: 'bg-blue-100 text-blue-800',
       GENERATED: 'bg-green-100 text-green-800',
       CANCELLED: 'bg-red-100 text-red-800',
+      EXPIRED: 'bg-orange-100 text-orange-800',
     };
     return colors[status] || 'bg-gray-100 text-gray-800';
   };
@@ -178,6 +179,7 @@ export function ProformaInvoices() {
                 <option value="SENT">Sent</option>
                 <option value="GENERATED">Generated</option>
                 <option value="CANCELLED">Cancelled</option>
+                <option value="EXPIRED">Expired</option>
               </select>
             </div>
             <div className="relative flex-1 min-w-[200px]">
@@ -27,6 +27,7 @@ export function ExpectedIncome() {
   );
   const [clientId, setClientId] = useState<string>('');
   const [activeTab, setActiveTab] = useState<'monthly' | 'clients' | 'details'>('monthly');
+  const [detailsPage, setDetailsPage] = useState(1);
 
   const { data: clients } = useQuery<Client[]>({
     queryKey: ['clients-active'],
@@ -37,9 +38,9 @@ export function ExpectedIncome() {
   });
 
   const { data, isLoading, error } = useQuery<ExpectedIncomeResponse>({
-    queryKey: ['expected-income', fromMonth, toMonth, clientId],
+    queryKey: ['expected-income', fromMonth, toMonth, clientId, detailsPage],
     queryFn: () => {
-      const params: Record<string, unknown> = {};
+      const params: Record<string, unknown> = { page: detailsPage };
       if (fromMonth) params.from_month = fromMonth;
       if (toMonth) params.to_month = toMonth;
       if (clientId) params.client_id = parseInt(clientId);
@@ -72,7 +73,7 @@ export function ExpectedIncome() {
                 id="from_month"
                 type="month"
                 value={fromMonth}
-                onChange={(e) => setFromMonth(e.target.value)}
+                onChange={(e) => { setFromMonth(e.target.value); setDetailsPage(1); }}
               />
             </div>
             <div>
@@ -81,7 +82,7 @@ export function ExpectedIncome() {
                 id="to_month"
                 type="month"
                 value={toMonth}
-                onChange={(e) => setToMonth(e.target.value)}
+                onChange={(e) => { setToMonth(e.target.value); setDetailsPage(1); }}
               />
             </div>
             <div>
@@ -89,7 +90,7 @@ export function ExpectedIncome() {
               <select
                 id="client"
                 value={clientId}
-                onChange={(e) => setClientId(e.target.value)}
+                onChange={(e) => { setClientId(e.target.value); setDetailsPage(1); }}
                 className="flex h-10 w-full rounded-md border border-gray-300 bg-white px-3 py-2 text-sm focus:outline-none focus:ring-2 focus:ring-blue-500"
               >
                 <option value="">All Clients</option>
@@ -107,6 +108,7 @@ export function ExpectedIncome() {
                   setFromMonth(`${today.getFullYear()}-${String(today.getMonth() + 1).padStart(2, '0')}`);
                   setToMonth(`${today.getFullYear() + 1}-${String(today.getMonth() + 1).padStart(2, '0')}`);
                   setClientId('');
+                  setDetailsPage(1);
                 }}
               >
                 Reset Filters
@@ -378,6 +380,31 @@ export function ExpectedIncome() {
                         ))}
                       </tbody>
                     </table>
+                    {data.details_page.total_pages > 1 && (
+                      <div className="flex items-center justify-between pt-4">
+                        <p className="text-sm text-gray-500">
+                          Page {data.details_page.page} of {data.details_page.total_pages} ({data.details_page.total} schedules)
+                        </p>
+                        <div className="flex gap-2">
+                          <Button
+                            variant="outline"
+                            size="sm"
+                            disabled={detailsPage <= 1}
+                            onClick={() => setDetailsPage(detailsPage - 1)}
+                          >
+                            Previous
+                          </Button>
+                          <Button
+                            variant="outline"
+                            size="sm"
+                            disabled={detailsPage >= data.details_page.total_pages}
+                            onClick={() => setDetailsPage(detailsPage + 1)}
+                          >
+                            Next
+                          </Button>
+                        </div>
+                      </div>
+                    )}
                   </div>
                 )}
               </CardContent>
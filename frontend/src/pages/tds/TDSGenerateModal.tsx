@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react';
 import { useQuery, useMutation } from '@tanstack/react-query';
 import { X, Upload } from 'lucide-react';
 import { tdsApi } from '../../services/api';
-import type { TDSType, PendingTDSTransaction, TDSChallanCreate, TDSChallanEntryCreate } from '../../types';
+import type { TDSType, PendingTDSTransaction, TDSChallanCreate } from '../../types';
 
 interface TDSGenerateModalProps {
   isOpen: boolean;
@@ -71,6 +71,23 @@ export default function TDSGenerateModal({
     enabled: isOpen,
   });
 
+  // Section 201(1A) interest for the pending transactions if paid on the payment date
+  const { data: interestData } = useQuery({
+    queryKey: ['tds-interest', financialYear, month, paymentDate, branchId],
+    queryFn: () => tdsApi.calculateInterest(financialYear, { month, payment_date: paymentDate, branch_id: branchId }),
+    enabled: isOpen && tdsType === 'PAYABLE' && !!paymentDate,
+  });
+
+  // Prefill interest for the selected transactions
+  useEffect(() => {
+    if (interestData) {
+      const total = interestData.entries
+        .filter((e) => selectedTransactions.has(e.invoice_id))
+        .reduce((sum, e) => sum + Number(e.interest), 0);
+      setInterest(total.toFixed(2));
+    }
+  }, [interestData, selectedTransactions]);
+
   // Select all by default
   useEffect(() => {
     if (pendingData?.transactions) {
@@ -140,24 +157,6 @@ export default function TDSGenerateModal({
       return;
     }
 
-    const selectedTxns = pendingData!.transactions.filter((t) =>
-      selectedTransactions.has(t.invoice_id)
-    );
-
-    const entries: TDSChallanEntryCreate[] = selectedTxns.map((t) => ({
-      invoice_id: t.invoice_id,
-      party_name: t.party_name,
-      party_pan: t.party_pan || undefined,
-      invoice_number: t.invoice_number,
-      invoice_date: t.invoice_date,
-      base_amount: t.base_amount,
-      tds_rate: t.tds_rate,
-      tds_section: t.tds_section,
-      tds_amount: t.tds_amount,
-      penalty: 0,
-      interest: 0,
-    }));
-
     const challanData: TDSChallanCreate = {
       challan_number: challanNumber,
       bsr_code: bsrCode,
@@ -170,7 +169,7 @@ export default function TDSGenerateModal({
       branch_id: branchId,
       penalty: parseFloat(penalty) || 0,
       interest: parseFloat(interest) || 0,
-      entries,
+      invoice_ids: Array.from(selectedTransactions),
     };
 
     createChallanMutation.mutate(challanData);
@@ -121,6 +121,7 @@ export default function TDSSheet() {
     { key: 'tds_paid', label: 'TDS Paid', isClickable: false },
     { key: 'penalty', label: 'Penalty', isClickable: false },
     { key: 'interest', label: 'Interest', isClickable: false },
+    { key: 'interest_accrued', label: 'Interest Accrued', isClickable: false },
     { key: 'challan', label: 'Challan', isClickable: false, isFile: true },
     { key: 'tds_return', label: 'TDS Return', isClickable: false, isQuarterly: true },
     { key: 'tds_deducted', label: 'TDS Deducted', isClickable: false },
@@ -139,6 +140,8 @@ export default function TDSSheet() {
         return monthData.penalty;
       case 'interest':
         return monthData.interest;
+      case 'interest_accrued':
+        return monthData.interest_accrued;
       case 'challan':
         return monthData.has_challan_files ? 'download' : null;
       case 'tds_return':
@@ -166,6 +169,8 @@ export default function TDSSheet() {
         return sheetData.totals.penalty;
       case 'interest':
         return sheetData.totals.interest;
+      case 'interest_accrued':
+        return sheetData.totals.interest_accrued;
       case 'tds_deducted':
         return sheetData.totals.tds_deducted;
       default:
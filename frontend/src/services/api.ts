@@ -22,7 +22,13 @@ import type {
   Item,
   ClientPO,
   BillingSchedule,
+  BillingRunRequest,
+  BulkGenerateSchedulesRequest,
+  BulkGenerateSchedulesResponse,
+  BillingRunResponse,
+  POFulfillmentReconcileResponse,
   ProformaInvoice,
+  PIBulkGenerateResponse,
   TDSChallan,
   TDSChallanCreate,
   TDSChallanUpdate,
@@ -31,6 +37,9 @@ import type {
   TDSSheetData,
   PendingTDSResponse,
   TDSReturnExportResponse,
+  TDSThresholdCheck,
+  Form16AJob,
+  TDSInterestResponse,
   TDSType,
 } from '../types';
 
@@ -155,6 +164,15 @@ export const invoiceApi = {
   update: (id: number, data: unknown) => api.patch<Invoice>(`/invoices/${id}`, data),
   delete: (id: number) => api.delete<{ message: string }>(`/invoices/${id}`),
   updateStatus: (id: number, status: string) => api.patch<Invoice>(`/invoices/${id}/status`, { status_update: status }),
+  bulkUpdateStatus: (invoiceIds: number[], status: string) =>
+    api.post<{
+      status: string;
+      updated_count: number;
+      posted_count: number;
+      reversed_count: number;
+      failed_count: number;
+      results: { invoice_id: number; success: boolean; status?: string; voucher_number?: string; message?: string }[];
+    }>('/invoices/bulk-status', { invoice_ids: invoiceIds, status }),
 };
 
 // Payment API
@@ -309,6 +327,17 @@ export const reportsApi = {
     return response.blob();
   },
   getExpectedIncome: (params?: Record<string, unknown>) => api.get<ExpectedIncomeResponse>('/reports/expected-income', params),
+  getCashFlowForecast: (params?: { from_month?: string; months?: number; branch_id?: number }) =>
+    api.get<CashFlowForecastResponse>('/reports/cash-flow-forecast', params),
+  getCashFlowForecastDetails: (params: {
+    source: CashFlowSource;
+    from_month?: string;
+    months?: number;
+    month?: string;
+    branch_id?: number;
+    page?: number;
+    page_size?: number;
+  }) => api.get<PaginatedResponse<CashFlowDetail>>('/reports/cash-flow-forecast/details', params),
   getInvoiceMonthlySummary: (financialYear: string, branchId?: number) =>
     api.get<InvoiceMonthlySummaryResponse>('/reports/invoices/monthly-summary', {
       financial_year: financialYear,
@@ -357,6 +386,51 @@ export interface ExpectedIncomeResponse {
     gst_amount: number;
     total_amount: number;
   }>;
+  details_page: {
+    total: number;
+    page: number;
+    page_size: number;
+    total_pages: number;
+  };
+}
+
+// Cash Flow Forecast types
+export type CashFlowSource = 'billing' | 'receivable' | 'payable';
+
+export interface CashFlowBucket {
+  billing: number;
+  billing_count: number;
+  receivable: number;
+  receivable_count: number;
+  payable: number;
+  payable_count: number;
+  net: number;
+}
+
+export interface CashFlowForecastResponse {
+  period: { from: string; to: string; months: number };
+  branch_id: number | null;
+  summary: CashFlowBucket;
+  overdue: CashFlowBucket;
+  months: Array<CashFlowBucket & { month: string; month_name: string; cumulative_net: number }>;
+  branches: Array<{
+    branch_id: number | null;
+    branch_name: string;
+    totals: CashFlowBucket;
+    overdue: CashFlowBucket;
+    months: Array<CashFlowBucket & { month: string }>;
+  }>;
+}
+
+export interface CashFlowDetail {
+  id: number;
+  source: CashFlowSource;
+  reference: string;
+  party_name: string | null;
+  description: string | null;
+  due_date: string;
+  amount: number;
+  branch_id: number | null;
 }
 
 // Settings API
@@ -404,6 +478,7 @@ export const authApi = {
   register: (data: unknown) => api.post('/auth/register', data),
   me: () => api.get('/auth/me'),
   logout: () => api.post('/auth/logout'),
+  changePassword: (data: { current_password: string; new_password: string }) => api.post('/auth/change-password', data),
 };
 
 // Invoice Attachment API
@@ -520,6 +595,11 @@ export const proformaInvoiceApi = {
   updateStatus: (id: number, status: string) => api.patch<ProformaInvoice>(`/proforma-invoices/${id}/status?status_update=${status}`, {}),
   delete: (id: number) => api.delete<{ message: string }>(`/proforma-invoices/${id}`),
   generateInvoice: (id: number) => api.post<{ message: string; invoice_id: number; invoice_number: string }>(`/proforma-invoices/${id}/generate-invoice`, {}),
+  generateInvoices: (piIds: number[], invoiceDate?: string) =>
+    api.post<PIBulkGenerateResponse>('/proforma-invoices/generate-invoices', {
+      pi_ids: piIds,
+      ...(invoiceDate && { invoice_date: invoiceDate }),
+    }),
 };
 
 // Client PO API (Sales Orders received from clients)
@@ -534,6 +614,8 @@ export const clientPOApi = {
   getSchedules: (poId: number) => api.get<BillingSchedule[]>(`/client-pos/${poId}/schedules`),
   generateSchedules: (poId: number, data: { start_date: string; end_date?: string }) =>
     api.post<BillingSchedule[]>(`/client-pos/${poId}/schedules/generate`, data),
+  generateSchedulesBulk: (data: BulkGenerateSchedulesRequest) =>
+    api.post<BulkGenerateSchedulesResponse>('/client-pos/schedules/generate-bulk', data),
   createSchedule: (poId: number, data: unknown) =>
     api.post<BillingSchedule>(`/client-pos/${poId}/schedules`, data),
   updateSchedule: (poId: number, scheduleId: number, data: unknown) =>
@@ -546,6 +628,10 @@ export const clientPOApi = {
   // Create PI from schedule
   createPIFromSchedule: (poId: number, scheduleId: number, data?: { invoice_date?: string; due_date?: string; bank_account_id?: number; notes?: string }) =>
     api.post<ProformaInvoice>(`/client-pos/${poId}/schedules/${scheduleId}/create-pi`, data || {}),
+  // Invoice all schedules due up to a date (dry_run previews them)
+  billingRun: (data: BillingRunRequest) => api.post<BillingRunResponse>('/client-pos/billing-run', data),
+  // Recompute invoiced amounts and status of all POs
+  reconcileFulfillment: () => api.post<POFulfillmentReconcileResponse>('/client-pos/reconcile-fulfillment'),
 };
 
 // TDS API
@@ -663,4 +749,71 @@ export const tdsApi = {
       tds_type: params.tds_type,
       branch_id: params.branch_id,
     }),
+
+  generateCertificates: (financialYear: string, quarter: number, params?: { branch_id?: number; restart?: boolean }) =>
+    api.post<Form16AJob>(
+      `/tds/certificates/${financialYear}/${quarter}/generate?${new URLSearchParams(
+        Object.entries(params || {}).filter(([, v]) => v !== undefined).map(([k, v]) => [k, String(v)])
+      )}`
+    ),
+
+  getCertificatesStatus: (financialYear: string, quarter: number, branchId?: number) =>
+    api.get<Form16AJob>(`/tds/certificates/${financialYear}/${quarter}/status`, { branch_id: branchId }),
+
+  downloadCertificates: async (financialYear: string, quarter: number, branchId?: number) => {
+    const token = localStorage.getItem('access_token');
+    if (!token) {
+      throw new Error('Not authenticated. Please log in again.');
+    }
+    const query = branchId ? `?branch_id=${branchId}` : '';
+    const response = await fetch(`/api/v1/tds/certificates/${financialYear}/${quarter}/download${query}`, {
+      headers: { 'Authorization': `Bearer ${token}` },
+    });
+    if (!response.ok) throw new Error('Failed to download certificates');
+    const blob = await response.blob();
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = `Form16A_${financialYear}_Q${quarter}.zip`;
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    window.URL.revokeObjectURL(url);
+  },
+
+  calculateInterest: (financialYear: string, params: { month?: number; quarter?: number; payment_date?: string; filed_date?: string; branch_id?: number }) =>
+    api.get<TDSInterestResponse>(`/tds/interest/${financialYear}`, params),
+
+  checkThreshold: (params: { vendor_id: number; amount: number; invoice_date?: string; section?: string }) =>
+    api.get<TDSThresholdCheck>('/tds/threshold/check', params),
+
+  downloadReturnExport: async (
+    params: { financial_year: string; quarter: number; tds_type: TDSType; branch_id?: number },
+    format: 'txt' | 'xlsx',
+    filename: string
+  ) => {
+    const token = localStorage.getItem('access_token');
+    if (!token) {
+      throw new Error('Not authenticated. Please log in again.');
+    }
+    const query = new URLSearchParams({ tds_type: params.tds_type, format });
+    if (params.branch_id) query.set('branch_id', String(params.branch_id));
+    const response = await fetch(
+      `/api/v1/tds/return/${params.financial_year}/${params.quarter}/export?${query}`,
+      { headers: { 'Authorization': `Bearer ${token}` } }
+    );
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.detail || 'Failed to export return');
+    }
+    const blob = await response.blob();
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = filename;
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    window.URL.revokeObjectURL(url);
+  },
 };
@@ -346,6 +346,13 @@ export interface Payment extends BaseEntity {
   notes: string | null;
   status: 'PENDING' | 'COMPLETED' | 'CANCELLED';
   is_posted: boolean;
+  allocations: PaymentAllocation[];
+}
+
+export interface PaymentAllocation {
+  id: number;
+  invoice_id: number;
+  amount: number;
 }
 
 export interface PaymentCreate {
@@ -363,6 +370,8 @@ export interface PaymentCreate {
   reference_number?: string;
   cheque_date?: string;
   notes?: string;
+  allocations?: { invoice_id: number; amount: number }[];
+  auto_allocate?: boolean;
 }
 
 // Ledger Types
@@ -618,8 +627,93 @@ export interface CreateInvoiceFromScheduleRequest {
   notes?: string;
 }
 
+export interface BulkGenerateSchedulesRequest {
+  client_po_ids: number[];
+  start_date?: string;
+  end_date?: string;
+}
+
+export interface BulkGenerateSchedulesResult {
+  client_po_id: number;
+  success: boolean;
+  schedule_count: number;
+  message: string | null;
+}
+
+export interface BulkGenerateSchedulesResponse {
+  generated_count: number;
+  failed_count: number;
+  results: BulkGenerateSchedulesResult[];
+}
+
+export interface POFulfillmentCorrection {
+  client_po_id: number;
+  internal_number: string;
+  old_invoiced_amount: number;
+  invoiced_amount: number;
+  remaining_amount: number;
+  old_status: ClientPOStatus;
+  status: ClientPOStatus;
+}
+
+export interface POFulfillmentReconcileResponse {
+  corrected_count: number;
+  corrections: POFulfillmentCorrection[];
+}
+
+export interface BillingRunRequest {
+  run_date: string;
+  invoice_date?: string;
+  due_date?: string;
+  bank_account_id?: number;
+  client_id?: number;
+  branch_id?: number;
+  client_po_ids?: number[];
+  dry_run?: boolean;
+}
+
+export interface BillingRunItem {
+  schedule_id: number;
+  client_po_id: number;
+  client_po_internal_number: string;
+  client_name: string | null;
+  installment_number: number;
+  description: string | null;
+  due_date: string;
+  amount: number;
+  gst_amount: number;
+  total_amount: number;
+  invoice_id: number | null;
+  invoice_number: string | null;
+}
+
+export interface BillingRunResponse {
+  dry_run: boolean;
+  run_date: string;
+  schedule_count: number;
+  po_count: number;
+  amount: number;
+  gst_amount: number;
+  total_amount: number;
+  items: BillingRunItem[];
+}
+
 // Proforma Invoice Types
-export type PIStatus = 'DRAFT' | 'SENT' | 'GENERATED' | 'CANCELLED';
+export type PIStatus = 'DRAFT' | 'SENT' | 'GENERATED' | 'CANCELLED' | 'EXPIRED';
+
+export interface PIBulkGenerateResult {
+  pi_id: number;
+  success: boolean;
+  invoice_id: number | null;
+  invoice_number: string | null;
+  message: string | null;
+}
+
+export interface PIBulkGenerateResponse {
+  generated_count: number;
+  failed_count: number;
+  results: PIBulkGenerateResult[];
+}
 
 export interface ProformaInvoiceItem {
   id: number;
@@ -1007,20 +1101,6 @@ export interface TDSChallan extends BaseEntity {
   entries?: TDSChallanEntry[];
 }
 
-export interface TDSChallanEntryCreate {
-  invoice_id: number;
-  party_name: string;
-  party_pan?: string;
-  invoice_number: string;
-  invoice_date: string;
-  base_amount: number;
-  tds_rate: number;
-  tds_section: string;
-  tds_amount: number;
-  penalty?: number;
-  interest?: number;
-}
-
 export interface TDSChallanCreate {
   challan_number: string;
   bsr_code: string;
@@ -1034,7 +1114,7 @@ export interface TDSChallanCreate {
   penalty?: number;
   interest?: number;
   notes?: string;
-  entries: TDSChallanEntryCreate[];
+  invoice_ids: number[];
 }
 
 export interface TDSChallanUpdate {
@@ -1086,6 +1166,7 @@ export interface MonthData {
   has_challan_files: boolean;
   tds_deducted: number;
   has_pending: boolean;
+  interest_accrued: number;
 }
 
 export interface QuarterData {
@@ -1093,6 +1174,8 @@ export interface QuarterData {
   return_status: ReturnStatus | null;
   has_return_file: boolean;
   return_id: number | null;
+  filed_date: string | null;
+  late_filing_fee: number;
 }
 
 export interface TDSSheetData {
@@ -1107,6 +1190,8 @@ export interface TDSSheetData {
     penalty: number;
     interest: number;
     tds_deducted: number;
+    interest_accrued: number;
+    late_filing_fee: number;
   };
 }
 
@@ -1144,3 +1229,57 @@ export interface TDSReturnExportResponse {
   total_interest: number;
   total_payable: number;
 }
+
+export interface TDSInterestEntry {
+  invoice_id: number;
+  invoice_number: string;
+  invoice_date: string;
+  tds_amount: number;
+  due_date: string;
+  months: number;
+  interest: number;
+}
+
+export interface TDSInterestResponse {
+  financial_year: string;
+  month: number | null;
+  quarter: number | null;
+  payment_date: string;
+  entries: TDSInterestEntry[];
+  total_tds: number;
+  total_interest: number;
+  return_due_date: string | null;
+  late_filing_fee: number;
+}
+
+export interface Form16AJob {
+  key: string;
+  financial_year: string;
+  quarter: number;
+  branch_id: number | null;
+  status: 'idle' | 'running' | 'interrupted' | 'completed' | 'failed';
+  total: number;
+  generated: number;
+  started_at: string | null;
+  finished_at: string | null;
+  file_name: string | null;
+  error: string | null;
+}
+
+export interface TDSThresholdCheck {
+  vendor_id: number;
+  financial_year: string;
+  section: string;
+  previous_total: number;
+  new_total: number;
+  single_limit: number | null;
+  aggregate_limit: number | null;
+  threshold_crossed: boolean;
+  crossed_now: boolean;
+  tds_applicable: boolean;
+  pan_valid: boolean;
+  rate: number;
+  taxable_base: number;
+  catch_up_base: number;
+  tds_amount: number;
+}